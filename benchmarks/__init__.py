@@ -0,0 +1,7 @@
+"""
+Bancs d'essai et contrôles de non-régression
+
+Chaque banc est un script exécutable (`python -m benchmarks.<banc>`) qui
+chronomètre une partie de l'application sur des dossiers de référence et
+compare ses sorties à des résultats attendus enregistrés dans `golden/`.
+"""
@@ -0,0 +1,278 @@
+"""
+Banc d'essai et non-régression du moteur financier
+
+Chronomètre chaque fonction `calculer_*` de `services/financial/calculations.py`
+ainsi que `calculer_tableaux_financiers` complet et la recherche d'objectif sur
+les variables de charges sur les dossiers de référence, puis compare toutes les sorties aux résultats attendus de `golden/financier.json`.
+
+Usage:
+    python -m benchmarks.bench_financier                  # mesure + vérification
+    python -m benchmarks.bench_financier --repetitions 50
+    python -m benchmarks.bench_financier --mettre-a-jour  # réenregistre les résultats attendus
+
+Incohérences connues, figées telles quelles par les résultats attendus :
+    - deux plans de financement coexistent (`calculer_plan_financement_cinq_ans`
+      pour les tableaux 5 ans, `calculer_plan_financement_5_ans` pour
+      `calculer_tableaux_financiers`) et ne donnent pas les mêmes soldes ;
+    - `calculer_budget_tresorerie_5_ans` lit `ca_mensuel` et une liste de charges
+      fixes, alors que `calculer_tableaux_financiers` lui passe les données de base :
+      le budget y échoue (`success` faux) dès qu'une charge fixe est saisie. Il est
+      donc aussi mesuré sur des données à son propre format.
+"""
+
+import sys
+import json
+import math
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+import numpy as np
+
+RACINE = Path(__file__).resolve().parent.parent
+if str(RACINE) not in sys.path:
+    sys.path.insert(0, str(RACINE))
+
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+from services.financial import calculations as calc
+from services.financial.projections import extraire_hypotheses
+from services.financial.solver import resoudre_objectif
+from benchmarks.fixtures_financieres import DOSSIERS, donnees_budget_tresorerie
+
+# Exécution hors de `streamlit run` : inutile d'avertir de l'absence de contexte de script
+config.set_option('logger.level', 'error')
+set_log_level('error')
+
+FICHIER_ATTENDU = Path(__file__).resolve().parent / 'golden' / 'financier.json'
+
+# Tolérances de comparaison des nombres aux résultats attendus
+TOLERANCE_RELATIVE = 1e-9
+TOLERANCE_ABSOLUE = 1e-6
+
+
+def _preparer_session(dossier: Dict[str, Any]) -> None:
+    """Place un dossier dans le session state, comme le font les pages financières."""
+    for cle in ('investissements', 'charges_fixes', 'ca_previsions', 'charges_variables', 'salaires', 'financements'):
+        st.session_state[cle] = dossier[cle]
+    st.session_state['data'] = {'indexation': dossier['indexation']}
+
+
+def _tableaux_complets(dossier: Dict[str, Any]) -> Dict[str, Any]:
+    _preparer_session(dossier)
+    return calc.calculer_tableaux_financiers()
+
+
+def _tableaux_complets_5_ans(dossier: Dict[str, Any]) -> Dict[str, Any]:
+    _preparer_session(dossier)
+    return calc.calculer_tableaux_financiers_5_ans()
+
+
+def _objectif_borne(dossier: Dict[str, Any], variable: str) -> Dict[str, Any]:
+    """
+    Recherche d'objectif sur une variable dont l'indicateur décroît (charges) :
+    sans borne, puis bornée sous la solution, où la cible reste dépassée sur
+    tout l'intervalle et la recherche doit échouer au lieu de rendre la borne basse.
+    """
+    hypotheses = extraire_hypotheses(dossier)
+    sans_borne = resoudre_objectif(hypotheses, variable, 'resultat_net_annee')
+    if not sans_borne['success']:
+        return {'sans_borne': sans_borne}
+    bornee = resoudre_objectif(hypotheses, variable, 'resultat_net_annee', borne_max=sans_borne['valeur'] / 2)
+    return {
+        'sans_borne': {cle: sans_borne[cle] for cle in ('success', 'valeur', 'indicateur_atteint')},
+        'bornee': {cle: bornee.get(cle) for cle in ('success', 'valeur', 'bornes')}
+    }
+
+
+# Cas mesurés : nom -> fonction du dossier
+CAS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'calculer_tableau_investissements': lambda d: calc.calculer_tableau_investissements(d['investissements']),
+    'calculer_bases_indexees': calc.calculer_bases_indexees,
+    'calculer_compte_resultats': calc.calculer_compte_resultats,
+    'calculer_plans_amortissement_investissements': lambda d: calc.calculer_plans_amortissement_investissements(d['investissements']),
+    'calculer_amortissements_annuels': lambda d: calc.calculer_amortissements_annuels(d['investissements']),
+    'calculer_soldes_intermediaires': calc.calculer_soldes_intermediaires,
+    'calculer_compte_resultats_5_ans': calc.calculer_compte_resultats_5_ans,
+    'calculer_amortissements_5_ans': lambda d: calc.calculer_amortissements_5_ans(d['investissements']),
+    'calculer_soldes_intermediaires_5_ans': calc.calculer_soldes_intermediaires_5_ans,
+    'calculer_tableau_caf_5_ans': calc.calculer_tableau_caf_5_ans,
+    'calculer_tableau_seuil_rentabilite_5_ans': calc.calculer_tableau_seuil_rentabilite_5_ans,
+    'calculer_tableau_bfr_5_ans': calc.calculer_tableau_bfr_5_ans,
+    'calculer_plan_financement_cinq_ans': calc.calculer_plan_financement_cinq_ans,
+    'calculer_plan_financement_5_ans': calc.calculer_plan_financement_5_ans,
+    'calculer_budget_tresorerie_5_ans': calc.calculer_budget_tresorerie_5_ans,
+    'calculer_budget_tresorerie_5_ans[format_budget]': lambda d: calc.calculer_budget_tresorerie_5_ans(donnees_budget_tresorerie(d)),
+    'calculer_tableaux_financiers': _tableaux_complets,
+    'calculer_tableaux_financiers_5_ans': _tableaux_complets_5_ans,
+    'resoudre_objectif[charges_fixes_mensuelles]': lambda d: _objectif_borne(d, 'charges_fixes_mensuelles'),
+    'resoudre_objectif[taux_charges_variables]': lambda d: _objectif_borne(d, 'taux_charges_variables')
+}
+
+
+def normaliser(valeur: Any) -> Any:
+    """
+    Convertit une sortie du moteur en structure JSON (tableaux NumPy, tuples, scalaires)
+
+    Args:
+        valeur: Sortie d'une fonction de calcul
+
+    Returns:
+        Structure composée de dict, list, str, bool, int, float et None
+    """
+    if isinstance(valeur, dict):
+        return {str(cle): normaliser(v) for cle, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [normaliser(v) for v in valeur]
+    if isinstance(valeur, np.ndarray):
+        return normaliser(valeur.tolist())
+    if isinstance(valeur, np.generic):
+        return valeur.item()
+    return valeur
+
+
+def comparer(attendu: Any, obtenu: Any, chemin: str = '') -> List[str]:
+    """
+    Liste les écarts entre une sortie et son résultat attendu
+
+    Args:
+        attendu: Résultat enregistré
+        obtenu: Résultat normalisé de l'exécution courante
+        chemin (str): Chemin de la valeur comparée, pour les messages
+
+    Returns:
+        list: Description de chaque écart (vide si identiques)
+    """
+    if isinstance(attendu, bool) or isinstance(obtenu, bool):
+        return [] if attendu == obtenu else [f"{chemin} : {attendu!r} attendu, {obtenu!r} obtenu"]
+    if isinstance(attendu, (int, float)) and isinstance(obtenu, (int, float)):
+        if math.isclose(attendu, obtenu, rel_tol=TOLERANCE_RELATIVE, abs_tol=TOLERANCE_ABSOLUE):
+            return []
+        return [f"{chemin} : {attendu!r} attendu, {obtenu!r} obtenu"]
+    if isinstance(attendu, dict) and isinstance(obtenu, dict):
+        ecarts = [f"{chemin}.{cle} : clé absente" for cle in attendu if cle not in obtenu]
+        ecarts += [f"{chemin}.{cle} : clé inattendue" for cle in obtenu if cle not in attendu]
+        for cle in attendu:
+            if cle in obtenu:
+                ecarts += comparer(attendu[cle], obtenu[cle], f"{chemin}.{cle}")
+        return ecarts
+    if isinstance(attendu, list) and isinstance(obtenu, list):
+        if len(attendu) != len(obtenu):
+            return [f"{chemin} : {len(attendu)} éléments attendus, {len(obtenu)} obtenus"]
+        ecarts = []
+        for i, (a, o) in enumerate(zip(attendu, obtenu)):
+            ecarts += comparer(a, o, f"{chemin}[{i}]")
+        return ecarts
+    return [] if attendu == obtenu else [f"{chemin} : {attendu!r} attendu, {obtenu!r} obtenu"]
+
+
+def mesurer(fonction: Callable[[Dict[str, Any]], Any], fabrique: Callable[[], Dict[str, Any]],
+            repetitions: int) -> Dict[str, Any]:
+    """
+    Chronomètre un cas sur un dossier neuf à chaque répétition
+
+    Args:
+        fonction (callable): Cas mesuré
+        fabrique (callable): Constructeur du dossier de référence
+        repetitions (int): Nombre d'exécutions chronométrées
+
+    Returns:
+        dict: Sortie normalisée de la première exécution et durées en ms
+    """
+    durees = []
+    sortie = None
+    for i in range(repetitions):
+        dossier = fabrique()
+        debut = time.perf_counter()
+        resultat = fonction(dossier)
+        durees.append((time.perf_counter() - debut) * 1000)
+        if i == 0:
+            sortie = normaliser(resultat)
+    return {
+        'sortie': sortie,
+        'min_ms': min(durees),
+        'mediane_ms': statistics.median(durees),
+        'max_ms': max(durees)
+    }
+
+
+def executer(repetitions: int = 20, dossiers: List[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Exécute tous les cas sur les dossiers demandés
+
+    Args:
+        repetitions (int): Nombre d'exécutions chronométrées par cas
+        dossiers (list, optional): Noms des dossiers (défaut : tous)
+
+    Returns:
+        dict: {dossier: {cas: mesure}}
+    """
+    resultats = {}
+    for nom in dossiers or list(DOSSIERS):
+        resultats[nom] = {cas: mesurer(fonction, DOSSIERS[nom], repetitions) for cas, fonction in CAS.items()}
+    return resultats
+
+
+def afficher(resultats: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    """Affiche les durées médianes, un cas par ligne et un dossier par colonne."""
+    dossiers = list(resultats)
+    largeur = max(len(cas) for cas in CAS)
+    print(f"{'Durée médiane (ms)':<{largeur}}" + ''.join(f"{nom:>12}" for nom in dossiers))
+    for cas in CAS:
+        print(f"{cas:<{largeur}}" + ''.join(f"{resultats[nom][cas]['mediane_ms']:>12.3f}" for nom in dossiers))
+
+
+def main(arguments: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Banc d'essai et non-régression du moteur financier")
+    parser.add_argument('--repetitions', type=int, default=20, help="exécutions chronométrées par cas")
+    parser.add_argument('--dossiers', nargs='+', choices=list(DOSSIERS), help="dossiers à mesurer (défaut : tous)")
+    parser.add_argument('--mettre-a-jour', action='store_true', help="réenregistre les résultats attendus")
+    parser.add_argument('--sans-verification', action='store_true', help="mesure uniquement")
+    options = parser.parse_args(arguments)
+
+    resultats = executer(max(options.repetitions, 1), options.dossiers)
+    afficher(resultats)
+
+    sorties = {nom: {cas: mesure['sortie'] for cas, mesure in cas_dossier.items()} for nom, cas_dossier in resultats.items()}
+
+    if options.mettre_a_jour:
+        attendus = json.loads(FICHIER_ATTENDU.read_text(encoding='utf-8')) if FICHIER_ATTENDU.exists() else {}
+        attendus.update(sorties)
+        FICHIER_ATTENDU.parent.mkdir(parents=True, exist_ok=True)
+        FICHIER_ATTENDU.write_text(json.dumps(attendus, indent=1, ensure_ascii=False, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"\n✅ Résultats attendus enregistrés : {FICHIER_ATTENDU.relative_to(RACINE)}")
+        return 0
+
+    if options.sans_verification:
+        return 0
+
+    if not FICHIER_ATTENDU.exists():
+        print(f"\n❌ Résultats attendus introuvables ({FICHIER_ATTENDU.relative_to(RACINE)}) : lancez avec --mettre-a-jour")
+        return 1
+
+    attendus = json.loads(FICHIER_ATTENDU.read_text(encoding='utf-8'))
+    ecarts = []
+    for nom, sorties_dossier in sorties.items():
+        for cas, sortie in sorties_dossier.items():
+            if cas not in attendus.get(nom, {}):
+                ecarts.append(f"{nom}/{cas} : aucun résultat attendu enregistré")
+                continue
+            ecarts += [f"{nom}/{cas}{ecart}" for ecart in comparer(attendus[nom][cas], sortie)]
+
+    if ecarts:
+        print(f"\n❌ {len(ecarts)} écart(s) avec les résultats attendus :")
+        for ecart in ecarts[:50]:
+            print(f"  - {ecart}")
+        if len(ecarts) > 50:
+            print(f"  ... et {len(ecarts) - 50} autre(s)")
+        return 1
+
+    print(f"\n✅ Sorties identiques aux résultats attendus ({sum(len(s) for s in sorties.values())} cas)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Banc d'essai de la génération de contenu contre le serveur OpenAI factice
+
+Exécute `generate_section`, `generer_business_model_canvas` et le flux complet
+`generate_complete_business_plan_origin_exact` contre `serveur_openai_factice`,
+sans consommer de tokens réels. Pour chaque scénario : durée totale, délai
+jusqu'au premier token, requêtes émises (nouvelles tentatives comprises),
+limitations 429, erreurs et tokens envoyés (dont servis par le cache de préfixes)
+et reçus.
+
+Usage:
+    python -m benchmarks.bench_generation
+    python -m benchmarks.bench_generation --scenarios section canvas --latence-ms 800 --taux-429 0.1
+    python -m benchmarks.bench_generation --sortie mesures_avant.json   # pour comparer deux versions
+
+Le registre des quotas, la télémétrie et la file des travaux sont redirigés
+vers un dossier temporaire : le trafic factice n'entame pas les quotas réels.
+
+Sans cache local des encodages tiktoken, les tokens du prompt sont estimés
+(caractères / 4) par `count_tokens_messages`.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+RACINE = Path(__file__).resolve().parent.parent
+if str(RACINE) not in sys.path:
+    sys.path.insert(0, str(RACINE))
+
+import streamlit as st
+from streamlit import config
+from streamlit.logger import set_log_level
+from benchmarks.serveur_openai_factice import ServeurOpenAIFactice
+from benchmarks.fixtures_financieres import dossier_typique
+
+# Exécution hors de `streamlit run` : inutile d'avertir de l'absence de contexte de script
+config.set_option('logger.level', 'error')
+set_log_level('error')
+
+TEMPLATE = "COPA TRANSFORME"
+
+DONNEES_ENTREPRISE = {
+    'nom_entreprise': "Agro Kivu Transformation",
+    'secteur_activite': "Transformation agroalimentaire",
+    'type_entreprise': "PME",
+    'localisation': "Goma, Nord-Kivu (RDC)",
+    'probleme_central': "Pertes post-récolte élevées et faible accès des producteurs aux marchés urbains",
+    'solution': "Unité de transformation du manioc et du maïs en farines conditionnées, collecte auprès des coopératives"
+}
+
+
+def _preparer_session() -> None:
+    """Remplit le session state comme après la saisie complète d'un dossier."""
+    st.session_state.clear()
+    dossier = dossier_typique()
+    for cle in ('investissements', 'charges_fixes', 'ca_previsions', 'charges_variables', 'salaires', 'financements'):
+        st.session_state[cle] = dossier[cle]
+    st.session_state['data'] = {
+        'indexation': dossier['indexation'],
+        'informations_generales': {**DONNEES_ENTREPRISE, 'type_vente': "Marchandises"},
+        'ca_previsions': dossier['ca_previsions'],
+        'charges_fixes': dossier['charges_fixes'],
+        'salaires': dossier['salaires'],
+        'financements': dossier['financements']
+    }
+    st.session_state['modele_openai_sidebar'] = 'gpt-4o'
+    st.session_state['template_selectionne'] = TEMPLATE
+    st.session_state['business_model_precedent'] = {
+        'segments_clients': "Ménages urbains de Goma, restaurants, écoles et ONG de distribution alimentaire",
+        'propositions_valeur': "Farines enrichies, conditionnées et disponibles toute l'année à prix stable"
+    }
+
+    # Tableaux financiers exportés, utilisés comme contexte du business plan
+    from services.financial.calculations import sauvegarder_donnees_financieres
+    sauvegarder_donnees_financieres()
+
+
+def _scenario_section() -> None:
+    from services.ai.content_generation import generate_section
+    from templates import get_metaprompt
+    generate_section(
+        system_message=get_metaprompt(TEMPLATE),
+        user_query="Rédigez le résumé exécutif du projet en mettant en avant le marché, l'offre et les besoins de financement.",
+        additional_context=json.dumps(DONNEES_ENTREPRISE, ensure_ascii=False),
+        section_name="Résumé Exécutif",
+        max_tokens=1000
+    )
+
+
+def _scenario_canvas() -> None:
+    from services.ai.content_generation import generer_business_model_canvas
+    generer_business_model_canvas(DONNEES_ENTREPRISE, TEMPLATE)
+
+
+def _scenario_plan_complet() -> None:
+    from ui.pages.generation_business_plan_complete import generate_complete_business_plan_origin_exact
+    generate_complete_business_plan_origin_exact(
+        user_text_input=f"{DONNEES_ENTREPRISE['nom_entreprise']} : {DONNEES_ENTREPRISE['solution']}",
+        template_nom=TEMPLATE,
+        use_workflow_data=True,
+        show_progress=False
+    )
+
+
+SCENARIOS: Dict[str, Callable[[], None]] = {
+    'section': _scenario_section,
+    'canvas': _scenario_canvas,
+    'plan_complet': _scenario_plan_complet
+}
+
+
+def mesurer_scenario(serveur: ServeurOpenAIFactice, scenario: Callable[[], None]) -> Dict[str, Any]:
+    """
+    Exécute un scénario et résume les requêtes reçues par le serveur factice
+
+    Args:
+        serveur (ServeurOpenAIFactice): Serveur démarré
+        scenario (callable): Scénario de génération
+
+    Returns:
+        dict: Durée, délai du premier token, requêtes et tokens du scénario
+    """
+    _preparer_session()
+    serveur.reinitialiser()
+    debut = time.perf_counter()
+    scenario()
+    duree = time.perf_counter() - debut
+    journal = serveur.journal()
+
+    premiers_tokens = [r['premier_token'] for r in journal if r['premier_token'] is not None]
+    return {
+        'duree_s': duree,
+        'premier_token_s': (min(premiers_tokens) - debut) if premiers_tokens else None,
+        'requetes': len(journal),
+        'limitations_429': sum(r['statut'] == 429 for r in journal),
+        'erreurs_500': sum(r['statut'] == 500 for r in journal),
+        'tokens_envoyes': sum(r['tokens_prompt'] for r in journal),
+        'tokens_caches': sum(r['tokens_caches'] for r in journal),
+        'caracteres_envoyes': sum(r['caracteres_prompt'] for r in journal),
+        'tokens_recus': sum(r['tokens_reponse'] for r in journal)
+    }
+
+
+def _resumer(mesures: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Médiane de chaque indicateur sur les répétitions."""
+    resume = {}
+    for cle in mesures[0]:
+        valeurs = [m[cle] for m in mesures if m[cle] is not None]
+        resume[cle] = statistics.median(valeurs) if valeurs else None
+    return resume
+
+
+def afficher(resultats: Dict[str, Dict[str, Any]]) -> None:
+    """Affiche un scénario par ligne."""
+    colonnes = [
+        ('duree_s', "Durée (s)", "{:.2f}"),
+        ('premier_token_s', "1er token (s)", "{:.2f}"),
+        ('requetes', "Requêtes", "{:.0f}"),
+        ('limitations_429', "429", "{:.0f}"),
+        ('erreurs_500', "500", "{:.0f}"),
+        ('tokens_envoyes', "Tokens envoyés", "{:,.0f}"),
+        ('tokens_caches', "dont en cache", "{:,.0f}"),
+        ('tokens_recus', "Tokens reçus", "{:,.0f}")
+    ]
+    print(f"{'Scénario':<14}" + ''.join(f"{titre:>16}" for _, titre, _ in colonnes))
+    for nom, resume in resultats.items():
+        cellules = [format_.format(resume[cle]) if resume[cle] is not None else "-" for cle, _, format_ in colonnes]
+        print(f"{nom:<14}" + ''.join(f"{c:>16}" for c in cellules))
+
+
+def main(arguments: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Banc d'essai de la génération contre un serveur OpenAI factice")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--repetitions', type=int, default=1)
+    parser.add_argument('--latence-ms', type=float, default=300.0, help="délai avant le premier token")
+    parser.add_argument('--tokens-par-seconde', type=float, default=200.0, help="débit de génération (0 : instantané)")
+    parser.add_argument('--tokens-reponse', type=int, default=400, help="longueur des réponses")
+    parser.add_argument('--taux-erreur', type=float, default=0.0, help="probabilité d'une erreur 500")
+    parser.add_argument('--taux-429', type=float, default=0.0, help="probabilité d'une limitation 429")
+    parser.add_argument('--graine', type=int, default=0)
+    parser.add_argument('--sortie', help="fichier JSON où enregistrer les mesures")
+    options = parser.parse_args(arguments)
+
+    serveur = ServeurOpenAIFactice(
+        latence_ms=options.latence_ms, tokens_par_seconde=options.tokens_par_seconde,
+        tokens_reponse=options.tokens_reponse, taux_erreur=options.taux_erreur,
+        taux_429=options.taux_429, graine=options.graine
+    )
+    os.environ['API_KEY'] = 'factice'
+    os.environ['OPENAI_BASE_URL'] = serveur.url
+
+    resultats = {}
+    with serveur, tempfile.TemporaryDirectory(prefix='mixbpm-bench-') as dossier:
+        # Registre des quotas, télémétrie et travaux jetables : le trafic factice
+        # ne doit ni consommer les quotas réels ni apparaître dans les métriques
+        os.environ['MIXBPM_REGISTRE_TOKENS'] = os.path.join(dossier, 'registre_tokens.db')
+        os.environ['MIXBPM_TELEMETRIE_JSONL'] = os.path.join(dossier, 'telemetrie', 'requetes_llm.jsonl')
+        os.environ['MIXBPM_TRAVAUX'] = os.path.join(dossier, 'travaux.db')
+        from services.ai.quotas import RegistreTokens, definir_registre_tokens
+        definir_registre_tokens(RegistreTokens(os.environ['MIXBPM_REGISTRE_TOKENS']))
+        for nom in options.scenarios:
+            mesures = [mesurer_scenario(serveur, SCENARIOS[nom]) for _ in range(max(options.repetitions, 1))]
+            resultats[nom] = _resumer(mesures)
+    afficher(resultats)
+
+    if options.sortie:
+        Path(options.sortie).write_text(json.dumps({
+            'parametres': {k: v for k, v in vars(options).items() if k != 'sortie'},
+            'resultats': resultats
+        }, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n✅ Mesures enregistrées : {options.sortie}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Dossiers de référence pour les bancs d'essai du moteur financier
+
+Les dossiers sont construits de façon déterministe (aucun tirage aléatoire) :
+les sorties enregistrées dans `golden/` restent donc comparables d'une
+exécution et d'une machine à l'autre.
+"""
+
+from typing import Dict, Any, List
+
+CHARGES_FIXES_TYPIQUES = {
+    'loyer': 400.0,
+    'electricite': 120.0,
+    'eau': 35.0,
+    'telephone': 50.0,
+    'assurance': 60.0,
+    'transport': 150.0,
+    'marketing': 80.0,
+    'autres_charges': 45.0
+}
+
+
+def _investissements(n: int, montant_base: float) -> List[Dict[str, Any]]:
+    """Investissements variés : durées, méthodes, mises en service et financements."""
+    durees = [3, 4, 5, 7, 10]
+    return [
+        {
+            'nom': f"Équipement {i + 1}",
+            'montant': round(montant_base * (1 + (i * 37) % 11 / 4), 2),
+            'duree_amortissement': durees[i % len(durees)],
+            'methode_amortissement': 'degressif' if i % 3 == 2 else 'lineaire',
+            'mois_mise_en_service': 1 + (i * 5) % 12,
+            'taux_financement': [0, 12, 15, 18][i % 4],
+            'duree_financement': [12, 24, 36, 48][i % 4]
+        }
+        for i in range(n)
+    ]
+
+
+def _dossier(investissements, charges_fixes, ca_previsions, taux_charges_variables,
+             salaires, financements, indexation=None) -> Dict[str, Any]:
+    """Assemble un dossier au format des données de base de `calculer_tableaux_financiers`."""
+    return {
+        'investissements': investissements,
+        'charges_fixes': charges_fixes,
+        'ca_previsions': ca_previsions,
+        'charges_variables': {'taux_charges_variables': taux_charges_variables},
+        'salaires': salaires,
+        'financements': financements,
+        'indexation': indexation or {}
+    }
+
+
+def dossier_petit() -> Dict[str, Any]:
+    """Micro-entreprise : un investissement, aucun prêt, deux charges fixes"""
+    return _dossier(
+        investissements=_investissements(1, 1500.0),
+        charges_fixes={'loyer': 100.0, 'telephone': 20.0},
+        ca_previsions={'ca_annee_1': 9000.0, 'ca_annee_2': 10500.0, 'ca_annee_3': 12000.0},
+        taux_charges_variables=55.0,
+        salaires={'salaire_poste_1': 150.0},
+        financements={'apport_personnel': 1500.0}
+    )
+
+
+def dossier_typique() -> Dict[str, Any]:
+    """Dossier courant d'un programme : quelques équipements, trois prêts, subvention"""
+    return _dossier(
+        investissements=_investissements(6, 2500.0),
+        charges_fixes=dict(CHARGES_FIXES_TYPIQUES),
+        ca_previsions={'ca_annee_1': 48000.0, 'ca_annee_2': 60000.0, 'ca_annee_3': 72000.0},
+        taux_charges_variables=60.0,
+        salaires={'salaire_poste_1': 450.0, 'salaire_poste_2': 300.0, 'salaire_poste_3': 250.0},
+        financements={
+            'apport_personnel': 5000.0,
+            'subventions': 8000.0,
+            'Prêt 1': {'montant': 10000.0, 'taux': 15.0, 'duree': 36},
+            'Prêt 2': {'montant': 4000.0, 'taux': 12.0, 'duree': 24, 'differe_mois': 6},
+            'Prêt 3': {'montant': 2500.0, 'taux': 18.0, 'duree': 12, 'type': 'amortissement_constant'}
+        },
+        indexation={'taux': {'inflation': [6.0, 5.5, 5.0, 5.0], 'loyer': 7.0}}
+    )
+
+
+def dossier_50_actifs() -> Dict[str, Any]:
+    """Entreprise fortement équipée : 50 immobilisations aux plans d'amortissement variés"""
+    dossier = dossier_typique()
+    dossier['investissements'] = _investissements(50, 900.0)
+    dossier['ca_previsions'] = {'ca_annee_1': 180000.0, 'ca_annee_2': 210000.0, 'ca_annee_3': 250000.0}
+    return dossier
+
+
+def dossier_10_prets() -> Dict[str, Any]:
+    """Montage financier complexe : dix prêts aux profils de remboursement différents"""
+    dossier = dossier_typique()
+    dossier['financements'] = {
+        'apport_personnel': 12000.0,
+        'subventions': 5000.0,
+        'emprunts_bancaires': 20000.0,
+        'taux_emprunt': 14.0,
+        'duree_emprunt': 4,
+        'prets': [
+            {
+                'nom': f"Crédit {i + 1}",
+                'montant': 3000.0 + 1500.0 * i,
+                'taux': 8.0 + i,
+                'duree_mois': [12, 18, 24, 36, 48, 60, 72][i % 7],
+                'type': 'amortissement_constant' if i % 2 else 'annuite',
+                'differe_mois': [0, 0, 3, 6][i % 4]
+            }
+            for i in range(9)
+        ]
+    }
+    return dossier
+
+
+DOSSIERS = {
+    'petit': dossier_petit,
+    'typique': dossier_typique,
+    'actifs_50': dossier_50_actifs,
+    'prets_10': dossier_10_prets
+}
+
+
+def donnees_budget_tresorerie(dossier: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Traduit un dossier dans le format lu par `calculer_budget_tresorerie_5_ans`
+
+    Le budget attend un CA mensuel (`ca_mensuel`) et une liste de charges fixes
+    annuelles, et non les données de base fournies par `calculer_tableaux_financiers`.
+
+    Args:
+        dossier (dict): Dossier de référence
+
+    Returns:
+        dict: Données au format du budget de trésorerie
+    """
+    ca = dossier['ca_previsions']
+    ca_annees = [float(ca.get(f'ca_annee_{a}', 0)) for a in range(1, 4)]
+    ca_annees += [ca_annees[2] * 1.05, ca_annees[2] * 1.05 ** 2]
+    # Saisonnalité simple de l'année 1 : montée en charge sur le premier trimestre
+    poids = [0.5, 0.75, 0.9] + [1.0] * 9
+    ca_mensuel = {f'mois_{m + 1}': ca_annees[0] * p / sum(poids) for m, p in enumerate(poids)}
+    ca_mensuel.update({f'annee_{a + 1}': montant for a, montant in enumerate(ca_annees)})
+
+    charges_fixes = [
+        {'nom': nom, **{f'annee{a}': montant * 12 * 1.05 ** (a - 1) for a in range(1, 6)}}
+        for nom, montant in dossier['charges_fixes'].items()
+    ]
+    return {
+        'ca_mensuel': ca_mensuel,
+        'charges_fixes': charges_fixes,
+        'delai_paiement_clients': 30,
+        'delai_paiement_fournisseurs': 60,
+        'tresorerie_initiale': float(dossier['financements'].get('apport_personnel', 0)),
+        'financements': dossier['financements']
+    }
@@ -0,0 +1,300 @@
+"""
+Serveur factice compatible avec l'API OpenAI
+
+Remplace l'API réelle pour mesurer la génération sans consommer de tokens :
+latence et débit de tokens configurables, injection d'erreurs 500 et de
+limitations 429, réponses complètes ou en flux (SSE). Chaque requête reçue est
+journalisée (horodatage, tokens du prompt, premier token émis).
+
+Le cache de préfixes du fournisseur est simulé : la part du prompt identique au
+début d'un prompt déjà reçu pour le même modèle est rapportée dans
+`usage.prompt_tokens_details.cached_tokens` (au-delà de 1024 tokens, par
+tranches de 128, comme l'API réelle).
+
+Usage autonome, pour pointer l'application dessus :
+    python -m benchmarks.serveur_openai_factice --port 8765 --latence-ms 400 --tokens-par-seconde 60
+    API_KEY=factice OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run main.py
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from os.path import commonprefix
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+RACINE = Path(__file__).resolve().parent.parent
+if str(RACINE) not in sys.path:
+    sys.path.insert(0, str(RACINE))
+
+from utils.token_utils import count_tokens_messages
+
+# Vocabulaire des réponses générées (un mot ≈ un token)
+MOTS_REPONSE = (
+    "Le projet vise une croissance durable du chiffre d'affaires grâce à une offre adaptée "
+    "au marché local de la RDC avec des partenaires fiables une gestion rigoureuse de la "
+    "trésorerie et un accompagnement des clients dans chaque province"
+).split()
+
+# Cache de préfixes simulé : taille minimale, granularité et prompts mémorisés par modèle
+CACHE_TOKENS_MINIMUM = 1024
+CACHE_TRANCHE_TOKENS = 128
+CACHE_PROMPTS_MEMORISES = 64
+
+
+class ServeurOpenAIFactice:
+    """
+    Serveur HTTP local imitant `/v1/chat/completions` et `/v1/models`
+
+    Args:
+        port (int): Port d'écoute (0 : port libre choisi par le système)
+        latence_ms (float): Délai avant le premier token
+        tokens_par_seconde (float): Débit d'émission des tokens de réponse (0 : instantané)
+        tokens_reponse (int): Longueur des réponses, plafonnée par `max_tokens`
+        taux_erreur (float): Probabilité d'une erreur 500
+        taux_429 (float): Probabilité d'une limitation de débit 429
+        graine (int): Graine du tirage des erreurs, pour des mesures reproductibles
+    """
+
+    def __init__(self, port: int = 0, latence_ms: float = 300.0, tokens_par_seconde: float = 80.0,
+                 tokens_reponse: int = 400, taux_erreur: float = 0.0, taux_429: float = 0.0, graine: int = 0):
+        self.latence_ms = latence_ms
+        self.tokens_par_seconde = tokens_par_seconde
+        self.tokens_reponse = tokens_reponse
+        self.taux_erreur = taux_erreur
+        self.taux_429 = taux_429
+        self._aleatoire = random.Random(graine)
+        self._verrou = threading.Lock()
+        self._journal: List[Dict[str, Any]] = []
+        self._prefixes: Dict[str, deque] = {}
+        self._serveur = ThreadingHTTPServer(('127.0.0.1', port), self._gestionnaire())
+        self._serveur.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL de base à passer au client OpenAI (`OPENAI_BASE_URL`)"""
+        hote, port = self._serveur.server_address[:2]
+        return f"http://{hote}:{port}/v1"
+
+    def demarrer(self) -> 'ServeurOpenAIFactice':
+        """Démarre le serveur dans un thread d'arrière-plan"""
+        self._thread = threading.Thread(target=self._serveur.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self) -> None:
+        """Arrête le serveur et libère le port"""
+        self._serveur.shutdown()
+        self._serveur.server_close()
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+    def journal(self) -> List[Dict[str, Any]]:
+        """Copie du journal des requêtes reçues depuis la dernière réinitialisation"""
+        with self._verrou:
+            return [dict(entree) for entree in self._journal]
+
+    def reinitialiser(self) -> None:
+        """Vide le journal des requêtes et le cache de préfixes"""
+        with self._verrou:
+            self._journal.clear()
+            self._prefixes.clear()
+
+    def _tokens_en_cache(self, modele: str, messages: List[Dict[str, Any]], tokens_prompt: int) -> int:
+        """Tokens du début du prompt déjà vus pour ce modèle, puis mémorise le prompt"""
+        texte = ''.join(f"{m.get('role')}\n{m.get('content', '')}\n" for m in messages)
+        with self._verrou:
+            precedents = self._prefixes.setdefault(modele, deque(maxlen=CACHE_PROMPTS_MEMORISES))
+            commun = max((len(commonprefix([texte, precedent])) for precedent in precedents), default=0)
+            precedents.append(texte)
+        tokens_communs = int(tokens_prompt * commun / len(texte)) if texte else 0
+        if tokens_communs < CACHE_TOKENS_MINIMUM:
+            return 0
+        return tokens_communs // CACHE_TRANCHE_TOKENS * CACHE_TRANCHE_TOKENS
+
+    def _tirer_statut(self) -> int:
+        with self._verrou:
+            tirage = self._aleatoire.random()
+        if tirage < self.taux_429:
+            return 429
+        if tirage < self.taux_429 + self.taux_erreur:
+            return 500
+        return 200
+
+    def _enregistrer(self, entree: Dict[str, Any]) -> Dict[str, Any]:
+        with self._verrou:
+            self._journal.append(entree)
+        return entree
+
+    def _gestionnaire(self):
+        serveur = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass  # Journal silencieux : les mesures passent par `journal()`
+
+            def _envoyer_json(self, statut: int, corps: Dict[str, Any], entetes: Dict[str, str] = None):
+                donnees = json.dumps(corps).encode('utf-8')
+                self.send_response(statut)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(donnees)))
+                for cle, valeur in (entetes or {}).items():
+                    self.send_header(cle, valeur)
+                self.end_headers()
+                self.wfile.write(donnees)
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/models'):
+                    modeles = ['gpt-4o', 'gpt-4o-mini', 'gpt-4-turbo', 'gpt-4']
+                    self._envoyer_json(200, {
+                        'object': 'list',
+                        'data': [{'id': m, 'object': 'model', 'created': 0, 'owned_by': 'factice'} for m in modeles]
+                    })
+                else:
+                    self._envoyer_json(404, {'error': {'message': f"Route inconnue : {self.path}", 'type': 'invalid_request_error'}})
+
+            def do_POST(self):
+                recu = time.perf_counter()
+                longueur = int(self.headers.get('Content-Length', 0))
+                requete = json.loads(self.rfile.read(longueur) or b'{}')
+                if not self.path.rstrip('/').endswith('/chat/completions'):
+                    self._envoyer_json(404, {'error': {'message': f"Route inconnue : {self.path}", 'type': 'invalid_request_error'}})
+                    return
+
+                messages = requete.get('messages', [])
+                modele = requete.get('model', 'gpt-4o')
+                entree = serveur._enregistrer({
+                    'recu': recu,
+                    'modele': modele,
+                    'flux': bool(requete.get('stream')),
+                    'tokens_prompt': int(count_tokens_messages(messages, model_name=modele)),
+                    'caracteres_prompt': sum(len(str(m.get('content', ''))) for m in messages),
+                    'tokens_reponse': 0,
+                    'tokens_caches': 0,
+                    'statut': None,
+                    'premier_token': None,
+                    'termine': None
+                })
+
+                time.sleep(serveur.latence_ms / 1000)
+                statut = serveur._tirer_statut()
+                entree['statut'] = statut
+                if statut == 429:
+                    entree['termine'] = time.perf_counter()
+                    self._envoyer_json(429, {'error': {
+                        'message': "Rate limit reached (serveur factice)", 'type': 'requests', 'code': 'rate_limit_exceeded'
+                    }}, {'Retry-After': '0', 'x-ratelimit-remaining-requests': '0'})
+                    return
+                if statut == 500:
+                    entree['termine'] = time.perf_counter()
+                    self._envoyer_json(500, {'error': {'message': "Erreur injectée (serveur factice)", 'type': 'server_error'}})
+                    return
+
+                n_tokens = max(1, min(serveur.tokens_reponse, int(requete.get('max_tokens') or serveur.tokens_reponse)))
+                mots = [MOTS_REPONSE[i % len(MOTS_REPONSE)] for i in range(n_tokens)]
+                delai_token = 1 / serveur.tokens_par_seconde if serveur.tokens_par_seconde > 0 else 0.0
+                entree['tokens_reponse'] = n_tokens
+                entree['tokens_caches'] = serveur._tokens_en_cache(modele, messages, entree['tokens_prompt'])
+                identifiant = f"chatcmpl-factice-{len(serveur._journal)}"
+                usage = {
+                    'prompt_tokens': entree['tokens_prompt'],
+                    'completion_tokens': n_tokens,
+                    'total_tokens': entree['tokens_prompt'] + n_tokens,
+                    'prompt_tokens_details': {'cached_tokens': entree['tokens_caches']}
+                }
+
+                if requete.get('stream'):
+                    self._repondre_en_flux(entree, identifiant, modele, mots, delai_token, usage,
+                                           bool((requete.get('stream_options') or {}).get('include_usage')))
+                    return
+
+                # Réponse complète : le premier token n'est visible qu'à la fin de la génération
+                time.sleep(delai_token * n_tokens)
+                entree['premier_token'] = entree['termine'] = time.perf_counter()
+                self._envoyer_json(200, {
+                    'id': identifiant,
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': modele,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': ' '.join(mots)},
+                        'finish_reason': 'length' if n_tokens < serveur.tokens_reponse else 'stop'
+                    }],
+                    'usage': usage
+                })
+
+            def _repondre_en_flux(self, entree, identifiant, modele, mots, delai_token, usage, inclure_usage):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+                def evenement(delta, fin=None, usage_final=None):
+                    morceau = {
+                        'id': identifiant, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': modele,
+                        'choices': [] if usage_final else [{'index': 0, 'delta': delta, 'finish_reason': fin}]
+                    }
+                    if usage_final:
+                        morceau['usage'] = usage_final
+                    self.wfile.write(f"data: {json.dumps(morceau)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+
+                evenement({'role': 'assistant', 'content': ''})
+                for i, mot in enumerate(mots):
+                    time.sleep(delai_token)
+                    evenement({'content': mot if i == 0 else ' ' + mot})
+                    if i == 0:
+                        entree['premier_token'] = time.perf_counter()
+                evenement({}, fin='stop')
+                if inclure_usage:
+                    evenement(None, usage_final=usage)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                entree['termine'] = time.perf_counter()
+
+        return Gestionnaire
+
+
+def main(arguments: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serveur factice compatible OpenAI")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latence-ms', type=float, default=300.0, help="délai avant le premier token")
+    parser.add_argument('--tokens-par-seconde', type=float, default=80.0, help="débit de génération (0 : instantané)")
+    parser.add_argument('--tokens-reponse', type=int, default=400, help="longueur des réponses")
+    parser.add_argument('--taux-erreur', type=float, default=0.0, help="probabilité d'une erreur 500")
+    parser.add_argument('--taux-429', type=float, default=0.0, help="probabilité d'une limitation 429")
+    parser.add_argument('--graine', type=int, default=0)
+    options = parser.parse_args(arguments)
+
+    serveur = ServeurOpenAIFactice(
+        options.port, options.latence_ms, options.tokens_par_seconde, options.tokens_reponse,
+        options.taux_erreur, options.taux_429, options.graine
+    )
+    print(f"🧪 Serveur OpenAI factice sur {serveur.url} (Ctrl+C pour arrêter)")
+    print(f"   API_KEY=factice OPENAI_BASE_URL={serveur.url} streamlit run main.py")
+    try:
+        serveur._serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur._serveur.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
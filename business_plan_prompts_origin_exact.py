@@ -2,6 +2,9 @@
 Prompts pour business plan avec la logique EXACTE d'Origin.txt adaptée pour les templates RDC
 """
 
+from templates.cache import memoiser_template
+
+@memoiser_template
 def get_template_context(template_nom):
     """Contexte spécifique selon le template choisi (RDC focus)"""
     contexts = {
@@ -26,6 +29,19 @@ def get_template_context(template_nom):
     }
     return contexts.get(template_nom, contexts["COPA TRANSFORME"])
 
+@memoiser_template
+def get_template_context_text(template_nom):
+    """Contexte du template en texte, identique pour toutes les sections d'un plan"""
+    template_context = get_template_context(template_nom)
+    return (
+        f"Template : {template_nom}\n"
+        f"Secteur : {template_context['secteur']}\n"
+        f"Marché : {template_context['marche']}\n"
+        f"Réglementation : {template_context['reglementation']}\n"
+        f"Spécificités : {template_context['specificites']}"
+    )
+
+@memoiser_template
 def get_system_messages_origin_style(template_nom="COPA TRANSFORME"):
     """Messages système avec la logique EXACTE d'Origin.txt + adaptation templates RDC"""
     
@@ -503,6 +519,7 @@ Le contenu doit être:
 Rédigez directement cette section annexes."""
     }
 
+@memoiser_template
 def get_queries_origin_style():
     """Requêtes utilisateur avec la logique EXACTE d'Origin.txt"""
     
@@ -3,14 +3,12 @@ Application principale MixBPM - Version refactorisée
 Business Model et Business Plan Generator
 """
 
+# Chronométrage des imports du premier démarrage (panneau de diagnostic)
+from profilage_imports import demarrer_profilage_imports, arreter_profilage_imports
+demarrer_profilage_imports()
+
 import streamlit as st
 import os
-import sys
-from datetime import datetime, date
-import pandas as pd
-import numpy as np
-from io import BytesIO
-import openai
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement
@@ -33,9 +31,14 @@ st.set_page_config(
 
 # Imports des modules refactorisés
 try:
-    from services.business import init_session_state
-    from ui.components import configurer_sidebar_principal, afficher_template_info
-    from templates import get_templates_list
+    from services.business import init_session_state, restaurer_projet, planifier_sauvegarde, entretenir_session
+    from ui.components import (
+        configurer_sidebar_principal, afficher_template_info, conserver_etat_widgets,
+        afficher_sauvegarde_projet, afficher_rapport_demarrage, afficher_memoire_sessions,
+        afficher_profil_executions, afficher_travaux
+    )
+    from templates import get_templates_list, verifier_templates
+    from utils.profilage_execution import mesurer, tracer_execution
     
     # Import des pages financières de base (version simplifiée)
     from ui.pages.pages_financieres_base import (
@@ -51,10 +54,13 @@ try:
     from ui.pages.generation_business_plan_complete import page_generation_business_plan_integree
     
 except ImportError as e:
+    arreter_profilage_imports()
     st.error(f"Erreur d'importation : {str(e)}")
     st.info("Vérifiez que tous les modules sont correctement installés et que les chemins d'importation sont corrects.")
     st.stop()
 
+arreter_profilage_imports()
+
 def main():
     """Fonction principale de l'application"""
     
@@ -64,11 +70,28 @@ def main():
     except Exception:
         pass  # Nettoyage silencieux
     
+    # Templates modifiés sur disque : rechargement et vidage du cache des prompts
+    verifier_templates()
+    
+    # Restauration du projet sauvegardé (une lecture, au début de la session)
+    restaurer_projet()
+    
     # Initialisation du session state
     init_session_state()
     
+    # Conservation des saisies des pages non affichées (avant tout widget)
+    conserver_etat_widgets()
+    
     # Configuration de la sidebar principale
     configurer_sidebar_principal()
+    afficher_sauvegarde_projet()
+    afficher_travaux()
+    
+    # Diagnostic du démarrage et de la mémoire (mode debug IA ou variable MIXBPM_DEBUG)
+    if st.session_state.get('debug_ai') or os.getenv("MIXBPM_DEBUG"):
+        afficher_rapport_demarrage()
+        afficher_memoire_sessions()
+        afficher_profil_executions()
     
     # Affichage du titre principal avec le template sélectionné
     template_actuel = st.session_state.get('template_selectionne', 'COPA TRANSFORME')
@@ -93,90 +116,116 @@ def main():
     if not st.session_state.get('nom_entreprise'):
         st.warning("⚠️ Veuillez configurer le nom de votre entreprise dans la sidebar pour commencer.")
     
-    # Menu principal avec onglets
-    create_main_navigation()
+    # Menu principal : seule la page sélectionnée est exécutée
+    try:
+        create_main_navigation()
+    finally:
+        # Plafonds mémoire de la session, puis sauvegarde des modifications en arrière-plan
+        entretenir_session()
+        planifier_sauvegarde()
+
+# Sections principales et sous-pages de la navigation
+SECTIONS_PRINCIPALES = [
+    "ℹ️ Informations Générales",
+    "📊 Analyse de Marché", 
+    "🎨 Business Model", 
+    "💰 Financier",
+    "🎯 Business Plan Complet",
+    "📁 Portefeuille"
+]
+
+SOUS_PAGES_MARCHE = [
+    "🌳 Arbre à Problème",
+    "🏪 Analyse du Marché",
+    "⚔️ Analyse de la Concurrence"
+]
+
+SOUS_PAGES_FINANCIERES = [
+    "💰 Besoins de Démarrage",
+    "🏦 Financement", 
+    "📋 Charges Fixes",
+    "📈 Chiffre d'Affaires",
+    "📊 Charges Variables",
+    "💼 Fonds de Roulement",
+    "👥 Salaires",
+    "📊 Rentabilité", 
+    "💰 Trésorerie",
+    "📊 Récapitulatif Complet",
+    "💼 Investissements & Financements",
+    "📋 Détail Amortissements"
+]
+
+def afficher_page(page):
+    """Exécute une page de la navigation, mesurée par le profileur d'exécution"""
+    with mesurer(page.__name__, 'page'):
+        page()
 
 def create_main_navigation():
-    """Crée la navigation principale de l'application"""
-    
-    # Onglets principaux restructurés
-    main_tabs = [
-        "ℹ️ Informations Générales",
-        "📊 Analyse de Marché", 
-        "🎨 Business Model", 
-        "💰 Financier",
-        "🎯 Business Plan Complet"
-    ]
-    
-    # Création des onglets principaux
-    main_tabs_ui = st.tabs(main_tabs)
+    """
+    Crée la navigation principale de l'application
+
+    Contrairement à `st.tabs`, qui exécute le contenu de tous les onglets à
+    chaque interaction, seule la page sélectionnée est exécutée. Les valeurs
+    saisies sur les autres pages sont conservées par `conserver_etat_widgets`,
+    appelée dans `main` avant la création du moindre widget.
+    """
+    section = st.radio(
+        "Section", SECTIONS_PRINCIPALES, horizontal=True,
+        key='navigation_section', label_visibility="collapsed"
+    )
     
     # 1. Informations Générales
-    with main_tabs_ui[0]:
-        page_informations_generales()
+    if section == SECTIONS_PRINCIPALES[0]:
+        afficher_page(page_informations_generales)
     
-    # 2. Analyse de Marché (nouvel onglet principal)
-    with main_tabs_ui[1]:
-        analyse_marche_subtabs = [
-            "� Arbre à Problème",
-            "�🏪 Analyse du Marché",
-            "⚔️ Analyse de la Concurrence"
-        ]
-        
-        market_tabs = st.tabs(analyse_marche_subtabs)
+    # 2. Analyse de Marché
+    elif section == SECTIONS_PRINCIPALES[1]:
+        sous_page = st.radio(
+            "Analyse de Marché", SOUS_PAGES_MARCHE, horizontal=True,
+            key='navigation_marche', label_visibility="collapsed"
+        )
         
-        with market_tabs[0]:
+        if sous_page == SOUS_PAGES_MARCHE[0]:
             try:
                 from ui.pages.business_model_initial import page_arbre_probleme
-                page_arbre_probleme()
+                afficher_page(page_arbre_probleme)
             except Exception as e:
                 st.error(f"Erreur lors du chargement de l'arbre à problème : {str(e)}")
                 st.info("Veuillez vérifier que le module arbre à problème est disponible")
         
-        with market_tabs[1]:
+        elif sous_page == SOUS_PAGES_MARCHE[1]:
             try:
                 from ui.pages import afficher_analyse_marche
-                afficher_analyse_marche()
+                afficher_page(afficher_analyse_marche)
             except Exception as e:
                 st.error(f"Fonction d'analyse de marché non encore implémentée : {str(e)}")
                 st.info("Cette section sera disponible prochainement")
         
-        with market_tabs[2]:
+        else:
             try:
                 from ui.pages import afficher_analyse_concurrence
-                afficher_analyse_concurrence()
+                afficher_page(afficher_analyse_concurrence)
             except Exception as e:
                 st.error(f"Fonction d'analyse de concurrence non encore implémentée : {str(e)}")
                 st.info("Cette section sera disponible prochainement")
     
-    # 3. Business Model (simplifié, sans sous-onglets)
-    with main_tabs_ui[2]:
+    # 3. Business Model (simplifié, sans sous-pages)
+    elif section == SECTIONS_PRINCIPALES[2]:
         try:
             # Import de la page Business Model Initial directement
             from ui.pages.business_model_initial import page_business_model_initial
-            page_business_model_initial()
+            afficher_page(page_business_model_initial)
         except Exception as e:
             st.error(f"Erreur lors du chargement du Business Model : {str(e)}")
             st.info("Veuillez vérifier que le module business_model_initial est disponible")
     
-    # 4. Financier (avec sous-onglets pour tous les éléments financiers)
-    with main_tabs_ui[3]:
-        financial_subtabs = [
-            "💰 Besoins de Démarrage",
-            "🏦 Financement", 
-            "📋 Charges Fixes",
-            "📈 Chiffre d'Affaires",
-            "📊 Charges Variables",
-            "💼 Fonds de Roulement",
-            "👥 Salaires",
-            "📊 Rentabilité", 
-            "💰 Trésorerie",
-            "📊 Récapitulatif Complet",
-            "💼 Investissements & Financements",
-            "📋 Détail Amortissements"
-        ]
-        
-        fin_tabs = st.tabs(financial_subtabs)
+    # 4. Financier (avec sous-pages pour tous les éléments financiers)
+    elif section == SECTIONS_PRINCIPALES[3]:
+        sous_page = st.radio(
+            "Financier", SOUS_PAGES_FINANCIERES, horizontal=True,
+            key='navigation_financier', label_visibility="collapsed"
+        )
+        i = SOUS_PAGES_FINANCIERES.index(sous_page)
         
         # Mapping des pages financières
         financial_pages = {
@@ -194,41 +243,49 @@ def create_main_navigation():
             11: page_detail_amortissements
         }
         
-        # Affichage des pages financières
-        for i, tab in enumerate(fin_tabs):
-            with tab:
-                try:
-                    # Indication pour les nouvelles pages refactorisées
-                    if i in [9, 10, 11]:  # Nouvelles pages
-                        with st.expander("✨ Nouvelle fonctionnalité", expanded=False):
-                            st.success("Cette page a été nouvellement développée dans l'architecture refactorisée.")
-                    # Ajout d'un indicateur pour les pages à migrer
-                    else:  # Pages financières existantes
-                        with st.expander("ℹ️ Info de migration", expanded=False):
-                            st.info("Cette page utilise encore l'ancienne architecture. La migration vers la nouvelle structure est prévue.")
-                    
-                    if i in financial_pages:
-                        financial_pages[i]()
-                    else:
-                        st.error(f"Page financière non trouvée pour l'onglet {i}")
-                        
-                except Exception as e:
-                    st.error(f"Erreur lors du chargement de la page financière : {str(e)}")
-                    st.info("Veuillez rafraîchir la page ou contacter le support technique.")
+        # Affichage de la page financière sélectionnée
+        try:
+            # Indication pour les nouvelles pages refactorisées
+            if i in [9, 10, 11]:  # Nouvelles pages
+                with st.expander("✨ Nouvelle fonctionnalité", expanded=False):
+                    st.success("Cette page a été nouvellement développée dans l'architecture refactorisée.")
+            # Ajout d'un indicateur pour les pages à migrer
+            else:  # Pages financières existantes
+                with st.expander("ℹ️ Info de migration", expanded=False):
+                    st.info("Cette page utilise encore l'ancienne architecture. La migration vers la nouvelle structure est prévue.")
+            
+            if i in financial_pages:
+                afficher_page(financial_pages[i])
+            else:
+                st.error(f"Page financière non trouvée pour l'onglet {i}")
+                
+        except Exception as e:
+            st.error(f"Erreur lors du chargement de la page financière : {str(e)}")
+            st.info("Veuillez rafraîchir la page ou contacter le support technique.")
 
     # 5. Business Plan Complet
-    with main_tabs_ui[4]:
+    elif section == SECTIONS_PRINCIPALES[4]:
         try:
             with st.expander("✨ Nouvelle fonctionnalité", expanded=False):
                 st.success("🎯 **Business Plan Complet** - Nouvelle version qui intègre automatiquement tous les tableaux financiers dans le plan d'affaires généré!")
-            page_generation_business_plan_integree()
+            afficher_page(page_generation_business_plan_integree)
         except Exception as e:
             st.error(f"Erreur lors du chargement de la page : {str(e)}")
 
+    # 6. Portefeuille (évaluation d'une cohorte de candidats)
+    else:
+        try:
+            from ui.pages.portefeuille import page_portefeuille
+            afficher_page(page_portefeuille)
+        except Exception as e:
+            st.error(f"Erreur lors du chargement du portefeuille : {str(e)}")
+
 def handle_errors():
     """Gestion globale des erreurs"""
     try:
-        main()
+        # Profil de l'exécution (mode debug ou MIXBPM_PROFIL)
+        with tracer_execution():
+            main()
     except Exception as e:
         st.error("🚨 Une erreur inattendue s'est produite")
         st.error(f"Détails de l'erreur : {str(e)}")
@@ -0,0 +1,158 @@
+"""
+Profilage des imports au démarrage de l'application
+
+Équivalent de `python -X importtime`, consultable depuis l'application :
+chaque import exécuté entre `demarrer_profilage_imports()` et
+`arreter_profilage_imports()` est chronométré (durée propre et cumulée,
+profondeur d'imbrication). Seule la première exécution de `main.py` dans le
+processus est mesurée : ensuite, tous les modules sont déjà chargés.
+
+Ce module est volontairement placé hors des paquets de l'application et
+n'importe que la bibliothèque standard, pour être chargé avant tout le reste.
+"""
+
+import sys
+import time
+import builtins
+import threading
+import importlib.util
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource  # Unix uniquement
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+# Piles importées au premier usage : (libellé, modules témoins)
+PILES_DIFFEREES = [
+    ("Documents PDF et recherche (LangChain, FAISS, PyPDF)",
+     ("langchain_text_splitters", "langchain_community.vectorstores", "langchain_community.document_loaders")),
+    ("Export Word (python-docx)", ("docx",)),
+]
+
+_import_original = None
+_thread_profile: Optional[int] = None
+_pile: List[float] = []
+_entrees: List[Dict[str, Any]] = []
+_debut: Optional[float] = None
+_modules_avant = 0
+_memoire_avant: Optional[float] = None
+_rapport: Optional[Dict[str, Any]] = None
+
+
+def _memoire_max_mo() -> Optional[float]:
+    """Pic de mémoire résidente du processus (Mo), si disponible"""
+    if resource is None:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Ko sous Linux, octets sous macOS
+    return pic / (1024 * 1024) if sys.platform == 'darwin' else pic / 1024
+
+
+def _nom_absolu(name: str, globals_: Optional[dict], level: int) -> str:
+    if level == 0 or not globals_:
+        return name
+    try:
+        paquet = globals_.get('__package__') or globals_.get('__name__', '').rpartition('.')[0]
+        return importlib.util.resolve_name('.' * level + name, paquet)
+    except (ImportError, ValueError):
+        return name
+
+
+def _import_chronometre(name, globals=None, locals=None, fromlist=(), level=0):
+    if threading.get_ident() != _thread_profile:
+        return _import_original(name, globals, locals, fromlist, level)
+
+    nom = _nom_absolu(name, globals, level)
+    if nom in sys.modules:
+        # `from paquet import sous_module` : seul le sous-module est à charger
+        parent = sys.modules[nom]
+        manquants = [
+            f"{nom}.{element}" for element in (fromlist or ())
+            if element != '*' and not hasattr(parent, element) and f"{nom}.{element}" not in sys.modules
+        ]
+        if not manquants:
+            return _import_original(name, globals, locals, fromlist, level)
+        nom = ', '.join(manquants)
+
+    entree = {'module': nom, 'profondeur': len(_pile), 'ordre': len(_entrees) + len(_pile)}
+    _pile.append(0.0)
+    debut = time.perf_counter()
+    try:
+        return _import_original(name, globals, locals, fromlist, level)
+    finally:
+        duree = time.perf_counter() - debut
+        enfants = _pile.pop()
+        if _pile:
+            _pile[-1] += duree
+        entree['cumule_ms'] = duree * 1000
+        entree['propre_ms'] = (duree - enfants) * 1000
+        _entrees.append(entree)
+
+
+def demarrer_profilage_imports() -> bool:
+    """
+    Commence à chronométrer les imports du thread courant
+
+    Returns:
+        bool: False si le démarrage a déjà été mesuré dans ce processus
+    """
+    global _import_original, _thread_profile, _debut, _modules_avant, _memoire_avant
+    if _rapport is not None or _import_original is not None:
+        return False
+    _import_original = builtins.__import__
+    _thread_profile = threading.get_ident()
+    _debut = time.perf_counter()
+    _modules_avant = len(sys.modules)
+    _memoire_avant = _memoire_max_mo()
+    builtins.__import__ = _import_chronometre
+    return True
+
+
+def arreter_profilage_imports() -> Optional[Dict[str, Any]]:
+    """
+    Rétablit l'import standard et fige le rapport de démarrage
+
+    Returns:
+        dict: Rapport (voir `rapport_imports`), ou None si aucun profilage n'était actif
+    """
+    global _import_original, _thread_profile, _rapport
+    if _import_original is None:
+        return _rapport
+    builtins.__import__ = _import_original
+    _import_original = None
+    _thread_profile = None
+
+    _rapport = {
+        'duree_totale_ms': (time.perf_counter() - _debut) * 1000,
+        'modules_charges': len(sys.modules) - _modules_avant,
+        'memoire_avant_mo': _memoire_avant,
+        'memoire_apres_mo': _memoire_max_mo(),
+        'imports': sorted(_entrees, key=lambda entree: entree['ordre'])  # ordre d'appel, parents avant enfants
+    }
+    _entrees.clear()
+    return _rapport
+
+
+def rapport_imports() -> Optional[Dict[str, Any]]:
+    """
+    Rapport du démarrage mesuré
+
+    Returns:
+        dict or None: Durée totale, modules chargés, pic mémoire avant/après et,
+                      pour chaque import, `module`, `profondeur`, `propre_ms`, `cumule_ms`
+    """
+    return _rapport
+
+
+def etat_piles_differees() -> List[Dict[str, Any]]:
+    """
+    Indique si les piles importées au premier usage ont déjà été chargées
+
+    Returns:
+        list: {'pile', 'chargee'} pour chaque pile de `PILES_DIFFEREES`
+    """
+    return [
+        {'pile': libelle, 'chargee': any(module in sys.modules for module in modules)}
+        for libelle, modules in PILES_DIFFEREES
+    ]
@@ -13,6 +13,31 @@ from .content_generation import (
     analyser_coherence_donnees,
     generer_contenu_personnalise
 )
+from .telemetrie import (
+    enregistrer_requete_llm,
+    statistiques_modeles,
+    metriques_prometheus
+)
+from .quotas import (
+    RegistreTokens,
+    definir_registre_tokens,
+    obtenir_registre_tokens,
+    verifier_quotas,
+    reserver_tokens,
+    regler_reservation,
+    consommation_du_jour,
+    definir_quota
+)
+from .routage import (
+    choisir_modele,
+    decisions_routage
+)
+from .regeneration import (
+    etat_sections,
+    sections_dependantes,
+    regenerer_section,
+    resultats_plan
+)
 
 __all__ = [
     'initialiser_openai',
@@ -23,5 +48,22 @@ __all__ = [
     'generer_business_model_canvas',
     'generer_suggestions_intelligentes',
     'analyser_coherence_donnees',
-    'generer_contenu_personnalise'
+    'generer_contenu_personnalise',
+    'enregistrer_requete_llm',
+    'statistiques_modeles',
+    'metriques_prometheus',
+    'RegistreTokens',
+    'definir_registre_tokens',
+    'obtenir_registre_tokens',
+    'verifier_quotas',
+    'reserver_tokens',
+    'regler_reservation',
+    'consommation_du_jour',
+    'definir_quota',
+    'choisir_modele',
+    'decisions_routage',
+    'etat_sections',
+    'sections_dependantes',
+    'regenerer_section',
+    'resultats_plan'
 ]
\ No newline at end of file
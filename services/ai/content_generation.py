@@ -4,12 +4,7 @@ Service de génération de contenu par Intelligence Artificielle
 
 import openai
 import streamlit as st
-from typing import List, Dict, Any, Optional
-from langchain_text_splitters import RecursiveCharacterTextSplitter  # Import correct
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_core.documents import Document
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import os
 import tempfile
 import gc
@@ -19,8 +14,18 @@ from utils.token_utils import (
     count_tokens, count_tokens_messages, update_token_usage, 
     check_token_limits, init_token_counter, calculate_cost
 )
+from utils.profilage_execution import tracer
+from .telemetrie import enregistrer_requete_llm
+from .quotas import reserver_tokens, regler_reservation
+from .routage import routage_actif, choisir_modele
 import time
 
+# Pile documents/recherche (LangChain, FAISS, PyPDF) : importée au premier usage,
+# la plupart des sessions ne téléversent aucun PDF
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+
 def cleanup_resources():
     """
     Nettoie les ressources système pour éviter l'accumulation de fichiers ouverts
@@ -159,7 +164,7 @@ def tester_connexion_openai() -> Dict[str, Any]:
                 "details": f"Erreur technique: {error_message}"
             }
 
-def load_and_split_documents(file_path: str) -> List[Document]:
+def load_and_split_documents(file_path: str) -> List["Document"]:
     """
     Charge et divise un document PDF
     
@@ -169,6 +174,9 @@ def load_and_split_documents(file_path: str) -> List[Document]:
     Returns:
         List[Document]: Liste des documents segmentés
     """
+    from langchain_community.document_loaders import PyPDFLoader
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
     loader = None
     try:
         loader = PyPDFLoader(file_path)
@@ -196,7 +204,7 @@ def load_and_split_documents(file_path: str) -> List[Document]:
                 pass
         cleanup_resources()
 
-def create_vector_store(documents: List[Document]) -> Optional[FAISS]:
+def create_vector_store(documents: List["Document"]) -> Optional["FAISS"]:
     """
     Crée un store vectoriel à partir des documents
     
@@ -206,6 +214,9 @@ def create_vector_store(documents: List[Document]) -> Optional[FAISS]:
     Returns:
         Optional[FAISS]: Store vectoriel ou None si erreur
     """
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.embeddings import OpenAIEmbeddings
+    
     try:
         api_key = os.getenv("API_KEY")
         if not api_key:
@@ -220,7 +231,7 @@ def create_vector_store(documents: List[Document]) -> Optional[FAISS]:
         st.error(f"Erreur lors de la création du store vectoriel : {e}")
         return None
 
-def search_similar_content(vector_store: FAISS, query: str, k: int = 3) -> List[str]:
+def search_similar_content(vector_store: "FAISS", query: str, k: int = 3) -> List[str]:
     """
     Recherche du contenu similaire dans le store vectoriel
     
@@ -242,46 +253,111 @@ def search_similar_content(vector_store: FAISS, query: str, k: int = 3) -> List[
 
 def upload_and_process_pdf():
     """Interface pour télécharger et traiter un PDF"""
+    from services.business.memoire import deposer_artefact, recuperer_artefact
+    
     uploaded_file = st.file_uploader("Télécharger un document PDF", type="pdf")
     
     if uploaded_file is not None:
-        tmp_file_path = None
-        try:
-            # Sauvegarder temporairement le fichier
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                tmp_file_path = tmp_file.name
-            
-            # Traiter le document
-            with st.spinner("Traitement du document..."):
-                documents = load_and_split_documents(tmp_file_path)
+        # Store du même fichier : repris de la session (rechargé du disque s'il y a été déversé)
+        vector_store = None
+        source = st.session_state.get('_vector_store_source')
+        if source and source[0] == uploaded_file.file_id:
+            vector_store = recuperer_artefact('vector_store')
+        
+        if vector_store is None:
+            tmp_file_path = None
+            try:
+                # Sauvegarder temporairement le fichier
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                    tmp_file.write(uploaded_file.getvalue())
+                    tmp_file_path = tmp_file.name
                 
-                if documents:
-                    vector_store = create_vector_store(documents)
+                # Traiter le document
+                with st.spinner("Traitement du document..."):
+                    documents = load_and_split_documents(tmp_file_path)
+                    if documents:
+                        vector_store = create_vector_store(documents)
                     
                     if vector_store:
-                        st.session_state['vector_store'] = vector_store
-                        st.success(f"Document traité avec succès ! {len(documents)} segments créés.")
-                        
-                        # Interface de recherche
-                        query = st.text_input("Rechercher dans le document:")
-                        if query:
-                            results = search_similar_content(vector_store, query)
-                            if results:
-                                st.write("**Résultats trouvés:**")
-                                for i, result in enumerate(results, 1):
-                                    st.write(f"**Résultat {i}:**")
-                                    st.write(result[:500] + "..." if len(result) > 500 else result)
-                                    st.write("---")
+                        # Artefact volumineux : déversé sur disque lorsqu'il n'est plus utilisé
+                        deposer_artefact('vector_store', vector_store)
+                        source = (uploaded_file.file_id, len(documents))
+                        st.session_state['_vector_store_source'] = source
+            
+            finally:
+                # Nettoyer le fichier temporaire même en cas d'erreur
+                if tmp_file_path and os.path.exists(tmp_file_path):
+                    try:
+                        os.unlink(tmp_file_path)
+                    except OSError:
+                        pass  # Ignorer les erreurs de suppression
         
-        finally:
-            # Nettoyer le fichier temporaire même en cas d'erreur
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                except OSError:
-                    pass  # Ignorer les erreurs de suppression
+        if vector_store:
+            st.success(f"Document traité avec succès ! {source[1]} segments créés.")
+            
+            # Interface de recherche
+            query = st.text_input("Rechercher dans le document:")
+            if query:
+                results = search_similar_content(vector_store, query)
+                if results:
+                    st.write("**Résultats trouvés:**")
+                    for i, result in enumerate(results, 1):
+                        st.write(f"**Résultat {i}:**")
+                        st.write(result[:500] + "..." if len(result) > 500 else result)
+                        st.write("---")
 
+def construire_messages(
+    system_message: str,
+    user_query: str,
+    additional_context: str = "",
+    financial_context: str = "",
+    business_model: Any = "",
+    template_context: str = ""
+) -> List[Dict[str, str]]:
+    """
+    Construit les messages d'une génération, du plus stable au plus variable
+    
+    Le fournisseur met en cache le début des prompts qu'il a déjà reçus : le
+    contexte commun (template, business model), identique à l'octet près pour
+    toutes les sections d'une génération, vient donc en premier ; puis le
+    contexte additionnel (qui, dans le plan complet, ne fait que s'allonger
+    d'une section à l'autre) ; puis les tableaux financiers, dont la sélection
+    dépend de la section ; enfin les consignes et la requête de la section.
+    
+    Args:
+        system_message (str): Consignes de la section
+        user_query (str): Requête de la section
+        additional_context (str): Contexte variable (sections déjà générées, documents...)
+        financial_context (str): Tableaux financiers de l'entreprise
+        business_model (Any): Business model à prendre en compte
+        template_context (str): Contexte du template (secteur, marché, réglementation)
+    
+    Returns:
+        list: Messages pour l'API chat
+    """
+    contexte_commun = ""
+    if template_context:
+        contexte_commun += f"Contexte du programme :\n{template_context}"
+    # Business model (comme business_model d'Origin.txt)
+    if business_model:
+        contexte_commun += f"\n\nInformations du business model à prendre en compte:\n{business_model}"
+    
+    messages = []
+    if contexte_commun:
+        messages.append({"role": "system", "content": contexte_commun.strip()})
+    if additional_context:
+        messages.append({"role": "user", "content": f"Contexte additionnel:\n{additional_context}"})
+    if financial_context:
+        # Tableaux filtrés selon la section : après le contexte additionnel, pour ne pas en rompre le cache
+        messages.append({
+            "role": "system",
+            "content": f"Données financières de l'entreprise (à utiliser pour enrichir les arguments):\n{financial_context}"
+        })
+    messages.append({"role": "system", "content": system_message})
+    messages.append({"role": "user", "content": user_query})
+    return messages
+
+@tracer('generation', argument='section_name')
 def generate_section(
     system_message: str, 
     user_query: str, 
@@ -289,11 +365,17 @@ def generate_section(
     section_name: str = "Section",
     max_tokens: int = 5000,  # Utiliser 5000 comme dans Origin.txt
     temperature: float = 0.7,
-    model: str = None  # Sera défini automatiquement depuis la sidebar
+    model: str = None,  # Sera défini automatiquement depuis la sidebar
+    financial_context: str = "",
+    business_model: Any = "",
+    template_context: str = ""
 ) -> str:
     """
     Génère du contenu pour une section spécifique du business model
     Version adaptée d'Origin.txt avec gestion d'erreurs améliorée et modèles modernes
+    
+    `template_context`, `financial_context` et `business_model` forment le contexte
+    commun aux sections d'une même génération (voir `construire_messages`).
     """
     # Modèles OpenAI modernes disponibles (2024-2025)
     MODELS_HIERARCHY = [
@@ -305,36 +387,64 @@ def generate_section(
         "o1-mini"           # Version allégée d'o1
     ]
     
-    # Utiliser le modèle sélectionné dans la sidebar ou premier de la hiérarchie
+    # Modèle imposé par l'appelant, sinon choisi pour la section (voir services/ai/routage.py)
+    gamme = None
     if model is None:
         model = st.session_state.get('modele_openai_sidebar', 'gpt-4o')
+        if routage_actif():
+            decision = choisir_modele(section_name, max_tokens, model, st.session_state.get('template_selectionne'))
+            model, gamme = decision['modele'], decision['gamme']
+    
+    # Trace de la requête, enregistrée en sortie (voir services/ai/telemetrie.py)
+    debut = time.perf_counter()
+    trace = {
+        'section': section_name,
+        'template': st.session_state.get('template_selectionne'),
+        'modele_demande': model,
+        'gamme': gamme,
+        'modele_utilise': None,
+        'tokens_prompt': 0,
+        'tokens_completion': 0,
+        'tokens_caches': 0,
+        'premier_token_s': None,
+        'latence_s': None,
+        'duree_appel_s': None,
+        'tentatives': 0,
+        'replis': 0,
+        'issue': 'erreur',
+        'erreur': None
+    }
+    reservation = None
     
     try:
         client = initialiser_openai()
         if not client:
+            trace['issue'] = 'client_absent'
             st.error("❌ Configuration OpenAI non disponible")
             return ""
         
-        # Construire le contexte complet (comme dans Origin.txt)
-        full_context = ""
-        if additional_context:
-            full_context = f"\n\nContexte additionnel:\n{additional_context}"
-        
-        # Construire le prompt final
-        full_prompt = f"{user_query}{full_context}"
-        
-        # Messages pour l'API (format EXACT d'Origin.txt)
-        messages = [
-            {"role": "system", "content": system_message},  # UTILISER LE SYSTEM_MESSAGE COMME DANS ORIGIN.TXT
-            {"role": "user", "content": full_prompt}
-        ]
+        messages = construire_messages(
+            system_message, user_query, additional_context, financial_context, business_model, template_context
+        )
         
         # Vérification des tokens avant l'appel
         total_tokens = count_tokens_messages(messages, model_name=model)
         if not check_token_limits(total_tokens + max_tokens):
+            trace['issue'] = 'limite_tokens'
             st.warning("⚠️ Limite de tokens atteinte. Requête simplifiée.")
             return ""
         
+        # Réservation dans le registre partagé : quotas journaliers par utilisateur et organisation
+        completion_max = get_model_max_tokens(model, max_tokens)
+        reservation, message_quota = reserver_tokens(
+            total_tokens + completion_max,
+            calculate_cost(total_tokens, completion_max, model)
+        )
+        if reservation is None:
+            trace['issue'] = 'quota'
+            st.warning(f"⚠️ {message_quota}")
+            return ""
+        
         # Initialiser le compteur de tokens si nécessaire
         init_token_counter()
         
@@ -347,16 +457,25 @@ def generate_section(
                 if current_model == model:  # Éviter de réessayer le même modèle
                     continue
             
+            trace['replis'] = attempt
+            debut_appel = time.perf_counter()
             try:
                 # Ajuster max_tokens selon le modèle
                 adjusted_max_tokens = get_model_max_tokens(current_model, max_tokens)
                 
-                response = client.chat.completions.create(
+                # Réponse brute : donne aussi le nombre de nouvelles tentatives du client
+                raw_response = client.chat.completions.with_raw_response.create(
                     model=current_model,
                     messages=messages,
                     max_tokens=adjusted_max_tokens,
                     temperature=temperature
                 )
+                response = raw_response.parse()
+                trace['tentatives'] += 1 + (getattr(raw_response, 'retries_taken', 0) or 0)
+                # Réponse sans flux : le premier token arrive avec la réponse complète
+                trace['duree_appel_s'] = time.perf_counter() - debut_appel
+                trace['premier_token_s'] = time.perf_counter() - debut
+                trace['modele_utilise'] = current_model
                 
                 # Extraire le contenu (comme dans Origin.txt)
                 content = response.choices[0].message.content.strip()
@@ -364,7 +483,20 @@ def generate_section(
                 # Mise à jour des statistiques de tokens avec le modèle réellement utilisé
                 usage = response.usage
                 if usage:
-                    update_token_usage(usage.prompt_tokens, usage.completion_tokens, current_model)
+                    # Tokens du prompt servis par le cache de préfixes du fournisseur
+                    details = getattr(usage, 'prompt_tokens_details', None)
+                    tokens_caches = getattr(details, 'cached_tokens', 0) or 0
+                    update_token_usage(usage.prompt_tokens, usage.completion_tokens, current_model, tokens_caches)
+                    regler_reservation(
+                        reservation,
+                        usage.prompt_tokens + usage.completion_tokens,
+                        calculate_cost(usage.prompt_tokens, usage.completion_tokens, current_model, tokens_caches)
+                    )
+                    reservation = None
+                    trace['tokens_prompt'] = usage.prompt_tokens
+                    trace['tokens_completion'] = usage.completion_tokens
+                    trace['tokens_caches'] = tokens_caches
+                trace['issue'] = 'succes'
                 
                 # Informer si fallback utilisé
                 if attempt > 0:
@@ -374,6 +506,8 @@ def generate_section(
                 
             except Exception as api_error:
                 error_str = str(api_error)
+                trace['tentatives'] += 1
+                trace['erreur'] = f"{type(api_error).__name__}: {error_str[:300]}"
                 
                 # Si c'est le dernier modèle de la liste, lever l'erreur
                 if attempt == len(MODELS_HIERARCHY) - 1:
@@ -402,6 +536,16 @@ def generate_section(
         return ""
     
     finally:
+        trace['latence_s'] = time.perf_counter() - debut
+        try:
+            enregistrer_requete_llm(trace)
+        except Exception:
+            pass  # La télémétrie ne doit jamais faire échouer une génération
+        try:
+            regler_reservation(reservation)  # Requête échouée : réservation libérée
+        except Exception:
+            pass
+        
         # Nettoyer les ressources après la génération
         try:
             cleanup_resources()
@@ -490,11 +634,11 @@ def generer_business_model_canvas(donnees: Dict[str, Any], template_nom: str = "
     """
     Génère un Business Model Canvas complet avec IA contextuelle
     """
-    from templates import get_metaprompt, get_sections_prompts
+    from templates import get_metaprompt, get_system_messages
     
     # Récupérer les prompts spécialisés
     metaprompt = get_metaprompt(template_nom)
-    sections_prompts = get_sections_prompts(template_nom)
+    sections_prompts = get_system_messages(template_nom)
     
     # Extraire les informations clés
     nom_entreprise = donnees.get('nom_entreprise', '')
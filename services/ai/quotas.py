@@ -0,0 +1,424 @@
+"""
+Registre partagé des tokens et des coûts, et quotas journaliers
+
+Le compteur de `utils/token_utils.py` vit dans la session : il repart de zéro
+à chaque rafraîchissement ou nouvel onglet. Ce registre est commun à toutes
+les sessions (et à tous les processus qui partagent la base) et compte, par
+jour, les tokens, le coût et les requêtes de chaque :
+
+- utilisateur identifié (voir `utilisateur_identifie`) : une session anonyme
+  n'a pas de portée utilisateur, son identité n'étant pas établie côté serveur ;
+- organisation, c'est-à-dire le template sélectionné ;
+- ensemble de l'application (« global »).
+
+Avant chaque appel, `reserver_tokens()` vérifie les quotas et réserve
+l'estimation de la requête en une seule transaction ; `regler_reservation()`
+la remplace ensuite par la consommation réelle (ou la libère en cas d'échec).
+Les lectures (`verifier_quotas`, `consommation_du_jour`) passent par un cache
+de quelques secondes : le refus d'une requête hors quota ne touche pas la base.
+
+Quotas par défaut (0 : illimité), par portée et par jour :
+`MIXBPM_QUOTA_TOKENS_UTILISATEUR` (100 000), `MIXBPM_QUOTA_COUT_UTILISATEUR`,
+`MIXBPM_QUOTA_TOKENS_ORGANISATION`, `MIXBPM_QUOTA_COUT_ORGANISATION`,
+`MIXBPM_QUOTA_TOKENS_GLOBAL`, `MIXBPM_QUOTA_COUT_GLOBAL` (coûts en USD) ;
+`definir_quota()` les remplace pour un utilisateur ou une organisation donnés.
+La base est `MIXBPM_REGISTRE_TOKENS` (`.mixbpm/registre_tokens.db` par défaut).
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import streamlit as st
+
+CHEMIN_REGISTRE_DEFAUT = Path(__file__).resolve().parents[2] / '.mixbpm' / 'registre_tokens.db'
+
+# Durée de validité des compteurs et quotas lus dans la base (secondes)
+DUREE_CACHE = 5.0
+
+PORTEES = ('utilisateur', 'organisation', 'global')
+IDENTIFIANT_GLOBAL = 'global'
+
+# Quota appliqué à tous les identifiants d'une portée sans quota propre
+TOUS = '*'
+
+QUOTAS_DEFAUT = {'tokens_utilisateur': 100000}
+
+_LIBELLES = {'utilisateur': "utilisateur", 'organisation': "de l'organisation", 'global': "de l'application"}
+
+
+def _quota_environnement(portee: str, mesure: str) -> Optional[float]:
+    valeur = os.getenv(f"MIXBPM_QUOTA_{mesure.upper()}_{portee.upper()}")
+    valeur = float(valeur) if valeur else QUOTAS_DEFAUT.get(f"{mesure}_{portee}", 0)
+    return valeur or None
+
+
+class RegistreTokens:
+    """
+    Registre SQLite de la consommation journalière, avec cache des lectures
+
+    Args:
+        chemin (str or Path): Fichier de la base, créé au besoin
+        duree_cache (float): Durée de validité des lectures mises en cache (secondes)
+    """
+
+    def __init__(self, chemin, duree_cache: float = DUREE_CACHE):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.duree_cache = duree_cache
+        self._verrou = threading.Lock()
+        self._consommations: Dict[tuple, Tuple[float, Dict[str, float]]] = {}
+        self._quotas: Optional[Tuple[float, Dict[tuple, Tuple[Optional[float], Optional[float]]]]] = None
+        with self._connexion() as connexion:
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("""
+                CREATE TABLE IF NOT EXISTS consommation (
+                    jour TEXT NOT NULL,
+                    portee TEXT NOT NULL,
+                    identifiant TEXT NOT NULL,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    cout REAL NOT NULL DEFAULT 0,
+                    requetes INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (jour, portee, identifiant)
+                ) WITHOUT ROWID
+            """)
+            connexion.execute("""
+                CREATE TABLE IF NOT EXISTS quota (
+                    portee TEXT NOT NULL,
+                    identifiant TEXT NOT NULL,
+                    tokens_jour INTEGER,
+                    cout_jour REAL,
+                    PRIMARY KEY (portee, identifiant)
+                ) WITHOUT ROWID
+            """)
+
+    @contextmanager
+    def _connexion(self) -> Iterator[sqlite3.Connection]:
+        # Une connexion par opération : utilisable depuis n'importe quel thread
+        connexion = sqlite3.connect(self.chemin, timeout=10)
+        try:
+            with connexion:  # Transaction validée, ou annulée en cas d'erreur
+                yield connexion
+        finally:
+            connexion.close()
+
+    # Lectures (mises en cache)
+
+    def quota(self, portee: str, identifiant: str) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Args:
+            portee (str): 'utilisateur', 'organisation' ou 'global'
+            identifiant (str): Utilisateur, organisation ou `IDENTIFIANT_GLOBAL`
+
+        Returns:
+            tuple: (tokens, coût USD) autorisés par jour, None si illimité
+        """
+        maintenant = time.monotonic()
+        with self._verrou:
+            quotas = self._quotas
+        if quotas is None or maintenant - quotas[0] > self.duree_cache:
+            with self._connexion() as connexion:
+                lignes = connexion.execute("SELECT portee, identifiant, tokens_jour, cout_jour FROM quota").fetchall()
+            quotas = (maintenant, {(p, i): (tokens, cout) for p, i, tokens, cout in lignes})
+            with self._verrou:
+                self._quotas = quotas
+
+        propre = quotas[1].get((portee, identifiant)) or quotas[1].get((portee, TOUS))
+        if propre is not None:
+            return propre
+        return _quota_environnement(portee, 'tokens'), _quota_environnement(portee, 'cout')
+
+    def consommation(self, portee: str, identifiant: str, jour: Optional[str] = None) -> Dict[str, float]:
+        """
+        Returns:
+            dict: tokens, cout et requetes du jour (aujourd'hui par défaut)
+        """
+        cle = (jour or date.today().isoformat(), portee, identifiant)
+        maintenant = time.monotonic()
+        with self._verrou:
+            en_cache = self._consommations.get(cle)
+        if en_cache is not None and maintenant - en_cache[0] <= self.duree_cache:
+            return en_cache[1]
+        with self._connexion() as connexion:
+            totaux = self._lire(connexion, cle)
+        with self._verrou:
+            self._consommations[cle] = (maintenant, totaux)
+        return totaux
+
+    def verifier(self, identifiants: Dict[str, str], tokens: int, cout: float) -> Tuple[bool, str]:
+        """
+        Vérifie les quotas sur les compteurs en cache, sans réserver
+
+        Args:
+            identifiants (dict): {portée: identifiant}
+            tokens (int): Tokens estimés de la requête
+            cout (float): Coût estimé de la requête (USD)
+
+        Returns:
+            tuple: (autorisé, message)
+        """
+        for portee, identifiant in identifiants.items():
+            message = self._depassement(portee, identifiant, self.consommation(portee, identifiant), tokens, cout)
+            if message:
+                return False, message
+        return True, "OK"
+
+    # Écritures (transactions atomiques)
+
+    def reserver(self, identifiants: Dict[str, str], tokens: int, cout: float) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Réserve l'estimation d'une requête si aucun quota n'est dépassé
+
+        La vérification et l'incrément ont lieu dans la même transaction
+        (verrou d'écriture SQLite) : deux sessions ne peuvent pas consommer
+        la même marge restante.
+
+        Args:
+            identifiants (dict): {portée: identifiant}
+            tokens (int): Tokens estimés de la requête
+            cout (float): Coût estimé de la requête (USD)
+
+        Returns:
+            tuple: (réservation à régler, message) ; réservation None si refusée
+        """
+        autorise, message = self.verifier(identifiants, tokens, cout)
+        if not autorise:
+            return None, message
+
+        jour = date.today().isoformat()
+        quotas = {portee: self.quota(portee, identifiant) for portee, identifiant in identifiants.items()}
+        with self._connexion() as connexion:
+            connexion.execute("BEGIN IMMEDIATE")
+            totaux = {portee: self._lire(connexion, (jour, portee, identifiant)) for portee, identifiant in identifiants.items()}
+            message = None
+            for portee, identifiant in identifiants.items():
+                message = self._depassement(portee, identifiant, totaux[portee], tokens, cout, quotas[portee])
+                if message:
+                    break
+            else:
+                self._incrementer(connexion, jour, identifiants, tokens, cout, 0)
+        self._memoriser(jour, identifiants, totaux, *((0, 0.0) if message else (tokens, cout)))
+        if message:
+            return None, message
+        return {'jour': jour, 'identifiants': dict(identifiants), 'tokens': tokens, 'cout': cout}, "OK"
+
+    def regler(self, reservation: Dict[str, Any], tokens: int = 0, cout: float = 0.0) -> None:
+        """
+        Remplace une réservation par la consommation réelle
+
+        Args:
+            reservation (dict): Réservation retournée par `reserver`
+            tokens (int): Tokens réellement consommés (0 : requête échouée, réservation libérée)
+            cout (float): Coût réel (USD)
+        """
+        jour, identifiants = reservation['jour'], reservation['identifiants']
+        delta_tokens = tokens - reservation['tokens']
+        delta_cout = cout - reservation['cout']
+        requetes = 1 if tokens else 0
+        with self._connexion() as connexion:
+            self._incrementer(connexion, jour, identifiants, delta_tokens, delta_cout, requetes)
+            totaux = {portee: self._lire(connexion, (jour, portee, identifiant)) for portee, identifiant in identifiants.items()}
+        self._memoriser(jour, identifiants, totaux)
+
+    def definir_quota(self, portee: str, identifiant: str = TOUS,
+                      tokens: Optional[int] = None, cout: Optional[float] = None) -> None:
+        """
+        Fixe le quota journalier d'un identifiant (ou de toute la portée avec `TOUS`)
+
+        Args:
+            portee (str): 'utilisateur', 'organisation' ou 'global'
+            identifiant (str): Identifiant concerné, `TOUS` par défaut
+            tokens (int, optional): Tokens par jour, None si illimité
+            cout (float, optional): Coût par jour (USD), None si illimité
+        """
+        with self._connexion() as connexion:
+            connexion.execute(
+                """
+                INSERT INTO quota (portee, identifiant, tokens_jour, cout_jour) VALUES (?, ?, ?, ?)
+                ON CONFLICT (portee, identifiant) DO UPDATE SET tokens_jour = excluded.tokens_jour, cout_jour = excluded.cout_jour
+                """,
+                (portee, identifiant, tokens, cout)
+            )
+        with self._verrou:
+            self._quotas = None
+
+    # Outils internes
+
+    @staticmethod
+    def _lire(connexion: sqlite3.Connection, cle: tuple) -> Dict[str, float]:
+        ligne = connexion.execute(
+            "SELECT tokens, cout, requetes FROM consommation WHERE jour = ? AND portee = ? AND identifiant = ?", cle
+        ).fetchone()
+        tokens, cout, requetes = ligne or (0, 0.0, 0)
+        return {'tokens': tokens, 'cout': cout, 'requetes': requetes}
+
+    @staticmethod
+    def _incrementer(connexion: sqlite3.Connection, jour: str, identifiants: Dict[str, str],
+                     tokens: int, cout: float, requetes: int) -> None:
+        connexion.executemany(
+            """
+            INSERT INTO consommation (jour, portee, identifiant, tokens, cout, requetes) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (jour, portee, identifiant) DO UPDATE SET
+                tokens = tokens + excluded.tokens, cout = cout + excluded.cout, requetes = requetes + excluded.requetes
+            """,
+            [(jour, portee, identifiant, tokens, cout, requetes) for portee, identifiant in identifiants.items()]
+        )
+
+    def _memoriser(self, jour: str, identifiants: Dict[str, str], totaux: Dict[str, Dict[str, float]],
+                   tokens: int = 0, cout: float = 0.0) -> None:
+        """Met le cache à jour avec les totaux lus pendant une écriture (et l'incrément qui a suivi)"""
+        maintenant = time.monotonic()
+        with self._verrou:
+            for portee, identifiant in identifiants.items():
+                self._consommations[(jour, portee, identifiant)] = (maintenant, {
+                    'tokens': totaux[portee]['tokens'] + tokens,
+                    'cout': totaux[portee]['cout'] + cout,
+                    'requetes': totaux[portee]['requetes']
+                })
+
+    def _depassement(self, portee: str, identifiant: str, totaux: Dict[str, float], tokens: int, cout: float,
+                     quota: Optional[Tuple[Optional[float], Optional[float]]] = None) -> Optional[str]:
+        quota_tokens, quota_cout = quota or self.quota(portee, identifiant)
+        libelle = _LIBELLES.get(portee, portee)
+        if quota_tokens and totaux['tokens'] + tokens > quota_tokens:
+            return f"Quota journalier {libelle} atteint ({totaux['tokens']:.0f}/{quota_tokens:.0f} tokens)"
+        if quota_cout and totaux['cout'] + cout > quota_cout:
+            return f"Quota journalier {libelle} atteint (${totaux['cout']:.4f}/${quota_cout:.2f})"
+        return None
+
+
+# Registre du processus
+
+_verrou = threading.Lock()
+_registre: Optional[RegistreTokens] = None
+
+
+def definir_registre_tokens(registre: RegistreTokens) -> None:
+    """
+    Remplace le registre du processus (autre base partagée...)
+
+    Args:
+        registre (RegistreTokens): Nouveau registre
+    """
+    global _registre
+    with _verrou:
+        _registre = registre
+
+
+def obtenir_registre_tokens() -> RegistreTokens:
+    """
+    Returns:
+        RegistreTokens: Registre courant (SQLite local par défaut)
+    """
+    global _registre
+    with _verrou:
+        if _registre is None:
+            _registre = RegistreTokens(os.getenv('MIXBPM_REGISTRE_TOKENS') or CHEMIN_REGISTRE_DEFAUT)
+        return _registre
+
+
+def identifiants_session(utilisateur: Optional[str] = None, organisation: Optional[str] = None) -> Dict[str, str]:
+    """
+    Identifiants de la session courante pour chaque portée
+
+    Args:
+        utilisateur (str, optional): Utilisateur, celui de la session par défaut
+        organisation (str, optional): Organisation, le template sélectionné par défaut
+
+    Returns:
+        dict: {portée: identifiant}, sans portée utilisateur pour une session anonyme
+    """
+    if utilisateur is None:
+        from services.business.persistance import utilisateur_identifie
+        utilisateur = utilisateur_identifie()
+    if organisation is None:
+        organisation = st.session_state.get('template_selectionne', 'COPA TRANSFORME')
+    identifiants = {'organisation': organisation, 'global': IDENTIFIANT_GLOBAL}
+    if utilisateur:
+        identifiants = {'utilisateur': utilisateur, **identifiants}
+    return identifiants
+
+
+def verifier_quotas(tokens: int, cout: float = 0.0, **identite) -> Tuple[bool, str]:
+    """
+    Vérifie, sans réserver, qu'une requête tient dans les quotas du jour
+
+    Args:
+        tokens (int): Tokens estimés
+        cout (float): Coût estimé (USD)
+        **identite: `utilisateur` et `organisation` (voir `identifiants_session`)
+
+    Returns:
+        tuple: (autorisé, message)
+    """
+    return obtenir_registre_tokens().verifier(identifiants_session(**identite), tokens, cout)
+
+
+def reserver_tokens(tokens: int, cout: float = 0.0, **identite) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Réserve l'estimation d'une requête dans le registre, si les quotas le permettent
+
+    Args:
+        tokens (int): Tokens estimés (prompt et complétion maximale)
+        cout (float): Coût estimé (USD)
+        **identite: `utilisateur` et `organisation` (voir `identifiants_session`)
+
+    Returns:
+        tuple: (réservation, message) ; réservation None si un quota est dépassé
+    """
+    return obtenir_registre_tokens().reserver(identifiants_session(**identite), tokens, cout)
+
+
+def regler_reservation(reservation: Optional[Dict[str, Any]], tokens: int = 0, cout: float = 0.0) -> None:
+    """
+    Remplace une réservation par la consommation réelle (0 : libère la réservation)
+
+    Args:
+        reservation (dict): Réservation de `reserver_tokens` (None : sans effet)
+        tokens (int): Tokens consommés
+        cout (float): Coût réel (USD)
+    """
+    if reservation is not None:
+        obtenir_registre_tokens().regler(reservation, tokens, cout)
+
+
+def consommation_du_jour(**identite) -> List[Dict[str, Any]]:
+    """
+    Consommation du jour et quotas de la session, pour chaque portée (lecture en cache)
+
+    Args:
+        **identite: `utilisateur` et `organisation` (voir `identifiants_session`)
+
+    Returns:
+        list: portee, identifiant, tokens, cout, requetes, quota_tokens, quota_cout
+    """
+    registre = obtenir_registre_tokens()
+    lignes = []
+    for portee, identifiant in identifiants_session(**identite).items():
+        quota_tokens, quota_cout = registre.quota(portee, identifiant)
+        lignes.append({
+            'portee': portee,
+            'identifiant': identifiant,
+            **registre.consommation(portee, identifiant),
+            'quota_tokens': quota_tokens,
+            'quota_cout': quota_cout
+        })
+    return lignes
+
+
+def definir_quota(portee: str, identifiant: str = TOUS, tokens: Optional[int] = None, cout: Optional[float] = None) -> None:
+    """
+    Fixe un quota journalier dans le registre (voir `RegistreTokens.definir_quota`)
+
+    Args:
+        portee (str): 'utilisateur', 'organisation' ou 'global'
+        identifiant (str): Identifiant concerné, `TOUS` par défaut
+        tokens (int, optional): Tokens par jour, None si illimité
+        cout (float, optional): Coût par jour (USD), None si illimité
+    """
+    obtenir_registre_tokens().definir_quota(portee, identifiant, tokens, cout)
@@ -0,0 +1,273 @@
+"""
+Régénération d'une section du business plan et invalidation de ses dépendantes
+
+Chaque section générée par le plan complet est conservée dans la session
+(`plan_sections`, sauvegardée avec le projet) avec les empreintes de ce qui
+l'a produite :
+
+- ses entrées : description du projet, template, business model et tableaux
+  financiers qu'elle reçoit (voir `entrees_section()`) ;
+- le texte des sections dont elle reprend le contenu (voir
+  `DEPENDANCES_SECTIONS`).
+
+Une section est à régénérer si l'une de ces empreintes ne correspond plus :
+données modifiées depuis, ou section amont régénérée. `regenerer_section()`
+ne refait qu'un appel, avec pour contexte les sections amont en cache, au lieu
+de relancer tout le plan ; les sections en aval deviennent alors à régénérer
+et sont proposées à leur tour.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+# Sections dont chaque section reprend le texte ; une section absente de ce
+# tableau dépend de toutes celles qui la précèdent (comme dans le plan complet)
+DEPENDANCES_SECTIONS = {
+    'Couverture': [],
+    'Sommaire': ['Couverture'],
+    'Présentation de votre entreprise': ['Couverture', 'Sommaire'],
+    'Étude de marché': ['Présentation de votre entreprise'],
+    'Produits et services': ['Présentation de votre entreprise', 'Étude de marché'],
+    'Stratégie commerciale et marketing': ['Étude de marché', 'Produits et services'],
+    'Équipe de direction': ['Présentation de votre entreprise'],
+    'Plan opérationnel': ['Produits et services', 'Équipe de direction'],
+    'Analyse financière': ['Stratégie commerciale et marketing', 'Plan opérationnel'],
+    'Financement et investissements': ['Analyse financière'],
+    'Annexes': ['Analyse financière', 'Financement et investissements']
+}
+
+# Couverture et sommaire sont générés sans business model ni tableaux financiers
+SECTIONS_SANS_DONNEES = ('Couverture', 'Sommaire')
+ENTREES = {
+    'description': "description du projet",
+    'template': "template",
+    'business_model': "business model",
+    'financier': "tableaux financiers"
+}
+
+_CLE_PLAN = 'plan_sections'
+
+
+def empreinte(texte: Any) -> str:
+    """Empreinte courte d'un texte (ou de sa représentation)"""
+    return hashlib.sha256(str(texte).encode('utf-8')).hexdigest()[:16]
+
+
+def plan_sections() -> Dict[str, Any]:
+    """
+    Returns:
+        dict: Plan en cache : template, description, ordre des sections et
+              sections ({nom: {contenu, entrees, dependances, horodatage}})
+    """
+    return st.session_state.get(_CLE_PLAN) or {}
+
+
+def demarrer_plan(template_nom: str, description: str, ordre: List[str]) -> None:
+    """
+    Réinitialise le plan en cache au lancement d'une génération complète
+
+    Args:
+        template_nom (str): Template du plan
+        description (str): Description du projet saisie par l'utilisateur
+        ordre (list): Sections du plan, dans l'ordre de génération
+    """
+    st.session_state[_CLE_PLAN] = {
+        'template': template_nom,
+        'description': description,
+        'ordre': list(ordre),
+        'sections': {}
+    }
+
+
+def dependances_section(section_name: str, ordre: Optional[List[str]] = None) -> List[str]:
+    """
+    Args:
+        section_name (str): Nom de la section
+        ordre (list, optional): Sections du plan (par défaut celles du plan en cache)
+
+    Returns:
+        list: Sections dont le texte sert de contexte à la section
+    """
+    ordre = ordre if ordre is not None else plan_sections().get('ordre', [])
+    if section_name in DEPENDANCES_SECTIONS:
+        return [nom for nom in DEPENDANCES_SECTIONS[section_name] if nom in ordre]
+    return ordre[:ordre.index(section_name)] if section_name in ordre else []
+
+
+def sections_dependantes(section_name: str, ordre: Optional[List[str]] = None) -> List[str]:
+    """
+    Args:
+        section_name (str): Nom de la section
+        ordre (list, optional): Sections du plan (par défaut celles du plan en cache)
+
+    Returns:
+        list: Sections qui reprennent, directement ou non, le texte de la section,
+              dans l'ordre du plan
+    """
+    ordre = ordre if ordre is not None else plan_sections().get('ordre', [])
+    atteintes = {section_name}
+    for nom in ordre:
+        if any(dependance in atteintes for dependance in dependances_section(nom, ordre)):
+            atteintes.add(nom)
+    return [nom for nom in ordre if nom in atteintes and nom != section_name]
+
+
+def entrees_section(section_name: str, template_nom: str, description: str) -> Dict[str, Any]:
+    """
+    Données actuelles transmises au modèle pour une section
+
+    Args:
+        section_name (str): Nom de la section
+        template_nom (str): Template du plan
+        description (str): Description du projet
+
+    Returns:
+        dict: description, template, business_model et financier (texte envoyé)
+    """
+    from business_plan_prompts_origin_exact import get_template_context_text
+    from services.document.tableaux_prompt import exports_financiers_session, serialiser_tableaux_financiers
+
+    entrees = {'description': description, 'template': get_template_context_text(template_nom)}
+    if section_name not in SECTIONS_SANS_DONNEES:
+        entrees['business_model'] = st.session_state.get('business_model_precedent', '')
+        entrees['financier'] = serialiser_tableaux_financiers(exports_financiers_session(), section_name)
+    return entrees
+
+
+def enregistrer_section(section_name: str, contenu: str) -> None:
+    """
+    Met en cache le texte d'une section et les empreintes de ce qui l'a produit
+
+    Args:
+        section_name (str): Nom de la section
+        contenu (str): Texte généré (une génération vide n'est pas conservée)
+    """
+    plan = plan_sections()
+    if not plan or not contenu:
+        return
+    sections = plan['sections']
+    if section_name not in plan['ordre']:
+        plan['ordre'].append(section_name)
+    entrees = entrees_section(section_name, plan['template'], plan['description'])
+    sections[section_name] = {
+        'contenu': contenu,
+        'entrees': {nom: empreinte(valeur) for nom, valeur in entrees.items()},
+        'dependances': {
+            nom: empreinte(sections[nom]['contenu']) if nom in sections else None
+            for nom in dependances_section(section_name, plan['ordre'])
+        },
+        'horodatage': datetime.now()
+    }
+    st.session_state[_CLE_PLAN] = plan
+
+
+def etat_sections(template_nom: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    État des sections du plan en cache au regard des données actuelles
+
+    Args:
+        template_nom (str, optional): Template courant (par défaut celui du plan)
+
+    Returns:
+        list: Dans l'ordre du plan, {section, a_regenerer, raisons, horodatage} ;
+              une section est aussi à régénérer quand une section amont l'est
+    """
+    plan = plan_sections()
+    if not plan:
+        return []
+    template_nom = template_nom or plan['template']
+    sections = plan['sections']
+    etats = []
+    a_regenerer = set()
+    for nom in plan['ordre']:
+        section = sections.get(nom)
+        raisons = []
+        if section is None:
+            raisons.append("jamais générée")
+        else:
+            entrees = entrees_section(nom, template_nom, plan['description'])
+            raisons += [
+                f"{ENTREES[entree]} modifié(s)" for entree, valeur in entrees.items()
+                if section['entrees'].get(entree) != empreinte(valeur)
+            ]
+            for dependance, empreinte_dependance in section['dependances'].items():
+                if dependance in a_regenerer:
+                    raisons.append(f"« {dependance} » à régénérer")
+                elif dependance in sections and empreinte(sections[dependance]['contenu']) != empreinte_dependance:
+                    raisons.append(f"« {dependance} » régénérée")
+        if raisons:
+            a_regenerer.add(nom)
+        etats.append({
+            'section': nom,
+            'a_regenerer': bool(raisons),
+            'raisons': raisons,
+            'horodatage': section['horodatage'] if section else None
+        })
+    return etats
+
+
+def resultats_plan() -> Dict[str, str]:
+    """
+    Returns:
+        dict: Texte en cache de chaque section, dans l'ordre du plan
+    """
+    plan = plan_sections()
+    sections = plan.get('sections', {})
+    return {nom: sections[nom]['contenu'] for nom in plan.get('ordre', []) if nom in sections}
+
+
+def regenerer_section(section_name: str, template_nom: Optional[str] = None,
+                      avec_dependantes: bool = False) -> Dict[str, Any]:
+    """
+    Régénère une section à partir des sections amont en cache
+
+    Args:
+        section_name (str): Section à régénérer
+        template_nom (str, optional): Template courant (par défaut celui du plan)
+        avec_dependantes (bool): Régénérer aussi, dans l'ordre, les sections qui en dépendent
+
+    Returns:
+        dict: {'success': True, 'sections': [régénérées]} ou {'success': False, 'error': ...}
+    """
+    from .content_generation import generate_section
+    from services.business.travaux import signaler_progression
+    from business_plan_prompts_origin_exact import get_system_messages_origin_style, get_queries_origin_style
+
+    plan = plan_sections()
+    if not plan or section_name not in plan['ordre']:
+        return {'success': False, 'error': f"Section inconnue ou plan non généré : {section_name}"}
+    if template_nom:
+        plan['template'] = template_nom
+    system_messages = get_system_messages_origin_style(plan['template'])
+    queries = get_queries_origin_style()
+
+    a_regenerer = [section_name] + (sections_dependantes(section_name) if avec_dependantes else [])
+    regenerees = []
+    for nom in a_regenerer:
+        if nom not in system_messages:
+            return {'success': False, 'error': f"Section absente du template {plan['template']} : {nom}",
+                    'sections': regenerees}
+        entrees = entrees_section(nom, plan['template'], plan['description'])
+        amont = [plan['sections'][dependance]['contenu'] for dependance in dependances_section(nom)
+                 if dependance in plan['sections']]
+        try:
+            contenu = generate_section(
+                system_message=system_messages[nom],
+                user_query=queries[nom],
+                additional_context=" ".join([plan['description']] + amont).strip(),
+                section_name=nom,
+                financial_context=entrees.get('financier', ""),
+                business_model=entrees.get('business_model', ""),
+                template_context=entrees['template']
+            )
+        except ValueError as e:
+            return {'success': False, 'error': str(e), 'sections': regenerees}
+        if not contenu:
+            return {'success': False, 'error': f"Aucun contenu généré pour {nom}", 'sections': regenerees}
+        enregistrer_section(nom, contenu)
+        regenerees.append(nom)
+        signaler_progression(len(regenerees) / len(a_regenerer), f"{nom} régénérée")
+    return {'success': True, 'sections': regenerees}
@@ -0,0 +1,158 @@
+"""
+Routage des requêtes LLM : choix du modèle par section
+
+Plutôt qu'un modèle unique pour toutes les générations (celui de la barre
+latérale), chaque appel de `generate_section` est classé dans une gamme :
+
+- « economique » (gpt-4o-mini) : suggestions, sections courtes ou de mise en
+  forme (couverture, sommaire, annexes), réponses attendues courtes ;
+- « premium » : longues sections analytiques (étude de marché, analyse
+  financière...) ;
+- « standard » : le reste, avec le modèle choisi dans la barre latérale.
+
+Dans sa gamme, le premier modèle en bonne santé est retenu, d'après la
+télémétrie des derniers appels (voir `statistiques_modeles`) : taux d'erreur
+et latence p95 sous les seuils de la gamme. Chaque template peut imposer une
+gamme ou un modèle à certaines sections (`routage_modeles`, voir
+`templates.get_routage_modeles`). Les dernières décisions sont conservées
+dans la session pour le panneau des tokens.
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from .telemetrie import statistiques_modeles
+
+# Modèles candidats par gamme, par ordre de préférence (None : modèle de la barre latérale)
+GAMMES = {
+    'economique': ['gpt-4o-mini', 'gpt-4o'],
+    'standard': [None, 'gpt-4o', 'gpt-4o-mini'],
+    'premium': ['gpt-4o', 'gpt-4-turbo', 'gpt-4']
+}
+
+# Importance des sections du business plan (les autres sont « normale »)
+IMPORTANCE_SECTIONS = {
+    'Couverture': 'basse',
+    'Sommaire': 'basse',
+    'Annexes': 'basse',
+    'Étude de marché': 'haute',
+    'Stratégie commerciale et marketing': 'haute',
+    'Analyse financière': 'haute',
+    'Financement et investissements': 'haute'
+}
+PREFIXES_IMPORTANCE_BASSE = ('Suggestions',)
+
+# Réponse attendue (max_tokens) en deçà de laquelle une section est courte
+LONGUEUR_COURTE = 1000
+
+# Seuils de santé d'un modèle, sur les derniers appels observés
+APPELS_MINIMUM = 5
+TAUX_ERREUR_MAX = 0.3
+LATENCE_P95_MAX_S = {'economique': 20.0, 'standard': 60.0, 'premium': 120.0}
+
+MAX_DECISIONS = 30
+_CLE_DECISIONS = '_decisions_routage'
+
+
+def routage_actif() -> bool:
+    """False si l'utilisateur impose le modèle de la barre latérale à toutes les sections"""
+    return bool(st.session_state.get('routage_modeles_actif', True))
+
+
+def importance_section(section_name: str) -> str:
+    """
+    Args:
+        section_name (str): Nom de la section
+
+    Returns:
+        str: 'basse', 'normale' ou 'haute'
+    """
+    if section_name.startswith(PREFIXES_IMPORTANCE_BASSE):
+        return 'basse'
+    return IMPORTANCE_SECTIONS.get(section_name, 'normale')
+
+
+def _gamme(section_name: str, max_tokens: int) -> Tuple[str, str]:
+    importance = importance_section(section_name)
+    if importance == 'haute':
+        return 'premium', "section analytique"
+    if importance == 'basse':
+        return 'economique', "section secondaire"
+    if max_tokens <= LONGUEUR_COURTE:
+        return 'economique', f"réponse courte ({max_tokens} tokens max)"
+    return 'standard', "section standard"
+
+
+def _etat_modele(modele: str, gamme: str, statistiques: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    """Raison d'écarter un modèle d'après la télémétrie, None s'il est en bonne santé"""
+    stats = statistiques.get(modele)
+    if not stats or stats['appels'] < APPELS_MINIMUM:
+        return None
+    if stats['taux_erreur'] > TAUX_ERREUR_MAX:
+        return f"{modele} : {stats['taux_erreur']:.0%} d'erreurs"
+    if stats['latence_p95_s'] is not None and stats['latence_p95_s'] > LATENCE_P95_MAX_S[gamme]:
+        return f"{modele} : p95 {stats['latence_p95_s']:.0f} s"
+    return None
+
+
+def choisir_modele(section_name: str, max_tokens: int, modele_defaut: str,
+                   template: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Choisit le modèle d'une génération et mémorise la décision dans la session
+
+    Args:
+        section_name (str): Nom de la section générée
+        max_tokens (int): Longueur maximale de la réponse demandée
+        modele_defaut (str): Modèle de la barre latérale
+        template (str, optional): Template courant (exceptions de routage)
+
+    Returns:
+        dict: section, gamme, modele et raison
+    """
+    from templates import get_routage_modeles
+
+    exception = get_routage_modeles(template).get(section_name) if template else None
+    if exception in GAMMES:
+        gamme, raison = exception, f"imposé par {template}"
+    elif exception:
+        gamme, raison = None, f"imposé par {template}"
+    else:
+        gamme, raison = _gamme(section_name, max_tokens)
+
+    if gamme is None:
+        modele = exception
+    else:
+        statistiques = statistiques_modeles()
+        candidats = list(dict.fromkeys(nom or modele_defaut for nom in GAMMES[gamme]))
+        ecartes = []
+        for candidat in candidats:
+            motif = _etat_modele(candidat, gamme, statistiques)
+            if motif is None:
+                modele = candidat
+                break
+            ecartes.append(motif)
+        else:
+            # Aucun modèle en bonne santé : le moins défaillant
+            modele = min(candidats, key=lambda candidat: statistiques[candidat]['taux_erreur'])
+        if ecartes:
+            raison += f", écarté(s) : {', '.join(ecartes)}"
+
+    decision = {'section': section_name, 'gamme': gamme or 'imposé', 'modele': modele, 'raison': raison}
+    try:
+        decisions = st.session_state.setdefault(_CLE_DECISIONS, deque(maxlen=MAX_DECISIONS))
+        decisions.append({'horodatage': datetime.now(), **decision})
+    except Exception:
+        pass  # Appel hors d'une session Streamlit
+    return decision
+
+
+def decisions_routage() -> List[Dict[str, Any]]:
+    """
+    Returns:
+        list: Dernières décisions de la session, de la plus récente à la plus ancienne
+              (horodatage, section, gamme, modele, raison)
+    """
+    return list(reversed(st.session_state.get(_CLE_DECISIONS, [])))
@@ -0,0 +1,305 @@
+"""
+Télémétrie des requêtes LLM : traces structurées et métriques Prometheus
+
+Chaque appel de `generate_section` produit une trace (section, template,
+modèle demandé et modèle utilisé, tokens, délai du premier token, latence,
+nouvelles tentatives, issue), transmise à `enregistrer_requete_llm()` :
+
+- ajoutée au fichier JSONL `MIXBPM_TELEMETRIE_JSONL`
+  (`.mixbpm/telemetrie/requetes_llm.jsonl` par défaut, renouvelé au-delà de 20 Mo) ;
+- ajoutée à l'historique des requêtes de la session (`token_usage['request_history']`) ;
+- agrégée par modèle pour les métriques : latence p50/p95/p99 et débit en
+  tokens par seconde sur les dernières requêtes, compteurs de requêtes,
+  d'erreurs et de tokens.
+
+Les métriques sont réécrites au format texte Prometheus dans
+`metriques.prom` (à côté du JSONL, pour le collecteur « textfile » de
+node_exporter) et servies sur `/metrics` si `MIXBPM_PORT_METRIQUES` est
+défini (sur 127.0.0.1, ou `MIXBPM_HOTE_METRIQUES`). `MIXBPM_TELEMETRIE=0` désactive les exports.
+
+Les processus des travaux en arrière-plan (`services/business/travaux.py`)
+retiennent leurs traces (`retenir_traces()`) : elles sont transmises au
+processus principal avec la fin du travail et y sont intégrées
+(`integrer_traces()`). Seul le processus principal tient ainsi les compteurs,
+écrit le JSONL et `metriques.prom` et sert `/metrics`, et le routage des
+modèles voit les requêtes des travaux.
+"""
+
+import os
+import json
+import math
+import threading
+from pathlib import Path
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import streamlit as st
+
+DOSSIER_TELEMETRIE_DEFAUT = Path(__file__).resolve().parents[2] / '.mixbpm' / 'telemetrie'
+TAILLE_MAX_JSONL = 20 * 1024 * 1024
+
+# Requêtes conservées par modèle pour le calcul des quantiles
+FENETRE_QUANTILES = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+
+_verrou = threading.RLock()
+_fenetres: Dict[str, deque] = {}
+_issues: Dict[str, deque] = {}
+_compteurs: Dict[tuple, float] = {}
+_serveur: Optional[ThreadingHTTPServer] = None
+
+# Processus de travail : traces retenues pour le processus principal (None hors d'un travail)
+_traces_retenues: Optional[List[Dict[str, Any]]] = None
+
+
+def telemetrie_active() -> bool:
+    """False si les exports sont désactivés (`MIXBPM_TELEMETRIE=0`)"""
+    return os.getenv('MIXBPM_TELEMETRIE', '1').lower() not in ('0', 'false', 'non')
+
+
+def _fichier_jsonl() -> Path:
+    return Path(os.getenv('MIXBPM_TELEMETRIE_JSONL') or DOSSIER_TELEMETRIE_DEFAUT / 'requetes_llm.jsonl')
+
+
+def _ecrire_jsonl(trace: Dict[str, Any]) -> None:
+    fichier = _fichier_jsonl()
+    fichier.parent.mkdir(parents=True, exist_ok=True)
+    if fichier.exists() and fichier.stat().st_size > TAILLE_MAX_JSONL:
+        fichier.replace(fichier.with_name(fichier.name + '.1'))
+    with open(fichier, 'a', encoding='utf-8') as sortie:
+        sortie.write(json.dumps(trace, ensure_ascii=False, default=str) + '\n')
+
+
+def _incrementer(nom: str, etiquettes: tuple, valeur: float = 1.0) -> None:
+    _compteurs[(nom, etiquettes)] = _compteurs.get((nom, etiquettes), 0.0) + valeur
+
+
+def _agreger(trace: Dict[str, Any]) -> None:
+    """Ajoute une trace aux compteurs et aux fenêtres des quantiles (appelée sous `_verrou`)"""
+    modele = trace.get('modele_utilise') or trace.get('modele_demande') or 'inconnu'
+    _incrementer('requetes_total', (modele, trace['issue']))
+    _incrementer('tentatives_total', (modele,), trace.get('tentatives', 1))
+    for type_tokens in ('prompt', 'completion', 'caches'):
+        _incrementer('tokens_total', (modele, type_tokens), trace.get(f'tokens_{type_tokens}') or 0)
+    if trace['issue'] in ('succes', 'erreur'):
+        _issues.setdefault(modele, deque(maxlen=FENETRE_QUANTILES)).append(trace['issue'] == 'succes')
+    if trace['issue'] == 'succes':
+        fenetre = _fenetres.setdefault(modele, deque(maxlen=FENETRE_QUANTILES))
+        duree_appel = trace.get('duree_appel_s') or 0.0
+        fenetre.append((
+            trace['latence_s'],
+            (trace.get('tokens_completion') or 0) / duree_appel if duree_appel > 0 else None
+        ))
+
+
+def _exporter(traces: List[Dict[str, Any]]) -> None:
+    """Ajoute des traces au JSONL et réécrit les métriques"""
+    if not telemetrie_active():
+        return
+    try:
+        with _verrou:
+            for trace in traces:
+                _ecrire_jsonl(trace)
+            _ecrire_metriques()
+    except OSError:
+        pass  # La télémétrie ne doit jamais faire échouer une génération
+    _demarrer_serveur_metriques()
+
+
+def enregistrer_requete_llm(trace: Dict[str, Any]) -> None:
+    """
+    Enregistre la trace d'une requête LLM (fichier JSONL, session, métriques)
+
+    Args:
+        trace (dict): section, template, modele_demande, modele_utilise,
+                      tokens_prompt, tokens_completion, tokens_caches,
+                      premier_token_s, latence_s, duree_appel_s, tentatives,
+                      issue ('succes', 'erreur', 'limite_tokens', 'quota',
+                      'client_absent') et erreur
+    """
+    trace = {'horodatage': datetime.now().isoformat(timespec='milliseconds'), **trace}
+
+    try:
+        usage = st.session_state.get('token_usage')
+    except Exception:
+        usage = None  # Appel hors d'une session Streamlit
+    if usage is not None:
+        from utils.token_utils import plafonner_historique_tokens
+        usage.setdefault('request_history', []).append(trace)
+        plafonner_historique_tokens()
+
+    with _verrou:
+        if _traces_retenues is not None:
+            _traces_retenues.append(trace)  # Intégrée par le processus principal
+            return
+        _agreger(trace)
+    _exporter([trace])
+
+
+def retenir_traces() -> None:
+    """
+    Processus de travail : les traces suivantes sont retenues au lieu d'être
+    agrégées et exportées, jusqu'à leur transmission (`traces_retenues()`)
+    """
+    global _traces_retenues
+    with _verrou:
+        _traces_retenues = []
+
+
+def traces_retenues() -> List[Dict[str, Any]]:
+    """
+    Returns:
+        list: Traces retenues depuis le dernier appel, à transmettre à
+              `integrer_traces()` dans le processus principal
+    """
+    with _verrou:
+        if _traces_retenues is None:
+            return []
+        traces = list(_traces_retenues)
+        _traces_retenues.clear()
+    return traces
+
+
+def integrer_traces(traces: List[Dict[str, Any]]) -> None:
+    """
+    Intègre aux métriques et au JSONL les traces d'un processus de travail
+
+    Args:
+        traces (list): Traces retenues par le processus (`traces_retenues()`)
+    """
+    if not traces:
+        return
+    with _verrou:
+        for trace in traces:
+            _agreger(trace)
+    _exporter(traces)
+
+
+def _quantile(valeurs: List[float], q: float) -> float:
+    """Quantile par rang le plus proche d'une liste triée"""
+    return valeurs[max(0, math.ceil(q * len(valeurs)) - 1)]
+
+
+def _etiquettes(noms: tuple, valeurs: tuple) -> str:
+    def echapper(valeur) -> str:
+        return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{nom}="{echapper(valeur)}"' for nom, valeur in zip(noms, valeurs))
+
+
+def statistiques_modeles() -> Dict[str, Dict[str, Any]]:
+    """
+    Latence et débit par modèle sur les dernières requêtes réussies, taux d'erreur
+    sur les derniers appels
+
+    Returns:
+        dict: {modèle: {requetes, latence_p50_s, latence_p95_s, latence_p99_s,
+               tokens_par_seconde_p50, appels, taux_erreur}} ; latences et débit
+               None pour un modèle sans requête réussie
+    """
+    with _verrou:
+        fenetres = {modele: list(fenetre) for modele, fenetre in _fenetres.items()}
+        issues = {modele: list(fenetre) for modele, fenetre in _issues.items()}
+    statistiques = {}
+    for modele in {**fenetres, **issues}:
+        mesures = fenetres.get(modele, [])
+        latences = sorted(latence for latence, _ in mesures)
+        debits = sorted(debit for _, debit in mesures if debit is not None)
+        appels = issues.get(modele, [])
+        statistiques[modele] = {
+            'requetes': len(mesures),
+            **{f"latence_p{int(q * 100)}_s": _quantile(latences, q) if latences else None for q in QUANTILES},
+            'tokens_par_seconde_p50': _quantile(debits, 0.5) if debits else None,
+            'appels': len(appels),
+            'taux_erreur': appels.count(False) / len(appels) if appels else 0.0
+        }
+    return statistiques
+
+
+def metriques_prometheus() -> str:
+    """
+    Returns:
+        str: Métriques au format texte d'exposition Prometheus
+    """
+    lignes = [
+        "# HELP mixbpm_llm_latence_secondes Latence des requêtes LLM réussies (fenêtre glissante par modèle)",
+        "# TYPE mixbpm_llm_latence_secondes summary"
+    ]
+    statistiques = statistiques_modeles()
+    with _verrou:
+        fenetres = {modele: list(fenetre) for modele, fenetre in _fenetres.items()}
+        compteurs = dict(_compteurs)
+
+    for modele, stats in statistiques.items():
+        if not stats['requetes']:
+            continue
+        for q in QUANTILES:
+            lignes.append(f"mixbpm_llm_latence_secondes{{{_etiquettes(('modele', 'quantile'), (modele, q))}}} "
+                          f"{stats[f'latence_p{int(q * 100)}_s']:.6f}")
+        lignes.append(f"mixbpm_llm_latence_secondes_sum{{{_etiquettes(('modele',), (modele,))}}} "
+                      f"{sum(latence for latence, _ in fenetres[modele]):.6f}")
+        lignes.append(f"mixbpm_llm_latence_secondes_count{{{_etiquettes(('modele',), (modele,))}}} {stats['requetes']}")
+
+    lignes += [
+        "# HELP mixbpm_llm_tokens_par_seconde Débit médian de génération (tokens de complétion par seconde d'appel)",
+        "# TYPE mixbpm_llm_tokens_par_seconde gauge"
+    ]
+    for modele, stats in statistiques.items():
+        if stats['tokens_par_seconde_p50'] is not None:
+            lignes.append(f"mixbpm_llm_tokens_par_seconde{{{_etiquettes(('modele',), (modele,))}}} "
+                          f"{stats['tokens_par_seconde_p50']:.3f}")
+
+    descriptions = {
+        'requetes_total': ("Requêtes LLM par modèle et issue", ('modele', 'issue')),
+        'tentatives_total': ("Appels API émis, nouvelles tentatives et replis compris", ('modele',)),
+        'tokens_total': ("Tokens par modèle et type (prompt, completion, caches)", ('modele', 'type'))
+    }
+    for nom, (aide, noms_etiquettes) in descriptions.items():
+        lignes += [f"# HELP mixbpm_llm_{nom} {aide}", f"# TYPE mixbpm_llm_{nom} counter"]
+        for (nom_compteur, etiquettes), valeur in sorted(compteurs.items()):
+            if nom_compteur == nom:
+                lignes.append(f"mixbpm_llm_{nom}{{{_etiquettes(noms_etiquettes, etiquettes)}}} {valeur:g}")
+    return '\n'.join(lignes) + '\n'
+
+
+def _ecrire_metriques() -> None:
+    """Réécrit le fichier de métriques de façon atomique (appelée sous `_verrou`)"""
+    fichier = _fichier_jsonl().with_name('metriques.prom')
+    temporaire = fichier.with_name(fichier.name + '.tmp')
+    temporaire.write_text(metriques_prometheus(), encoding='utf-8')
+    temporaire.replace(fichier)
+
+
+def _demarrer_serveur_metriques() -> None:
+    """Sert `/metrics` sur `MIXBPM_PORT_METRIQUES`, une fois par processus"""
+    global _serveur
+    port = os.getenv('MIXBPM_PORT_METRIQUES')
+    if not port or _serveur is not None:
+        return
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            corps = metriques_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+    with _verrou:
+        if _serveur is not None:
+            return
+        try:
+            hote = os.getenv('MIXBPM_HOTE_METRIQUES', '127.0.0.1')
+            _serveur = ThreadingHTTPServer((hote, int(port)), Gestionnaire)
+        except (OSError, ValueError):
+            return
+        _serveur.daemon_threads = True
+    threading.Thread(target=_serveur.serve_forever, name="mixbpm-metriques", daemon=True).start()
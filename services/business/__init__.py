@@ -14,6 +14,35 @@ from .data_management import (
     reinitialiser_donnees_business,
     get_donnees_consolidees
 )
+from .persistance import (
+    StockageSessions,
+    StockageSQLite,
+    definir_stockage_sessions,
+    obtenir_stockage_sessions,
+    restaurer_projet,
+    planifier_sauvegarde,
+    changer_projet,
+    lister_projets,
+    etat_sauvegarde
+)
+from .memoire import (
+    estimer_taille,
+    mesurer_session,
+    deposer_artefact,
+    recuperer_artefact,
+    liberer_artefact,
+    entretenir_session,
+    sessions_les_plus_lourdes
+)
+from .travaux import (
+    FileTravaux,
+    definir_file_travaux,
+    obtenir_file_travaux,
+    soumettre_travail,
+    signaler_progression,
+    travaux_session,
+    recuperer_travaux_termines
+)
 
 __all__ = [
     'init_session_state',
@@ -25,5 +54,28 @@ __all__ = [
     'exporter_donnees_business',
     'importer_donnees_business',
     'reinitialiser_donnees_business',
-    'get_donnees_consolidees'
+    'get_donnees_consolidees',
+    'StockageSessions',
+    'StockageSQLite',
+    'definir_stockage_sessions',
+    'obtenir_stockage_sessions',
+    'restaurer_projet',
+    'planifier_sauvegarde',
+    'changer_projet',
+    'lister_projets',
+    'etat_sauvegarde',
+    'estimer_taille',
+    'mesurer_session',
+    'deposer_artefact',
+    'recuperer_artefact',
+    'liberer_artefact',
+    'entretenir_session',
+    'sessions_les_plus_lourdes',
+    'FileTravaux',
+    'definir_file_travaux',
+    'obtenir_file_travaux',
+    'soumettre_travail',
+    'signaler_progression',
+    'travaux_session',
+    'recuperer_travaux_termines'
 ]
\ No newline at end of file
@@ -0,0 +1,376 @@
+"""
+Empreinte mémoire des sessions : mesure, plafonds et déversement sur disque
+
+Chaque session Streamlit conserve ses données en mémoire pour toute sa durée.
+Ce module borne cette empreinte :
+
+- `estimer_taille()` / `mesurer_session()` estiment la taille de chaque clé ;
+- `entretenir_session()`, appelée en fin d'exécution, plafonne les historiques
+  d'usage et relève périodiquement l'empreinte de la session dans un registre
+  du processus ;
+- `deposer_artefact()` / `recuperer_artefact()` conservent les artefacts
+  volumineux (stores vectoriels, documents générés) : ils restent en mémoire
+  tant qu'ils servent, puis sont écrits sur disque et rechargés à la demande ;
+- un thread de balayage (`balayer_artefacts()`) déverse, hors des exécutions,
+  les artefacts inutilisés de toutes les sessions, y compris des sessions
+  inactives ou abandonnées, qui ne s'exécutent plus ;
+- `sessions_les_plus_lourdes()` alimente la vue d'administration.
+"""
+
+import os
+import sys
+import time
+import uuid
+import types
+import atexit
+import pickle
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Artefacts de plus de SEUIL_DEVERSEMENT octets inutilisés depuis INACTIVITE_DEVERSEMENT secondes
+SEUIL_DEVERSEMENT = int(float(os.getenv('MIXBPM_SEUIL_DEVERSEMENT_MO', '2')) * 1024 * 1024)
+INACTIVITE_DEVERSEMENT = 300
+# Au-delà, tous les artefacts en mémoire de la session sont déversés, du plus gros au plus petit
+PLAFOND_SESSION = int(float(os.getenv('MIXBPM_PLAFOND_SESSION_MO', '50')) * 1024 * 1024)
+
+INTERVALLE_MESURE = 30      # secondes entre deux mesures d'une même session
+INTERVALLE_BALAYAGE = 60    # secondes entre deux balayages des artefacts
+EXPIRATION_SESSION = 3600   # sessions sans activité retirées du registre (secondes)
+
+_CLE_ARTEFACTS = '_artefacts'
+_CLE_SESSION = '_id_session'
+_CLE_DERNIERE_MESURE = '_derniere_mesure_memoire'
+
+_verrou = threading.Lock()
+_registre: Dict[str, Dict[str, Any]] = {}
+_dossier: Optional[Path] = None
+
+# Artefacts de chaque session, accessibles au balayage hors de toute exécution :
+# session -> {'artefacts': dictionnaire de la session, '_horloge': dernière activité}
+_verrou_artefacts = threading.RLock()
+_artefacts_sessions: Dict[str, Dict[str, Any]] = {}
+_balayage: Optional[threading.Thread] = None
+
+
+def estimer_taille(valeur: Any, _vus: Optional[set] = None, _profondeur: int = 0) -> int:
+    """
+    Estime la taille en mémoire d'une valeur et de ce qu'elle contient
+
+    Les objets partagés ne sont comptés qu'une fois ; tableaux NumPy et
+    DataFrames sont mesurés par leurs propres méthodes, les index FAISS par
+    le nombre et la dimension de leurs vecteurs.
+
+    Args:
+        valeur: Valeur à mesurer
+
+    Returns:
+        int: Taille estimée en octets
+    """
+    vus = set() if _vus is None else _vus
+    if id(valeur) in vus or _profondeur > 12:
+        return 0
+    vus.add(id(valeur))
+
+    if isinstance(valeur, (str, bytes, bytearray, int, float, bool)) or valeur is None:
+        return sys.getsizeof(valeur)
+    if isinstance(valeur, np.ndarray):
+        return int(valeur.nbytes) + sys.getsizeof(valeur)
+    if isinstance(valeur, pd.DataFrame):
+        return int(valeur.memory_usage(deep=True).sum())
+    if isinstance(valeur, pd.Series):
+        return int(valeur.memory_usage(deep=True))
+    if isinstance(valeur, dict):
+        return sys.getsizeof(valeur) + sum(
+            estimer_taille(cle, vus, _profondeur + 1) + estimer_taille(v, vus, _profondeur + 1)
+            for cle, v in list(valeur.items())
+        )
+    if isinstance(valeur, (list, tuple, set, frozenset, deque)):
+        return sys.getsizeof(valeur) + sum(estimer_taille(v, vus, _profondeur + 1) for v in list(valeur))
+    if isinstance(valeur, (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)):
+        return 0
+
+    taille = sys.getsizeof(valeur)
+    index = getattr(valeur, 'index', None)
+    if hasattr(index, 'ntotal') and hasattr(index, 'd'):
+        taille += int(index.ntotal) * int(index.d) * 4  # Vecteurs float32 d'un index FAISS
+    attributs = getattr(valeur, '__dict__', None)
+    if isinstance(attributs, dict):
+        taille += estimer_taille({k: v for k, v in attributs.items() if k != 'index'}, vus, _profondeur + 1)
+    return taille
+
+
+def mesurer_session() -> Dict[str, int]:
+    """
+    Mesure chaque clé du session state courant
+
+    Returns:
+        dict: {clé: octets estimés}, de la plus lourde à la plus légère ;
+              les artefacts déversés sur disque ne comptent pas
+    """
+    tailles = {}
+    for cle in list(st.session_state.keys()):
+        try:
+            valeur = st.session_state[cle]
+        except KeyError:
+            continue
+        if cle == _CLE_ARTEFACTS:
+            for nom, entree in valeur.items():
+                tailles[f"artefact:{nom}"] = entree['taille'] if entree['valeur'] is not None else 0
+            continue
+        tailles[cle] = estimer_taille(valeur)
+    return dict(sorted(tailles.items(), key=lambda element: element[1], reverse=True))
+
+
+# Artefacts volumineux
+
+def _dossier_artefacts() -> Path:
+    """Dossier des artefacts déversés par ce processus, supprimé à sa sortie"""
+    global _dossier
+    with _verrou:
+        if _dossier is None:
+            racine = os.getenv('MIXBPM_DOSSIER_ARTEFACTS')
+            if racine:
+                Path(racine).mkdir(parents=True, exist_ok=True)
+            _dossier = Path(tempfile.mkdtemp(prefix='mixbpm-artefacts-', dir=racine or None))
+        return _dossier
+
+
+@atexit.register
+def _supprimer_dossier_artefacts() -> None:
+    if _dossier is not None:
+        shutil.rmtree(_dossier, ignore_errors=True)
+
+
+def _identifiant_session() -> str:
+    if _CLE_SESSION not in st.session_state:
+        st.session_state[_CLE_SESSION] = uuid.uuid4().hex[:12]
+    return st.session_state[_CLE_SESSION]
+
+
+def _suivre_artefacts(artefacts: Dict[str, Any]) -> None:
+    """Inscrit les artefacts de la session courante au balayage, lancé au besoin"""
+    global _balayage
+    with _verrou:
+        _artefacts_sessions[_identifiant_session()] = {'artefacts': artefacts, '_horloge': time.monotonic()}
+        if _balayage is None or not _balayage.is_alive():
+            _balayage = threading.Thread(target=_boucle_balayage, name="mixbpm-artefacts", daemon=True)
+            _balayage.start()
+
+
+def deposer_artefact(cle: str, valeur: Any) -> None:
+    """
+    Conserve un artefact volumineux de la session, déversable sur disque
+
+    Args:
+        cle (str): Nom de l'artefact (ex. 'vector_store')
+        valeur: Artefact ; les stores vectoriels LangChain sont écrits avec
+                `serialize_to_bytes`, les autres objets avec pickle
+    """
+    artefacts = st.session_state.setdefault(_CLE_ARTEFACTS, {})
+    entree = {
+        'valeur': valeur,
+        'taille': estimer_taille(valeur),
+        'fichier': None,
+        'acces': time.monotonic(),
+        'rechargeur': None
+    }
+    with _verrou_artefacts:
+        ancien = artefacts.get(cle)
+        if ancien and ancien['fichier']:
+            Path(ancien['fichier']).unlink(missing_ok=True)
+        artefacts[cle] = entree
+    _suivre_artefacts(artefacts)
+
+
+def recuperer_artefact(cle: str, defaut: Any = None) -> Any:
+    """
+    Renvoie un artefact de la session, rechargé depuis le disque s'il y a été déversé
+
+    Args:
+        cle (str): Nom de l'artefact
+        defaut: Valeur si l'artefact n'existe pas ou ne peut pas être rechargé
+
+    Returns:
+        L'artefact
+    """
+    entree = st.session_state.get(_CLE_ARTEFACTS, {}).get(cle)
+    if entree is None:
+        return defaut
+    with _verrou_artefacts:  # Le balayage peut déverser l'artefact au même moment
+        if entree['valeur'] is None:
+            try:
+                contenu = Path(entree['fichier']).read_bytes()
+                rechargeur = entree['rechargeur']
+                entree['valeur'] = rechargeur(contenu) if rechargeur else pickle.loads(contenu)
+            except Exception:
+                return defaut
+        entree['acces'] = time.monotonic()
+        return entree['valeur']
+
+
+def liberer_artefact(cle: str) -> None:
+    """Supprime un artefact de la session, en mémoire comme sur disque"""
+    with _verrou_artefacts:
+        entree = st.session_state.get(_CLE_ARTEFACTS, {}).pop(cle, None)
+    if entree and entree['fichier']:
+        Path(entree['fichier']).unlink(missing_ok=True)
+
+
+def _deverser(nom: str, entree: Dict[str, Any], session: str) -> bool:
+    """Écrit un artefact sur disque et libère sa copie en mémoire"""
+    valeur = entree['valeur']
+    if entree['fichier'] is None or not Path(entree['fichier']).exists():
+        if hasattr(valeur, 'serialize_to_bytes') and hasattr(type(valeur), 'deserialize_from_bytes'):
+            # Store vectoriel LangChain : l'objet d'embeddings (léger) reste en mémoire
+            contenu = valeur.serialize_to_bytes()
+            classe, embeddings = type(valeur), valeur.embeddings
+            entree['rechargeur'] = lambda octets: classe.deserialize_from_bytes(
+                octets, embeddings, allow_dangerous_deserialization=True  # Fichier écrit par ce processus
+            )
+        else:
+            try:
+                contenu = pickle.dumps(valeur, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                return False
+        dossier = _dossier_artefacts() / session
+        dossier.mkdir(exist_ok=True)
+        fichier = dossier / f"{uuid.uuid4().hex[:8]}_{nom}.bin"
+        fichier.write_bytes(contenu)
+        entree['fichier'] = str(fichier)
+    entree['valeur'] = None
+    return True
+
+
+def _deverser_artefacts(artefacts: Dict[str, Any], session: str, tous: bool = False) -> List[str]:
+    """Déverse les artefacts volumineux inutilisés d'une session, du plus gros au plus petit"""
+    maintenant = time.monotonic()
+    deverses = []
+    with _verrou_artefacts:
+        for nom, entree in sorted(list(artefacts.items()), key=lambda element: element[1]['taille'], reverse=True):
+            if entree['valeur'] is None:
+                continue
+            inutilise = entree['taille'] >= SEUIL_DEVERSEMENT and maintenant - entree['acces'] >= INACTIVITE_DEVERSEMENT
+            if (tous or inutilise) and _deverser(nom, entree, session):
+                deverses.append(nom)
+    return deverses
+
+
+def deverser_artefacts(tous: bool = False) -> List[str]:
+    """
+    Déverse sur disque les artefacts volumineux inutilisés de la session
+
+    Args:
+        tous (bool): Déverser tous les artefacts en mémoire, quels que soient taille et usage
+
+    Returns:
+        list: Noms des artefacts déversés
+    """
+    return _deverser_artefacts(st.session_state.get(_CLE_ARTEFACTS, {}), _identifiant_session(), tous)
+
+
+def balayer_artefacts() -> Dict[str, List[str]]:
+    """
+    Déverse les artefacts inutilisés de toutes les sessions du processus
+
+    Les sessions sans activité depuis EXPIRATION_SESSION secondes voient tous
+    leurs artefacts déversés, puis ne sont plus suivies.
+
+    Returns:
+        dict: {session: noms des artefacts déversés}
+    """
+    maintenant = time.monotonic()
+    with _verrou:
+        suivies = list(_artefacts_sessions.items())
+    deverses = {}
+    for session, suivi in suivies:
+        expiree = maintenant - suivi['_horloge'] > EXPIRATION_SESSION
+        noms = _deverser_artefacts(suivi['artefacts'], session, tous=expiree)
+        if noms:
+            deverses[session] = noms
+        if expiree:
+            with _verrou:
+                if _artefacts_sessions.get(session) is suivi:
+                    del _artefacts_sessions[session]
+    return deverses
+
+
+def _boucle_balayage() -> None:
+    while True:
+        time.sleep(INTERVALLE_BALAYAGE)
+        try:
+            balayer_artefacts()
+        except Exception:
+            pass  # Un balayage manqué est repris au suivant
+
+
+# Entretien et registre des sessions
+
+def entretenir_session(forcer_mesure: bool = False) -> None:
+    """
+    Borne l'empreinte mémoire de la session courante ; à appeler en fin d'exécution
+
+    Plafonne les historiques d'usage des tokens, signale l'activité de la
+    session au balayage des artefacts puis, au plus toutes les
+    INTERVALLE_MESURE secondes, mesure la session et l'inscrit au registre du
+    processus (déversant tous ses artefacts si elle dépasse PLAFOND_SESSION).
+
+    Args:
+        forcer_mesure (bool): Mesurer même si la dernière mesure est récente
+    """
+    from utils.token_utils import plafonner_historique_tokens
+
+    plafonner_historique_tokens()
+    if _CLE_ARTEFACTS in st.session_state:
+        _suivre_artefacts(st.session_state[_CLE_ARTEFACTS])
+
+    maintenant = time.monotonic()
+    if not forcer_mesure and maintenant - st.session_state.get(_CLE_DERNIERE_MESURE, -INTERVALLE_MESURE) < INTERVALLE_MESURE:
+        return
+    st.session_state[_CLE_DERNIERE_MESURE] = maintenant
+
+    tailles = mesurer_session()
+    if sum(tailles.values()) > PLAFOND_SESSION and deverser_artefacts(tous=True):
+        tailles = mesurer_session()
+
+    artefacts = st.session_state.get(_CLE_ARTEFACTS, {})
+    utilisateur, projet = st.session_state.get('_projet_restaure', (None, None))
+    with _verrou:
+        _registre[_identifiant_session()] = {
+            'session': _identifiant_session(),
+            'utilisateur': utilisateur,
+            'projet': projet,
+            'nom_entreprise': st.session_state.get('nom_entreprise', ''),
+            'total_octets': sum(tailles.values()),
+            'cles': list(tailles.items())[:5],
+            'artefacts_deverses': sum(1 for e in artefacts.values() if e['valeur'] is None),
+            'maj': datetime.now(),
+            '_horloge': maintenant
+        }
+        for session, entree in list(_registre.items()):
+            if maintenant - entree['_horloge'] > EXPIRATION_SESSION:
+                del _registre[session]
+
+
+def sessions_les_plus_lourdes(n: int = 10) -> List[Dict[str, Any]]:
+    """
+    Sessions actives du processus, de la plus lourde à la plus légère
+
+    Args:
+        n (int): Nombre de sessions renvoyées
+
+    Returns:
+        list: session, utilisateur, projet, nom_entreprise, total_octets,
+              cles (les 5 plus lourdes), artefacts_deverses, maj
+    """
+    with _verrou:
+        entrees = [{k: v for k, v in e.items() if not k.startswith('_')} for e in _registre.values()]
+    return sorted(entrees, key=lambda e: e['total_octets'], reverse=True)[:n]
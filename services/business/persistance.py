@@ -0,0 +1,626 @@
+"""
+Persistance du session state : sauvegarde automatique et restauration des projets
+
+Toutes les saisies vivent dans `st.session_state`, perdu au rafraîchissement du
+navigateur ou au redémarrage du serveur. Ce module les conserve dans un
+stockage durable, par utilisateur et par projet :
+
+- `restaurer_projet()`, en début d'exécution, recharge le projet de l'URL
+  (`?projet=...`) en une seule lecture, une fois par session ;
+- `planifier_sauvegarde()`, en fin d'exécution, ne fait que relever les
+  références des valeurs : la sérialisation et l'écriture ont lieu dans un
+  thread d'arrière-plan, après un délai sans nouvelle modification, et ne
+  portent que sur les clés dont le contenu a changé.
+
+Le stockage par défaut est une base SQLite locale (`MIXBPM_BASE_SESSIONS`,
+`.mixbpm/sessions.db` par défaut) ; tout objet respectant l'interface de
+`StockageSessions` peut le remplacer via `definir_stockage_sessions()`.
+`MIXBPM_SAUVEGARDE_AUTO=0` désactive la persistance.
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import sqlite3
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import date, datetime, time as heure
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CHEMIN_BASE_DEFAUT = Path(__file__).resolve().parents[2] / '.mixbpm' / 'sessions.db'
+
+# Délai sans modification avant l'écriture, et attente maximale sous saisie continue (secondes)
+DELAI_SAUVEGARDE = float(os.getenv('MIXBPM_DELAI_SAUVEGARDE', '2'))
+ATTENTE_MAXIMALE = 10 * DELAI_SAUVEGARDE
+
+# Marqueur des valeurs que JSON ne représente pas nativement
+_TYPE = '__mixbpm__'
+
+# Propriétaire des projets des sessions sans utilisateur identifié
+UTILISATEUR_ANONYME = 'local'
+
+# État d'un `st.data_editor`, qui ne peut pas être imposé via le session state
+_CLES_EDITEUR = {'edited_rows', 'added_rows', 'deleted_rows'}
+
+
+# Sérialisation
+
+def _encoder(valeur: Any) -> Any:
+    """Convertit une valeur du session state en structure JSON, types d'origine balisés"""
+    if valeur is None or isinstance(valeur, (str, bool, int, float)):
+        return valeur
+    if isinstance(valeur, dict):
+        if all(isinstance(cle, str) for cle in valeur) and _TYPE not in valeur:
+            return {cle: _encoder(v) for cle, v in valeur.items()}
+        # Clés non textuelles (mois, années...) : JSON les convertirait en chaînes
+        return {_TYPE: 'dict', 'valeur': [[_encoder(cle), _encoder(v)] for cle, v in valeur.items()]}
+    if isinstance(valeur, list):
+        return [_encoder(v) for v in valeur]
+    if isinstance(valeur, (tuple, set, frozenset)):
+        return {_TYPE: type(valeur).__name__, 'valeur': [_encoder(v) for v in valeur]}
+    if isinstance(valeur, datetime):
+        return {_TYPE: 'datetime', 'valeur': valeur.isoformat()}
+    if isinstance(valeur, date):
+        return {_TYPE: 'date', 'valeur': valeur.isoformat()}
+    if isinstance(valeur, heure):
+        return {_TYPE: 'time', 'valeur': valeur.isoformat()}
+    if isinstance(valeur, np.generic):
+        return _encoder(valeur.item())
+    if isinstance(valeur, np.ndarray):
+        return {_TYPE: 'ndarray', 'dtype': str(valeur.dtype), 'valeur': _encoder(valeur.tolist())}
+    if isinstance(valeur, (pd.DataFrame, pd.Series)):
+        return {
+            _TYPE: 'dataframe' if isinstance(valeur, pd.DataFrame) else 'series',
+            'valeur': json.loads(valeur.to_json(orient='split', date_format='iso'))
+        }
+    raise TypeError(f"type non sauvegardable : {type(valeur).__name__}")
+
+
+def _decoder(objet: Dict[str, Any]) -> Any:
+    """`object_hook` de `json.loads` : reconstruit les valeurs balisées par `_encoder`"""
+    nature = objet.get(_TYPE)
+    if nature is None:
+        return objet
+    valeur = objet['valeur']
+    if nature == 'dict':
+        return {(tuple(cle) if isinstance(cle, list) else cle): v for cle, v in valeur}
+    if nature in ('tuple', 'set', 'frozenset'):
+        return {'tuple': tuple, 'set': set, 'frozenset': frozenset}[nature](valeur)
+    if nature == 'datetime':
+        return datetime.fromisoformat(valeur)
+    if nature == 'date':
+        return date.fromisoformat(valeur)
+    if nature == 'time':
+        return heure.fromisoformat(valeur)
+    if nature == 'ndarray':
+        return np.array(valeur, dtype=objet['dtype'])
+    if nature == 'dataframe':
+        return pd.DataFrame(valeur['data'], index=valeur['index'], columns=valeur['columns'])
+    if nature == 'series':
+        return pd.Series(valeur['data'], index=valeur['index'], name=valeur.get('name'))
+    return objet
+
+
+def serialiser_valeur(valeur: Any) -> str:
+    """
+    Sérialise une valeur du session state
+
+    Args:
+        valeur: Valeur à sauvegarder
+
+    Returns:
+        str: Texte JSON
+
+    Raises:
+        TypeError: Si la valeur contient un objet non sauvegardable
+    """
+    return json.dumps(_encoder(valeur), ensure_ascii=False, separators=(',', ':'))
+
+
+def deserialiser_valeur(texte: str) -> Any:
+    """
+    Args:
+        texte (str): Texte produit par `serialiser_valeur`
+
+    Returns:
+        Valeur d'origine (dates, tuples, tableaux et clés numériques compris)
+    """
+    return json.loads(texte, object_hook=_decoder)
+
+
+# Stockages
+
+class StockageSessions:
+    """
+    Interface d'un stockage de sessions ; les valeurs sont des textes JSON
+
+    Les méthodes peuvent être appelées depuis le thread de sauvegarde comme
+    depuis celui des pages : une implémentation doit être sûre entre threads.
+    """
+
+    def charger(self, utilisateur: str, projet: str) -> Dict[str, str]:
+        """Toutes les valeurs d'un projet, {clé: texte JSON}"""
+        raise NotImplementedError
+
+    def enregistrer(self, utilisateur: str, projet: str, valeurs: Dict[str, str]) -> None:
+        """Écrit (ou remplace) les clés données, en une transaction"""
+        raise NotImplementedError
+
+    def lister_projets(self, utilisateur: str) -> List[Dict[str, Any]]:
+        """Projets de l'utilisateur, du plus récent au plus ancien : projet, nom_entreprise, modifie, n_cles"""
+        raise NotImplementedError
+
+    def supprimer_projet(self, utilisateur: str, projet: str) -> None:
+        raise NotImplementedError
+
+
+class StockageSQLite(StockageSessions):
+    """
+    Stockage SQLite local : une ligne par clé du session state
+
+    Args:
+        chemin (str or Path): Fichier de la base, créé au besoin
+    """
+
+    def __init__(self, chemin):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        with self._connexion() as connexion:
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("""
+                CREATE TABLE IF NOT EXISTS etat_session (
+                    utilisateur TEXT NOT NULL,
+                    projet TEXT NOT NULL,
+                    cle TEXT NOT NULL,
+                    valeur TEXT NOT NULL,
+                    modifie REAL NOT NULL,
+                    PRIMARY KEY (utilisateur, projet, cle)
+                ) WITHOUT ROWID
+            """)
+
+    @contextmanager
+    def _connexion(self) -> Iterator[sqlite3.Connection]:
+        # Une connexion par opération : utilisable depuis n'importe quel thread
+        connexion = sqlite3.connect(self.chemin, timeout=10)
+        try:
+            with connexion:  # Transaction validée, ou annulée en cas d'erreur
+                yield connexion
+        finally:
+            connexion.close()
+
+    def charger(self, utilisateur: str, projet: str) -> Dict[str, str]:
+        with self._connexion() as connexion:
+            lignes = connexion.execute(
+                "SELECT cle, valeur FROM etat_session WHERE utilisateur = ? AND projet = ?",
+                (utilisateur, projet)
+            ).fetchall()
+        return dict(lignes)
+
+    def enregistrer(self, utilisateur: str, projet: str, valeurs: Dict[str, str]) -> None:
+        if not valeurs:
+            return
+        maintenant = time.time()
+        with self._connexion() as connexion:
+            connexion.executemany(
+                """
+                INSERT INTO etat_session (utilisateur, projet, cle, valeur, modifie) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (utilisateur, projet, cle) DO UPDATE SET valeur = excluded.valeur, modifie = excluded.modifie
+                """,
+                [(utilisateur, projet, cle, texte, maintenant) for cle, texte in valeurs.items()]
+            )
+
+    def lister_projets(self, utilisateur: str) -> List[Dict[str, Any]]:
+        with self._connexion() as connexion:
+            lignes = connexion.execute(
+                """
+                SELECT projet, MAX(CASE WHEN cle = 'nom_entreprise' THEN valeur END), MAX(modifie), COUNT(*)
+                FROM etat_session WHERE utilisateur = ?
+                GROUP BY projet ORDER BY MAX(modifie) DESC
+                """,
+                (utilisateur,)
+            ).fetchall()
+        return [
+            {
+                'projet': projet,
+                'nom_entreprise': deserialiser_valeur(nom) if nom else '',
+                'modifie': datetime.fromtimestamp(modifie),
+                'n_cles': n_cles
+            }
+            for projet, nom, modifie, n_cles in lignes
+        ]
+
+    def supprimer_projet(self, utilisateur: str, projet: str) -> None:
+        with self._connexion() as connexion:
+            connexion.execute("DELETE FROM etat_session WHERE utilisateur = ? AND projet = ?", (utilisateur, projet))
+
+
+# Sauvegarde différée
+
+class SauvegardeAuto:
+    """
+    Écrit les instantanés du session state depuis un thread d'arrière-plan
+
+    Chaque projet en attente est écrit `delai` secondes après sa dernière
+    modification (au plus `attente_maximale` secondes après la première).
+    Seules les clés dont le texte JSON a changé depuis la dernière écriture
+    réussie sont envoyées au stockage.
+
+    Args:
+        stockage (StockageSessions): Stockage cible
+        delai (float): Délai sans modification avant l'écriture
+        attente_maximale (float): Attente maximale sous modifications continues
+    """
+
+    def __init__(self, stockage: StockageSessions, delai: float = DELAI_SAUVEGARDE,
+                 attente_maximale: float = ATTENTE_MAXIMALE):
+        self.stockage = stockage
+        self.delai = delai
+        self.attente_maximale = attente_maximale
+        self._condition = threading.Condition()
+        # (utilisateur, projet) -> (échéance, première demande, instantané)
+        self._en_attente: Dict[Tuple[str, str], Tuple[float, float, Dict[str, Any]]] = {}
+        self._empreintes: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._etats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._en_cours = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def planifier(self, utilisateur: str, projet: str, instantane: Dict[str, Any], immediat: bool = False) -> None:
+        """
+        Programme l'écriture d'un instantané, en remplaçant celui en attente pour le même projet
+
+        Args:
+            utilisateur (str): Identifiant de l'utilisateur
+            projet (str): Identifiant du projet
+            instantane (dict): {clé: valeur} ; les valeurs ne sont lues qu'au moment de l'écriture
+            immediat (bool): Écrire sans attendre le délai
+        """
+        maintenant = time.monotonic()
+        with self._condition:
+            _, premiere, _ = self._en_attente.get((utilisateur, projet), (None, maintenant, None))
+            echeance = maintenant if immediat else min(maintenant + self.delai, premiere + self.attente_maximale)
+            self._en_attente[(utilisateur, projet)] = (echeance, premiere, instantane)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._boucle, name="mixbpm-sauvegarde", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def memoriser(self, utilisateur: str, projet: str, valeurs: Dict[str, str]) -> None:
+        """Enregistre le contenu restauré comme déjà écrit : seules les modifications suivantes seront sauvegardées"""
+        with self._condition:
+            self._empreintes[(utilisateur, projet)] = {cle: hash(texte) for cle, texte in valeurs.items()}
+
+    def vider(self, delai_max: float = 5.0) -> bool:
+        """
+        Écrit immédiatement tous les instantanés en attente
+
+        Args:
+            delai_max (float): Attente maximale (secondes)
+
+        Returns:
+            bool: True si tout a été écrit dans le délai
+        """
+        limite = time.monotonic() + delai_max
+        with self._condition:
+            self._en_attente = {cle: (0.0, premiere, instantane)
+                                for cle, (_, premiere, instantane) in self._en_attente.items()}
+            self._condition.notify_all()
+            while self._en_attente or self._en_cours:
+                restant = limite - time.monotonic()
+                if restant <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._condition.wait(restant)
+        return True
+
+    def etat(self, utilisateur: str, projet: str) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: derniere_sauvegarde (datetime), cles_ecrites, cles_ignorees, erreur, en_attente
+        """
+        with self._condition:
+            return {
+                'derniere_sauvegarde': None, 'cles_ecrites': 0, 'cles_ignorees': [], 'erreur': None,
+                **self._etats.get((utilisateur, projet), {}),
+                'en_attente': (utilisateur, projet) in self._en_attente
+            }
+
+    def _boucle(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    maintenant = time.monotonic()
+                    echus = [cle for cle, (echeance, _, _) in self._en_attente.items() if echeance <= maintenant]
+                    if echus:
+                        break
+                    prochaine = min((e for e, _, _ in self._en_attente.values()), default=None)
+                    self._condition.wait(None if prochaine is None else prochaine - maintenant)
+                lot = [(cle, self._en_attente.pop(cle)[2]) for cle in echus]
+                self._en_cours += len(lot)
+
+            for (utilisateur, projet), instantane in lot:
+                try:
+                    self._ecrire(utilisateur, projet, instantane)
+                finally:
+                    with self._condition:
+                        self._en_cours -= 1
+                        self._condition.notify_all()
+
+    def _ecrire(self, utilisateur: str, projet: str, instantane: Dict[str, Any]) -> None:
+        cle_projet = (utilisateur, projet)
+        with self._condition:
+            empreintes = dict(self._empreintes.get(cle_projet, {}))
+
+        modifiees, nouvelles_empreintes, ignorees = {}, {}, []
+        for cle, valeur in instantane.items():
+            try:
+                texte = serialiser_valeur(valeur)
+            except TypeError:
+                ignorees.append(cle)
+                continue
+            except RuntimeError:
+                # Valeur modifiée pendant la lecture par une exécution en cours : nouvel essai
+                with self._condition:
+                    if cle_projet not in self._en_attente:
+                        self._en_attente[cle_projet] = (time.monotonic() + self.delai, time.monotonic(), instantane)
+                return
+            empreinte = hash(texte)
+            if empreintes.get(cle) != empreinte:
+                modifiees[cle] = texte
+                nouvelles_empreintes[cle] = empreinte
+
+        try:
+            self.stockage.enregistrer(utilisateur, projet, modifiees)
+        except Exception as e:
+            # Empreintes inchangées : les mêmes clés seront réécrites à la prochaine sauvegarde
+            with self._condition:
+                self._etats[cle_projet] = {**self._etats.get(cle_projet, {}), 'erreur': str(e)}
+            return
+
+        with self._condition:
+            self._empreintes.setdefault(cle_projet, {}).update(nouvelles_empreintes)
+            self._etats[cle_projet] = {
+                'derniere_sauvegarde': datetime.now(),
+                'cles_ecrites': len(modifiees),
+                'cles_ignorees': ignorees,
+                'erreur': None
+            }
+
+
+_verrou = threading.Lock()
+_stockage: Optional[StockageSessions] = None
+_sauvegarde: Optional[SauvegardeAuto] = None
+
+
+def persistance_active() -> bool:
+    """False si la persistance est désactivée (`MIXBPM_SAUVEGARDE_AUTO=0`)"""
+    return os.getenv('MIXBPM_SAUVEGARDE_AUTO', '1').lower() not in ('0', 'false', 'non')
+
+
+def definir_stockage_sessions(stockage: StockageSessions) -> None:
+    """
+    Remplace le stockage des sessions (base partagée, service distant...)
+
+    Args:
+        stockage (StockageSessions): Nouveau stockage ; les écritures en attente sont d'abord vidées
+    """
+    global _stockage, _sauvegarde
+    with _verrou:
+        if _sauvegarde is not None:
+            _sauvegarde.vider()
+        _stockage = stockage
+        _sauvegarde = SauvegardeAuto(stockage)
+
+
+def obtenir_stockage_sessions() -> StockageSessions:
+    """
+    Returns:
+        StockageSessions: Stockage courant (SQLite local par défaut)
+    """
+    _obtenir_sauvegarde()
+    return _stockage
+
+
+def _obtenir_sauvegarde() -> SauvegardeAuto:
+    global _stockage, _sauvegarde
+    with _verrou:
+        if _sauvegarde is None:
+            _stockage = StockageSQLite(os.getenv('MIXBPM_BASE_SESSIONS') or CHEMIN_BASE_DEFAUT)
+            _sauvegarde = SauvegardeAuto(_stockage)
+        return _sauvegarde
+
+
+@atexit.register
+def _vider_a_la_sortie() -> None:
+    if _sauvegarde is not None:
+        _sauvegarde.vider()
+
+
+# Intégration au session state
+
+def utilisateur_identifie() -> Optional[str]:
+    """
+    Utilisateur de la session, s'il est établi côté serveur
+
+    Returns:
+        str: Compte connecté (`st.user`) s'il existe, sinon `MIXBPM_UTILISATEUR`
+             (déploiement mono-utilisateur) ; None pour une session anonyme
+    """
+    try:
+        if st.user.is_logged_in:
+            return str(st.user.get('email') or st.user.get('sub'))
+    except Exception:
+        pass  # Authentification non configurée
+    return os.getenv('MIXBPM_UTILISATEUR') or None
+
+
+def identifier_utilisateur() -> str:
+    """
+    Identifie l'utilisateur de la session
+
+    Les sessions anonymes partagent `UTILISATEUR_ANONYME` : leurs projets ne
+    sont pas listés et ne se rouvrent que par leur lien (voir `lister_projets`).
+
+    Returns:
+        str: Utilisateur identifié (voir `utilisateur_identifie`) ou `UTILISATEUR_ANONYME`
+    """
+    return utilisateur_identifie() or UTILISATEUR_ANONYME
+
+
+def _nouveau_projet() -> str:
+    """Identifiant de projet impossible à deviner : le lien suffit à rouvrir le projet"""
+    return uuid.uuid4().hex
+
+
+def identifier_projet() -> Tuple[str, str]:
+    """
+    Identifie l'utilisateur et le projet de la session
+
+    Le projet est le paramètre d'URL `projet`, créé au besoin : il survit
+    ainsi au rafraîchissement de la page.
+
+    Returns:
+        tuple: (utilisateur, projet)
+    """
+    utilisateur = identifier_utilisateur()
+
+    projet = st.query_params.get('projet') or st.session_state.get('_projet_courant')
+    if not projet:
+        projet = _nouveau_projet()
+    if st.query_params.get('projet') != projet:
+        st.query_params['projet'] = projet
+    st.session_state['_projet_courant'] = projet
+    return utilisateur, str(projet)
+
+
+def _cles_sauvegardables() -> Dict[str, Any]:
+    """Références des valeurs à sauvegarder (aucune copie ni sérialisation)"""
+    instantane = {}
+    for cle in list(st.session_state.keys()):
+        if not isinstance(cle, str) or cle.startswith(('_', 'FormSubmitter')):
+            continue
+        try:
+            valeur = st.session_state[cle]
+        except KeyError:
+            continue
+        # Booléens : boutons ; None et listes vides : téléversements sans fichier.
+        # Aucune de ces valeurs ne peut être imposée à un widget, et les
+        # données des pages se trouvent dans leurs propres entrées.
+        if valeur is None or isinstance(valeur, bool) or (isinstance(valeur, list) and not valeur):
+            continue
+        if isinstance(valeur, dict) and _CLES_EDITEUR.issuperset(valeur) and valeur:
+            continue
+        instantane[cle] = valeur
+    return instantane
+
+
+def restaurer_projet() -> bool:
+    """
+    Recharge le projet de la session depuis le stockage, une fois par session et par projet
+
+    À appeler en début d'exécution, avant la création des widgets.
+
+    Returns:
+        bool: True si des données ont été restaurées
+    """
+    if not persistance_active():
+        return False
+    utilisateur, projet = identifier_projet()
+    if st.session_state.get('_projet_restaure') == (utilisateur, projet):
+        return False
+    st.session_state['_projet_restaure'] = (utilisateur, projet)
+
+    sauvegarde = _obtenir_sauvegarde()
+    try:
+        valeurs = sauvegarde.stockage.charger(utilisateur, projet)
+    except Exception as e:
+        st.warning(f"⚠️ Projet non restauré : {str(e)}")
+        return False
+
+    restaurees = {}
+    for cle, texte in valeurs.items():
+        try:
+            restaurees[cle] = deserialiser_valeur(texte)
+        except (ValueError, TypeError, KeyError):
+            continue
+    for cle, valeur in restaurees.items():
+        st.session_state[cle] = valeur
+    sauvegarde.memoriser(utilisateur, projet, valeurs)
+    return bool(restaurees)
+
+
+def planifier_sauvegarde(immediat: bool = False) -> None:
+    """
+    Programme la sauvegarde des modifications de la session, hors du chemin de rendu
+
+    Args:
+        immediat (bool): Écrire sans attendre le délai de regroupement
+    """
+    if not persistance_active() or '_projet_restaure' not in st.session_state:
+        return
+    utilisateur, projet = st.session_state['_projet_restaure']
+    _obtenir_sauvegarde().planifier(utilisateur, projet, _cles_sauvegardables(), immediat=immediat)
+
+
+def changer_projet(projet: Optional[str] = None) -> str:
+    """
+    Sauvegarde le projet courant puis bascule sur un autre (ou sur un nouveau projet vide)
+
+    À utiliser dans un callback (`on_click`, `on_change`) : la page est
+    réexécutée ensuite et `restaurer_projet()` charge le projet choisi.
+
+    Args:
+        projet (str, optional): Identifiant du projet ; un nouveau projet si absent
+
+    Returns:
+        str: Identifiant du projet désormais actif
+    """
+    if persistance_active() and '_projet_restaure' in st.session_state:
+        planifier_sauvegarde(immediat=True)
+        _obtenir_sauvegarde().vider()
+
+    projet = projet or _nouveau_projet()
+    for cle in list(st.session_state.keys()):
+        if isinstance(cle, str) and not cle.startswith('_'):
+            del st.session_state[cle]
+    st.session_state.pop('_projet_restaure', None)
+    st.session_state['_projet_courant'] = projet
+    st.query_params['projet'] = projet
+    return projet
+
+
+def lister_projets() -> List[Dict[str, Any]]:
+    """
+    Returns:
+        list: Projets sauvegardés de l'utilisateur courant (voir `StockageSessions.lister_projets`) ;
+              aucun pour une session anonyme, dont le propriétaire est commun à tous les visiteurs
+    """
+    if not persistance_active() or utilisateur_identifie() is None:
+        return []
+    if '_projet_restaure' in st.session_state:
+        utilisateur = st.session_state['_projet_restaure'][0]
+    else:
+        utilisateur = identifier_projet()[0]
+    try:
+        return _obtenir_sauvegarde().stockage.lister_projets(utilisateur)
+    except Exception:
+        return []
+
+
+def etat_sauvegarde() -> Dict[str, Any]:
+    """
+    Returns:
+        dict: Utilisateur, projet et état de la dernière sauvegarde de la session (voir `SauvegardeAuto.etat`)
+    """
+    if not persistance_active() or '_projet_restaure' not in st.session_state:
+        return {'active': False}
+    utilisateur, projet = st.session_state['_projet_restaure']
+    return {
+        'active': True, 'utilisateur': utilisateur, 'projet': projet,
+        **_obtenir_sauvegarde().etat(utilisateur, projet)
+    }
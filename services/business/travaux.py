@@ -0,0 +1,470 @@
+"""
+File de travaux en arrière-plan pour les générations longues
+
+Une génération exécutée dans le script Streamlit (sous `st.spinner`) est
+interrompue par la moindre interaction : clic, changement d'onglet, saisie.
+Les travaux soumis ici s'exécutent dans un pool de processus, indépendamment
+des réexécutions du script (`MIXBPM_TRAVAUX_PARALLELES` en parallèle, 2 par
+défaut) :
+
+- `soumettre_travail()` transmet au processus un instantané de la session
+  (clés publiques, comme la sauvegarde du projet) et les paramètres ; la
+  fonction du type de travail (`TYPES_TRAVAUX`) s'y exécute sans interface ;
+- l'état, la progression (`signaler_progression()`) et le résultat de chaque
+  travail sont écrits dans `MIXBPM_TRAVAUX` (`.mixbpm/travaux.db` par défaut) ;
+- `recuperer_travaux_termines()`, appelée par le panneau des travaux, reporte
+  dans la session qui les a soumis les clés de session produites par ses
+  travaux terminés et les tokens consommés ; la valeur retournée par le
+  travail est déposée comme artefact de la session quand son type en nomme un
+  (document Word), et reste disponible par `FileTravaux.resultat()`.
+
+L'utilisateur peut ainsi continuer à modifier ses données pendant qu'un plan
+est généré à partir de l'instantané pris à la soumission.
+"""
+
+import os
+import sys
+import uuid
+import types
+import pickle
+import sqlite3
+import importlib
+import threading
+import multiprocessing
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import streamlit as st
+
+CHEMIN_TRAVAUX_DEFAUT = Path(__file__).resolve().parents[2] / '.mixbpm' / 'travaux.db'
+TRAVAUX_PARALLELES = int(os.getenv('MIXBPM_TRAVAUX_PARALLELES', '2'))
+
+# Travaux terminés conservés dans la base (jours)
+CONSERVATION_JOURS = 7
+
+STATUTS_ACTIFS = ('en_attente', 'en_cours')
+
+# Types de travaux : fonction exécutée ('module:fonction'), clés de session
+# reportées dans la session à la fin du travail et, le cas échéant, artefact
+# de la session recevant la valeur retournée
+TYPES_TRAVAUX = {
+    'plan_complet': {
+        'libelle': "Business plan complet",
+        'fonction': 'ui.pages.generation_business_plan_complete:generate_complete_business_plan_origin_exact',
+        'cles_retour': ('plan_sections',)
+    },
+    'regeneration': {
+        'libelle': "Régénération de sections",
+        'fonction': 'services.ai.regeneration:regenerer_section',
+        'cles_retour': ('plan_sections',)
+    },
+    'suggestions': {
+        'libelle': "Suggestions du business model",
+        'fonction': 'ui.pages.business_model_initial:prefill_with_ai',
+        'cles_retour': ('business_model_initial',)
+    },
+    'export_word': {
+        'libelle': "Export Word du business plan",
+        'fonction': 'ui.pages.generation_business_plan_complete:generate_word_document_cyclique',
+        'cles_retour': (),
+        'artefact': 'document_word'
+    }
+}
+
+# Clés de session non transmises aux travaux : compteur de tokens (celui du
+# travail part de zéro, puis s'ajoute à celui de la session) et suivi des travaux
+_CLES_EXCLUES = {'token_usage', 'travaux_soumis'}
+_CLE_TRAVAUX = 'travaux_soumis'
+
+_verrou = threading.Lock()
+_verrou_principal = threading.Lock()
+_file: Optional['FileTravaux'] = None
+
+# Travail en cours dans ce processus de travail : (base, identifiant)
+_travail_courant: Optional[tuple] = None
+
+
+@contextmanager
+def _connexion(chemin: Path) -> Iterator[sqlite3.Connection]:
+    # Une connexion par opération : utilisable depuis n'importe quel thread ou processus
+    connexion = sqlite3.connect(chemin, timeout=10)
+    try:
+        with connexion:  # Transaction validée, ou annulée en cas d'erreur
+            yield connexion
+    finally:
+        connexion.close()
+
+
+def _mettre_a_jour(chemin: Path, identifiant: str, **champs: Any) -> None:
+    colonnes = ', '.join(f"{nom} = ?" for nom in champs)
+    with _connexion(chemin) as connexion:
+        connexion.execute(f"UPDATE travail SET {colonnes} WHERE id = ?", (*champs.values(), identifiant))
+
+
+def _maintenant() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _initialiser_processus() -> None:
+    """Processus de travail : pas d'interface, journaux de Streamlit limités aux erreurs"""
+    from streamlit.logger import set_log_level
+    set_log_level('error')
+
+
+@contextmanager
+def _module_principal_neutre() -> Iterator[None]:
+    """
+    Masque le script Streamlit le temps de lancer les processus du pool
+
+    « spawn » réexécute le module `__main__` du parent dans chaque processus ;
+    sous Streamlit c'est le script de l'application (connexion à l'API, pages).
+    """
+    with _verrou_principal:
+        principal = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = principal
+
+
+def _executer(chemin: str, identifiant: str, type_travail: str, parametres: Dict[str, Any],
+              etat: Dict[str, Any], utilisateur: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Exécute un travail dans un processus du pool, sur l'instantané de la session
+
+    Returns:
+        list: Traces des requêtes LLM du travail, intégrées à la télémétrie du
+              processus principal (`FileTravaux._surveiller`)
+    """
+    from services.ai.telemetrie import retenir_traces, traces_retenues
+
+    global _travail_courant
+    chemin = Path(chemin)
+    retenir_traces()
+    _travail_courant = (chemin, identifiant)
+    _mettre_a_jour(chemin, identifiant, statut='en_cours', debut=_maintenant(), message="Démarré")
+    try:
+        # Hors d'une session Streamlit, st.session_state est propre au processus
+        st.session_state.clear()
+        for cle, valeur in etat.items():
+            st.session_state[cle] = valeur
+        # Quotas imputés à l'auteur du travail (processus réutilisé : aucune identité héritée)
+        if utilisateur:
+            os.environ['MIXBPM_UTILISATEUR'] = utilisateur
+        else:
+            os.environ.pop('MIXBPM_UTILISATEUR', None)
+
+        definition = TYPES_TRAVAUX[type_travail]
+        module, nom = definition['fonction'].split(':')
+        valeur = getattr(importlib.import_module(module), nom)(**parametres)
+
+        resultat = {
+            'valeur': valeur,
+            'cles': {cle: st.session_state[cle] for cle in definition['cles_retour'] if cle in st.session_state},
+            'usage_tokens': st.session_state.get('token_usage')
+        }
+        _mettre_a_jour(chemin, identifiant, statut='termine', progression=1.0, message="Terminé",
+                       fin=_maintenant(), resultat=pickle.dumps(resultat))
+    except Exception as e:
+        _mettre_a_jour(chemin, identifiant, statut='erreur', erreur=f"{type(e).__name__}: {e}", fin=_maintenant())
+    finally:
+        _travail_courant = None
+    return traces_retenues()
+
+
+def signaler_progression(progression: float, message: str = "") -> None:
+    """
+    Enregistre l'avancement du travail en cours (sans effet hors d'un travail)
+
+    Args:
+        progression (float): Avancement entre 0 et 1
+        message (str): Étape en cours
+    """
+    if _travail_courant is None:
+        return
+    chemin, identifiant = _travail_courant
+    try:
+        _mettre_a_jour(chemin, identifiant, progression=max(0.0, min(1.0, progression)), message=message)
+    except sqlite3.Error:
+        pass  # Le suivi ne doit jamais faire échouer le travail
+
+
+class FileTravaux:
+    """
+    File des travaux : pool de processus et base SQLite de leur état
+
+    Args:
+        chemin (str or Path): Fichier de la base, créé au besoin
+        paralleles (int): Nombre de travaux exécutés simultanément
+    """
+
+    def __init__(self, chemin, paralleles: int = TRAVAUX_PARALLELES):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self.paralleles = max(1, paralleles)
+        self._verrou = threading.Lock()
+        self._executeur: Optional[ProcessPoolExecutor] = None
+        self._futurs: Dict[str, Future] = {}
+        with _connexion(self.chemin) as connexion:
+            connexion.execute("PRAGMA journal_mode=WAL")
+            connexion.execute("""
+                CREATE TABLE IF NOT EXISTS travail (
+                    id TEXT PRIMARY KEY,
+                    utilisateur TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    libelle TEXT NOT NULL,
+                    statut TEXT NOT NULL,
+                    progression REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    erreur TEXT,
+                    resultat BLOB,
+                    cree TEXT NOT NULL,
+                    debut TEXT,
+                    fin TEXT
+                )
+            """)
+            # Travaux d'un serveur précédent : leurs processus n'existent plus
+            connexion.execute(
+                "UPDATE travail SET statut = 'interrompu', fin = ? WHERE statut IN ('en_attente', 'en_cours')",
+                (_maintenant(),)
+            )
+            limite = (datetime.now() - timedelta(days=CONSERVATION_JOURS)).isoformat(timespec='seconds')
+            connexion.execute("DELETE FROM travail WHERE cree < ?", (limite,))
+
+    def _obtenir_executeur(self) -> ProcessPoolExecutor:
+        with self._verrou:
+            if self._executeur is None:
+                # « spawn » : processus neufs, sans l'état du serveur Streamlit
+                self._executeur = ProcessPoolExecutor(
+                    max_workers=self.paralleles,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_initialiser_processus
+                )
+            return self._executeur
+
+    def soumettre(self, type_travail: str, parametres: Dict[str, Any], etat: Dict[str, Any],
+                  utilisateur: Optional[str]) -> str:
+        """
+        Args:
+            type_travail (str): Clé de `TYPES_TRAVAUX`
+            parametres (dict): Arguments de la fonction du travail
+            etat (dict): Instantané de la session transmis au travail
+            utilisateur (str, optional): Auteur identifié du travail, None pour une session anonyme
+
+        Returns:
+            str: Identifiant du travail
+        """
+        from services.business.persistance import UTILISATEUR_ANONYME
+
+        identifiant = uuid.uuid4().hex[:12]
+        with _connexion(self.chemin) as connexion:
+            connexion.execute(
+                "INSERT INTO travail (id, utilisateur, type, libelle, statut, message, cree) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (identifiant, utilisateur or UTILISATEUR_ANONYME, type_travail, TYPES_TRAVAUX[type_travail]['libelle'],
+                 'en_attente', "En attente d'un processus", _maintenant())
+            )
+        executeur = self._obtenir_executeur()
+        with _module_principal_neutre():  # Les processus sont lancés à la soumission
+            futur = executeur.submit(
+                _executer, str(self.chemin), identifiant, type_travail, parametres, etat, utilisateur
+            )
+        with self._verrou:
+            self._futurs[identifiant] = futur
+        futur.add_done_callback(lambda f: self._surveiller(identifiant, f))
+        return identifiant
+
+    def _surveiller(self, identifiant: str, futur: Future) -> None:
+        """
+        Fin d'un travail : ses traces LLM rejoignent la télémétrie du processus
+        principal ; travail annulé ou processus perdu (arrêt brutal, arguments
+        non transmissibles) marqué comme tel
+        """
+        with self._verrou:
+            self._futurs.pop(identifiant, None)
+        if futur.cancelled():
+            erreur, statut = None, 'annule'
+        elif futur.exception() is not None:
+            erreur, statut = f"{type(futur.exception()).__name__}: {futur.exception()}", 'erreur'
+        else:
+            from services.ai.telemetrie import integrer_traces
+            integrer_traces(futur.result())
+            return
+        with _connexion(self.chemin) as connexion:
+            connexion.execute(
+                "UPDATE travail SET statut = ?, erreur = ?, fin = ? WHERE id = ? AND statut IN ('en_attente', 'en_cours')",
+                (statut, erreur, _maintenant(), identifiant)
+            )
+
+    def annuler(self, identifiant: str) -> bool:
+        """
+        Returns:
+            bool: True si le travail, pas encore démarré, est annulé
+        """
+        with self._verrou:
+            futur = self._futurs.get(identifiant)
+        return futur is not None and futur.cancel()
+
+    def travail(self, identifiant: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            dict: id, utilisateur, type, libelle, statut, progression, message,
+                  erreur, cree, debut et fin ; None si inconnu
+        """
+        travaux = self._lire("WHERE id = ?", (identifiant,))
+        return travaux[0] if travaux else None
+
+    def travaux(self, utilisateur: Optional[str] = None, limite: int = 20) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            list: Travaux les plus récents (d'un utilisateur, ou de tous)
+        """
+        if utilisateur is None:
+            return self._lire("ORDER BY cree DESC LIMIT ?", (limite,))
+        return self._lire("WHERE utilisateur = ? ORDER BY cree DESC LIMIT ?", (utilisateur, limite))
+
+    def _lire(self, condition: str, parametres: tuple) -> List[Dict[str, Any]]:
+        colonnes = ('id', 'utilisateur', 'type', 'libelle', 'statut', 'progression', 'message',
+                    'erreur', 'cree', 'debut', 'fin')
+        with _connexion(self.chemin) as connexion:
+            lignes = connexion.execute(f"SELECT {', '.join(colonnes)} FROM travail {condition}", parametres).fetchall()
+        return [dict(zip(colonnes, ligne)) for ligne in lignes]
+
+    def resultat(self, identifiant: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            dict: valeur retournée, clés de session produites et compteur de
+                  tokens du travail ; None si le travail n'est pas terminé
+        """
+        with _connexion(self.chemin) as connexion:
+            ligne = connexion.execute("SELECT resultat FROM travail WHERE id = ?", (identifiant,)).fetchone()
+        return pickle.loads(ligne[0]) if ligne and ligne[0] is not None else None
+
+    def fermer(self) -> None:
+        """Arrête le pool ; les travaux non démarrés sont annulés"""
+        with self._verrou:
+            executeur, self._executeur = self._executeur, None
+        if executeur is not None:
+            executeur.shutdown(wait=False, cancel_futures=True)
+
+
+def definir_file_travaux(file: FileTravaux) -> None:
+    """
+    Remplace la file du processus (autre base, autre nombre de processus...)
+
+    Args:
+        file (FileTravaux): Nouvelle file
+    """
+    global _file
+    with _verrou:
+        if _file is not None and _file is not file:
+            _file.fermer()
+        _file = file
+
+
+def obtenir_file_travaux() -> FileTravaux:
+    """
+    Returns:
+        FileTravaux: File courante (SQLite local par défaut)
+    """
+    global _file
+    with _verrou:
+        if _file is None:
+            _file = FileTravaux(os.getenv('MIXBPM_TRAVAUX') or CHEMIN_TRAVAUX_DEFAUT)
+        return _file
+
+
+def instantane_session() -> Dict[str, Any]:
+    """
+    Returns:
+        dict: Clés publiques de la session transmissibles à un processus de travail
+    """
+    etat = {}
+    for cle in list(st.session_state.keys()):
+        if not isinstance(cle, str) or cle.startswith(('_', 'FormSubmitter')) or cle in _CLES_EXCLUES:
+            continue
+        try:
+            valeur = st.session_state[cle]
+            pickle.dumps(valeur)
+        except Exception:
+            continue  # Widgets, fichiers téléversés... : propres à la session
+        etat[cle] = valeur
+    return etat
+
+
+def soumettre_travail(type_travail: str, **parametres: Any) -> Dict[str, Any]:
+    """
+    Soumet un travail exécuté en arrière-plan sur un instantané de la session
+
+    Args:
+        type_travail (str): Clé de `TYPES_TRAVAUX`
+        **parametres: Arguments de la fonction du travail
+
+    Returns:
+        dict: {'success': True, 'id': ...} ou {'success': False, 'error': ...}
+    """
+    from services.business.persistance import utilisateur_identifie
+
+    if type_travail not in TYPES_TRAVAUX:
+        return {'success': False, 'error': f"Type de travail inconnu : {type_travail}"}
+    try:
+        identifiant = obtenir_file_travaux().soumettre(
+            type_travail, parametres, instantane_session(), utilisateur_identifie()
+        )
+    except Exception as e:
+        return {'success': False, 'error': f"Soumission impossible : {e}"}
+    st.session_state.setdefault(_CLE_TRAVAUX, []).append(identifiant)
+    return {'success': True, 'id': identifiant}
+
+
+def travaux_session() -> List[Dict[str, Any]]:
+    """
+    Returns:
+        list: Travaux soumis par la session et pas encore récupérés, du plus ancien au plus récent
+    """
+    file = obtenir_file_travaux()
+    travaux = [file.travail(identifiant) for identifiant in st.session_state.get(_CLE_TRAVAUX, [])]
+    return [travail for travail in travaux if travail is not None]
+
+
+def travail_actif(type_travail: str) -> bool:
+    """True si la session a un travail de ce type en attente ou en cours"""
+    return any(travail['type'] == type_travail and travail['statut'] in STATUTS_ACTIFS
+               for travail in travaux_session())
+
+
+def recuperer_travaux_termines() -> List[Dict[str, Any]]:
+    """
+    Reporte dans la session les résultats de ses travaux terminés
+
+    Returns:
+        list: Travaux récupérés (terminés, en erreur, annulés ou interrompus)
+    """
+    from utils.token_utils import fusionner_usage_tokens
+    from services.business.memoire import deposer_artefact
+
+    file = obtenir_file_travaux()
+    identifiants = st.session_state.get(_CLE_TRAVAUX, [])
+    recuperes = []
+    for identifiant in list(identifiants):
+        travail = file.travail(identifiant)
+        if travail is not None and travail['statut'] in STATUTS_ACTIFS:
+            continue
+        identifiants.remove(identifiant)
+        if travail is None:
+            continue  # Purgé de la base
+        if travail['statut'] == 'termine':
+            resultat = file.resultat(identifiant) or {}
+            for cle, valeur in resultat.get('cles', {}).items():
+                st.session_state[cle] = valeur
+            if resultat.get('usage_tokens'):
+                fusionner_usage_tokens(resultat['usage_tokens'])
+            artefact = TYPES_TRAVAUX.get(travail['type'], {}).get('artefact')
+            if artefact and resultat.get('valeur') is not None:
+                deposer_artefact(artefact, resultat['valeur'])
+        recuperes.append(travail)
+    st.session_state[_CLE_TRAVAUX] = identifiants
+    return recuperes
@@ -12,6 +12,12 @@ from .generation import (
     generer_rapport_excel,
     consolider_donnees_financieres
 )
+from .tableaux_prompt import (
+    niveau_section,
+    serialiser_tableau,
+    serialiser_tableaux_financiers,
+    exports_financiers_session
+)
 
 __all__ = [
     'generer_docx_business_model',
@@ -21,5 +27,9 @@ __all__ = [
     'generer_markdown',
     'exporter_donnees_json',
     'generer_rapport_excel',
-    'consolider_donnees_financieres'
+    'consolider_donnees_financieres',
+    'niveau_section',
+    'serialiser_tableau',
+    'serialiser_tableaux_financiers',
+    'exports_financiers_session'
 ]
\ No newline at end of file
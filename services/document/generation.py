@@ -3,17 +3,17 @@ Service de génération et export de documents
 """
 
 import streamlit as st
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.enum.table import WD_TABLE_ALIGNMENT
 from io import BytesIO
 import pandas as pd
 from datetime import datetime, date
-from typing import Dict, List, Any
+from typing import Dict, List, Any, TYPE_CHECKING
 import re
 
-def generer_docx_business_model(nom_entreprise: str, date_creation: date, business_model: str, doc: Document, value: int = 1) -> Document:
+# python-docx n'est importé qu'au premier export Word
+if TYPE_CHECKING:
+    from docx.document import Document
+
+def generer_docx_business_model(nom_entreprise: str, date_creation: date, business_model: str, doc: "Document", value: int = 1) -> "Document":
     """
     Génère un document Word contenant le business model
     
@@ -27,6 +27,8 @@ def generer_docx_business_model(nom_entreprise: str, date_creation: date, busine
     Returns:
         Document: Document Word modifié
     """
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    
     if value == 1:  # Nouvelle page
         doc.add_page_break()
     
@@ -63,7 +65,7 @@ def generer_docx_business_model(nom_entreprise: str, date_creation: date, busine
     
     return doc
 
-def markdown_to_word_via_text(markdown_content: str, doc: Document) -> Document:
+def markdown_to_word_via_text(markdown_content: str, doc: "Document") -> "Document":
     """
     Convertit le contenu Markdown en document Word
     
@@ -144,7 +146,7 @@ def markdown_to_word_via_text(markdown_content: str, doc: Document) -> Document:
         
     return doc
 
-def add_table_with_borders(doc: Document, table_data: List[List[str]]):
+def add_table_with_borders(doc: "Document", table_data: List[List[str]]):
     """
     Ajoute un tableau au document Word avec bordures
     
@@ -171,7 +173,7 @@ def add_table_with_borders(doc: Document, table_data: List[List[str]]):
                     else:  # Texte normal
                         cell_content.add_run(part.strip())
 
-def ajouter_tableau_financier(doc: Document, donnees: Dict[str, Any], headers: List[str], titre: str):
+def ajouter_tableau_financier(doc: "Document", donnees: Dict[str, Any], headers: List[str], titre: str):
     """
     Ajoute un tableau financier au document Word
     
@@ -181,6 +183,9 @@ def ajouter_tableau_financier(doc: Document, donnees: Dict[str, Any], headers: L
         headers (list): En-têtes du tableau
         titre (str): Titre du tableau
     """
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    from docx.enum.table import WD_TABLE_ALIGNMENT
+    
     doc.add_heading(titre, level=2)
     
     if not donnees.get("table_data"):
@@ -364,6 +369,9 @@ def consolider_donnees_financieres() -> Dict[str, Any]:
         'budget_part2': st.session_state.get('export_data_budget_part2', {})
     }
     
+    # Devise de présentation choisie dans la page Trésorerie
+    devise_rapport = st.session_state.get('data', {}).get('devises', {}).get('devise_rapport', 'USD')
+    
     # Créer une synthèse financière
     synthese = f"""
     SYNTHÈSE FINANCIÈRE CONSOLIDÉE:
@@ -376,8 +384,9 @@ def consolider_donnees_financieres() -> Dict[str, Any]:
     
     Capacité d'Autofinancement: {donnees.get('capacite', {}).get('caf_net', 'Non calculé')}
     
-    Contexte RDC: Tous les montants sont exprimés en USD pour faciliter l'analyse économique et les comparaisons. 
-    L'environnement économique congolais nécessite une attention particulière aux fluctuations monétaires et aux défis logistiques.
+    Contexte RDC: Les montants sont saisis en USD ; les postes réglés en francs congolais (CDF) suivent le chemin de change USD/CDF
+    et les projections peuvent être présentées en {devise_rapport}. L'environnement économique congolais nécessite une attention
+    particulière aux fluctuations monétaires et aux défis logistiques.
     """
     
     return {
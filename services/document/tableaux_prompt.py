@@ -0,0 +1,228 @@
+"""
+Sérialisation compacte des tableaux financiers pour les prompts
+
+Les tableaux exportés (`export_data_*`) sont envoyés au modèle avec chaque
+section du business plan. Plutôt que des lignes `clé: valeur` indentées ou du
+markdown commenté, chaque tableau devient un bloc CSV minimal (séparateur
+`;`) : montants arrondis à l'unité, en-têtes courts (« A1 » pour « Année 1 »),
+séries brutes redondantes avec le tableau omises.
+
+Chaque section ne reçoit que les tableaux utiles à sa rédaction, selon des
+niveaux emboîtés (synthèse ⊂ opérationnel ⊂ complet) : la section marketing
+n'a pas besoin du tableau d'amortissements. Les tableaux sont ordonnés par
+niveau, si bien que le texte d'un niveau est le début de celui du niveau
+supérieur.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+# (suffixe de la clé `export_data_*`, titre, niveau minimal), dans l'ordre d'envoi
+TABLEAUX_PROMPT = [
+    ('compte_resultats_previsionnel', "Compte de résultat", 1),
+    ('seuil_rentabilite_economique', "Seuil de rentabilité", 1),
+    ('investissements', "Investissements et financements", 1),
+    ('salaires_charges_sociales', "Salaires et charges sociales", 2),
+    ('besoin_fonds_roulement', "Besoin en fonds de roulement", 2),
+    ('soldes_intermediaires_de_gestion', "Soldes intermédiaires de gestion", 3),
+    ('capacite_autofinancement', "Capacité d'autofinancement", 3),
+    ('detail_amortissements', "Amortissements", 3),
+    ('plan_financement_trois_ans', "Plan de financement", 3),
+    ('budget_previsionnel_tresorerie_part1', "Budget de trésorerie", 3),
+    ('budget_previsionnel_tresorerie_part2', "Budget de trésorerie (suite)", 3)
+]
+
+NIVEAUX = {'aucun': 0, 'synthese': 1, 'operationnel': 2, 'complet': 3}
+
+# Tableaux utiles à chaque section du plan (les autres sections reçoivent tout)
+NIVEAU_SECTIONS = {
+    'Couverture': 'aucun',
+    'Sommaire': 'aucun',
+    'Présentation de votre entreprise': 'synthese',
+    'Étude de marché': 'synthese',
+    'Produits et services': 'synthese',
+    'Stratégie commerciale et marketing': 'synthese',
+    'Équipe de direction': 'operationnel',
+    'Plan opérationnel': 'operationnel',
+    'Analyse financière': 'complet',
+    'Financement et investissements': 'complet',
+    'Annexes': 'complet'
+}
+
+SEPARATEUR = ';'
+
+_NOMBRE = re.compile(r'^\s*(-?)\$?\s*(\d[\d,\s]*(?:\.\d+)?)\s*(%?)\s*$')
+_ABREVIATIONS = [
+    (re.compile(r'^annee_(\d+)_mois_(\d+)$', re.IGNORECASE), r'A\1M\2'),
+    (re.compile(r'^ann[ée]e[ _](\d+)$', re.IGNORECASE), r'A\1'),
+    (re.compile(r'^mois[ _](\d+)$', re.IGNORECASE), r'M\1'),
+    (re.compile(r'\s*\((\$|USD|%)\)'), ''),
+    (re.compile(r'^(Description|Élément|Poste)$'), 'Poste'),
+    (re.compile(r'^Durée \(mois\)$'), 'Mois')
+]
+_CLES_IGNOREES = {'success', 'table_data'}
+
+
+def niveau_section(section_name: Optional[str]) -> str:
+    """
+    Args:
+        section_name (str): Nom de la section du plan (None : toutes les données)
+
+    Returns:
+        str: 'aucun', 'synthese', 'operationnel' ou 'complet'
+    """
+    return NIVEAU_SECTIONS.get(section_name, 'complet') if section_name else 'complet'
+
+
+def _nombre(valeur: float) -> str:
+    if abs(valeur) >= 100 or valeur == int(valeur):
+        return str(int(round(valeur)))
+    return f"{valeur:.2f}".rstrip('0').rstrip('.')
+
+
+def _valeur(valeur: Any) -> str:
+    """Valeur compacte : nombres arrondis, sans séparateur de milliers"""
+    if valeur is None:
+        return ''
+    if isinstance(valeur, bool):
+        return 'oui' if valeur else 'non'
+    if isinstance(valeur, (int, float)):
+        return _nombre(float(valeur))
+    if hasattr(valeur, 'item'):  # Scalaires numpy
+        return _valeur(valeur.item())
+    texte = str(valeur).strip()
+    correspondance = _NOMBRE.match(texte)
+    if correspondance:
+        signe, chiffres, pourcent = correspondance.groups()
+        try:
+            nombre = float(chiffres.replace(',', '').replace(' ', ''))
+        except ValueError:
+            return texte.replace(SEPARATEUR, ',')
+        return f"{signe if nombre else ''}{_nombre(nombre)}{pourcent}"
+    return texte.replace(SEPARATEUR, ',').replace('\n', ' ')
+
+
+def _entete(nom: Any) -> str:
+    texte = str(nom)
+    for motif, remplacement in _ABREVIATIONS:
+        texte = motif.sub(remplacement, texte)
+    return texte
+
+
+def _csv(lignes: List[Dict[str, Any]]) -> List[str]:
+    colonnes = list(dict.fromkeys(colonne for ligne in lignes for colonne in ligne))
+    return [SEPARATEUR.join(_entete(colonne) for colonne in colonnes)] + [
+        SEPARATEUR.join(_valeur(ligne.get(colonne)) for colonne in colonnes) for ligne in lignes
+    ]
+
+
+def _feuilles(valeur: Dict[str, Any], chemin: str = '') -> Dict[str, Any]:
+    """Aplatit un dictionnaire imbriqué : {'ressources.prets': 16500, ...}"""
+    feuilles = {}
+    for cle, sous_valeur in valeur.items():
+        nom = f"{chemin}.{cle}" if chemin else str(cle)
+        if isinstance(sous_valeur, dict):
+            feuilles.update(_feuilles(sous_valeur, nom))
+        elif not isinstance(sous_valeur, (list, tuple)):
+            feuilles[nom] = sous_valeur
+    return feuilles
+
+
+def _tableau_croise(valeurs: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Dictionnaire de dictionnaires (par année, par mois...) en tableau"""
+    feuilles = {cle: _feuilles(valeur) for cle, valeur in valeurs.items()}
+    postes = list(dict.fromkeys(poste for valeur in feuilles.values() for poste in valeur))
+    # Libellé le plus court qui reste sans ambiguïté
+    courts = [poste.rsplit('.', 1)[-1] for poste in postes]
+    libelles = {poste: court if courts.count(court) == 1 else poste for poste, court in zip(postes, courts)}
+    if len(valeurs) <= len(postes):
+        # Peu de périodes : une colonne par période
+        return [SEPARATEUR.join(['Poste'] + [_entete(cle) for cle in valeurs])] + [
+            SEPARATEUR.join([libelles[poste]] + [_valeur(feuilles[cle].get(poste)) for cle in valeurs])
+            for poste in postes
+        ]
+    # Nombreuses périodes (mois) : une ligne par période
+    return [SEPARATEUR.join(['Période'] + [libelles[poste] for poste in postes])] + [
+        SEPARATEUR.join([_entete(cle)] + [_valeur(feuilles[cle].get(poste)) for poste in postes])
+        for cle in valeurs
+    ]
+
+
+def serialiser_tableau(donnees: Any, titre: str) -> str:
+    """
+    Sérialise un tableau exporté en bloc CSV compact
+
+    Args:
+        donnees (Any): Données exportées (`table_data`, séries, dictionnaires par période...)
+        titre (str): Titre du bloc
+
+    Returns:
+        str: Bloc « ## titre » suivi des lignes, ou chaîne vide si rien à envoyer
+    """
+    if not donnees:
+        return ""
+    lignes: List[str] = []
+    scalaires: List[str] = []
+
+    if isinstance(donnees, list):
+        donnees = {'table_data': donnees}
+    if not isinstance(donnees, dict):
+        return f"## {titre}\n{_valeur(donnees)}\n"
+
+    table = donnees.get('table_data') or donnees.get('data')
+    if isinstance(table, list) and table and all(isinstance(ligne, dict) for ligne in table):
+        lignes += _csv(table)
+
+    for cle, valeur in donnees.items():
+        if cle in _CLES_IGNOREES or valeur is donnees.get('data'):
+            continue
+        if isinstance(valeur, dict) and valeur and all(isinstance(v, dict) for v in valeur.values()):
+            lignes += _tableau_croise(valeur)
+        elif isinstance(valeur, dict):
+            scalaires += [f"{nom}={_valeur(v)}" for nom, v in _feuilles(valeur).items()]
+        elif isinstance(valeur, (list, tuple)):
+            if lignes:
+                continue  # Série brute déjà présente dans le tableau
+            if valeur and all(isinstance(v, dict) for v in valeur):
+                lignes += _csv(list(valeur))
+            else:
+                scalaires.append(f"{cle}={','.join(_valeur(v) for v in valeur)}")
+        else:
+            scalaires.append(f"{cle}={_valeur(valeur)}")
+
+    if scalaires:
+        lignes.append(SEPARATEUR.join(scalaires))
+    if not lignes:
+        return ""
+    return f"## {titre}\n" + '\n'.join(lignes) + '\n'
+
+
+def serialiser_tableaux_financiers(exports: Dict[str, Any], section_name: Optional[str] = None) -> str:
+    """
+    Sérialise les tableaux utiles à une section, du niveau synthèse au niveau complet
+
+    Args:
+        exports (dict): Données par suffixe de clé `export_data_*` (voir `TABLEAUX_PROMPT`)
+        section_name (str, optional): Section du plan ; None pour tous les tableaux
+
+    Returns:
+        str: Blocs CSV (montants en USD), chaîne vide si la section n'en utilise aucun
+    """
+    niveau = NIVEAUX[niveau_section(section_name)]
+    blocs = [
+        serialiser_tableau(exports.get(cle), titre)
+        for cle, titre, niveau_minimal in TABLEAUX_PROMPT
+        if niveau_minimal <= niveau
+    ]
+    texte = '\n'.join(bloc for bloc in blocs if bloc)
+    return f"Montants en USD.\n{texte}" if texte else ""
+
+
+def exports_financiers_session() -> Dict[str, Any]:
+    """
+    Returns:
+        dict: Tableaux exportés du session state, par suffixe de clé `export_data_*`
+    """
+    return {cle: st.session_state.get(f'export_data_{cle}', {}) for cle, _, _ in TABLEAUX_PROMPT}
@@ -11,6 +11,49 @@ from .calculations import (
     generer_analyse_financiere,
     sauvegarder_donnees_financieres
 )
+from .projections import (
+    extraire_hypotheses,
+    extraire_hypotheses_pages,
+    lignes_devises_pages,
+    projeter_scenarios
+)
+from .indexation import (
+    INDICES,
+    lire_parametres_indexation,
+    matrice_taux_indexation,
+    indices_cumules,
+    indexer,
+    indexer_charges_annuelles
+)
+from .devises import (
+    DEVISES,
+    POSTES_DEVISE,
+    TAUX_CHANGE_DEFAUT,
+    construire_chemin_change,
+    convertir,
+    reporter_en_devise
+)
+from .simulation import (
+    tirer_scenarios,
+    simuler_monte_carlo
+)
+from .sensitivity import (
+    construire_scenarios_sensibilite,
+    analyser_sensibilite
+)
+from .solver import (
+    VARIABLES_OBJECTIF,
+    INDICATEURS_OBJECTIF,
+    resoudre_objectif
+)
+from .portfolio import (
+    INDICATEURS_PORTEFEUILLE,
+    creer_instantane,
+    charger_instantanes,
+    construire_portefeuille,
+    calculer_etats_portefeuille,
+    analyser_portefeuille
+)
 
 __all__ = [
     'calculer_tableaux_financiers',
@@ -19,5 +62,34 @@ __all__ = [
     'calculer_amortissements_annuels',
     'calculer_soldes_intermediaires',
     'generer_analyse_financiere',
-    'sauvegarder_donnees_financieres'
+    'sauvegarder_donnees_financieres',
+    'extraire_hypotheses',
+    'extraire_hypotheses_pages',
+    'lignes_devises_pages',
+    'projeter_scenarios',
+    'INDICES',
+    'lire_parametres_indexation',
+    'matrice_taux_indexation',
+    'indices_cumules',
+    'indexer',
+    'indexer_charges_annuelles',
+    'DEVISES',
+    'POSTES_DEVISE',
+    'TAUX_CHANGE_DEFAUT',
+    'construire_chemin_change',
+    'convertir',
+    'reporter_en_devise',
+    'tirer_scenarios',
+    'simuler_monte_carlo',
+    'construire_scenarios_sensibilite',
+    'analyser_sensibilite',
+    'VARIABLES_OBJECTIF',
+    'INDICATEURS_OBJECTIF',
+    'resoudre_objectif',
+    'INDICATEURS_PORTEFEUILLE',
+    'creer_instantane',
+    'charger_instantanes',
+    'construire_portefeuille',
+    'calculer_etats_portefeuille',
+    'analyser_portefeuille'
 ]
\ No newline at end of file
@@ -8,7 +8,17 @@ import numpy as np
 from typing import Dict, List, Any, Tuple
 from datetime import datetime, date
 from utils.financial_utils import *
+from utils.profilage_execution import tracer
+from .indexation import (
+    INDEXATION_CHARGES_FIXES,
+    lire_parametres_indexation,
+    matrice_taux_indexation,
+    indice_de_charge,
+    regrouper_par_indice,
+    indexer
+)
 
+@tracer('calcul')
 def calculer_tableaux_financiers() -> Dict[str, Any]:
     """
     Calcule tous les tableaux financiers basés sur les données du session state
@@ -25,7 +35,8 @@ def calculer_tableaux_financiers() -> Dict[str, Any]:
         'ca_previsions': st.session_state.get('ca_previsions', {}),
         'charges_variables': st.session_state.get('charges_variables', {}),
         'salaires': st.session_state.get('salaires', {}),
-        'financements': st.session_state.get('financements', {})
+        'financements': st.session_state.get('financements', {}),
+        'indexation': st.session_state.get('data', {}).get('indexation', {})
     }
     
     # Calcul des différents tableaux (utilisant les fonctions 5 ans existantes)
@@ -40,6 +51,7 @@ def calculer_tableaux_financiers() -> Dict[str, Any]:
     
     return resultats
 
+@tracer('calcul')
 def calculer_tableau_investissements(investissements: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Calcule le tableau des investissements et financements
@@ -94,6 +106,47 @@ def calculer_tableau_investissements(investissements: List[Dict[str, Any]]) -> D
         "financement_necessaire": total_financement - total_investissement
     }
 
+@tracer('calcul')
+def calculer_bases_indexees(donnees: Dict[str, Any], n_annees: int = 5) -> Dict[str, Any]:
+    """
+    Regroupe les charges fixes et la masse salariale chargée par indice suivi,
+    aux prix de l'année 1
+    
+    Args:
+        donnees (dict): Données financières de base (clé `indexation` optionnelle)
+        n_annees (int): Nombre d'années
+    
+    Returns:
+        dict: Montants par indice (I, n_annees) des charges fixes et des salaires,
+        taux d'indexation (I, n_annees) et paramètres complets
+    """
+    parametres = lire_parametres_indexation(donnees.get('indexation'))
+    
+    # Charges fixes mensuelles par catégorie, ramenées à l'année
+    charges_fixes_data = donnees.get('charges_fixes', {})
+    categories = list(INDEXATION_CHARGES_FIXES)
+    montants = np.array([float(charges_fixes_data.get(categorie, 0)) * 12 for categorie in categories])
+    charges_fixes = regrouper_par_indice(
+        np.repeat(montants[:, None], n_annees, axis=1),
+        [indice_de_charge(categorie, parametres) for categorie in categories]
+    )
+    
+    # Masse salariale chargée (jusqu'à 5 postes)
+    salaires_data = donnees.get('salaires', {})
+    masse_salariale = sum(float(salaires_data.get(f'salaire_poste_{i}', 0)) * 12 for i in range(1, 6))
+    salaires = regrouper_par_indice(
+        np.full((1, n_annees), masse_salariale * (1 + parametres['taux_charges_sociales'] / 100)),
+        ['salaires']
+    )
+    
+    return {
+        'charges_fixes': charges_fixes,
+        'salaires': salaires,
+        'taux': matrice_taux_indexation(parametres, n_annees),
+        'parametres': parametres
+    }
+
+@tracer('calcul')
 def calculer_compte_resultats(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le compte de résultats prévisionnel sur 3 ans
@@ -144,26 +197,9 @@ def calculer_compte_resultats(donnees: Dict[str, Any]) -> Dict[str, Any]:
         "Année 3": f"{marge_brute[2]:,.2f}"
     })
     
-    # Charges fixes
-    charges_fixes_data = donnees.get('charges_fixes', {})
-    charges_fixes_base = sum([
-        float(charges_fixes_data.get('loyer', 0)),
-        float(charges_fixes_data.get('electricite', 0)),
-        float(charges_fixes_data.get('eau', 0)),
-        float(charges_fixes_data.get('telephone', 0)),
-        float(charges_fixes_data.get('assurance', 0)),
-        float(charges_fixes_data.get('transport', 0)),
-        float(charges_fixes_data.get('marketing', 0)),
-        float(charges_fixes_data.get('autres_charges', 0))
-    ]) * 12  # Mensuel vers annuel
-    
-    # Croissance des charges fixes (inflation estimée)
-    croissance_cf = 1.05  # 5% par an
-    charges_fixes_annees = [
-        charges_fixes_base,
-        charges_fixes_base * croissance_cf,
-        charges_fixes_base * (croissance_cf ** 2)
-    ]
+    # Charges fixes et salaires indexés
+    bases = calculer_bases_indexees(donnees, 3)
+    charges_fixes_annees = indexer(bases['charges_fixes'], bases['taux']).tolist()
     
     table_data.append({
         "Description": "Charges fixes",
@@ -173,21 +209,7 @@ def calculer_compte_resultats(donnees: Dict[str, Any]) -> Dict[str, Any]:
     })
     
     # Salaires et charges sociales
-    salaires_data = donnees.get('salaires', {})
-    masse_salariale_base = sum([
-        float(salaires_data.get(f'salaire_poste_{i}', 0)) * 12
-        for i in range(1, 6)  # Jusqu'à 5 postes
-    ])
-    
-    # Charges sociales (environ 15% en RDC)
-    taux_charges_sociales = 0.15
-    charges_sociales_base = masse_salariale_base * taux_charges_sociales
-    
-    total_salaires_charges = [
-        masse_salariale_base + charges_sociales_base,
-        (masse_salariale_base + charges_sociales_base) * 1.08,  # 8% d'augmentation
-        (masse_salariale_base + charges_sociales_base) * (1.08 ** 2)
-    ]
+    total_salaires_charges = indexer(bases['salaires'], bases['taux']).tolist()
     
     table_data.append({
         "Description": "Salaires et charges sociales",
@@ -246,9 +268,33 @@ def calculer_compte_resultats(donnees: Dict[str, Any]) -> Dict[str, Any]:
         "ca_annees": ca_annees,
         "resultat_net": resultat_net,
         "resultat_avant_impot": resultat_avant_impot,
-        "marge_brute": marge_brute
+        "marge_brute": marge_brute,
+        "total_salaires_charges": total_salaires_charges
     }
 
+@tracer('calcul')
+def calculer_plans_amortissement_investissements(investissements: List[Dict[str, Any]], n_annees: int = None) -> Dict[str, Any]:
+    """
+    Calcule les plans d'amortissement de la liste des investissements
+    
+    Args:
+        investissements (list): Liste des investissements (montant, duree_amortissement,
+            methode_amortissement et mois_mise_en_service optionnels)
+        n_annees (int, optional): Horizon en années (défaut : plan complet)
+    
+    Returns:
+        dict: Matrices actif × année (voir `calculer_plans_amortissement`)
+    """
+    actifs = [inv for inv in investissements if int(inv.get('duree_amortissement', 5)) > 0]
+    return calculer_plans_amortissement(
+        [float(inv.get('montant', 0)) for inv in actifs],
+        [int(inv.get('duree_amortissement', 5)) for inv in actifs],
+        [inv.get('methode_amortissement', 'lineaire') for inv in actifs],
+        [int(inv.get('mois_mise_en_service', 1)) for inv in actifs],
+        n_annees
+    )
+
+@tracer('calcul')
 def calculer_amortissements_annuels(investissements: List[Dict[str, Any]]) -> List[float]:
     """
     Calcule les amortissements annuels sur 3 ans
@@ -259,21 +305,9 @@ def calculer_amortissements_annuels(investissements: List[Dict[str, Any]]) -> Li
     Returns:
         list: Amortissements pour les 3 années
     """
-    amortissements_annuels = [0, 0, 0]
-    
-    for inv in investissements:
-        montant = float(inv.get('montant', 0))
-        duree_amort = int(inv.get('duree_amortissement', 5))
-        
-        if duree_amort > 0:
-            amortissement_annuel = montant / duree_amort
-            
-            # Répartir sur les 3 années si applicable
-            for annee in range(min(3, duree_amort)):
-                amortissements_annuels[annee] += amortissement_annuel
-    
-    return amortissements_annuels
+    return calculer_plans_amortissement_investissements(investissements, 3)['total_par_annee'].tolist()
 
+@tracer('calcul')
 def calculer_soldes_intermediaires(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule les soldes intermédiaires de gestion
@@ -303,10 +337,7 @@ def calculer_soldes_intermediaires(donnees: Dict[str, Any]) -> Dict[str, Any]:
     
     # EBE (Excédent Brut d'Exploitation)
     # EBE = Valeur ajoutée - Charges de personnel - Impôts et taxes
-    charges_personnel = [
-        float(st.session_state.get('salaires', {}).get(f'salaire_poste_{i}', 0)) * 12 * 1.15
-        for i in range(3)
-    ]
+    charges_personnel = compte_resultats['total_salaires_charges']
     
     ebe = [va - cp for va, cp in zip(marge_brute, charges_personnel)]
     
@@ -432,6 +463,7 @@ def sauvegarder_donnees_financieres():
         st.error(f"Erreur lors de la sauvegarde des données financières : {str(e)}")
         return False
 
+@tracer('calcul')
 def calculer_tableaux_financiers_5_ans() -> Dict[str, Any]:
     """
     Calcule tous les tableaux financiers basés sur les données du session state sur 5 ans
@@ -448,7 +480,8 @@ def calculer_tableaux_financiers_5_ans() -> Dict[str, Any]:
         'ca_previsions': st.session_state.get('ca_previsions', {}),
         'charges_variables': st.session_state.get('charges_variables', {}),
         'salaires': st.session_state.get('salaires', {}),
-        'financements': st.session_state.get('financements', {})
+        'financements': st.session_state.get('financements', {}),
+        'indexation': st.session_state.get('data', {}).get('indexation', {})
     }
     
     # Calcul des différents tableaux sur 5 ans
@@ -461,6 +494,7 @@ def calculer_tableaux_financiers_5_ans() -> Dict[str, Any]:
     
     return resultats
 
+@tracer('calcul')
 def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le compte de résultats prévisionnel sur 5 ans
@@ -481,12 +515,13 @@ def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         float(ca_data.get('ca_annee_3', 0))
     ]
     
-    # Estimation de la croissance pour les années 4 et 5
+    # Estimation de la croissance pour les années 4 et 5 (plafond paramétrable)
+    parametres = lire_parametres_indexation(donnees.get('indexation'))
     if len(ca_base) >= 3 and ca_base[1] > 0 and ca_base[2] > 0:
         taux_croissance = ((ca_base[2] / ca_base[1]) + (ca_base[1] / ca_base[0]) if ca_base[0] > 0 else 1) / 2
-        taux_croissance = max(1.0, min(taux_croissance, 1.15))  # Entre 0% et 15%
+        taux_croissance = max(1.0, min(taux_croissance, 1 + parametres['plafond_croissance_ca'] / 100))
     else:
-        taux_croissance = 1.05  # 5% par défaut
+        taux_croissance = 1 + parametres['croissance_ca_defaut'] / 100
     
     ca_annees = ca_base + [
         ca_base[2] * taux_croissance,
@@ -529,23 +564,9 @@ def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         "Année 5": f"{marge_brute[4]:,.2f}"
     })
     
-    # Charges fixes avec croissance sur 5 ans
-    charges_fixes_data = donnees.get('charges_fixes', {})
-    charges_fixes_base = sum([
-        float(charges_fixes_data.get('loyer', 0)),
-        float(charges_fixes_data.get('electricite', 0)),
-        float(charges_fixes_data.get('eau', 0)),
-        float(charges_fixes_data.get('telephone', 0)),
-        float(charges_fixes_data.get('assurance', 0)),
-        float(charges_fixes_data.get('transport', 0)),
-        float(charges_fixes_data.get('marketing', 0)),
-        float(charges_fixes_data.get('autres_charges', 0))
-    ]) * 12
-    
-    croissance_cf = 1.05  # 5% par an
-    charges_fixes_annees = [
-        charges_fixes_base * (croissance_cf ** i) for i in range(5)
-    ]
+    # Charges fixes indexées sur 5 ans
+    bases = calculer_bases_indexees(donnees, 5)
+    charges_fixes_annees = indexer(bases['charges_fixes'], bases['taux']).tolist()
     
     table_data.append({
         "Description": "Charges fixes",
@@ -556,19 +577,8 @@ def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         "Année 5": f"{charges_fixes_annees[4]:,.2f}"
     })
     
-    # Salaires et charges sociales sur 5 ans
-    salaires_data = donnees.get('salaires', {})
-    masse_salariale_base = sum([
-        float(salaires_data.get(f'salaire_poste_{i}', 0)) * 12
-        for i in range(1, 6)
-    ])
-    
-    taux_charges_sociales = 0.15
-    charges_sociales_base = masse_salariale_base * taux_charges_sociales
-    
-    total_salaires_charges = [
-        (masse_salariale_base + charges_sociales_base) * (1.08 ** i) for i in range(5)
-    ]
+    # Salaires et charges sociales indexés sur 5 ans
+    total_salaires_charges = indexer(bases['salaires'], bases['taux']).tolist()
     
     table_data.append({
         "Description": "Salaires et charges sociales",
@@ -591,10 +601,23 @@ def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         "Année 5": f"{amortissements[4]:,.2f}"
     })
     
+    # Charges financières : intérêts des emprunts (échéancier commun)
+    echeancier = calculer_echeancier_financements(donnees.get('financements', {}))
+    charges_financieres = totaliser_par_annee(echeancier['interets'], 5).sum(axis=0).tolist()
+    
+    table_data.append({
+        "Description": "Charges financières",
+        "Année 1": f"{charges_financieres[0]:,.2f}",
+        "Année 2": f"{charges_financieres[1]:,.2f}",
+        "Année 3": f"{charges_financieres[2]:,.2f}",
+        "Année 4": f"{charges_financieres[3]:,.2f}",
+        "Année 5": f"{charges_financieres[4]:,.2f}"
+    })
+    
     # Résultat avant impôt
     resultat_avant_impot = [
-        mb - cf - sc - amort 
-        for mb, cf, sc, amort in zip(marge_brute, charges_fixes_annees, total_salaires_charges, amortissements)
+        mb - cf - sc - amort - cfin
+        for mb, cf, sc, amort, cfin in zip(marge_brute, charges_fixes_annees, total_salaires_charges, amortissements, charges_financieres)
     ]
     
     table_data.append({
@@ -639,11 +662,13 @@ def calculer_compte_resultats_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         'charges_fixes_annees': charges_fixes_annees,
         'total_salaires_charges': total_salaires_charges,
         'amortissements': amortissements,
+        'charges_financieres': charges_financieres,
         'resultat_avant_impot': resultat_avant_impot,
         'impots': impots,
         'resultat_net': resultat_net
     }
 
+@tracer('calcul')
 def calculer_amortissements_5_ans(investissements: List[Dict[str, Any]]) -> List[float]:
     """
     Calcule les amortissements annuels sur 5 ans
@@ -654,20 +679,9 @@ def calculer_amortissements_5_ans(investissements: List[Dict[str, Any]]) -> List
     Returns:
         list: Amortissements pour chaque année sur 5 ans
     """
-    amortissements_annuels = [0.0] * 5
-    
-    for inv in investissements:
-        montant = float(inv.get('montant', 0))
-        duree = int(inv.get('duree_amortissement', 5))
-        
-        amortissement_annuel = montant / duree
-        
-        # Répartir sur la durée d'amortissement
-        for annee in range(min(duree, 5)):
-            amortissements_annuels[annee] += amortissement_annuel
-    
-    return amortissements_annuels
+    return calculer_plans_amortissement_investissements(investissements, 5)['total_par_annee'].tolist()
 
+@tracer('calcul')
 def calculer_soldes_intermediaires_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule les soldes intermédiaires de gestion sur 5 ans
@@ -743,6 +757,7 @@ def calculer_soldes_intermediaires_5_ans(donnees: Dict[str, Any]) -> Dict[str, A
         'resultat_net': resultat_net
     }
 
+@tracer('calcul')
 def calculer_tableau_caf_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule la capacité d'autofinancement sur 5 ans
@@ -760,14 +775,9 @@ def calculer_tableau_caf_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     # CAF = Résultat net + Amortissements
     caf = [rn + amort for rn, amort in zip(resultat_net, amortissements)]
     
-    # Remboursements d'emprunts (estimation)
-    financements = donnees.get('financements', {})
-    emprunts = float(financements.get('emprunts_bancaires', 0))
-    duree_emprunt = int(financements.get('duree_emprunt', 5))
-    remboursement_annuel = emprunts / duree_emprunt if duree_emprunt > 0 else 0
-    
-    remboursements = [remboursement_annuel] * min(duree_emprunt, 5)
-    remboursements.extend([0] * (5 - len(remboursements)))
+    # Remboursements du capital des emprunts (échéancier commun)
+    echeancier = calculer_echeancier_financements(donnees.get('financements', {}))
+    remboursements = totaliser_par_annee(echeancier['principal'], 5).sum(axis=0).tolist()
     
     # Autofinancement net
     autofinancement_net = [c - r for c, r in zip(caf, remboursements)]
@@ -826,6 +836,7 @@ def calculer_tableau_caf_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         'autofinancement_net': autofinancement_net
     }
 
+@tracer('calcul')
 def calculer_tableau_seuil_rentabilite_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le seuil de rentabilité sur 5 ans
@@ -914,6 +925,7 @@ def calculer_tableau_seuil_rentabilite_5_ans(donnees: Dict[str, Any]) -> Dict[st
         'point_mort_jours': point_mort_jours
     }
 
+@tracer('calcul')
 def calculer_tableau_bfr_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le besoin en fonds de roulement sur 5 ans
@@ -986,6 +998,7 @@ def calculer_tableau_bfr_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         'dettes_fournisseurs': dettes_fournisseurs
     }
 
+@tracer('calcul')
 def calculer_plan_financement_cinq_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le plan de financement sur 5 ans
@@ -1131,97 +1144,77 @@ def calculer_plan_financement_cinq_ans(donnees: Dict[str, Any]) -> Dict[str, Any
         'tresorerie_cumulee': tresorerie_cumulee
     }
 
+@tracer('calcul')
 def calculer_plan_financement_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le plan de financement sur 5 ans
+    
+    Args:
+        donnees (dict): Données financières
+    
+    Returns:
+        dict: Plan de financement par année et résumé
     """
     try:
         # Données de financement
-        financement = donnees.get('financement', {})
-        apport_personnel = financement.get('apport_personnel', 0)
-        
-        # Prêts
-        prets = []
-        for i in range(1, 4):
-            pret = financement.get(f'pret_{i}', {})
-            if pret.get('montant', 0) > 0:
-                prets.append(pret)
+        financements = donnees.get('financements', donnees.get('financement', {}))
+        apport_personnel = float(financements.get('apport_personnel', financements.get('Apport personnel ou familial', 0)))
+        subventions = float(financements.get('subventions', sum(
+            float(financements.get(f'Subvention {i}', {}).get('montant', 0)) for i in range(1, 3)
+        )))
         
-        # Subventions
-        subventions = []
-        for i in range(1, 3):
-            subv = financement.get(f'subvention_{i}', {})
-            if subv.get('montant', 0) > 0:
-                subventions.append(subv)
+        # Prêts et remboursements du capital (échéancier commun)
+        echeancier = calculer_echeancier_financements(financements)
+        total_prets = float(echeancier['prets']['montants'].sum())
+        remboursements_annuels = totaliser_par_annee(echeancier['principal'], 5).sum(axis=0)
         
         # Besoins
-        besoins_demarrage = donnees.get('besoins_demarrage', {})
-        total_besoins = sum(besoins_demarrage.values())
-        
-        # Calcul CAF (capacité d'autofinancement)
-        caf_data = calculer_tableau_caf_5_ans(donnees)
-        caf_annuelle = {}
-        if caf_data.get('success'):
-            for annee in ['annee_1', 'annee_2', 'annee_3', 'annee_4', 'annee_5']:
-                caf_annuelle[annee] = caf_data['tableau'][annee]['caf']
+        investissements = donnees.get('investissements', [])
+        if investissements:
+            total_besoins = sum(float(inv.get('montant', 0)) for inv in investissements)
+        else:
+            besoins_demarrage = donnees.get('besoins_demarrage', {})
+            total_besoins = sum(v for v in besoins_demarrage.values() if isinstance(v, (int, float)))
         
-        # Calcul BFR
-        bfr_data = calculer_tableau_bfr_5_ans(donnees)
-        variation_bfr = {}
-        if bfr_data.get('success'):
-            for annee in ['annee_1', 'annee_2', 'annee_3', 'annee_4', 'annee_5']:
-                variation_bfr[annee] = bfr_data['tableau'][annee]['variation_bfr']
+        # CAF et variation du BFR
+        caf_annuelle = calculer_tableau_caf_5_ans(donnees)['caf']
+        bfr = calculer_tableau_bfr_5_ans(donnees)['bfr']
+        variation_bfr = [bfr[0]] + [bfr[i] - bfr[i-1] for i in range(1, 5)]
         
         plan_financement = {}
+        solde_cumule = 0.0
         
         for i, annee in enumerate(['annee_1', 'annee_2', 'annee_3', 'annee_4', 'annee_5']):
             # Ressources
-            ressources = 0
+            ressources = caf_annuelle[i]
             if i == 0:  # Première année
-                ressources += apport_personnel
-                ressources += sum(pret.get('montant', 0) for pret in prets)
-                ressources += sum(subv.get('montant', 0) for subv in subventions)
-            
-            ressources += caf_annuelle.get(annee, 0)
+                ressources += apport_personnel + total_prets + subventions
             
             # Emplois
-            emplois = 0
+            emplois = variation_bfr[i] + float(remboursements_annuels[i])
             if i == 0:  # Première année
                 emplois += total_besoins
             
-            emplois += variation_bfr.get(annee, 0)
-            
-            # Remboursements de prêts
-            remboursements = 0
-            for pret in prets:
-                duree_mois = pret.get('duree_mois', 60)
-                if duree_mois > i * 12:  # Le prêt est encore en cours
-                    montant_pret = pret.get('montant', 0)
-                    taux = pret.get('taux', 5)
-                    details_pret = calculer_pret_interet_fixe(montant_pret, taux, duree_mois)
-                    remboursements += details_pret['mensualite'] * 12
-            
-            emplois += remboursements
-            
             # Solde
             solde = ressources - emplois
+            solde_cumule += solde
             
             plan_financement[annee] = {
                 'ressources': {
                     'apport_personnel': apport_personnel if i == 0 else 0,
-                    'prets': sum(pret.get('montant', 0) for pret in prets) if i == 0 else 0,
-                    'subventions': sum(subv.get('montant', 0) for subv in subventions) if i == 0 else 0,
-                    'caf': caf_annuelle.get(annee, 0),
+                    'prets': total_prets if i == 0 else 0,
+                    'subventions': subventions if i == 0 else 0,
+                    'caf': caf_annuelle[i],
                     'total_ressources': ressources
                 },
                 'emplois': {
                     'investissements': total_besoins if i == 0 else 0,
-                    'variation_bfr': variation_bfr.get(annee, 0),
-                    'remboursements_prets': remboursements,
+                    'variation_bfr': variation_bfr[i],
+                    'remboursements_prets': float(remboursements_annuels[i]),
                     'total_emplois': emplois
                 },
                 'solde': solde,
-                'solde_cumule': sum(plan_financement[a]['solde'] for a in plan_financement.keys()) + solde
+                'solde_cumule': solde_cumule
             }
         
         return {
@@ -1236,6 +1229,7 @@ def calculer_plan_financement_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
+@tracer('calcul')
 def calculer_budget_tresorerie_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
     """
     Calcule le budget de trésorerie mensuel pour les 5 années
@@ -1254,6 +1248,11 @@ def calculer_budget_tresorerie_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
         # Trésorerie initiale
         tresorerie_initiale = donnees.get('tresorerie_initiale', 0)
         
+        # Service de la dette (échéancier commun des prêts)
+        financements = donnees.get('financements', {})
+        echeancier = calculer_echeancier_financements(financements if isinstance(financements, dict) else {})
+        service_dette = echeancier['mensualite'].sum(axis=0)
+        
         budget_tresorerie = {}
         tresorerie_cumul = tresorerie_initiale
         
@@ -1309,7 +1308,9 @@ def calculer_budget_tresorerie_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
                         ca_a_payer = ca_annuel_paiement / 12
                     decaissements_variables = ca_a_payer * 0.7
                 
-                total_decaissements = charges_fixes_mois + decaissements_variables
+                remboursement_emprunts = float(service_dette[mois_global - 1])
+                
+                total_decaissements = charges_fixes_mois + decaissements_variables + remboursement_emprunts
                 
                 # Solde du mois
                 solde_mois = encaissements - total_decaissements
@@ -1319,6 +1320,7 @@ def calculer_budget_tresorerie_5_ans(donnees: Dict[str, Any]) -> Dict[str, Any]:
                     'encaissements': encaissements,
                     'charges_fixes': charges_fixes_mois,
                     'charges_variables_payees': decaissements_variables,
+                    'remboursement_emprunts': remboursement_emprunts,
                     'total_decaissements': total_decaissements,
                     'solde_mois': solde_mois,
                     'tresorerie_cumul': tresorerie_cumul,
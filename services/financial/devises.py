@@ -0,0 +1,171 @@
+"""
+Gestion multi-devises USD/CDF des projections financières
+
+Chaque ligne (source de CA, charge fixe, salarié, emprunt) porte sa devise de
+règlement, à défaut celle de son poste (CA, charges, salaires, emprunts).
+Les montants sont saisis en USD au taux de référence ; la valeur en USD d'une
+ligne réglée en CDF suit ensuite le chemin de change mensuel. Les lignes d'un
+poste sont regroupées par devise avant que le moteur n'additionne le poste :
+la conversion, linéaire en la part CDF, porte alors sur des tableaux entiers
+(scénario, poste, mois) ; reporter un budget de 60 mois dans l'autre devise
+revient à une multiplication par le chemin de change.
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+DEVISES = {
+    'USD': "Dollar américain (USD)",
+    'CDF': "Franc congolais (CDF)"
+}
+
+DEVISE_BASE = 'USD'
+
+# Postes pouvant être réglés en CDF, dans l'ordre de l'axe « poste » des conversions
+POSTES_DEVISE = {
+    'ca': "Chiffre d'affaires",
+    'charges_variables': "Charges variables (achats)",
+    'charges_fixes': "Charges fixes",
+    'salaires': "Salaires",
+    'emprunts': "Emprunts"
+}
+
+TAUX_CHANGE_DEFAUT = 2800.0  # CDF pour 1 USD
+
+# Grandeurs de `projeter_scenarios` selon leur nature pour le report en devise
+FLUX_MENSUELS = ('ca', 'encaissements', 'decaissements', 'solde_mensuel', 'resultat_mensuel', 'tresorerie')
+FLUX_ANNUELS = ('ca_annuel', 'resultat_avant_impot', 'impots', 'resultat_net', 'seuil_rentabilite', 'service_dette_annuel')
+
+
+def construire_chemin_change(taux_initial: float = TAUX_CHANGE_DEFAUT, depreciation_annuelle: float = 0.0,
+                             n_mois: int = 60, taux_mensuels: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Construit le chemin mensuel du taux de change (CDF pour 1 USD)
+
+    Args:
+        taux_initial (float): Taux du premier mois
+        depreciation_annuelle (float): Dépréciation annuelle du CDF (0.10 = 10 %)
+        n_mois (int): Nombre de mois
+        taux_mensuels (list, optional): Taux saisis mois par mois, prolongés par le dernier
+
+    Returns:
+        np.ndarray: Taux mensuels (n_mois,)
+    """
+    if taux_mensuels is not None and len(taux_mensuels):
+        saisis = np.asarray(taux_mensuels, dtype=float)[:n_mois]
+        return np.concatenate([saisis, np.full(n_mois - saisis.size, saisis[-1])])
+    return float(taux_initial) * (1 + depreciation_annuelle) ** (np.arange(n_mois) / 12)
+
+
+def _part_cdf(valeur) -> float:
+    """Part CDF d'un code devise ou d'une part saisie entre 0 et 1"""
+    if isinstance(valeur, str):
+        return 1.0 if valeur == 'CDF' else 0.0
+    return float(np.clip(valeur, 0.0, 1.0))
+
+
+def parts_cdf_postes(devises: Dict[str, Any], lignes: Optional[Dict[str, Tuple[Sequence[str], np.ndarray]]] = None,
+                     n_mois: int = 60) -> np.ndarray:
+    """
+    Part réglée en CDF de chaque poste, mois par mois
+
+    Un poste détaillé en lignes prend, chaque mois, la part CDF des montants de
+    ses lignes ; une ligne sans devise propre suit celle de son poste.
+
+    Args:
+        devises (dict): Paramètres de devises ; `postes` associe à chaque poste
+            un code devise ou une part CDF entre 0 et 1, `lignes` fait de même
+            pour les lignes de chaque poste ({poste: {nom: devise}})
+        lignes (dict, optional): Lignes des postes détaillés,
+            {poste: (noms (L,), montants mensuels en USD (L, n_mois))}
+        n_mois (int): Nombre de mois
+
+    Returns:
+        np.ndarray: Parts CDF (P, n_mois) dans l'ordre de `POSTES_DEVISE`
+    """
+    postes = dict(devises.get('postes', {}))
+    # Anciens paramètres : une part pour le CA, une pour l'ensemble des charges
+    if 'part_ca_cdf' in devises:
+        postes.setdefault('ca', devises['part_ca_cdf'])
+    if 'part_charges_cdf' in devises:
+        for poste in ('charges_variables', 'charges_fixes', 'salaires'):
+            postes.setdefault(poste, devises['part_charges_cdf'])
+
+    parts_postes = np.array([_part_cdf(postes.get(poste, DEVISE_BASE)) for poste in POSTES_DEVISE])
+    parts = np.repeat(parts_postes[:, None], n_mois, axis=1)
+
+    # Lignes regroupées par devise : part CDF du montant total du poste, mois par mois
+    devises_lignes = devises.get('lignes', {})
+    for p, poste in enumerate(POSTES_DEVISE):
+        noms, montants = (lignes or {}).get(poste, ((), None))
+        if not len(noms):
+            continue
+        montants = np.asarray(montants, dtype=float).reshape(len(noms), n_mois)
+        parts_lignes = np.array([
+            _part_cdf(devises_lignes.get(poste, {}).get(nom, parts_postes[p])) for nom in noms
+        ])
+        total = montants.sum(axis=0)
+        parts[p] = np.divide((montants * parts_lignes[:, None]).sum(axis=0), total, out=parts[p], where=total != 0)
+    return parts
+
+
+def facteurs_conversion(parts_cdf: np.ndarray, taux_change: np.ndarray, taux_reference) -> np.ndarray:
+    """
+    Valeur en USD, mois par mois, d'un dollar saisi au taux de référence
+
+    Args:
+        parts_cdf (np.ndarray): Parts CDF des postes, mois par mois (..., P, M)
+        taux_change (np.ndarray): Taux mensuels CDF/USD (..., M)
+        taux_reference: Taux auquel les montants ont été saisis, scalaire ou (...,)
+
+    Returns:
+        np.ndarray: Facteurs (..., P, M)
+    """
+    relatif = np.asarray(taux_reference, dtype=float)[..., None] / taux_change
+    parts = np.asarray(parts_cdf, dtype=float)
+    return (1 - parts) + parts * relatif[..., None, :]
+
+
+def convertir(montants_usd: np.ndarray, taux_change: np.ndarray, devise: str = DEVISE_BASE) -> np.ndarray:
+    """
+    Exprime des montants mensuels en USD dans la devise demandée
+
+    Args:
+        montants_usd (np.ndarray): Montants (..., M)
+        taux_change (np.ndarray): Taux mensuels CDF/USD diffusables sur (..., M)
+        devise (str): 'USD' ou 'CDF'
+
+    Returns:
+        np.ndarray: Montants dans la devise demandée
+    """
+    return montants_usd * taux_change if devise == 'CDF' else montants_usd
+
+
+def reporter_en_devise(projection: Dict[str, np.ndarray], devise: str = DEVISE_BASE) -> Dict[str, np.ndarray]:
+    """
+    Reporte une projection dans une autre devise sans la recalculer
+
+    Les flux et la trésorerie mensuels sont convertis au taux du mois, les
+    grandeurs annuelles au taux moyen de l'année.
+
+    Args:
+        projection (dict): Résultat de `projeter_scenarios`
+        devise (str): 'USD' ou 'CDF'
+
+    Returns:
+        dict: Projection exprimée dans la devise demandée
+    """
+    if devise == DEVISE_BASE:
+        return dict(projection, devise=DEVISE_BASE)
+
+    taux = projection['taux_change']
+    n_scenarios, n_mois = taux.shape
+    taux_annuel = taux.reshape(n_scenarios, n_mois // 12, 12).mean(axis=2)
+
+    rapport = dict(projection, devise=devise)
+    for cle in FLUX_MENSUELS:
+        rapport[cle] = convertir(projection[cle], taux, devise)
+    for cle in FLUX_ANNUELS:
+        rapport[cle] = convertir(projection[cle], taux_annuel, devise)
+    rapport['tresorerie_initiale'] = convertir(projection['tresorerie_initiale'], taux[:, 0], devise)
+    return rapport
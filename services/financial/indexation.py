@@ -0,0 +1,216 @@
+"""
+Indexation des charges et des salaires
+
+Chaque catégorie de charge suit sa propre série d'indices (inflation générale,
+révision des loyers, indexation des salaires). Les taux annuels sont
+paramétrables et transformés en indices par produit cumulé vectorisé, ce qui
+permet de recalculer les projections dès qu'un taux change.
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional, Sequence
+
+INDICES = {
+    'inflation': "Inflation générale",
+    'loyer': "Révision des loyers",
+    'salaires': "Indexation des salaires"
+}
+
+# Taux annuels par défaut (%), appliqués à partir de l'année 2
+TAUX_INDICES_DEFAUT = {
+    'inflation': 5.0,
+    'loyer': 5.0,
+    'salaires': 8.0
+}
+
+TAUX_CHARGES_SOCIALES_DEFAUT = 15.0   # % de la masse salariale (RDC)
+CROISSANCE_CA_DEFAUT = 5.0            # % par an au-delà des prévisions saisies
+PLAFOND_CROISSANCE_CA_DEFAUT = 15.0   # % par an au maximum pour l'extrapolation du CA
+
+# Catégories de charges fixes des données de base -> indice
+INDEXATION_CHARGES_FIXES = {
+    'loyer': 'loyer',
+    'electricite': 'inflation',
+    'eau': 'inflation',
+    'telephone': 'inflation',
+    'assurance': 'inflation',
+    'transport': 'inflation',
+    'marketing': 'inflation',
+    'autres_charges': 'inflation'
+}
+
+# Mots-clés des charges saisies librement qui relèvent d'un bail
+MOTS_CLES_LOYER = ('loyer', 'emplacement', 'bail')
+
+
+def lire_parametres_indexation(parametres: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Complète les paramètres d'indexation saisis avec les valeurs par défaut
+
+    Args:
+        parametres (dict, optional): Paramètres saisis (`taux` par indice, scalaire
+            ou liste des taux des années 2 à 5, `taux_charges_sociales`,
+            `croissance_ca_defaut`, `plafond_croissance_ca`, `categories`)
+
+    Returns:
+        dict: Paramètres complets
+    """
+    parametres = parametres or {}
+    return {
+        'taux': {**TAUX_INDICES_DEFAUT, **parametres.get('taux', {})},
+        'taux_charges_sociales': float(parametres.get('taux_charges_sociales', TAUX_CHARGES_SOCIALES_DEFAUT)),
+        'croissance_ca_defaut': float(parametres.get('croissance_ca_defaut', CROISSANCE_CA_DEFAUT)),
+        'plafond_croissance_ca': float(parametres.get('plafond_croissance_ca', PLAFOND_CROISSANCE_CA_DEFAUT)),
+        'categories': dict(parametres.get('categories', {}))
+    }
+
+
+def matrice_taux_indexation(parametres: Optional[Dict[str, Any]] = None, n_annees: int = 5) -> np.ndarray:
+    """
+    Taux annuels de chaque indice, année par année
+
+    Args:
+        parametres (dict, optional): Paramètres d'indexation
+        n_annees (int): Nombre d'années
+
+    Returns:
+        np.ndarray: Taux en fraction (I, n_annees), nuls pour l'année 1
+    """
+    taux = lire_parametres_indexation(parametres)['taux']
+    matrice = np.zeros((len(INDICES), n_annees))
+    for i, indice in enumerate(INDICES):
+        serie = np.atleast_1d(np.asarray(taux[indice], dtype=float))[:n_annees - 1]
+        # Une série plus courte que l'horizon est prolongée par son dernier taux
+        matrice[i, 1:] = np.concatenate([serie, np.full(n_annees - 1 - serie.size, serie[-1])]) / 100
+    return matrice
+
+
+def indices_cumules(taux: np.ndarray) -> np.ndarray:
+    """
+    Indices cumulés (base 1 en année 1) à partir des taux annuels
+
+    Args:
+        taux (np.ndarray): Taux en fraction (..., n_annees)
+
+    Returns:
+        np.ndarray: Indices (..., n_annees)
+    """
+    return np.cumprod(1 + taux, axis=-1)
+
+
+def indice_de_charge(nom_charge: str, parametres: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Indice suivi par une charge fixe
+
+    Args:
+        nom_charge (str): Nom ou catégorie de la charge
+        parametres (dict, optional): Paramètres d'indexation (`categories` prioritaire)
+
+    Returns:
+        str: Nom de l'indice
+    """
+    categories = lire_parametres_indexation(parametres)['categories']
+    if nom_charge in categories:
+        return categories[nom_charge]
+    if nom_charge in INDEXATION_CHARGES_FIXES:
+        return INDEXATION_CHARGES_FIXES[nom_charge]
+    nom = nom_charge.lower()
+    return 'loyer' if any(mot in nom for mot in MOTS_CLES_LOYER) else 'inflation'
+
+
+def regrouper_par_indice(montants: np.ndarray, indices_charges: Sequence[str]) -> np.ndarray:
+    """
+    Regroupe des montants de charges par indice suivi
+
+    Args:
+        montants (np.ndarray): Montants par charge (C, n_annees)
+        indices_charges (list): Indice de chaque charge (C,)
+
+    Returns:
+        np.ndarray: Montants par indice (I, n_annees)
+    """
+    montants = np.atleast_2d(np.asarray(montants, dtype=float))
+    lignes = np.array([list(INDICES).index(indice) for indice in indices_charges], dtype=int)
+    groupes = np.zeros((len(INDICES), montants.shape[1]))
+    np.add.at(groupes, lignes, montants)
+    return groupes
+
+
+def indexer(montants_par_indice: np.ndarray, taux: np.ndarray) -> np.ndarray:
+    """
+    Applique les indices cumulés à des montants exprimés aux prix de l'année 1
+
+    Args:
+        montants_par_indice (np.ndarray): Montants (I, n_annees)
+        taux (np.ndarray): Taux annuels (..., I, n_annees)
+
+    Returns:
+        np.ndarray: Totaux indexés (..., n_annees)
+    """
+    return (indices_cumules(taux) * montants_par_indice).sum(axis=-2)
+
+
+def indexer_lignes(montants: np.ndarray, indices_charges: Sequence[str], taux: np.ndarray) -> np.ndarray:
+    """
+    Indexe chaque charge sur son propre indice, sans regroupement
+
+    Args:
+        montants (np.ndarray): Montants par charge aux prix de l'année 1 (C, n_annees)
+        indices_charges (list): Indice de chaque charge (C,)
+        taux (np.ndarray): Taux annuels (I, n_annees)
+
+    Returns:
+        np.ndarray: Montants indexés par charge (C, n_annees)
+    """
+    montants = np.atleast_2d(np.asarray(montants, dtype=float))
+    lignes = np.array([list(INDICES).index(indice) for indice in indices_charges], dtype=int)
+    return montants * indices_cumules(taux)[lignes].reshape(montants.shape)
+
+
+def indexer_charges_annuelles(charges_par_annee: Dict[str, Dict[str, float]],
+                              parametres: Optional[Dict[str, Any]] = None, n_annees: int = 5) -> Dict[str, np.ndarray]:
+    """
+    Indexe des charges saisies année par année
+
+    Un montant qui diffère de celui de l'année précédente est une saisie de
+    l'utilisateur, retenue telle quelle pour son année ; un montant recopié
+    d'une année à l'autre (remplissage automatique) est indexé à partir de la
+    dernière année saisie. Une hausse saisie à la main n'est donc pas indexée
+    une seconde fois.
+
+    Args:
+        charges_par_annee (dict): {'annee1': {charge: montant}, ..., 'annee5': {...}}
+        parametres (dict, optional): Paramètres d'indexation
+        n_annees (int): Nombre d'années
+
+    Returns:
+        dict: Montants par indice ramenés aux prix de l'année 1 (I, n_annees),
+        taux (I, n_annees), totaux indexés (n_annees,), noms des charges (C,)
+        et montants indexés par charge (C, n_annees)
+    """
+    noms = sorted({nom for annee in charges_par_annee.values() for nom in annee})
+    montants = np.array([
+        [float(charges_par_annee.get(f"annee{a}", {}).get(nom, 0.0)) for a in range(1, n_annees + 1)]
+        for nom in noms
+    ]).reshape(len(noms), n_annees)
+    indices_charges = [indice_de_charge(nom, parametres) for nom in noms]
+    taux = matrice_taux_indexation(parametres, n_annees)
+
+    # Dernière année saisie (montant différent de l'année précédente) pour chaque année
+    saisies = np.ones(montants.shape, dtype=bool)
+    saisies[:, 1:] = montants[:, 1:] != montants[:, :-1]
+    annees_saisies = np.maximum.accumulate(np.where(saisies, np.arange(n_annees), 0), axis=1)
+
+    # Montant saisi ramené aux prix de l'année 1 par l'indice de son année de saisie
+    lignes = np.array([list(INDICES).index(indice) for indice in indices_charges], dtype=int)
+    indices = indices_cumules(taux)[lignes].reshape(len(noms), n_annees)
+    montants_base = montants / np.take_along_axis(indices, annees_saisies, axis=1)
+
+    par_indice = regrouper_par_indice(montants_base, indices_charges)
+    return {
+        'par_indice': par_indice,
+        'taux': taux,
+        'totaux': indexer(par_indice, taux),
+        'noms': noms,
+        'par_charge': indexer_lignes(montants_base, indices_charges, taux)
+    }
@@ -0,0 +1,341 @@
+"""
+Analyse financière d'un portefeuille de dossiers (cohorte de candidats)
+
+Les instantanés sauvegardés des candidats sont chargés dans une structure en
+colonnes (candidat × année × poste), puis tous les états financiers sont
+calculés pour l'ensemble de la cohorte en une seule passe NumPy : compte de
+résultat, CAF, service de la dette et trésorerie mensuelle.
+"""
+
+import json
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Any, List
+
+from .projections import extraire_hypotheses_pages, _decaler, NB_ANNEES, NB_MOIS, JOURS_PAR_MOIS, TAUX_IMPOT
+from .devises import POSTES_DEVISE, facteurs_conversion
+from utils.financial_utils import calculer_echeanciers_prets
+from utils.profilage_execution import tracer
+
+# Postes annuels saisis, dans l'ordre du dernier axe du cube candidat × année × poste
+POSTES = ('ca', 'charges_fixes', 'salaires', 'amortissements')
+
+# Indicateurs de classement -> (libellé, tri décroissant)
+INDICATEURS_PORTEFEUILLE = {
+    'annee_equilibre': ("Année d'équilibre", False),
+    'tresorerie_minimale': ("Trésorerie minimale ($)", True),
+    'dscr_minimal': ("Couverture du service de la dette (min)", True),
+    'resultat_net_cumule': ("Résultat net cumulé 5 ans ($)", True),
+    'ca_annee1': ("CA année 1 ($)", True)
+}
+
+SEUIL_DSCR = 1.2
+SEUIL_ATYPIQUE = 3.5
+
+
+def creer_instantane(session_state) -> Dict[str, Any]:
+    """
+    Crée l'instantané sauvegardable d'un dossier candidat
+
+    Args:
+        session_state: État de session Streamlit (ou dictionnaire équivalent)
+
+    Returns:
+        dict: Identité du candidat, programme et données des pages financières
+    """
+    return {
+        'nom_entreprise': session_state.get('nom_entreprise', ''),
+        'template': session_state.get('template_selectionne', ''),
+        'date': datetime.now().isoformat(),
+        'data': dict(session_state.get('data', {}))
+    }
+
+
+def charger_instantanes(sources: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Charge des instantanés à partir de dictionnaires, de textes JSON ou de fichiers
+
+    Un fichier peut contenir un instantané ou une liste d'instantanés.
+
+    Args:
+        sources (list): Dictionnaires, chaînes/octets JSON ou fichiers téléversés
+
+    Returns:
+        list: Instantanés au format de `creer_instantane`
+    """
+    instantanes = []
+    for source in sources:
+        if hasattr(source, 'getvalue'):
+            source = source.getvalue()
+        if isinstance(source, bytes):
+            source = source.decode('utf-8')
+        if isinstance(source, str):
+            source = json.loads(source)
+        for instantane in (source if isinstance(source, list) else [source]):
+            # Données de pages financières brutes, sans enveloppe
+            if 'data' not in instantane:
+                instantane = {'nom_entreprise': '', 'template': '', 'data': instantane}
+            instantanes.append(instantane)
+    return instantanes
+
+
+def construire_portefeuille(instantanes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Empile les hypothèses de tous les candidats dans une structure en colonnes
+
+    Args:
+        instantanes (list): Instantanés des candidats
+
+    Returns:
+        dict: Cube annuel (N, 5, P), hypothèses par candidat (N,), prêts à plat
+        avec l'index de leur candidat, profils mensuels (N, 12), parts CDF des
+        postes selon la devise de leurs lignes (N, P, 60) et chemins de change (N, 60)
+    """
+    n_dossiers = len(instantanes)
+    annuel = np.zeros((n_dossiers, NB_ANNEES, len(POSTES)))
+    profils = np.zeros((n_dossiers, 12))
+    parts_cdf = np.zeros((n_dossiers, len(POSTES_DEVISE), NB_MOIS))
+    taux_change = np.zeros((n_dossiers, NB_MOIS))
+    colonnes = {cle: np.zeros(n_dossiers) for cle in (
+        'taux_charges_variables', 'delai_clients', 'delai_fournisseurs', 'tresorerie_initiale', 'taux_change_reference'
+    )}
+    prets = {cle: [] for cle in ('dossier', 'montants', 'taux_annuels', 'durees_mois', 'types', 'differes_mois')}
+    noms, programmes = [], []
+
+    for i, instantane in enumerate(instantanes):
+        hypotheses = extraire_hypotheses_pages(instantane.get('data', {}))
+        annuel[i] = np.stack([
+            hypotheses['ca_annees'], hypotheses['charges_fixes_annees'],
+            hypotheses['salaires_annees'], hypotheses['amortissements']
+        ], axis=1)
+        profils[i] = hypotheses['profil_ca']
+        parts_cdf[i] = hypotheses['parts_cdf']
+        taux_change[i] = hypotheses['taux_change']
+        for cle in colonnes:
+            colonnes[cle][i] = hypotheses[cle]
+
+        emprunts = hypotheses['emprunts']
+        prets['dossier'].extend([i] * emprunts['montants'].size)
+        for cle in ('montants', 'taux_annuels', 'durees_mois', 'types', 'differes_mois'):
+            prets[cle].extend(emprunts[cle].tolist())
+
+        noms.append(instantane.get('nom_entreprise') or f"Dossier {i + 1}")
+        programmes.append(instantane.get('template', ''))
+
+    return {
+        'n_dossiers': n_dossiers,
+        'noms': noms,
+        'programmes': programmes,
+        'postes': POSTES,
+        'annuel': annuel,
+        'profils_ca': profils,
+        'parts_cdf': parts_cdf,
+        'taux_change': taux_change,
+        **colonnes,
+        'prets': {
+            'dossier': np.array(prets['dossier'], dtype=int),
+            'montants': np.array(prets['montants'], dtype=float),
+            'taux_annuels': np.array(prets['taux_annuels'], dtype=float),
+            'durees_mois': np.array(prets['durees_mois'], dtype=float),
+            'types': np.array(prets['types'], dtype=str),
+            'differes_mois': np.array(prets['differes_mois'], dtype=float)
+        }
+    }
+
+
+@tracer('calcul')
+def calculer_etats_portefeuille(portefeuille: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Calcule les états financiers de tous les candidats en une passe
+
+    Args:
+        portefeuille (dict): Structure de `construire_portefeuille`
+
+    Returns:
+        dict: États annuels (N, 5), trésorerie mensuelle (N, 60) et service de la dette
+    """
+    n_dossiers = portefeuille['n_dossiers']
+    annuel = portefeuille['annuel']
+    ca_annees, cf_annees, salaires_annees, amortissements = (annuel[:, :, p] for p in range(len(POSTES)))
+    taux_cv = portefeuille['taux_charges_variables'][:, None]
+
+    # Flux mensuels en USD : saisonnalité de l'année 1 et postes réglés en CDF
+    mois_annee = np.arange(NB_MOIS) % 12
+    annee_du_mois = np.arange(NB_MOIS) // 12
+    change = dict(zip(POSTES_DEVISE, np.moveaxis(facteurs_conversion(
+        portefeuille['parts_cdf'], portefeuille['taux_change'], portefeuille['taux_change_reference']
+    ), 1, 0)))
+    ca_volume = ca_annees[:, annee_du_mois] * portefeuille['profils_ca'][:, mois_annee]
+    ca = ca_volume * change['ca']
+    charges_variables = ca_volume * taux_cv * change['charges_variables']
+    charges_fixes = cf_annees[:, annee_du_mois] / 12 * change['charges_fixes']
+    salaires = salaires_annees[:, annee_du_mois] / 12 * change['salaires']
+
+    # Tous les prêts de la cohorte en un seul échéancier, puis regroupés par candidat
+    prets = portefeuille['prets']
+    principal = np.zeros((n_dossiers, NB_MOIS))
+    interets = np.zeros((n_dossiers, NB_MOIS))
+    if prets['montants'].size:
+        echeancier = calculer_echeanciers_prets(
+            prets['montants'], prets['taux_annuels'], prets['durees_mois'],
+            prets['types'], prets['differes_mois'], NB_MOIS
+        )
+        np.add.at(principal, prets['dossier'], echeancier['principal'])
+        np.add.at(interets, prets['dossier'], echeancier['interets'])
+    principal = principal * change['emprunts']
+    interets = interets * change['emprunts']
+
+    def _annualiser(flux):
+        return flux.reshape(n_dossiers, NB_ANNEES, 12).sum(axis=2)
+
+    ca_annuel = _annualiser(ca)
+    cv_annuel = _annualiser(charges_variables)
+    cf_annuel = _annualiser(charges_fixes)
+    salaires_annuel = _annualiser(salaires)
+    interets_annuel = _annualiser(interets)
+    principal_annuel = _annualiser(principal)
+
+    # Compte de résultat
+    marge = ca_annuel - cv_annuel
+    ebe = marge - cf_annuel - salaires_annuel
+    resultat_avant_impot = ebe - amortissements - interets_annuel
+    impots = np.maximum(resultat_avant_impot, 0.0) * TAUX_IMPOT
+    resultat_net = resultat_avant_impot - impots
+    caf = resultat_net + amortissements
+
+    # Couverture du service de la dette : flux disponible / (capital + intérêts)
+    service_dette = principal_annuel + interets_annuel
+    dscr = np.divide(ebe - impots, service_dette, out=np.full_like(ebe, np.nan), where=service_dette > 0)
+
+    taux_marge = np.divide(marge, ca_annuel, out=np.zeros_like(marge), where=ca_annuel > 0)
+    seuil_rentabilite = np.divide(
+        cf_annuel + salaires_annuel + interets_annuel, taux_marge,
+        out=np.full_like(marge, np.nan), where=taux_marge > 0
+    )
+
+    # Trésorerie mensuelle : délais clients/fournisseurs, impôt payé l'année suivante
+    encaissements = _decaler(ca, portefeuille['delai_clients'][:, None] / JOURS_PAR_MOIS)
+    achats_payes = _decaler(charges_variables, portefeuille['delai_fournisseurs'][:, None] / JOURS_PAR_MOIS)
+    impots_payes = np.zeros((n_dossiers, NB_MOIS))
+    impots_payes[:, 12::12] = impots[:, :NB_ANNEES - 1]
+
+    decaissements = achats_payes + charges_fixes + salaires + principal + interets + impots_payes
+    tresorerie = portefeuille['tresorerie_initiale'][:, None] + np.cumsum(encaissements - decaissements, axis=1)
+
+    return {
+        'ca': ca_annuel,
+        'charges_variables': cv_annuel,
+        'marge': marge,
+        'charges_fixes': cf_annuel,
+        'salaires': salaires_annuel,
+        'ebe': ebe,
+        'amortissements': amortissements,
+        'interets': interets_annuel,
+        'resultat_avant_impot': resultat_avant_impot,
+        'impots': impots,
+        'resultat_net': resultat_net,
+        'caf': caf,
+        'remboursements': principal_annuel,
+        'service_dette': service_dette,
+        'dscr': dscr,
+        'seuil_rentabilite': seuil_rentabilite,
+        'tresorerie': tresorerie,
+        'taux_change': portefeuille['taux_change']
+    }
+
+
+def detecter_atypiques(valeurs: np.ndarray, seuil: float = SEUIL_ATYPIQUE) -> np.ndarray:
+    """
+    Repère les valeurs atypiques par le score z modifié (médiane et écart absolu médian)
+
+    Args:
+        valeurs (np.ndarray): Valeurs de l'indicateur (N,), NaN ignorés
+        seuil (float): Score au-delà duquel une valeur est atypique
+
+    Returns:
+        np.ndarray: Scores z modifiés (N,), NaN pour les valeurs absentes
+    """
+    valides = np.isfinite(valeurs)
+    scores = np.full(valeurs.shape, np.nan)
+    if not valides.any():
+        return scores
+    mediane = np.median(valeurs[valides])
+    mad = np.median(np.abs(valeurs[valides] - mediane))
+    if mad == 0:
+        scores[valides] = 0.0
+        return scores
+    scores[valides] = 0.6745 * (valeurs[valides] - mediane) / mad
+    return scores
+
+
+def analyser_portefeuille(instantanes: List[Dict[str, Any]], critere: str = 'tresorerie_minimale',
+                          seuil_atypique: float = SEUIL_ATYPIQUE) -> Dict[str, Any]:
+    """
+    Évalue une cohorte de candidats : classement et valeurs atypiques
+
+    Args:
+        instantanes (list): Instantanés des candidats
+        critere (str): Indicateur de classement (voir `INDICATEURS_PORTEFEUILLE`)
+        seuil_atypique (float): Seuil du score z modifié
+
+    Returns:
+        dict: Tableau de classement, valeurs atypiques, états financiers par
+        candidat et durée de calcul
+    """
+    try:
+        debut = time.perf_counter()
+
+        portefeuille = construire_portefeuille(instantanes)
+        etats = calculer_etats_portefeuille(portefeuille)
+        duree_calcul = (time.perf_counter() - debut) * 1000
+
+        resultat_net = etats['resultat_net']
+        beneficiaire = resultat_net >= 0
+        annee_equilibre = np.where(beneficiaire.any(axis=1), beneficiaire.argmax(axis=1) + 1, np.nan)
+        dscr = etats['dscr']
+        avec_dette = np.isfinite(dscr).any(axis=1)
+        dscr_minimal = np.full(portefeuille['n_dossiers'], np.nan)
+        dscr_minimal[avec_dette] = np.nanmin(dscr[avec_dette], axis=1)
+
+        indicateurs = pd.DataFrame({
+            'Candidat': portefeuille['noms'],
+            'Programme': portefeuille['programmes'],
+            'annee_equilibre': annee_equilibre,
+            'tresorerie_minimale': etats['tresorerie'].min(axis=1),
+            'mois_tresorerie_minimale': etats['tresorerie'].argmin(axis=1) + 1,
+            'dscr_minimal': dscr_minimal,
+            'resultat_net_cumule': resultat_net.sum(axis=1),
+            'ca_annee1': etats['ca'][:, 0]
+        })
+
+        # Alertes métier, puis valeurs atypiques au sein de la cohorte
+        indicateurs['tresorerie_negative'] = indicateurs['tresorerie_minimale'] < 0
+        indicateurs['dscr_insuffisant'] = indicateurs['dscr_minimal'] < SEUIL_DSCR
+        scores = {
+            colonne: detecter_atypiques(indicateurs[colonne].to_numpy(dtype=float))
+            for colonne in ('tresorerie_minimale', 'dscr_minimal', 'resultat_net_cumule', 'ca_annee1')
+        }
+        atypique = np.zeros(len(indicateurs), dtype=bool)
+        for colonne, score in scores.items():
+            indicateurs[f"score_{colonne}"] = score
+            atypique |= np.abs(np.nan_to_num(score)) > seuil_atypique
+        indicateurs['atypique'] = atypique
+
+        _, decroissant = INDICATEURS_PORTEFEUILLE[critere]
+        classement = indicateurs.sort_values(critere, ascending=not decroissant, na_position='last', kind='stable')
+        classement.insert(0, 'Rang', np.arange(1, len(classement) + 1))
+
+        return {
+            'success': True,
+            'n_dossiers': portefeuille['n_dossiers'],
+            'critere': critere,
+            'classement': classement.reset_index(drop=True),
+            'atypiques': classement[classement['atypique']].reset_index(drop=True),
+            'etats': etats,
+            'duree_calcul_ms': duree_calcul
+        }
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,485 @@
+"""
+Moteur de projection financière vectorisé sur 60 mois
+
+Les hypothèses sont extraites une seule fois des données de base, puis
+projetées pour un lot de scénarios en une passe NumPy : chaque grandeur
+porte un axe « scénario » en tête, ce qui permet aux simulations, analyses
+de sensibilité et solveurs de réutiliser le même calcul.
+"""
+
+import numpy as np
+from typing import Dict, Any, Optional
+
+from .calculations import calculer_compte_resultats_5_ans, calculer_bases_indexees
+from .indexation import (
+    INDICES,
+    lire_parametres_indexation,
+    indice_de_charge,
+    INDEXATION_CHARGES_FIXES,
+    matrice_taux_indexation,
+    indices_cumules,
+    regrouper_par_indice,
+    indexer,
+    indexer_lignes,
+    indexer_charges_annuelles
+)
+from .devises import (
+    POSTES_DEVISE,
+    TAUX_CHANGE_DEFAUT,
+    construire_chemin_change,
+    parts_cdf_postes,
+    facteurs_conversion
+)
+from utils.financial_utils import (
+    normaliser_prets,
+    calculer_echeanciers_prets,
+    calculer_plans_amortissement,
+    preparer_actifs_amortissables
+)
+from utils.profilage_execution import tracer
+
+NB_ANNEES = 5
+NB_MOIS = 60
+JOURS_PAR_MOIS = 30
+TAUX_IMPOT = 0.30
+
+
+def extraire_hypotheses(donnees: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrait les hypothèses du moteur à partir des données de base
+    (format de `calculer_tableaux_financiers`)
+
+    Args:
+        donnees (dict): Données financières de base
+
+    Returns:
+        dict: Hypothèses prêtes pour `projeter_scenarios`
+    """
+    compte_resultats = calculer_compte_resultats_5_ans(donnees)
+
+    # Profil mensuel de l'année 1 (saisonnalité) si disponible
+    ca_mensuel = donnees.get('ca_mensuel', {})
+    profil = np.array([float(ca_mensuel.get(f'mois_{m}', 0)) for m in range(1, 13)])
+
+    financements = donnees.get('financements', {})
+    prets = normaliser_prets(financements)
+
+    total_investissements = sum(float(inv.get('montant', 0)) for inv in donnees.get('investissements', []))
+    ressources = (
+        float(financements.get('apport_personnel', 0))
+        + float(prets['montants'].sum())
+        + float(financements.get('subventions', 0))
+    )
+
+    return {
+        'ca_annees': np.array(compte_resultats['ca_annees'], dtype=float),
+        'profil_ca': _normaliser_profil(profil),
+        'taux_charges_variables': float(donnees.get('charges_variables', {}).get('taux_charges_variables', 60)) / 100,
+        'charges_fixes_annees': np.array(compte_resultats['charges_fixes_annees'], dtype=float),
+        'salaires_annees': np.array(compte_resultats['total_salaires_charges'], dtype=float),
+        'amortissements': np.array(compte_resultats['amortissements'], dtype=float),
+        'indexation': _indexation(calculer_bases_indexees(donnees, NB_ANNEES)),
+        'delai_clients': float(donnees.get('delai_paiement_clients', 30)),
+        'delai_fournisseurs': float(donnees.get('delai_paiement_fournisseurs', 30)),
+        'tresorerie_initiale': float(donnees.get('tresorerie_initiale', 0)) + ressources - total_investissements,
+        'emprunts': prets,
+        **_extraire_devises(donnees.get('devises', {
+            'part_ca_cdf': donnees.get('part_ca_cdf', 0),
+            'part_charges_cdf': donnees.get('part_charges_cdf', 0)
+        }), _lignes_devises(donnees)),
+        'taux_impot': TAUX_IMPOT
+    }
+
+
+def extraire_hypotheses_pages(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extrait les hypothèses du moteur à partir des données saisies dans les
+    pages financières (`st.session_state.data`)
+
+    Args:
+        data (dict): Données des pages financières
+
+    Returns:
+        dict: Hypothèses prêtes pour `projeter_scenarios`
+    """
+    ca_annees = np.array([
+        float(data.get(f"total_chiffre_affaires_annee{i}", data.get(f"total_ca_annee{i}", 0.0)))
+        for i in range(1, NB_ANNEES + 1)
+    ])
+
+    # Saisonnalité de l'année 1 à partir de la grille mensuelle
+    chiffre_affaires = data.get("chiffre_affaires", {})
+    profil = np.array([
+        sum(float(chiffre_affaires.get(f"{nom_vente}_Mois {m}_ca", 0.0)) for nom_vente in ("Marchandises", "Services"))
+        for m in range(1, 13)
+    ])
+
+    # Charges fixes et salaires aux prix de l'année 1, regroupés par indice
+    parametres_indexation = data.get("indexation", {})
+    taux_indexation = matrice_taux_indexation(parametres_indexation, NB_ANNEES)
+    if isinstance(data.get("charges_fixes"), dict) and "annee1" in data["charges_fixes"]:
+        charges_fixes_base = indexer_charges_annuelles(data["charges_fixes"], parametres_indexation, NB_ANNEES)['par_indice']
+    else:
+        # Totaux seuls : considérés comme déjà indexés sur l'inflation générale
+        totaux = np.array([float(data.get(f"total_charges_fixes_annee{i}", 0.0)) for i in range(1, NB_ANNEES + 1)])
+        inflation = indices_cumules(taux_indexation[list(INDICES).index('inflation')])
+        charges_fixes_base = regrouper_par_indice((totaux / inflation)[None, :], ['inflation'])
+    salaires_base = regrouper_par_indice(
+        np.full((1, NB_ANNEES), float(data.get("total_salaires_annee1", 0.0))), ['salaires']
+    )
+    indexation = _indexation({
+        'charges_fixes': charges_fixes_base, 'salaires': salaires_base, 'taux': taux_indexation
+    })
+
+    # Amortissements des besoins de démarrage immobilisés (paramètres de la page détail)
+    besoins = data.get("besoins_demarrage", {})
+    total_besoins = float(data.get("total_besoins", 0.0))
+    actifs = preparer_actifs_amortissables(besoins, data.get("parametres_amortissement", {}))
+    amortissements = calculer_plans_amortissement(
+        actifs["montants"], actifs["durees"], actifs["methodes"], actifs["mois_mise_en_service"], n_annees=NB_ANNEES
+    )["total_par_annee"]
+
+    fin = data.get("financements", {})
+    total_financement = float(fin.get("total_financement", 0.0))
+    tresorerie_initiale = (
+        float(data.get("tresorerie", {}).get("tresorerie_initiale", 0.0))
+        + total_financement - total_besoins
+        + float(besoins.get("Trésorerie de départ", 0.0))
+    )
+
+    fonds_roulement = data.get("fonds_roulement", {})
+    devises = data.get("devises", {})
+
+    return {
+        'ca_annees': ca_annees,
+        'profil_ca': _normaliser_profil(profil),
+        'taux_charges_variables': float(data.get("taux_charges_variables", 0.0)) / 100,
+        'charges_fixes_annees': indexer(indexation['charges_fixes'], indexation['taux']),
+        'salaires_annees': indexer(indexation['salaires'], indexation['taux']),
+        'amortissements': amortissements,
+        'indexation': indexation,
+        'delai_clients': float(fonds_roulement.get("duree_credits_clients", 30)),
+        'delai_fournisseurs': float(fonds_roulement.get("duree_dettes_fournisseurs", 30)),
+        'tresorerie_initiale': tresorerie_initiale,
+        'emprunts': normaliser_prets(fin),
+        **_extraire_devises(devises, lignes_devises_pages(data)),
+        'taux_impot': TAUX_IMPOT
+    }
+
+
+def _indexation(bases: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Montants par indice aux prix de l'année 1 et taux d'indexation (I, 5)."""
+    return {
+        'charges_fixes': np.asarray(bases['charges_fixes'], dtype=float),
+        'salaires': np.asarray(bases['salaires'], dtype=float),
+        'taux': np.asarray(bases['taux'], dtype=float)
+    }
+
+
+def _extraire_devises(devises: Dict[str, Any], lignes: Optional[Dict[str, tuple]] = None) -> Dict[str, Any]:
+    """Part CDF de chaque poste mois par mois, selon la devise de ses lignes, et chemin de change mensuel (CDF pour 1 USD)."""
+    taux_initial = float(devises.get('taux_change', TAUX_CHANGE_DEFAUT))
+    return {
+        'parts_cdf': parts_cdf_postes(devises, lignes, NB_MOIS),
+        'taux_change': construire_chemin_change(
+            taux_initial,
+            float(devises.get('depreciation_annuelle', 0.0)) / 100,
+            NB_MOIS,
+            devises.get('taux_mensuels')
+        ),
+        'taux_change_reference': taux_initial
+    }
+
+
+def _lignes_emprunts(prets: Dict[str, Any]) -> tuple:
+    """Service mensuel de chaque prêt (noms, (L, 60)), qui pondère la devise des emprunts."""
+    if prets['montants'].size == 0:
+        return [], np.zeros((0, NB_MOIS))
+    echeancier = calculer_echeanciers_prets(
+        prets['montants'], prets['taux_annuels'], prets['durees_mois'],
+        prets['types'], prets['differes_mois'], NB_MOIS
+    )
+    return prets['noms'], echeancier['principal'] + echeancier['interets']
+
+
+def _lignes_devises(donnees: Dict[str, Any]) -> Dict[str, tuple]:
+    """Lignes des postes dans les données de base : charges fixes par catégorie, postes salariés et prêts."""
+    annee_du_mois = np.arange(NB_MOIS) // 12
+    parametres = lire_parametres_indexation(donnees.get('indexation'))
+    taux = matrice_taux_indexation(parametres, NB_ANNEES)
+
+    charges_fixes_data = donnees.get('charges_fixes', {})
+    categories = list(INDEXATION_CHARGES_FIXES)
+    charges_fixes = indexer_lignes(
+        np.array([[float(charges_fixes_data.get(categorie, 0))] * NB_ANNEES for categorie in categories]),
+        [indice_de_charge(categorie, parametres) for categorie in categories], taux
+    )
+
+    salaires_data = donnees.get('salaires', {})
+    postes_salaries = [f'salaire_poste_{i}' for i in range(1, 6)]
+    return {
+        'charges_fixes': (categories, charges_fixes[:, annee_du_mois]),
+        'salaires': (postes_salaries, np.array([[float(salaires_data.get(poste, 0))] * NB_MOIS for poste in postes_salaries])),
+        'emprunts': _lignes_emprunts(normaliser_prets(donnees.get('financements', {})))
+    }
+
+
+def lignes_devises_pages(data: Dict[str, Any]) -> Dict[str, tuple]:
+    """
+    Lignes des postes saisies dans les pages financières, pour leur devise de règlement
+
+    Les montants ne servent qu'à pondérer la devise de chaque ligne dans son
+    poste : CA de l'année 1 par type de vente (saisonnalité reprise chaque
+    année), charges fixes indexées, coût des salariés et service des prêts.
+
+    Args:
+        data (dict): Données des pages financières
+
+    Returns:
+        dict: {poste: (noms (L,), montants mensuels (L, 60))}
+    """
+    annee_du_mois = np.arange(NB_MOIS) // 12
+
+    chiffre_affaires = data.get("chiffre_affaires", {})
+    ventes = ("Marchandises", "Services")
+    ca = np.array([
+        [float(chiffre_affaires.get(f"{nom_vente}_Mois {m}_ca", 0.0)) for m in range(1, 13)] for nom_vente in ventes
+    ])
+
+    lignes = {
+        'ca': (list(ventes), np.tile(ca, NB_ANNEES)),
+        'emprunts': _lignes_emprunts(normaliser_prets(data.get("financements", {})))
+    }
+
+    if isinstance(data.get("charges_fixes"), dict) and "annee1" in data["charges_fixes"]:
+        charges = indexer_charges_annuelles(data["charges_fixes"], data.get("indexation", {}), NB_ANNEES)
+        lignes['charges_fixes'] = (charges['noms'], charges['par_charge'][:, annee_du_mois])
+
+    salaries = {poste: valeurs for poste, valeurs in data.get("salaires", {}).items() if isinstance(valeurs, dict)}
+    lignes['salaires'] = (list(salaries), np.array([
+        [float(valeurs.get("salaire_brut", 0.0)) + float(valeurs.get("charges_sociales", 0.0))] * NB_MOIS
+        for valeurs in salaries.values()
+    ]).reshape(len(salaries), NB_MOIS))
+    return lignes
+
+
+def _normaliser_profil(profil: np.ndarray) -> np.ndarray:
+    """Poids mensuels de l'année 1 (somme = 1), uniformes à défaut de saisie."""
+    total = profil.sum()
+    if total <= 0:
+        return np.full(12, 1 / 12)
+    return profil / total
+
+
+def _en_colonne(valeur, n_scenarios: int) -> np.ndarray:
+    """Met une hypothèse scalaire ou par scénario au format (S, 1)."""
+    return np.broadcast_to(np.asarray(valeur, dtype=float).reshape(-1, 1), (n_scenarios, 1))
+
+
+def _par_periode(valeur, n_scenarios: int, n_periodes: int) -> np.ndarray:
+    """Met une hypothèse scalaire, (S,) ou (S, P) au format (S, P)."""
+    tableau = np.asarray(valeur, dtype=float)
+    tableau = tableau.reshape(1, 1) if tableau.ndim == 0 else tableau.reshape(tableau.shape[0], -1)
+    return np.broadcast_to(tableau, (n_scenarios, n_periodes))
+
+
+def _decaler(flux: np.ndarray, delai_mois: np.ndarray) -> np.ndarray:
+    """
+    Décale des flux mensuels d'un délai fractionnaire propre à chaque scénario
+
+    Args:
+        flux (np.ndarray): Flux (S, M)
+        delai_mois (np.ndarray): Délai en mois (S, 1)
+
+    Returns:
+        np.ndarray: Flux décalés (S, M), les montants dépassant l'horizon sont perdus
+    """
+    n_mois = flux.shape[1]
+    entier = np.floor(delai_mois).astype(int)
+    fraction = delai_mois - entier
+
+    def _prendre(decalage):
+        index = np.arange(n_mois)[None, :] - decalage
+        valeurs = np.take_along_axis(flux, np.clip(index, 0, n_mois - 1), axis=1)
+        return np.where(index >= 0, valeurs, 0.0)
+
+    return (1 - fraction) * _prendre(entier) + fraction * _prendre(entier + 1)
+
+
+def _service_dette(emprunts: Dict[str, Any], facteur_taux: np.ndarray, n_mois: int):
+    """
+    Échéanciers de tous les prêts pour tous les scénarios
+
+    Args:
+        emprunts (dict): Prêts normalisés (`normaliser_prets`)
+        facteur_taux (np.ndarray): Multiplicateur du taux par scénario (S, 1)
+        n_mois (int): Horizon en mois
+
+    Returns:
+        tuple: (principal, intérêts) mensuels agrégés sur les prêts (S, M)
+    """
+    if emprunts['montants'].size == 0:
+        zeros = np.zeros((facteur_taux.shape[0], n_mois))
+        return zeros, zeros
+
+    echeancier = calculer_echeanciers_prets(
+        emprunts['montants'],
+        facteur_taux * emprunts['taux_annuels'][None, :],
+        emprunts['durees_mois'],
+        emprunts['types'],
+        emprunts['differes_mois'],
+        n_mois
+    )
+    return echeancier['principal'].sum(axis=1), echeancier['interets'].sum(axis=1)
+
+
+@tracer('calcul')
+def projeter_scenarios(hypotheses: Dict[str, Any], scenarios: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Projette la trésorerie mensuelle et les résultats annuels pour un lot de scénarios
+
+    Chaque clé de `scenarios` remplace ou module une hypothèse, avec l'axe des
+    scénarios en tête :
+
+    - facteur_ca (S, 5) ou (S, 1) : multiplicateur du CA annuel
+    - taux_charges_variables (S,) : taux de charges variables (fraction du CA)
+    - facteur_charges_fixes (S,), facteur_salaires (S,) : multiplicateurs
+    - taux_indexation (S, I, 5) : taux annuels des indices remplaçant ceux des hypothèses
+    - delai_clients (S,), delai_fournisseurs (S,) : délais en jours
+    - facteur_taux_emprunt (S,) : multiplicateur des taux d'emprunt
+    - taux_change (S, 60) : chemins du taux de change CDF/USD remplaçant celui des hypothèses
+    - apport_tresorerie (S,) : trésorerie supplémentaire au démarrage
+    - montant_emprunt_supplementaire (S,) : prêt additionnel aux conditions de
+      `hypotheses['emprunt_supplementaire']` (taux, duree_mois, type, differe_mois)
+
+    Args:
+        hypotheses (dict): Hypothèses issues de `extraire_hypotheses*`
+        scenarios (dict, optional): Variations par scénario
+
+    Returns:
+        dict: Tableaux (S, 60) mensuels et (S, 5) annuels
+    """
+    scenarios = scenarios or {}
+    n_scenarios = max([np.shape(v)[0] for v in scenarios.values() if np.ndim(v) > 0] or [1])
+
+    annee_du_mois = np.arange(NB_MOIS) // 12
+
+    # Chiffre d'affaires mensuel : CA annuel réparti selon la saisonnalité de l'année 1
+    facteur_ca = _par_periode(scenarios.get('facteur_ca', 1.0), n_scenarios, NB_ANNEES)
+    ca_annees = hypotheses['ca_annees'][None, :] * facteur_ca
+    ca_volume = ca_annees[:, annee_du_mois] * np.tile(hypotheses['profil_ca'], NB_ANNEES)[None, :]
+
+    # Conversion en USD des postes réglés en CDF : facteurs (S, poste, mois) en une passe
+    taux_change = np.broadcast_to(
+        np.asarray(scenarios.get('taux_change', hypotheses['taux_change']), dtype=float).reshape(-1, NB_MOIS),
+        (n_scenarios, NB_MOIS)
+    )
+    change = dict(zip(POSTES_DEVISE, np.moveaxis(
+        facteurs_conversion(hypotheses['parts_cdf'], taux_change, hypotheses['taux_change_reference']), 1, 0
+    )))
+
+    ca = ca_volume * change['ca']
+    taux_cv = _en_colonne(scenarios.get('taux_charges_variables', hypotheses['taux_charges_variables']), n_scenarios)
+    charges_variables = ca_volume * taux_cv * change['charges_variables']
+
+    # Charges fixes et salaires indexés : produit cumulé des taux de chaque indice
+    indexation = hypotheses.get('indexation')
+    if indexation is not None:
+        taux_indexation = np.broadcast_to(
+            scenarios.get('taux_indexation', indexation['taux']), (n_scenarios,) + indexation['taux'].shape
+        )
+        charges_fixes_annees = indexer(indexation['charges_fixes'], taux_indexation)
+        salaires_annees = indexer(indexation['salaires'], taux_indexation)
+    else:
+        charges_fixes_annees = np.broadcast_to(hypotheses['charges_fixes_annees'], (n_scenarios, NB_ANNEES))
+        salaires_annees = np.broadcast_to(hypotheses['salaires_annees'], (n_scenarios, NB_ANNEES))
+
+    charges_fixes = (
+        charges_fixes_annees[:, annee_du_mois] / 12
+        * _en_colonne(scenarios.get('facteur_charges_fixes', 1.0), n_scenarios) * change['charges_fixes']
+    )
+    salaires = (
+        salaires_annees[:, annee_du_mois] / 12
+        * _en_colonne(scenarios.get('facteur_salaires', 1.0), n_scenarios) * change['salaires']
+    )
+
+    principal, interets = _service_dette(
+        hypotheses['emprunts'],
+        _en_colonne(scenarios.get('facteur_taux_emprunt', 1.0), n_scenarios),
+        NB_MOIS
+    )
+
+    # Prêt supplémentaire : l'échéancier est linéaire en capital, on calcule celui d'un dollar
+    montant_supplementaire = _en_colonne(scenarios.get('montant_emprunt_supplementaire', 0.0), n_scenarios)
+    conditions = hypotheses.get('emprunt_supplementaire')
+    if conditions and np.any(montant_supplementaire):
+        unitaire = calculer_echeanciers_prets(
+            [1.0], [float(conditions.get('taux', 0.0))], [int(conditions.get('duree_mois', 36))],
+            [conditions.get('type', 'annuite')], [int(conditions.get('differe_mois', 0))], NB_MOIS
+        )
+        principal = principal + montant_supplementaire * unitaire['principal']
+        interets = interets + montant_supplementaire * unitaire['interets']
+    principal = principal * change['emprunts']
+    interets = interets * change['emprunts']
+
+    # Compte de résultat annuel
+    def _annualiser(flux):
+        return flux.reshape(n_scenarios, NB_ANNEES, 12).sum(axis=2)
+
+    ca_annuel = _annualiser(ca)
+    cv_annuel = _annualiser(charges_variables)
+    cf_annuel = _annualiser(charges_fixes)
+    salaires_annuel = _annualiser(salaires)
+    interets_annuel = _annualiser(interets)
+
+    resultat_avant_impot = (
+        ca_annuel - cv_annuel - cf_annuel - salaires_annuel - interets_annuel
+        - hypotheses['amortissements'][None, :]
+    )
+    impots = np.maximum(resultat_avant_impot, 0.0) * hypotheses['taux_impot']
+    resultat_net = resultat_avant_impot - impots
+
+    # Seuil de rentabilité (charges fixes, salaires et frais financiers)
+    marge = ca_annuel - cv_annuel
+    taux_marge = np.divide(marge, ca_annuel, out=np.zeros_like(marge), where=ca_annuel > 0)
+    couts_fixes = cf_annuel + salaires_annuel + interets_annuel
+    seuil_rentabilite = np.divide(couts_fixes, taux_marge, out=np.zeros_like(marge), where=taux_marge > 0)
+
+    # Flux de trésorerie : délais clients/fournisseurs, impôt payé le premier mois de l'année suivante
+    encaissements = _decaler(ca, _en_colonne(scenarios.get('delai_clients', hypotheses['delai_clients']), n_scenarios) / JOURS_PAR_MOIS)
+    achats_payes = _decaler(charges_variables, _en_colonne(scenarios.get('delai_fournisseurs', hypotheses['delai_fournisseurs']), n_scenarios) / JOURS_PAR_MOIS)
+    impots_payes = np.zeros((n_scenarios, NB_MOIS))
+    impots_payes[:, 12::12] = impots[:, :NB_ANNEES - 1]
+
+    decaissements = achats_payes + charges_fixes + salaires + principal + interets + impots_payes
+    solde_mensuel = encaissements - decaissements
+    tresorerie_initiale = (
+        hypotheses['tresorerie_initiale']
+        + _en_colonne(scenarios.get('apport_tresorerie', 0.0), n_scenarios)
+        + montant_supplementaire
+    )
+    tresorerie = tresorerie_initiale + np.cumsum(solde_mensuel, axis=1)
+
+    # Résultat mensuel avant impôt (dotations réparties sur l'année)
+    resultat_mensuel = (
+        ca - charges_variables - charges_fixes - salaires - interets
+        - hypotheses['amortissements'][annee_du_mois][None, :] / 12
+    )
+
+    return {
+        'n_scenarios': n_scenarios,
+        'ca': ca,
+        'encaissements': encaissements,
+        'decaissements': decaissements,
+        'solde_mensuel': solde_mensuel,
+        'tresorerie': tresorerie,
+        'tresorerie_initiale': tresorerie_initiale[:, 0],
+        'resultat_mensuel': resultat_mensuel,
+        'ca_annuel': ca_annuel,
+        'resultat_avant_impot': resultat_avant_impot,
+        'impots': impots,
+        'resultat_net': resultat_net,
+        'seuil_rentabilite': seuil_rentabilite,
+        'service_dette_annuel': _annualiser(principal) + interets_annuel,
+        'taux_change': taux_change
+    }
@@ -0,0 +1,116 @@
+"""
+Analyse de sensibilité des hypothèses financières
+
+Toutes les variations (±x % sur chaque hypothèse clé) sont empilées sur l'axe
+des scénarios et évaluées en un seul appel du moteur de projection.
+"""
+
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from utils.profilage_execution import tracer
+
+from .projections import projeter_scenarios
+
+# Hypothèse -> (libellé, clé de scénario, valeur de base relative ou absolue)
+VARIABLES_SENSIBILITE = {
+    'ca': ("Chiffre d'affaires", 'facteur_ca', None),
+    'taux_charges_variables': ("Taux de charges variables", 'taux_charges_variables', 'taux_charges_variables'),
+    'charges_fixes': ("Charges fixes", 'facteur_charges_fixes', None),
+    'salaires': ("Salaires", 'facteur_salaires', None),
+    'taux_emprunt': ("Taux d'emprunt", 'facteur_taux_emprunt', None),
+    'delai_clients': ("Délai clients", 'delai_clients', 'delai_clients'),
+    'delai_fournisseurs': ("Délai fournisseurs", 'delai_fournisseurs', 'delai_fournisseurs')
+}
+
+
+def construire_scenarios_sensibilite(hypotheses: Dict[str, Any], variation: float = 0.10,
+                                     variables: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Construit le lot de scénarios : base, puis -x % et +x % pour chaque variable
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        variation (float): Variation relative appliquée (0.10 = ±10 %)
+        variables (list, optional): Variables à perturber (toutes par défaut)
+
+    Returns:
+        dict: Scénarios (2V + 1 lignes) et ordre des variables
+    """
+    variables = variables or list(VARIABLES_SENSIBILITE)
+    n_scenarios = 2 * len(variables) + 1
+
+    scenarios = {}
+    for i, variable in enumerate(variables):
+        _, cle, base = VARIABLES_SENSIBILITE[variable]
+        valeur_base = hypotheses[base] if base else 1.0
+        if cle not in scenarios:
+            scenarios[cle] = np.full(n_scenarios, float(valeur_base))
+        scenarios[cle][1 + 2 * i] = valeur_base * (1 - variation)
+        scenarios[cle][2 + 2 * i] = valeur_base * (1 + variation)
+
+    return {'scenarios': scenarios, 'variables': variables, 'n_scenarios': n_scenarios}
+
+
+@tracer('calcul')
+def analyser_sensibilite(hypotheses: Dict[str, Any], variation: float = 0.10,
+                         variables: Optional[List[str]] = None, annee_seuil: int = 1,
+                         annee_resultat: int = 5) -> Dict[str, Any]:
+    """
+    Mesure l'impact de chaque hypothèse sur le seuil de rentabilité, le résultat
+    net et la trésorerie minimale
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        variation (float): Variation relative appliquée (0.10 = ±10 %)
+        variables (list, optional): Variables à perturber (toutes par défaut)
+        annee_seuil (int): Année du seuil de rentabilité analysé
+        annee_resultat (int): Année du résultat net analysé
+
+    Returns:
+        dict: Données de diagramme en tornade par indicateur, triées par amplitude
+    """
+    try:
+        lot = construire_scenarios_sensibilite(hypotheses, variation, variables)
+        projection = projeter_scenarios(hypotheses, lot['scenarios'])
+
+        indicateurs = {
+            f"seuil_rentabilite_annee{annee_seuil}": projection['seuil_rentabilite'][:, annee_seuil - 1],
+            f"resultat_net_annee{annee_resultat}": projection['resultat_net'][:, annee_resultat - 1],
+            # Les délais de paiement n'agissent que sur la trésorerie
+            "tresorerie_minimale": projection['tresorerie'].min(axis=1)
+        }
+
+        n_variables = len(lot['variables'])
+        resultats = {}
+        for nom, valeurs in indicateurs.items():
+            base = valeurs[0]
+            basses = valeurs[1::2][:n_variables]
+            hautes = valeurs[2::2][:n_variables]
+            amplitudes = np.abs(hautes - basses)
+            ordre = np.argsort(-amplitudes, kind='stable')
+
+            resultats[nom] = {
+                'base': float(base),
+                'lignes': [
+                    {
+                        'variable': lot['variables'][j],
+                        'libelle': VARIABLES_SENSIBILITE[lot['variables'][j]][0],
+                        'valeur_basse': float(basses[j]),
+                        'valeur_haute': float(hautes[j]),
+                        'ecart_bas': float(basses[j] - base),
+                        'ecart_haut': float(hautes[j] - base),
+                        'amplitude': float(amplitudes[j])
+                    }
+                    for j in ordre
+                ]
+            }
+
+        return {
+            'success': True,
+            'variation': variation,
+            'indicateurs': resultats
+        }
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,140 @@
+"""
+Simulation de Monte Carlo des projections financières
+
+Tire des milliers de scénarios (croissance du CA, taux de charges variables,
+délais de paiement, change USD/CDF) et les projette en une seule passe du
+moteur vectorisé pour mesurer le risque de rupture de trésorerie.
+"""
+
+import time
+import numpy as np
+from typing import Dict, Any, Optional
+
+from utils.profilage_execution import tracer
+
+from .projections import projeter_scenarios, NB_ANNEES, NB_MOIS
+
+# Écarts-types par défaut des hypothèses aléatoires
+VOLATILITES_DEFAUT = {
+    'croissance_ca': 0.15,           # choc annuel (log) sur le CA
+    'taux_charges_variables': 0.05,  # en points de CA
+    'delai_clients': 15.0,           # jours
+    'delai_fournisseurs': 10.0,      # jours
+    'change': 0.20,                  # volatilité annuelle du taux USD/CDF
+    'derive_change': 0.0             # dépréciation annuelle du CDF au-delà du chemin de change saisi
+}
+
+PERCENTILES = (5, 50, 95)
+
+
+def tirer_scenarios(hypotheses: Dict[str, Any], n_scenarios: int = 10000,
+                    graine: Optional[int] = 42, volatilites: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Tire les variations aléatoires des hypothèses
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        n_scenarios (int): Nombre de scénarios
+        graine (int, optional): Graine du générateur pour des tirages reproductibles
+        volatilites (dict, optional): Écarts-types remplaçant `VOLATILITES_DEFAUT`
+
+    Returns:
+        dict: Variations au format attendu par `projeter_scenarios`
+    """
+    vol = {**VOLATILITES_DEFAUT, **(volatilites or {})}
+    rng = np.random.default_rng(graine)
+
+    # Croissance du CA : marche aléatoire log-normale annuelle (moyenne 1)
+    sigma_ca = vol['croissance_ca']
+    chocs_ca = rng.normal(-sigma_ca ** 2 / 2, sigma_ca, size=(n_scenarios, NB_ANNEES))
+    facteur_ca = np.exp(np.cumsum(chocs_ca, axis=1))
+
+    taux_cv = np.clip(
+        hypotheses['taux_charges_variables'] + rng.normal(0, vol['taux_charges_variables'], n_scenarios),
+        0.0, 0.99
+    )
+    delai_clients = np.maximum(hypotheses['delai_clients'] + rng.normal(0, vol['delai_clients'], n_scenarios), 0.0)
+    delai_fournisseurs = np.maximum(hypotheses['delai_fournisseurs'] + rng.normal(0, vol['delai_fournisseurs'], n_scenarios), 0.0)
+
+    # Taux CDF par USD : marche aléatoire mensuelle autour du chemin de change saisi
+    sigma_mensuel = vol['change'] / np.sqrt(12)
+    chocs_change = rng.normal(vol['derive_change'] / 12 - sigma_mensuel ** 2 / 2, sigma_mensuel, size=(n_scenarios, NB_MOIS))
+    taux_change = hypotheses['taux_change'][None, :] * np.exp(np.cumsum(chocs_change, axis=1))
+
+    return {
+        'facteur_ca': facteur_ca,
+        'taux_charges_variables': taux_cv,
+        'delai_clients': delai_clients,
+        'delai_fournisseurs': delai_fournisseurs,
+        'taux_change': taux_change
+    }
+
+
+@tracer('calcul')
+def simuler_monte_carlo(hypotheses: Dict[str, Any], n_scenarios: int = 10000,
+                        graine: Optional[int] = 42, volatilites: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Simule la distribution des résultats et de la trésorerie sur 5 ans
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        n_scenarios (int): Nombre de scénarios
+        graine (int, optional): Graine du générateur
+        volatilites (dict, optional): Écarts-types des hypothèses aléatoires
+
+    Returns:
+        dict: Probabilité de trésorerie négative, percentiles des résultats nets
+        annuels et de la trésorerie mensuelle, analyse des creux de trésorerie
+    """
+    try:
+        debut = time.perf_counter()
+
+        scenarios = tirer_scenarios(hypotheses, n_scenarios, graine, volatilites)
+        projection = projeter_scenarios(hypotheses, scenarios)
+
+        tresorerie = projection['tresorerie']
+        resultat_net = projection['resultat_net']
+
+        # Risque de rupture : part des scénarios passant sous zéro au moins une fois
+        negative = tresorerie < 0
+        probabilite_negative = float(negative.any(axis=1).mean())
+
+        # Creux (drawdown) : écart au plus haut atteint depuis le démarrage
+        tresorerie_avec_depart = np.concatenate(
+            [projection['tresorerie_initiale'][:, None], tresorerie], axis=1
+        )
+        plus_haut = np.maximum.accumulate(tresorerie_avec_depart, axis=1)[:, 1:]
+        creux = plus_haut - tresorerie
+        creux_max = creux.max(axis=1)
+        mois_creux_max = creux.argmax(axis=1)
+        frequence_mois = np.bincount(mois_creux_max[creux_max > 0], minlength=NB_MOIS)
+
+        percentiles_resultat = np.percentile(resultat_net, PERCENTILES, axis=0)
+        percentiles_tresorerie = np.percentile(tresorerie, PERCENTILES, axis=0)
+
+        return {
+            'success': True,
+            'n_scenarios': n_scenarios,
+            'graine': graine,
+            'probabilite_tresorerie_negative': probabilite_negative,
+            'probabilite_negative_par_mois': negative.mean(axis=0).tolist(),
+            'resultat_net_percentiles': {
+                f"P{p}": percentiles_resultat[i].tolist() for i, p in enumerate(PERCENTILES)
+            },
+            'tresorerie_percentiles': {
+                f"P{p}": percentiles_tresorerie[i].tolist() for i, p in enumerate(PERCENTILES)
+            },
+            'tresorerie_minimale_percentiles': {
+                f"P{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(tresorerie.min(axis=1), PERCENTILES))
+            },
+            'creux_max_percentiles': {
+                f"P{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(creux_max, PERCENTILES))
+            },
+            'mois_pire_creux': int(frequence_mois.argmax()) + 1 if frequence_mois.any() else None,
+            'mois_tresorerie_p5_minimale': int(percentiles_tresorerie[0].argmin()) + 1,
+            'frequence_mois_pire_creux': frequence_mois.tolist(),
+            'duree_calcul_ms': (time.perf_counter() - debut) * 1000
+        }
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
@@ -0,0 +1,209 @@
+"""
+Recherche d'objectif (goal seek) sur le moteur de projection
+
+Trouve la valeur d'une hypothèse qui amène un indicateur à une cible, par
+bissection vectorisée : à chaque itération, une grille de points de
+l'intervalle est évaluée en un seul appel du moteur, puis l'intervalle est
+resserré autour du premier changement de signe.
+"""
+
+import time
+import numpy as np
+from typing import Dict, Any, Optional, Callable
+
+from utils.profilage_execution import tracer
+
+from .projections import projeter_scenarios
+
+# Variables ajustables et indicateurs visés, avec leurs libellés
+VARIABLES_OBJECTIF = {
+    'ca_mensuel': "CA mensuel moyen de l'année 1 ($)",
+    'taux_charges_variables': "Taux de charges variables (%)",
+    'charges_fixes_mensuelles': "Charges fixes mensuelles de l'année 1 ($)",
+    'montant_emprunt': "Montant d'emprunt supplémentaire ($)",
+    'apport_tresorerie': "Apport de trésorerie au démarrage ($)"
+}
+
+INDICATEURS_OBJECTIF = {
+    'resultat_mois': "Résultat du mois",
+    'resultat_net_annee': "Résultat net de l'année",
+    'tresorerie_minimale': "Trésorerie minimale jusqu'au mois",
+    'tresorerie_fin_mois': "Trésorerie en fin de mois"
+}
+
+
+def _preparer_variable(hypotheses: Dict[str, Any], variable: str) -> Callable[[np.ndarray], Dict[str, np.ndarray]]:
+    """Retourne la fonction qui traduit des valeurs candidates (S,) en scénarios du moteur."""
+    ca_annee1 = float(hypotheses['ca_annees'][0])
+    cf_annee1 = float(hypotheses['charges_fixes_annees'][0])
+
+    if variable == 'ca_mensuel':
+        # Le CA des années suivantes évolue dans la même proportion
+        if ca_annee1 <= 0:
+            raise ValueError("Le chiffre d'affaires de l'année 1 doit être renseigné")
+        return lambda x: {'facteur_ca': x * 12 / ca_annee1}
+    if variable == 'taux_charges_variables':
+        return lambda x: {'taux_charges_variables': x / 100}
+    if variable == 'charges_fixes_mensuelles':
+        if cf_annee1 <= 0:
+            raise ValueError("Les charges fixes de l'année 1 doivent être renseignées")
+        return lambda x: {'facteur_charges_fixes': x * 12 / cf_annee1}
+    if variable == 'montant_emprunt':
+        return lambda x: {'montant_emprunt_supplementaire': x}
+    if variable == 'apport_tresorerie':
+        return lambda x: {'apport_tresorerie': x}
+    raise ValueError(f"Variable inconnue : {variable}")
+
+
+def _preparer_indicateur(indicateur: str, mois: int, annee: int) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    """Retourne la fonction qui extrait l'indicateur (S,) d'une projection."""
+    if indicateur == 'resultat_mois':
+        return lambda p: p['resultat_mensuel'][:, mois - 1]
+    if indicateur == 'resultat_net_annee':
+        return lambda p: p['resultat_net'][:, annee - 1]
+    if indicateur == 'tresorerie_minimale':
+        return lambda p: p['tresorerie'][:, :mois].min(axis=1)
+    if indicateur == 'tresorerie_fin_mois':
+        return lambda p: p['tresorerie'][:, mois - 1]
+    raise ValueError(f"Indicateur inconnu : {indicateur}")
+
+
+def bornes_par_defaut(hypotheses: Dict[str, Any], variable: str) -> tuple:
+    """
+    Intervalle de recherche par défaut d'une variable
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        variable (str): Variable recherchée
+
+    Returns:
+        tuple: (borne_min, borne_max)
+    """
+    ca_mensuel = float(hypotheses['ca_annees'][0]) / 12
+    cf_mensuelles = float(hypotheses['charges_fixes_annees'][0]) / 12
+    if variable == 'ca_mensuel':
+        return 0.0, max(ca_mensuel * 10, 100000.0)
+    if variable == 'taux_charges_variables':
+        return 0.0, 100.0
+    if variable == 'charges_fixes_mensuelles':
+        return 0.0, max(cf_mensuelles * 10, 10000.0)
+    return 0.0, max(float(hypotheses['ca_annees'].max()) * 2, 100000.0)
+
+
+@tracer('calcul')
+def resoudre_objectif(hypotheses: Dict[str, Any], variable: str, indicateur: str, cible: float = 0.0,
+                      mois: int = 12, annee: int = 1, borne_min: Optional[float] = None,
+                      borne_max: Optional[float] = None, tolerance: float = 0.01,
+                      points_par_iteration: int = 32, max_iterations: int = 20) -> Dict[str, Any]:
+    """
+    Cherche la valeur d'une variable pour laquelle l'indicateur atteint la cible
+
+    Args:
+        hypotheses (dict): Hypothèses du moteur de projection
+        variable (str): Variable à ajuster (voir `VARIABLES_OBJECTIF`)
+        indicateur (str): Indicateur visé (voir `INDICATEURS_OBJECTIF`)
+        cible (float): Valeur cible de l'indicateur
+        mois (int): Mois de référence des indicateurs mensuels, ou horizon de la
+            trésorerie minimale (1-60)
+        annee (int): Année de référence pour les indicateurs annuels (1-5)
+        borne_min (float, optional): Borne basse de la recherche
+        borne_max (float, optional): Borne haute de la recherche
+        tolerance (float): Largeur d'intervalle à atteindre, dans l'unité de la variable
+        points_par_iteration (int): Points évalués en une passe à chaque itération
+        max_iterations (int): Nombre maximal d'itérations
+
+    Returns:
+        dict: Valeur trouvée, indicateur atteint, itérations et durée ; si la cible
+              est déjà dépassée sur tout l'intervalle, la valeur est la borne basse
+              quand l'indicateur croît avec la variable, et la recherche échoue
+              (valeur au-delà de la borne haute) quand il décroît
+    """
+    try:
+        debut = time.perf_counter()
+
+        vers_scenarios = _preparer_variable(hypotheses, variable)
+        extraire = _preparer_indicateur(indicateur, mois, annee)
+        defaut_min, defaut_max = bornes_par_defaut(hypotheses, variable)
+        bas = defaut_min if borne_min is None else float(borne_min)
+        haut = defaut_max if borne_max is None else float(borne_max)
+
+        def evaluer(valeurs):
+            return extraire(projeter_scenarios(hypotheses, vers_scenarios(valeurs))) - cible
+
+        evaluations = 0
+        iterations = 0
+        while True:
+            grille = np.linspace(bas, haut, points_par_iteration)
+            ecarts = evaluer(grille)
+            evaluations += grille.size
+
+            # Premier point où l'écart change de signe (ou s'annule)
+            changements = np.nonzero(np.sign(ecarts[:-1]) != np.sign(ecarts[1:]))[0]
+            exacts = np.nonzero(ecarts == 0)[0]
+            if exacts.size and (not changements.size or exacts[0] <= changements[0]):
+                bas = haut = grille[exacts[0]]
+                break
+            if not changements.size:
+                if iterations == 0 and ecarts[0] > 0 and ecarts[-1] < ecarts[0]:
+                    # Indicateur décroissant (charges) encore au-dessus de la cible à la borne haute
+                    return {
+                        'success': False,
+                        'error': f"Cible dépassée sur tout l'intervalle : la valeur cherchée est au-delà de la borne haute ({haut:g})",
+                        'indicateur_bornes': (float(ecarts[0] + cible), float(ecarts[-1] + cible)),
+                        'bornes': (bas, haut)
+                    }
+                if iterations == 0 and ecarts[0] > 0:
+                    # Indicateur croissant déjà au-dessus de la cible à la borne basse (aucun emprunt nécessaire...)
+                    valeur = float(bas)
+                    return {
+                        'success': True,
+                        'variable': variable,
+                        'indicateur': indicateur,
+                        'valeur': valeur,
+                        'indicateur_atteint': float(ecarts[0] + cible),
+                        'cible': cible,
+                        'intervalle': (valeur, valeur),
+                        'iterations': 0,
+                        'evaluations': evaluations,
+                        'duree_calcul_ms': (time.perf_counter() - debut) * 1000
+                    }
+                if iterations == 0:
+                    return {
+                        'success': False,
+                        'error': "Objectif inatteignable dans l'intervalle de recherche",
+                        'indicateur_bornes': (float(ecarts[0] + cible), float(ecarts[-1] + cible)),
+                        'bornes': (bas, haut)
+                    }
+                break
+
+            i = changements[0]
+            bas, haut = grille[i], grille[i + 1]
+            iterations += 1
+            if haut - bas <= tolerance or iterations >= max_iterations:
+                break
+
+        # Interpolation linéaire finale dans le dernier intervalle
+        ecart_bas, ecart_haut = evaluer(np.array([bas, haut]))
+        evaluations += 2
+        if ecart_haut != ecart_bas:
+            valeur = bas - ecart_bas * (haut - bas) / (ecart_haut - ecart_bas)
+        else:
+            valeur = bas
+        valeur = float(np.clip(valeur, bas, haut))
+        atteint = float(evaluer(np.array([valeur]))[0] + cible)
+
+        return {
+            'success': True,
+            'variable': variable,
+            'indicateur': indicateur,
+            'valeur': valeur,
+            'indicateur_atteint': atteint,
+            'cible': cible,
+            'intervalle': (float(bas), float(haut)),
+            'iterations': iterations,
+            'evaluations': evaluations + 1,
+            'duree_calcul_ms': (time.perf_counter() - debut) * 1000
+        }
+
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
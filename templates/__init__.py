@@ -10,10 +10,19 @@ from .template_manager import (
     get_secteurs,
     get_system_messages,
     get_organisation_info,
+    get_routage_modeles,
     get_templates_list,
     TEMPLATES_DISPONIBLES
 )
 
+# Cache des prompts partagé par les sessions
+from .cache import (
+    memoiser_template,
+    verifier_templates,
+    invalider_cache_templates,
+    statistiques_cache_templates
+)
+
 # Nouveau système (business_plan_prompts.py) - Import conditionnel pour éviter les conflits
 try:
     from .business_plan_prompts import (
@@ -37,9 +46,16 @@ __all__ = [
     'get_secteurs',
     'get_system_messages',
     'get_organisation_info',
+    'get_routage_modeles',
     'get_templates_list',
     'TEMPLATES_DISPONIBLES',
     
+    # Cache
+    'memoiser_template',
+    'verifier_templates',
+    'invalider_cache_templates',
+    'statistiques_cache_templates',
+    
     # Nouveau système (si disponible)
     'get_business_plan_sections',
     'get_user_queries',
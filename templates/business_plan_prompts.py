@@ -4,7 +4,9 @@ Adapté pour les templates RDC (COPA TRANSFORME, Virunga, IP Femme)
 """
 
 from typing import Dict, Any
+from templates.cache import memoiser_template
 
+@memoiser_template
 def get_system_messages_origin_style(template_name: str = "COPA TRANSFORME") -> Dict[str, str]:
     """
     Messages système EXACTS de Origin.txt adaptés pour templates RDC
@@ -331,6 +333,7 @@ def get_system_messages_origin_style(template_name: str = "COPA TRANSFORME") ->
         """
     }
 
+@memoiser_template
 def get_queries_origin_style() -> Dict[str, str]:
     """
     Requêtes EXACTES de Origin.txt
@@ -348,6 +351,7 @@ def get_queries_origin_style() -> Dict[str, str]:
         "Annexes": "Inclure tous les documents annexes pertinents pour étayer le plan d'affaires."
     }
 
+@memoiser_template
 def get_template_context(template_name: str) -> str:
     """
     Contexte spécifique pour chaque template
@@ -377,6 +381,7 @@ def get_template_context(template_name: str) -> str:
     
     return contexts.get(template_name, contexts["COPA TRANSFORME"])
 
+@memoiser_template
 def get_sections_configuration_origin_style(template_name: str) -> Dict[str, Dict[str, str]]:
     """
     Configuration complète Origin.txt pour un template donné
@@ -0,0 +1,138 @@
+"""
+Cache des templates partagé par toutes les sessions du processus
+
+Les constructeurs de prompts (messages système, configuration des sections)
+assemblent de longues f-strings à partir du nom du template. Décorés par
+`memoiser_template`, ils ne sont exécutés qu'une fois par template et par
+processus : toutes les sessions Streamlit partagent le résultat.
+
+Invalidation : `verifier_templates()` (appelée à chaque exécution de
+l'application) compare la date de modification des fichiers de templates à
+celle du dernier chargement ; si l'un d'eux a changé, les modules sont
+rechargés et le cache vidé. `invalider_cache_templates()` force l'opération.
+"""
+
+import os
+import sys
+import importlib
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Modules de templates, dans l'ordre de rechargement (dépendances d'abord)
+MODULES_TEMPLATES = (
+    'templates.copa_transforme',
+    'templates.virunga',
+    'templates.ip_femme',
+    'templates.template_manager',
+    'templates.business_plan_prompts',
+    'templates',
+    'business_plan_prompts_origin_exact'
+)
+
+_verrou = threading.RLock()
+_memo: Dict[Tuple, Any] = {}
+_signature: Optional[Tuple] = None
+_statistiques = {'appels': 0, 'constructions': 0, 'invalidations': 0}
+
+
+def _copie(valeur: Any) -> Any:
+    """Copie des dictionnaires et listes (les chaînes, immuables, sont partagées)"""
+    if isinstance(valeur, dict):
+        return {cle: _copie(v) for cle, v in valeur.items()}
+    if isinstance(valeur, list):
+        return [_copie(v) for v in valeur]
+    return valeur
+
+
+def memoiser_template(fonction: Callable) -> Callable:
+    """
+    Mémorise le résultat d'un constructeur de prompts pour tout le processus
+
+    La clé est le nom de la fonction et ses arguments (le nom du template).
+    Chaque appelant reçoit une copie : modifier le dictionnaire renvoyé
+    n'altère pas le cache. Après rechargement d'un module, l'appel est
+    redirigé vers la nouvelle définition, même depuis un module qui avait
+    importé l'ancienne.
+
+    Args:
+        fonction (callable): Constructeur à arguments hachables
+
+    Returns:
+        callable: Constructeur mémorisé
+    """
+    nom_module, nom = fonction.__module__, fonction.__name__
+
+    @wraps(fonction)
+    def constructeur_memorise(*args, **kwargs):
+        cle = (nom_module, nom, args, tuple(sorted(kwargs.items())))
+        with _verrou:
+            _statistiques['appels'] += 1
+            if cle not in _memo:
+                actuelle = getattr(importlib.import_module(nom_module), nom, constructeur_memorise)
+                _memo[cle] = getattr(actuelle, '__wrapped__', fonction)(*args, **kwargs)
+                _statistiques['constructions'] += 1
+            return _copie(_memo[cle])
+
+    return constructeur_memorise
+
+
+def _signature_fichiers() -> Tuple:
+    """Date de modification et taille des fichiers des modules de templates chargés"""
+    signature = []
+    for nom_module in MODULES_TEMPLATES:
+        fichier = getattr(sys.modules.get(nom_module), '__file__', None)
+        if fichier:
+            try:
+                etat = os.stat(fichier)
+                signature.append((nom_module, etat.st_mtime_ns, etat.st_size))
+            except OSError:
+                signature.append((nom_module, None, None))
+    return tuple(signature)
+
+
+def invalider_cache_templates(recharger: bool = True) -> None:
+    """
+    Vide le cache des templates et recharge leurs modules
+
+    Args:
+        recharger (bool): Recharge aussi les modules déjà importés
+    """
+    global _signature
+    with _verrou:
+        if recharger:
+            for nom_module in MODULES_TEMPLATES:
+                module = sys.modules.get(nom_module)
+                if module is not None:
+                    importlib.reload(module)
+        _memo.clear()
+        _signature = _signature_fichiers()
+        _statistiques['invalidations'] += 1
+
+
+def verifier_templates() -> bool:
+    """
+    Invalide le cache si un fichier de template a été modifié depuis le dernier chargement
+
+    Returns:
+        bool: True si le cache a été invalidé
+    """
+    global _signature
+    signature = _signature_fichiers()
+    with _verrou:
+        if _signature is None:
+            _signature = signature
+            return False
+        if signature == _signature:
+            return False
+    invalider_cache_templates()
+    return True
+
+
+def statistiques_cache_templates() -> Dict[str, int]:
+    """
+    Returns:
+        dict: Appels, constructions effectives, invalidations et entrées en cache
+    """
+    with _verrou:
+        return {**_statistiques, 'entrees': len(_memo)}
@@ -59,19 +59,22 @@ TEMPLATES_DISPONIBLES = {
         "metaprompt": METAPROMPT_COPA_TRANSFORME,
         "system_messages": SYSTEM_MESSAGES_COPA_TRANSFORME,
         "secteurs": SECTEURS_COPA_TRANSFORME,
-        "organisation": COPA_TRANSFORME_ORG
+        "organisation": COPA_TRANSFORME_ORG,
+        "routage_modeles": {}  # Section -> gamme ou modèle (voir services/ai/routage.py)
     },
     "Virunga": {
         "metaprompt": METAPROMPT_VIRUNGA,
         "system_messages": SYSTEM_MESSAGES_VIRUNGA,
         "secteurs": SECTEURS_VIRUNGA,
-        "organisation": VIRUNGA_ORG
+        "organisation": VIRUNGA_ORG,
+        "routage_modeles": {}  # Section -> gamme ou modèle (voir services/ai/routage.py)
     },
     "IP Femme": {
         "metaprompt": METAPROMPT_IP_FEMME,
         "system_messages": SYSTEM_MESSAGES_IP_FEMME,
         "secteurs": SECTEURS_IP_FEMME,
-        "organisation": IP_FEMME_ORG
+        "organisation": IP_FEMME_ORG,
+        "routage_modeles": {}  # Section -> gamme ou modèle (voir services/ai/routage.py)
     }
 }
 
@@ -153,6 +156,21 @@ def get_organisation_info(nom_template):
         return template["organisation"]
     return COPA_TRANSFORME_ORG  # Par défaut
 
+def get_routage_modeles(nom_template):
+    """
+    Récupère les exceptions du template à la politique de routage des modèles
+    
+    Args:
+        nom_template (str): Nom du template
+    
+    Returns:
+        dict: Nom de section -> gamme ("economique", "standard", "premium") ou nom de modèle
+    """
+    template = get_template(nom_template)
+    if template:
+        return template.get("routage_modeles", {})
+    return {}
+
 def get_templates_list():
     """
     Récupère la liste des noms de templates disponibles
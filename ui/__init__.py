@@ -12,7 +12,14 @@ from .components import (
     bouton_sauvegarder_avec_confirmation,
     widget_validation_donnees,
     afficher_template_info,
-    navigation_etapes
+    navigation_etapes,
+    conserver_etat_widgets,
+    choisir_mode_saisie,
+    editeur_tableau,
+    afficher_sauvegarde_projet,
+    afficher_rapport_demarrage,
+    afficher_memoire_sessions,
+    afficher_profil_executions
 )
 
 from . import pages
@@ -28,5 +35,12 @@ __all__ = [
     'widget_validation_donnees',
     'afficher_template_info',
     'navigation_etapes',
+    'conserver_etat_widgets',
+    'choisir_mode_saisie',
+    'editeur_tableau',
+    'afficher_sauvegarde_projet',
+    'afficher_rapport_demarrage',
+    'afficher_memoire_sessions',
+    'afficher_profil_executions',
     'pages'
 ]
\ No newline at end of file
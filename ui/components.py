@@ -4,8 +4,11 @@ Configuration et widgets communs pour l'interface utilisateur
 
 import streamlit as st
 import os
-from typing import Dict, List, Any, Optional
+import pandas as pd
+from io import StringIO
+from typing import Dict, List, Any, Optional, Sequence
 from templates import get_templates_list, get_secteurs
+from utils.validation_utils import valider_tableau
 from utils.token_utils import (
     initialiser_compteur_tokens, 
     obtenir_statistiques_tokens, 
@@ -199,6 +202,14 @@ def afficher_compteur_tokens():
         modele_selectionne = option_selectionnee.split(" ")[0]
         st.session_state['modele_openai_sidebar'] = modele_selectionne
         
+        st.checkbox(
+            "Routage automatique par section",
+            value=True,
+            key="routage_modeles_actif",
+            help="Modèle économique pour les suggestions et sections courtes, premium pour les sections analytiques ; "
+                 "sinon le modèle ci-dessus pour toutes les sections."
+        )
+        
         # Activer/désactiver la limite
         limite_activee = st.checkbox(
             "Activer la limite de tokens",
@@ -225,7 +236,7 @@ def afficher_compteur_tokens():
             configurer_limite_tokens(0, False)
         
         # Bouton de réinitialisation
-        if st.button("🔄 Réinitialiser compteur", key="reset_tokens"):
+        if st.button("🔄 Réinitialiser compteur", key="btn_reset_tokens"):
             reinitialiser_compteur()
             st.rerun()
     
@@ -281,6 +292,7 @@ def afficher_compteur_tokens():
         <small>
         📤 Envoyés: {formater_nombre_tokens(stats['input_tokens'])} | 
         📥 Reçus: {formater_nombre_tokens(stats['output_tokens'])}<br>
+        🗄️ En cache: {formater_nombre_tokens(stats['cached_tokens'])} (−{stats['cache_savings']:.4f} USD)<br>
         🔄 Requêtes: {stats['requests_count']} | 
         ⏱️ Session: {stats['session_duration']}<br>
         🤖 Modèle: {stats['model_used']}
@@ -288,6 +300,78 @@ def afficher_compteur_tokens():
         """,
         unsafe_allow_html=True
     )
+    
+    afficher_quotas_du_jour()
+    afficher_decisions_routage()
+
+def afficher_quotas_du_jour():
+    """Affiche la consommation du jour, toutes sessions confondues, face aux quotas"""
+    from services.ai.quotas import consommation_du_jour
+    
+    try:
+        lignes = consommation_du_jour()
+    except Exception:
+        return  # Registre indisponible : le compteur de session reste affiché
+    
+    st.sidebar.markdown("**📅 Quotas du jour (toutes sessions)**")
+    libelles = {'utilisateur': "👤 Vous", 'global': "🌐 Application"}
+    for ligne in lignes:
+        libelle = libelles.get(ligne['portee'], f"🏢 {ligne['identifiant']}")
+        consomme = f"{formater_nombre_tokens(ligne['tokens'])} tokens · ${ligne['cout']:.4f}"
+        if ligne['quota_tokens']:
+            st.sidebar.progress(
+                min(1.0, ligne['tokens'] / ligne['quota_tokens']),
+                text=f"{libelle} : {consomme} / {formater_nombre_tokens(int(ligne['quota_tokens']))}"
+            )
+        elif ligne['quota_cout']:
+            st.sidebar.progress(
+                min(1.0, ligne['cout'] / ligne['quota_cout']),
+                text=f"{libelle} : {consomme} / ${ligne['quota_cout']:.2f}"
+            )
+        else:
+            st.sidebar.caption(f"{libelle} : {consomme}")
+
+def afficher_decisions_routage():
+    """Affiche les derniers choix de modèle par section et l'état observé des modèles"""
+    from services.ai.routage import decisions_routage
+    from services.ai.telemetrie import statistiques_modeles
+    
+    decisions = decisions_routage()
+    statistiques = statistiques_modeles()
+    if not decisions and not statistiques:
+        return
+    
+    with st.sidebar.expander("🧭 Routage des modèles", expanded=False):
+        if decisions:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Heure': decision['horodatage'].strftime('%H:%M:%S'),
+                        'Section': decision['section'],
+                        'Gamme': decision['gamme'],
+                        'Modèle': decision['modele'],
+                        'Raison': decision['raison']
+                    }
+                    for decision in decisions
+                ]),
+                hide_index=True,
+                width='stretch'
+            )
+        if statistiques:
+            st.caption("Modèles observés (derniers appels)")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Modèle': modele,
+                        'Appels': stats['appels'],
+                        'Erreurs': f"{stats['taux_erreur']:.0%}",
+                        'p95 (s)': round(stats['latence_p95_s'], 1) if stats['latence_p95_s'] is not None else None
+                    }
+                    for modele, stats in statistiques.items()
+                ]),
+                hide_index=True,
+                width='stretch'
+            )
 
 def afficher_indicateur_progression(etapes_completees: List[str], total_etapes: int = 11):
     """
@@ -527,6 +611,155 @@ def afficher_template_info():
             with cols[i % 2]:
                 st.markdown(f"• {secteur}")
 
+MODES_SAISIE = ["✏️ Champ par champ", "📋 Tableau (copier-coller, import CSV)"]
+
+def choisir_mode_saisie() -> bool:
+    """
+    Choix du mode de saisie des pages financières, commun à toutes les pages
+
+    Returns:
+        bool: True pour la saisie en tableau (`editeur_tableau`)
+    """
+    mode = st.radio(
+        "Mode de saisie", MODES_SAISIE, horizontal=True, key="mode_saisie_financiere",
+        help="Le mode tableau remplace les champs par un tableau unique : collez une plage copiée "
+             "depuis Excel ou importez un fichier CSV."
+    )
+    return mode == MODES_SAISIE[1]
+
+def _lire_csv(fichier, colonnes: List[str]) -> pd.DataFrame:
+    """
+    Lit un CSV exporté d'un tableur (séparateur `,` ou `;`, encodage UTF-8 ou Windows)
+
+    Les colonnes sont reconnues par leur nom ; à défaut, un fichier ayant
+    exactement le nombre de colonnes attendu est lu dans l'ordre.
+    """
+    contenu = fichier.getvalue()
+    for encodage in ('utf-8-sig', 'cp1252', 'latin-1'):
+        try:
+            texte = contenu.decode(encodage)
+            break
+        except UnicodeDecodeError:
+            continue
+    tableau = pd.read_csv(StringIO(texte), sep=None, engine='python', dtype=str, skipinitialspace=True)
+    tableau.columns = [str(colonne).strip() for colonne in tableau.columns]
+
+    if set(colonnes) <= set(tableau.columns):
+        return tableau[colonnes]
+    if len(tableau.columns) == len(colonnes):
+        # Sans en-tête reconnu : la première ligne est une donnée
+        entete = pd.DataFrame([tableau.columns], columns=tableau.columns)
+        tableau = pd.concat([entete, tableau], ignore_index=True)
+        tableau.columns = colonnes
+        return tableau
+    raise ValueError(f"Colonnes attendues : {', '.join(colonnes)} (trouvées : {', '.join(tableau.columns)})")
+
+def _normaliser_tableau(tableau: pd.DataFrame, colonnes_nombres: Sequence[str]) -> pd.DataFrame:
+    """Tableau comparable d'une exécution à l'autre (index et types uniformes)."""
+    normalise = tableau.reset_index(drop=True).copy()
+    for colonne in normalise.columns:
+        if colonne in colonnes_nombres:
+            normalise[colonne] = pd.to_numeric(normalise[colonne], errors='coerce').astype(float)
+        else:
+            normalise[colonne] = normalise[colonne].astype(str)
+    return normalise
+
+def editeur_tableau(
+    cle: str,
+    tableau: pd.DataFrame,
+    colonnes_montants: Sequence[str] = (),
+    colonnes_pourcentages: Sequence[str] = (),
+    colonnes_texte: Sequence[str] = (),
+    colonne_libelle: Optional[str] = None,
+    lignes_dynamiques: bool = False,
+    column_config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Saisie en masse d'un tableau avec `st.data_editor`, import CSV et validation vectorisée
+
+    Un seul widget remplace un champ par cellule ; une plage copiée depuis un
+    tableur peut y être collée directement. Le tableau affiché est repris des
+    données de la page (`tableau`) à chaque fois que celles-ci changent hors de
+    l'éditeur : la page doit donc y enregistrer le tableau nettoyé lorsque la
+    validation réussit, et uniquement dans ce cas.
+
+    Args:
+        cle (str): Identifiant unique du tableau
+        tableau (pd.DataFrame): Données actuelles de la page
+        colonnes_montants (list): Colonnes validées comme montants
+        colonnes_pourcentages (list): Colonnes validées comme pourcentages
+        colonnes_texte (list): Colonnes de libellés obligatoires
+        colonne_libelle (str, optional): Colonne nommant les lignes dans les messages
+        lignes_dynamiques (bool): Autorise l'ajout et la suppression de lignes
+        column_config (dict, optional): Configuration des colonnes de `st.data_editor`
+
+    Returns:
+        dict: Résultat de `valider_tableau` sur le tableau édité
+    """
+    regles = {
+        'colonnes_montants': colonnes_montants,
+        'colonnes_pourcentages': colonnes_pourcentages,
+        'colonnes_texte': colonnes_texte,
+        'colonne_libelle': colonne_libelle
+    }
+    colonnes_nombres = list(colonnes_montants) + list(colonnes_pourcentages)
+    cle_version, cle_base, cle_sortie = f"_version_{cle}", f"_tableau_{cle}", f"_sortie_{cle}"
+    version = st.session_state.get(cle_version, 0)
+    actuel = _normaliser_tableau(tableau, colonnes_nombres)
+
+    # Données modifiées hors de l'éditeur (autre mode de saisie, autre page) : on repart de celles-ci
+    sortie = st.session_state.get(cle_sortie)
+    if f"editeur_{cle}_{version}" not in st.session_state:
+        st.session_state[cle_base] = actuel
+    elif sortie is None or not actuel.equals(sortie):
+        st.session_state[cle_base] = actuel
+        version += 1
+
+    with st.expander("📥 Importer un fichier CSV", expanded=False):
+        st.caption(
+            f"Colonnes attendues : {', '.join(tableau.columns)}. Séparateur `,` ou `;`, "
+            "décimales avec virgule acceptées. Vous pouvez aussi coller directement dans le tableau "
+            "une plage copiée depuis Excel."
+        )
+        fichier = st.file_uploader("Fichier CSV", type=["csv", "txt"], key=f"import_{cle}")
+
+    if fichier is not None and fichier.file_id != st.session_state.get(f"_import_{cle}"):
+        st.session_state[f"_import_{cle}"] = fichier.file_id
+        try:
+            importe = valider_tableau(_lire_csv(fichier, list(tableau.columns)), **regles)
+            st.session_state[cle_base] = importe['donnees_nettoyees']
+            version += 1
+            if importe['valide']:
+                st.success(f"✅ {len(importe['donnees_nettoyees'])} ligne(s) importée(s)")
+            else:
+                st.warning(f"Import : {len(importe['erreurs'])} valeur(s) invalide(s) remplacée(s) par 0, à vérifier.")
+        except Exception as e:
+            st.error(f"Import impossible : {str(e)}")
+
+    st.session_state[cle_version] = version
+    edite = st.data_editor(
+        st.session_state[cle_base],
+        key=f"editeur_{cle}_{version}",
+        num_rows="dynamic" if lignes_dynamiques else "fixed",
+        hide_index=True,
+        width='stretch',
+        column_config=column_config
+    )
+
+    validation = valider_tableau(edite, **regles)
+    if validation['valide']:
+        st.session_state[cle_sortie] = _normaliser_tableau(validation['donnees_nettoyees'], colonnes_nombres)
+    else:
+        st.error(f"❌ {len(validation['erreurs'])} erreur(s) : le tableau n'est pas enregistré tant qu'elles ne sont pas corrigées.")
+        for erreur in validation['erreurs'][:10]:
+            st.markdown(f"- {erreur}")
+        if len(validation['erreurs']) > 10:
+            st.markdown(f"- ... et {len(validation['erreurs']) - 10} autre(s)")
+    for avertissement in validation['avertissements']:
+        st.warning(avertissement)
+
+    return validation
+
 def navigation_etapes():
     """Crée une navigation entre les étapes"""
     etapes = [
@@ -557,6 +790,234 @@ def navigation_etapes():
             if st.button("Suivant ➡️"):
                 st.session_state['etape_actuelle'] = etape_actuelle + 1
 
+def afficher_sauvegarde_projet():
+    """Choix du projet et état de la sauvegarde automatique, dans la sidebar"""
+    from services.business.persistance import etat_sauvegarde, lister_projets, changer_projet, utilisateur_identifie
+    
+    with st.sidebar.expander("💾 Projet et sauvegarde", expanded=False):
+        etat = etat_sauvegarde()
+        if not etat.get('active'):
+            st.caption("Sauvegarde automatique désactivée (MIXBPM_SAUVEGARDE_AUTO=0).")
+            return
+        
+        projets = {p['projet']: p for p in lister_projets()}
+        options = list(projets)
+        if etat['projet'] not in projets:
+            options.insert(0, etat['projet'])
+        
+        def libelle(projet: str) -> str:
+            if projet not in projets:
+                return "Projet en cours (pas encore sauvegardé)"
+            infos = projets[projet]
+            return f"{infos['nom_entreprise'] or 'Projet sans nom'} — {infos['modifie']:%d/%m/%Y %H:%M}"
+        
+        def ouvrir_projet():
+            changer_projet(st.session_state['_choix_projet'])
+        
+        def nouveau_projet():
+            st.session_state['_choix_projet'] = changer_projet()
+        
+        if projets:
+            if st.session_state.get('_choix_projet') not in options:
+                st.session_state['_choix_projet'] = etat['projet']
+            st.selectbox("Projet", options, format_func=libelle, key='_choix_projet', on_change=ouvrir_projet)
+        else:
+            # Session anonyme (ou premier projet) : les projets ne sont retrouvés que par leur lien
+            st.caption(libelle(etat['projet']))
+        st.button("➕ Nouveau projet", on_click=nouveau_projet, width='stretch')
+        
+        if etat['erreur']:
+            st.error(f"Échec de la dernière sauvegarde : {etat['erreur']}")
+        elif etat['en_attente']:
+            st.caption("⏳ Modifications en attente d'écriture")
+        elif etat['derniere_sauvegarde']:
+            st.caption(f"✅ Sauvegardé à {etat['derniere_sauvegarde']:%H:%M:%S} "
+                       f"({etat['cles_ecrites']} entrée(s) modifiée(s))")
+        st.caption("Le lien de cette page (paramètre `projet`) rouvre ce projet.")
+        if utilisateur_identifie() is None:
+            st.caption("🔒 Sans connexion, vos projets ne sont pas listés : conservez ce lien pour y revenir.")
+
+# Intervalle de suivi des travaux en arrière-plan (secondes)
+INTERVALLE_SUIVI_TRAVAUX = 2
+
+def afficher_travaux():
+    """Travaux en arrière-plan de la session, dans la sidebar, suivis jusqu'à leur récupération"""
+    from services.business.travaux import travaux_session
+
+    icones = {'termine': "✅", 'erreur': "❌", 'annule': "🚫", 'interrompu': "⚠️"}
+    for travail in st.session_state.pop('_travaux_recuperes', []):
+        if travail['statut'] == 'termine':
+            st.toast(f"{icones['termine']} {travail['libelle']} : terminé")
+        else:
+            st.sidebar.error(f"{icones.get(travail['statut'], '❌')} {travail['libelle']} : "
+                             f"{travail['erreur'] or travail['statut']}")
+
+    try:
+        en_cours = travaux_session()
+    except Exception:
+        return  # File indisponible : pas de suivi
+    if en_cours:
+        with st.sidebar:
+            _suivre_travaux()
+
+@st.fragment(run_every=INTERVALLE_SUIVI_TRAVAUX)
+def _suivre_travaux():
+    """Réexécutée seule à intervalle régulier ; relance l'application quand un travail aboutit"""
+    from services.business.travaux import travaux_session, recuperer_travaux_termines, obtenir_file_travaux
+
+    recuperes = recuperer_travaux_termines()
+    if recuperes:
+        st.session_state['_travaux_recuperes'] = recuperes
+        st.rerun()
+
+    with st.expander("⏳ Travaux en arrière-plan", expanded=True):
+        for travail in travaux_session():
+            st.progress(travail['progression'], text=f"{travail['libelle']} — {travail['message'] or ''}")
+            if travail['statut'] == 'en_attente':
+                if st.button("Annuler", key=f"btn_annuler_travail_{travail['id']}"):
+                    obtenir_file_travaux().annuler(travail['id'])
+        st.caption("Vous pouvez continuer à travailler : les résultats seront repris à la fin de chaque travail.")
+
+def afficher_rapport_demarrage(nb_lignes: int = 25):
+    """
+    Panneau de diagnostic du démarrage : imports les plus coûteux, à la manière de `-X importtime`
+
+    Args:
+        nb_lignes (int): Nombre d'imports affichés
+    """
+    from profilage_imports import rapport_imports, etat_piles_differees
+    
+    with st.sidebar.expander("⏱️ Démarrage (imports)", expanded=False):
+        rapport = rapport_imports()
+        if not rapport:
+            st.caption("Aucune mesure : le démarrage de ce processus n'a pas été profilé.")
+            return
+        
+        imports = pd.DataFrame(rapport['imports'])
+        duree_imports = imports.loc[imports['profondeur'] == 0, 'cumule_ms'].sum() if len(imports) else 0.0
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Imports", f"{duree_imports / 1000:.2f} s")
+            st.metric("Modules chargés", f"{rapport['modules_charges']:,}")
+        with col2:
+            st.metric("Démarrage complet", f"{rapport['duree_totale_ms'] / 1000:.2f} s")
+            if rapport['memoire_apres_mo'] is not None:
+                st.metric("Mémoire (pic)", f"{rapport['memoire_apres_mo']:.0f} Mo",
+                          delta=f"+{rapport['memoire_apres_mo'] - rapport['memoire_avant_mo']:.0f} Mo",
+                          delta_color="off")
+        
+        if len(imports):
+            st.markdown("**Imports les plus coûteux** (durée cumulée, sous-imports compris)")
+            lignes = imports.nlargest(nb_lignes, 'cumule_ms').sort_values('ordre')
+            st.dataframe(
+                pd.DataFrame({
+                    'Module': ['  ' * p + m for p, m in zip(lignes['profondeur'], lignes['module'])],
+                    'Propre (ms)': lignes['propre_ms'].round(1),
+                    'Cumulé (ms)': lignes['cumule_ms'].round(1)
+                }),
+                hide_index=True, width='stretch'
+            )
+        
+        st.markdown("**Chargés au premier usage**")
+        for pile in etat_piles_differees():
+            st.markdown(f"{'🟢 chargée' if pile['chargee'] else '⚪ non chargée'} — {pile['pile']}")
+
+def afficher_memoire_sessions(nb_sessions: int = 10):
+    """
+    Vue d'administration de la mémoire : clés les plus lourdes de la session et sessions les plus lourdes du processus
+
+    Args:
+        nb_sessions (int): Nombre de sessions listées
+    """
+    from services.business.memoire import mesurer_session, sessions_les_plus_lourdes
+    
+    def en_mo(octets: int) -> float:
+        return round(octets / (1024 * 1024), 2)
+    
+    with st.sidebar.expander("🧠 Mémoire des sessions", expanded=False):
+        tailles = mesurer_session()
+        st.metric("Session courante", f"{en_mo(sum(tailles.values())):.2f} Mo")
+        st.dataframe(
+            pd.DataFrame({'Clé': list(tailles)[:10], 'Taille (Mo)': [en_mo(t) for t in list(tailles.values())[:10]]}),
+            hide_index=True, width='stretch'
+        )
+        
+        sessions = sessions_les_plus_lourdes(nb_sessions)
+        st.markdown(f"**Sessions les plus lourdes** ({len(sessions)} relevée(s))")
+        if sessions:
+            st.dataframe(
+                pd.DataFrame([{
+                    'Session': s['session'],
+                    'Entreprise': s['nom_entreprise'] or "-",
+                    'Utilisateur': s['utilisateur'] or "-",
+                    'Taille (Mo)': en_mo(s['total_octets']),
+                    'Clé principale': s['cles'][0][0] if s['cles'] else "-",
+                    'Déversés': s['artefacts_deverses'],
+                    'Relevé': f"{s['maj']:%H:%M:%S}"
+                } for s in sessions]),
+                hide_index=True, width='stretch'
+            )
+        st.caption("Relevé au plus toutes les 30 s par session ; les artefacts déversés sont sur disque.")
+
+def afficher_profil_executions(nb_lignes: int = 15):
+    """
+    Profil des dernières exécutions : intervalles de la plus récente, cumul par fonction et exports
+
+    Args:
+        nb_lignes (int): Nombre de lignes des tableaux
+    """
+    from utils.profilage_execution import (
+        executions_profilees, agreger_spans, exporter_json, exporter_trace_chrome
+    )
+    
+    with st.sidebar.expander("🔬 Profil des exécutions", expanded=False):
+        executions = executions_profilees()
+        if not executions:
+            st.caption("Aucune exécution profilée : le profil de l'exécution en cours s'affichera à la suivante.")
+            return
+        
+        derniere = executions[-1]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Dernière exécution", f"{derniere['duree_ms']:.0f} ms")
+        with col2:
+            durees = sorted(e['duree_ms'] for e in executions)
+            st.metric(f"Médiane ({len(executions)})", f"{durees[len(durees) // 2]:.0f} ms")
+        
+        st.markdown(f"**Dernière exécution** ({derniere['horodatage']:%H:%M:%S})")
+        spans = sorted(derniere['spans'], key=lambda span: span['duree_ms'], reverse=True)[:nb_lignes]
+        st.dataframe(
+            pd.DataFrame([{
+                'Intervalle': span['nom'] + (f" ⚠️ {span['erreur']}" if span['erreur'] else ""),
+                'Catégorie': span['categorie'],
+                'Durée (ms)': round(span['duree_ms'], 1),
+                'Blocs alloués': span['blocs']
+            } for span in spans]),
+            hide_index=True, width='stretch'
+        )
+        
+        st.markdown("**Cumul par fonction**")
+        st.dataframe(
+            pd.DataFrame([{
+                'Fonction': agregat['nom'],
+                'Appels': agregat['appels'],
+                'Total (ms)': round(agregat['total_ms'], 1),
+                'Moyenne (ms)': round(agregat['moyenne_ms'], 1),
+                'Max (ms)': round(agregat['max_ms'], 1)
+            } for agregat in agreger_spans(executions)[:nb_lignes]]),
+            hide_index=True, width='stretch'
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📥 JSON", exporter_json(executions), file_name="profil_executions.json",
+                               mime="application/json", key="download_profil_json", width='stretch')
+        with col2:
+            st.download_button("📥 Chrome trace", exporter_trace_chrome(executions), file_name="profil_executions.trace.json",
+                               mime="application/json", key="download_profil_chrome", width='stretch')
+        st.caption("Trace à ouvrir dans chrome://tracing ou ui.perfetto.dev")
+
 def afficher_progression_sidebar():
     """Affiche la progression globale dans la sidebar"""
     from datetime import datetime
@@ -595,4 +1056,42 @@ def afficher_progression_sidebar():
     st.sidebar.markdown(f"**Template actuel:** {template_actuel}")
     
     # Statut de l'API OpenAI
-    afficher_statut_api_sidebar()
\ No newline at end of file
+    afficher_statut_api_sidebar()
+
+# Préfixes des clés de boutons (dont la valeur ne peut pas être imposée) :
+# toute clé de `st.button` ou `st.download_button` doit en commencer par un
+PREFIXES_CLES_BOUTONS = ('btn_', 'download_', 'FormSubmitter')
+
+def conserver_etat_widgets():
+    """
+    Conserve la valeur des widgets des pages qui ne sont pas affichées
+
+    Streamlit supprime l'état d'un widget à clé dès qu'une exécution ne le crée
+    pas : sans cela, les saisies d'une page seraient perdues en changeant de page.
+    Réenregistrer la valeur sous la même clé en début d'exécution la détache du
+    widget, qui la retrouve lorsqu'il est recréé.
+
+    Sont ignorés les clés internes, les boutons (`PREFIXES_CLES_BOUTONS`), les
+    fichiers téléversés et les dictionnaires (état des `st.data_editor`) : les
+    pages conservent ces données dans leurs propres entrées du session state.
+    Les cases à cocher et interrupteurs (booléens) sont conservés.
+    """
+    from datetime import date, time
+
+    types_conserves = (bool, str, int, float, date, time)
+
+    def conservable(valeur) -> bool:
+        if isinstance(valeur, (list, tuple)):
+            # Liste vide : aussi la valeur d'un téléversement multiple sans fichier
+            return bool(valeur) and all(conservable(v) for v in valeur)
+        return isinstance(valeur, types_conserves)
+
+    for cle in list(st.session_state.keys()):
+        if not isinstance(cle, str) or cle.startswith(('_',) + PREFIXES_CLES_BOUTONS):
+            continue
+        try:
+            valeur = st.session_state[cle]
+        except KeyError:
+            continue
+        if conservable(valeur):
+            st.session_state[cle] = valeur
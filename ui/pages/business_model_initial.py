@@ -8,6 +8,7 @@ import json
 import os
 from datetime import datetime
 from services.business import sauvegarder_donnees_session
+from services.business.travaux import soumettre_travail, travail_actif
 from ui.components import afficher_template_info, bouton_sauvegarder_avec_confirmation
 
 def page_business_model_initial():
@@ -132,13 +133,35 @@ def page_creation_business_model_manuel():
     col_ai, col_clear, col_info = st.columns([2, 1, 1])
     
     with col_ai:
-        if st.button("🔄 Actualiser les suggestions IA", help="Met à jour les suggestions basées sur vos dernières données"):
-            with st.spinner("🧠 L'IA actualise les suggestions..."):
-                if prefill_with_ai(force_update=True):
-                    st.success("✨ Suggestions mises à jour ! Modifiez-les selon vos besoins.")
-                    st.rerun()
-                else:
+        suggestions_arriere_plan = st.checkbox(
+            "⏳ Suggestions en arrière-plan",
+            value=True,
+            key="suggestions_arriere_plan",
+            help="Les suggestions sont générées pendant que vous utilisez le reste de l'application ; "
+                 "elles remplacent les 9 blocs à la fin du travail (suivi dans la barre latérale)"
+        )
+        suggestions_en_cours = travail_actif('suggestions')
+        if suggestions_en_cours:
+            st.info("⏳ Suggestions IA en cours de génération en arrière-plan")
+
+        if st.button("🔄 Actualiser les suggestions IA", help="Met à jour les suggestions basées sur vos dernières données",
+                     disabled=suggestions_en_cours):
+            if suggestions_arriere_plan:
+                if not has_sufficient_data():
                     st.warning("ℹ️ Ajoutez plus d'informations (informations générales, arbre à problème, analyse de marché) pour de meilleures suggestions.")
+                else:
+                    resultat = soumettre_travail('suggestions', force_update=True)
+                    if resultat['success']:
+                        st.success("✅ Suggestions lancées en arrière-plan")
+                    else:
+                        st.error(f"❌ {resultat['error']}")
+            else:
+                with st.spinner("🧠 L'IA actualise les suggestions..."):
+                    if prefill_with_ai(force_update=True):
+                        st.success("✨ Suggestions mises à jour ! Modifiez-les selon vos besoins.")
+                        st.rerun()
+                    else:
+                        st.warning("ℹ️ Ajoutez plus d'informations (informations générales, arbre à problème, analyse de marché) pour de meilleures suggestions.")
         
         # Bouton de test pour forcer le pré-remplissage
         if st.button("🧪 Test Pré-remplissage", help="Force le pré-remplissage même avec des données minimales"):
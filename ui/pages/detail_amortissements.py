@@ -4,7 +4,14 @@ Page de détail des amortissements et immobilisations
 
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from utils.financial_utils import (
+    IMMOBILISATIONS_AMORTISSABLES,
+    DUREES_AMORTISSEMENT_DEFAUT,
+    METHODES_AMORTISSEMENT,
+    calculer_plans_amortissement,
+    preparer_actifs_amortissables
+)
 
 def page_detail_amortissements():
     """Page détaillée des amortissements"""
@@ -28,84 +35,69 @@ def page_detail_amortissements():
     with tab3:
         configurer_parametres_amortissement(data)
 
+@st.cache_data(show_spinner=False)
+def calculer_vue_amortissements(noms: Tuple[str, ...], montants: Tuple[float, ...], durees: Tuple[int, ...],
+                                methodes: Tuple[str, ...], mois: Tuple[int, ...]) -> pd.DataFrame:
+    """Plan d'amortissement détaillé (une ligne par élément et par année), mis en cache par paramètres"""
+    plans = calculer_plans_amortissement(montants, durees, methodes, mois)
+    n_actifs, n_annees = plans["dotations"].shape
+    
+    return pd.DataFrame({
+        "Élément": [nom for nom in noms for _ in range(n_annees)],
+        "Année": list(range(1, n_annees + 1)) * n_actifs,
+        "Valeur début": plans["valeur_debut"].ravel().round(2),
+        "Amortissement": plans["dotations"].ravel().round(2),
+        "Valeur fin": plans["valeur_fin"].ravel().round(2)
+    })
+
+def obtenir_vue_amortissements(data: Dict[str, Any]) -> pd.DataFrame:
+    """Vue par élément des amortissements des besoins de démarrage"""
+    actifs = preparer_actifs_amortissables(data.get("besoins_demarrage", {}), data.get("parametres_amortissement", {}))
+    return calculer_vue_amortissements(
+        tuple(actifs["noms"]), tuple(actifs["montants"]), tuple(actifs["durees"]),
+        tuple(actifs["methodes"]), tuple(actifs["mois_mise_en_service"])
+    )
+
 def afficher_plan_amortissement_detaille(data: Dict[str, Any]):
-    """Affiche le plan d'amortissement détaillé sur 5 ans"""
-    st.subheader("📊 Plan d'Amortissement Détaillé (5 ans)")
+    """Affiche le plan d'amortissement détaillé sur toute la durée des plans"""
+    st.subheader("📊 Plan d'Amortissement Détaillé")
     
-    besoins = data.get("besoins_demarrage", {})
-    
-    # Classification des immobilisations avec durées standard
-    immobilisations = {
-        "Immobilisations incorporelles": {
-            "elements": [
-                "Frais d'établissement",
-                "Logiciels, formations", 
-                "Dépôt de marque",
-                "Droits d'entrée",
-                "Achat fonds de commerce ou parts",
-                "Droit au bail"
-            ],
-            "duree_defaut": 5
-        },
-        "Immobilisations corporelles": {
-            "elements": [
-                "Véhicule",
-                "Matériel professionnel",
-                "Matériel autre",
-                "Matériel de bureau",
-                "Enseigne et éléments de communication"
-            ],
-            "duree_defaut": 5
-        }
-    }
+    actifs = preparer_actifs_amortissables(data.get("besoins_demarrage", {}), data.get("parametres_amortissement", {}))
+    vue = obtenir_vue_amortissements(data)
     
-    # Récupérer les paramètres personnalisés
-    params_amort = data.get("parametres_amortissement", {})
-    
-    all_amortissements = []
-    
-    for categorie, info in immobilisations.items():
+    for categorie in IMMOBILISATIONS_AMORTISSABLES:
+        indices = [i for i, c in enumerate(actifs["categories"]) if c == categorie]
+        if not indices:
+            continue
+        
         st.write(f"**{categorie}**")
         
-        for element in info["elements"]:
-            montant = besoins.get(element, 0.0)
-            if montant > 0:
-                # Durée personnalisée ou par défaut
-                duree = params_amort.get(element, {}).get("duree", info["duree_defaut"])
-                
-                # Calcul du plan d'amortissement
-                plan = calculer_plan_amortissement_element(element, montant, duree)
-                if plan:
-                    all_amortissements.extend(plan)
-                    
-                    # Affichage résumé
-                    amort_annuel = montant / duree
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.write(f"• {element}")
-                    with col2:
-                        st.write(f"{montant:,.0f} $")
-                    with col3:
-                        st.write(f"{duree} ans")
-                    with col4:
-                        st.write(f"{amort_annuel:,.0f} $/an")
+        for i in indices:
+            element = actifs["noms"][i]
+            plan_element = vue[vue["Élément"] == element]
+            
+            # Affichage résumé
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.write(f"• {element}")
+            with col2:
+                st.write(f"{actifs['montants'][i]:,.0f} $")
+            with col3:
+                st.write(f"{actifs['durees'][i]} ans — {METHODES_AMORTISSEMENT.get(actifs['methodes'][i], actifs['methodes'][i])}")
+            with col4:
+                st.write(f"{plan_element['Amortissement'].iloc[0]:,.0f} $ en année 1")
         
         st.write("")  # Ligne vide
     
     # Tableau récapitulatif par année
-    if all_amortissements:
+    if not vue.empty:
         st.divider()
         st.subheader("📋 Tableau Récapitulatif par Année")
         
-        # Grouper par année
-        amort_par_annee = {}
-        for item in all_amortissements:
-            annee = item["Année"]
-            if annee not in amort_par_annee:
-                amort_par_annee[annee] = {}
-            
-            element = item["Élément"]
-            amort_par_annee[annee][element] = item["Amortissement"]
+        amort_par_annee = {
+            annee: dict(zip(groupe["Élément"], groupe["Amortissement"]))
+            for annee, groupe in vue.groupby("Année")
+        }
         
         # Créer le DataFrame
         df_recap = create_dataframe_amortissements(amort_par_annee)
@@ -193,19 +185,13 @@ def configurer_parametres_amortissement(data: Dict[str, Any]):
     st.write("*Modifiez les durées selon vos besoins spécifiques*")
     
     # Elements amortissables
-    elements_amortissables = [
-        "Frais d'établissement",
-        "Logiciels, formations",
-        "Véhicule", 
-        "Matériel professionnel",
-        "Matériel autre",
-        "Matériel de bureau",
-        "Enseigne et éléments de communication"
-    ]
+    elements_amortissables = list(DUREES_AMORTISSEMENT_DEFAUT)
+    methodes = list(METHODES_AMORTISSEMENT)
     
     col1, col2, col3 = st.columns(3)
     
-    for i, element in enumerate(elements_amortissables):
+    i = 0
+    for element in elements_amortissables:
         montant = besoins.get(element, 0.0)
         if montant > 0:
             with [col1, col2, col3][i % 3]:
@@ -229,79 +215,55 @@ def configurer_parametres_amortissement(data: Dict[str, Any]):
                 
                 params[element]["duree"] = new_duree
                 
+                params[element]["methode"] = st.selectbox(
+                    "Méthode",
+                    options=methodes,
+                    index=methodes.index(params[element].get("methode", "lineaire")),
+                    format_func=METHODES_AMORTISSEMENT.get,
+                    key=f"methode_{element}"
+                )
+                
+                params[element]["mois_mise_en_service"] = st.selectbox(
+                    "Mois de mise en service (prorata temporis)",
+                    options=list(range(1, 13)),
+                    index=params[element].get("mois_mise_en_service", 1) - 1,
+                    key=f"mois_service_{element}"
+                )
+                
                 # Calcul impact
-                amort_annuel = montant / new_duree
-                st.write(f"Amortissement: {amort_annuel:,.0f} $/an")
+                plan = calculer_plan_amortissement_element(
+                    element, montant, new_duree,
+                    params[element]["methode"], params[element]["mois_mise_en_service"]
+                )
+                st.write(f"Amortissement année 1: {plan[0]['Amortissement']:,.0f} $")
                 st.write("---")
+            i += 1
     
     # Sauvegarder les changements
     if st.button("💾 Sauvegarder les paramètres"):
         st.session_state.data["parametres_amortissement"] = params
         st.success("Paramètres d'amortissement sauvegardés")
 
-def calculer_plan_amortissement_element(element: str, montant: float, duree_annees: int) -> List[Dict]:
-    """Calcule le plan d'amortissement pour un élément"""
+def calculer_plan_amortissement_element(element: str, montant: float, duree_annees: int,
+                                       methode: str = "lineaire", mois_mise_en_service: int = 1) -> List[Dict]:
+    """Calcule le plan d'amortissement complet pour un élément"""
     if montant <= 0 or duree_annees <= 0:
         return []
     
-    amortissement_annuel = montant / duree_annees
-    plan = []
-    
-    for annee in range(1, min(duree_annees + 1, 6)):  # Max 5 ans pour l'affichage
-        valeur_debut = montant - (amortissement_annuel * (annee - 1))
-        valeur_fin = max(0, montant - (amortissement_annuel * annee))
-        
-        plan.append({
-            "Élément": element,
-            "Année": annee,
-            "Valeur début": round(valeur_debut, 2),
-            "Amortissement": round(amortissement_annuel, 2),
-            "Valeur fin": round(valeur_fin, 2)
-        })
-    
-    return plan
+    vue = calculer_vue_amortissements((element,), (montant,), (duree_annees,), (methode,), (mois_mise_en_service,))
+    return vue.to_dict("records")
 
 def calculer_amortissements_annuels(data: Dict[str, Any]) -> Dict[int, float]:
-    """Calcule le total des amortissements par année"""
-    besoins = data.get("besoins_demarrage", {})
-    params = data.get("parametres_amortissement", {})
-    
-    amortissements = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    
-    elements_amortissables = [
-        "Frais d'établissement",
-        "Logiciels, formations", 
-        "Véhicule",
-        "Matériel professionnel",
-        "Matériel autre", 
-        "Matériel de bureau",
-        "Enseigne et éléments de communication"
-    ]
-    
-    for element in elements_amortissables:
-        montant = besoins.get(element, 0.0)
-        if montant > 0:
-            duree = params.get(element, {}).get("duree", get_duree_amortissement_defaut(element))
-            amort_annuel = montant / duree
-            
-            # Ajouter aux années concernées
-            for annee in range(1, min(duree + 1, 6)):
-                amortissements[annee] += amort_annuel
-    
-    return amortissements
+    """Calcule le total des amortissements par année (5 premières années)"""
+    actifs = preparer_actifs_amortissables(data.get("besoins_demarrage", {}), data.get("parametres_amortissement", {}))
+    plans = calculer_plans_amortissement(
+        actifs["montants"], actifs["durees"], actifs["methodes"], actifs["mois_mise_en_service"], n_annees=5
+    )
+    return {annee: float(total) for annee, total in enumerate(plans["total_par_annee"], 1)}
 
 def get_duree_amortissement_defaut(element: str) -> int:
     """Retourne la durée d'amortissement par défaut"""
-    durees = {
-        "Frais d'établissement": 3,
-        "Logiciels, formations": 3,
-        "Véhicule": 5,
-        "Matériel professionnel": 5,
-        "Matériel autre": 5,
-        "Matériel de bureau": 3,
-        "Enseigne et éléments de communication": 5
-    }
-    return durees.get(element, 5)
+    return DUREES_AMORTISSEMENT_DEFAUT.get(element, 5)
 
 def create_dataframe_amortissements(amort_par_annee: Dict) -> pd.DataFrame:
     """Crée un DataFrame pour l'affichage des amortissements"""
@@ -313,12 +275,14 @@ def create_dataframe_amortissements(amort_par_annee: Dict) -> pd.DataFrame:
     for annee_data in amort_par_annee.values():
         all_elements.update(annee_data.keys())
     
+    annees = sorted(amort_par_annee)
+    
     # Créer le DataFrame
     data = []
     for element in sorted(all_elements):
         row = {"Élément": element}
         total = 0
-        for annee in range(1, 6):
+        for annee in annees:
             montant = amort_par_annee.get(annee, {}).get(element, 0)
             row[f"Année {annee}"] = f"{montant:,.0f}" if montant > 0 else "-"
             total += montant
@@ -328,7 +292,7 @@ def create_dataframe_amortissements(amort_par_annee: Dict) -> pd.DataFrame:
     # Ligne totaux
     row_total = {"Élément": "**TOTAL**"}
     grand_total = 0
-    for annee in range(1, 6):
+    for annee in annees:
         total_annee = sum(amort_par_annee.get(annee, {}).values())
         row_total[f"Année {annee}"] = f"**{total_annee:,.0f}**"
         grand_total += total_annee
@@ -345,7 +309,7 @@ def afficher_graphique_amortissements(amort_par_annee: Dict):
     years = []
     totals = []
     
-    for annee in range(1, 6):
+    for annee in sorted(amort_par_annee):
         total = sum(amort_par_annee.get(annee, {}).values())
         years.append(f"Année {annee}")
         totals.append(total)
@@ -6,11 +6,27 @@ Version cyclique adaptée d'Origin.txt avec système de templates professionnels
 import streamlit as st
 from typing import Dict, Any, List
 from services.ai.content_generation import generate_section, tester_connexion_openai
+from services.ai.regeneration import (
+    demarrer_plan,
+    enregistrer_section,
+    etat_sections,
+    plan_sections,
+    regenerer_section,
+    resultats_plan,
+    sections_dependantes
+)
 from services.financial.calculations import calculer_tableaux_financiers_5_ans
-from services.document.generation import format_table_to_markdown
+from services.business.travaux import signaler_progression, soumettre_travail, travail_actif
+from services.business.memoire import deposer_artefact, recuperer_artefact
+from services.document.tableaux_prompt import (
+    exports_financiers_session,
+    serialiser_tableau,
+    serialiser_tableaux_financiers
+)
 from business_plan_prompts_origin_exact import (
     get_system_messages_origin_style,
-    get_queries_origin_style
+    get_queries_origin_style,
+    get_template_context_text
 )
 
 
@@ -27,6 +43,7 @@ def generate_section_origin(system_message, query, documents, combined_content,
 import pandas as pd
 import tempfile
 import os
+from io import BytesIO
 
 def page_generation_business_plan_integree():
     """Page de génération du business plan avec tableaux financiers intégrés - Version cyclique"""
@@ -107,15 +124,94 @@ def page_generation_business_plan_integree():
         st.warning("⚠️ Veuillez soit télécharger un document, soit saisir une description, soit cocher 'Utiliser les données du workflow'")
         return
     
+    arriere_plan = st.checkbox(
+        "⏳ Générer en arrière-plan",
+        value=True,
+        key="generation_arriere_plan",
+        help="La génération se poursuit pendant que vous utilisez le reste de l'application ; "
+             "son avancement est suivi dans la barre latérale"
+    )
+    
+    if travail_actif('plan_complet'):
+        st.info("⏳ Un business plan est en cours de génération en arrière-plan (suivi dans la barre latérale).")
+    
     if st.button("🚀 Générer le Business Plan Complet", type="primary", disabled=not can_generate):
-        generate_complete_business_plan_origin_exact(
-            uploaded_file=uploaded_file,
-            user_text_input=user_text_input,
-            template_nom=template_actuel,
-            use_workflow_data=use_workflow_data,
-            show_progress=show_progress,
-            split_generation=split_generation
+        if arriere_plan:
+            # Le PDF est transmis par son contenu : le fichier téléversé ne passe pas au processus
+            resultat = soumettre_travail(
+                'plan_complet',
+                uploaded_file=BytesIO(uploaded_file.getvalue()) if uploaded_file else None,
+                user_text_input=user_text_input,
+                template_nom=template_actuel,
+                use_workflow_data=use_workflow_data,
+                show_progress=False,
+                split_generation=split_generation
+            )
+            if resultat['success']:
+                st.success("✅ Génération lancée en arrière-plan : le plan s'affichera ici une fois terminé.")
+            else:
+                st.error(f"❌ {resultat['error']}")
+        else:
+            generate_complete_business_plan_origin_exact(
+                uploaded_file=uploaded_file,
+                user_text_input=user_text_input,
+                template_nom=template_actuel,
+                use_workflow_data=use_workflow_data,
+                show_progress=show_progress,
+                split_generation=split_generation
+            )
+    elif plan_sections():
+        # Plan déjà généré : régénération section par section, exports depuis le cache
+        afficher_regeneration_sections(template_actuel)
+
+def afficher_regeneration_sections(template_nom: str):
+    """Propose de régénérer les sections devenues obsolètes sans relancer tout le plan"""
+    st.markdown("### 🔁 Régénérer une section")
+    etats = etat_sections(template_nom)
+    
+    toutes = st.checkbox("Proposer toutes les sections", value=False, key="regeneration_toutes_sections",
+                         help="Par défaut, seules les sections obsolètes sont proposées")
+    options = [etat['section'] for etat in etats if toutes or etat['a_regenerer']]
+    
+    if options:
+        section = st.selectbox("Section à régénérer", options, key="section_a_regenerer")
+        dependantes = sections_dependantes(section)
+        avec_dependantes = st.checkbox(
+            "Régénérer aussi les sections dépendantes",
+            value=False,
+            key="regenerer_dependantes",
+            help=f"Sections qui reprennent son contenu : {', '.join(dependantes)}" if dependantes else "Aucune section ne reprend son contenu",
+            disabled=not dependantes
+        )
+        if st.button("🔁 Régénérer", key="btn_regenerer_section"):
+            if st.session_state.get('generation_arriere_plan', True):
+                resultat = soumettre_travail('regeneration', section_name=section, template_nom=template_nom,
+                                             avec_dependantes=avec_dependantes)
+                if resultat['success']:
+                    st.success("✅ Régénération lancée en arrière-plan (suivi dans la barre latérale)")
+                else:
+                    st.error(f"❌ {resultat['error']}")
+            else:
+                with st.spinner(f"Régénération de {section}..."):
+                    resultat = regenerer_section(section, template_nom, avec_dependantes=avec_dependantes)
+                if resultat['success']:
+                    st.success(f"✅ Régénérée(s) : {', '.join(resultat['sections'])}")
+                else:
+                    st.error(f"❌ {resultat['error']}")
+                etats = etat_sections(template_nom)
+    
+    obsoletes = [etat for etat in etats if etat['a_regenerer']]
+    if obsoletes:
+        st.warning(f"⚠️ {len(obsoletes)} section(s) à régénérer depuis la dernière génération")
+        st.dataframe(
+            pd.DataFrame([{'Section': etat['section'], 'Raison': " ; ".join(etat['raisons'])} for etat in obsoletes]),
+            hide_index=True,
+            width='stretch'
         )
+    else:
+        st.success("✅ Toutes les sections sont à jour avec les données actuelles")
+    
+    create_export_files_origin_style(resultats_plan(), collect_all_business_data(), template_nom)
 
 def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_input="", template_nom="COPA TRANSFORME", 
                                               use_workflow_data=True, show_progress=True, split_generation=True):
@@ -133,36 +229,13 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
     # 2. Récupération des données financières (EXACT Origin.txt)
     business_data = collect_all_business_data() if use_workflow_data else {}
     
-    # Récupérer les données exportées de toutes les sections (EXACT Origin.txt)
-    export_data_investissements = st.session_state.get('export_data_investissements', {})
-    export_data_salaires = st.session_state.get('export_data_salaires_charges_sociales', {})
-    export_data_amortissements = st.session_state.get('export_data_detail_amortissements', {})
-    export_data_compte = st.session_state.get('export_data_compte_resultats_previsionnel', {})
-    export_data_soldes = st.session_state.get('export_data_soldes_intermediaires_de_gestion', {})
-    export_data_capacite = st.session_state.get('export_data_capacite_autofinancement', {})
-    export_data_seuil = st.session_state.get('export_data_seuil_rentabilite_economique', {})
-    export_data_bfr = st.session_state.get('export_data_besoin_fonds_roulement', {})
-    export_data_plan_financement = st.session_state.get('export_data_plan_financement_trois_ans', {})
-    export_data_budget_part1 = st.session_state.get('export_data_budget_previsionnel_tresorerie_part1', {})
-    export_data_budget_part2 = st.session_state.get('export_data_budget_previsionnel_tresorerie_part2', {})
-
-    # Concaténer toutes les sections financières (EXACT Origin.txt)
-    final_text = ""
-    final_text += format_table_data_origin(export_data_investissements, "Investissements et financements")
-    final_text += format_table_data_origin(export_data_salaires, "Salaires et Charges Sociales")
-    final_text += format_table_data_origin(export_data_amortissements, "Détail des Amortissements")
-    final_text += format_table_data_origin(export_data_compte, "Compte de résultats prévisionnel")
-    final_text += format_table_data_origin(export_data_soldes, "Soldes intermédiaires de gestion")
-    final_text += format_table_data_origin(export_data_capacite, "Capacité d'autofinancement")
-    final_text += format_table_data_origin(export_data_seuil, "Seuil de rentabilité économique")
-    final_text += format_table_data_origin(export_data_bfr, "Besoin en fonds de roulement")
-    final_text += format_table_data_origin(export_data_plan_financement, "Plan de financement à trois ans")
-    final_text += format_table_data_origin(export_data_budget_part1, "Budget prévisionnel de trésorerie")
-    final_text += format_table_data_origin(export_data_budget_part2, "Budget prévisionnel de trésorerie(suite)")
+    # Tableaux exportés de toutes les sections, sérialisés pour chaque section selon ses besoins
+    exports_financiers = exports_financiers_session()
 
     # 3. Configuration des sections selon template (Origin.txt + templates)
     system_messages = get_system_messages_origin_style(template_nom)
     queries = get_queries_origin_style()
+    template_context = get_template_context_text(template_nom)  # Préfixe commun à toutes les sections
     
     # 4. Espaces réservés pour affichage (EXACT Origin.txt)
     placeholders = {name: st.empty() for name in system_messages.keys()}
@@ -170,6 +243,7 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
     # 5. Séparation en deux parties (EXACT Origin.txt)
     section_order = list(system_messages.keys())
     split_section = "Présentation de votre entreprise"
+    demarrer_plan(template_nom, combined_content, section_order)  # Cache des sections pour la régénération
     
     first_part = []
     second_part = []
@@ -199,7 +273,8 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
                         system_message=system_message, 
                         user_query=query, 
                         additional_context=combined_content,
-                        section_name=section_name
+                        section_name=section_name,
+                        template_context=template_context
                     )
                 else:
                     # Récupérer le business model (EXACT Origin.txt)
@@ -209,14 +284,18 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
                         user_query=query, 
                         additional_context=combined_content,
                         section_name=section_name,
-                        financial_context=final_text,
-                        business_model=business_model
+                        financial_context=serialiser_tableaux_financiers(exports_financiers, section_name),
+                        business_model=business_model,
+                        template_context=template_context
                     )
             except ValueError as e:
                 results_first_part[section_name] = f"Erreur: {str(e)}"
+            else:
+                enregistrer_section(section_name, results_first_part[section_name])
             
             # Accumulation progressive du contexte (EXACT Origin.txt)
             combined_content += " " + results_first_part[section_name]
+            signaler_progression((section_order.index(section_name) + 1) / len(section_order), f"{section_name} générée")
             
             # Affichage en temps réel
             if show_progress:
@@ -239,14 +318,18 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
                     user_query=query, 
                     additional_context=combined_content,
                     section_name=section_name,
-                    financial_context=final_text,
-                    business_model=business_model
+                    financial_context=serialiser_tableaux_financiers(exports_financiers, section_name),
+                    business_model=business_model,
+                    template_context=template_context
                 )
             except ValueError as e:
                 results_second_part[section_name] = f"Erreur: {str(e)}"
+            else:
+                enregistrer_section(section_name, results_second_part[section_name])
             
             # Accumulation continue (EXACT Origin.txt)
             combined_content += " " + results_second_part[section_name]
+            signaler_progression((section_order.index(section_name) + 1) / len(section_order), f"{section_name} générée")
             
             # Affichage en temps réel
             if show_progress:
@@ -260,23 +343,6 @@ def generate_complete_business_plan_origin_exact(uploaded_file=None, user_text_i
     # 9. Génération des fichiers de sortie (Origin.txt style)
     create_export_files_origin_style(all_results, business_data, template_nom)
 
-def format_table_data_origin(export_data, section_title):
-    """Formate les données de tableau dans le style Origin.txt"""
-    if not export_data:
-        return ""
-    
-    formatted_text = f"\n\n=== {section_title} ===\n"
-    
-    for key, value in export_data.items():
-        if isinstance(value, dict):
-            formatted_text += f"\n{key}:\n"
-            for sub_key, sub_value in value.items():
-                formatted_text += f"  {sub_key}: {sub_value}\n"
-        else:
-            formatted_text += f"{key}: {value}\n"
-    
-    return formatted_text
-
 def create_export_files_origin_style(results: Dict[str, str], business_data: Dict[str, Any], template_nom: str):
     """Fonction d'export dans le style Origin.txt"""
     return create_export_files_cyclique(results, business_data, template_nom)
@@ -308,19 +374,19 @@ def generate_section_cyclique(section_name, section_config, documents, combined_
             # Sections avec contexte business comme dans Origin.txt
             business_model = st.session_state.get('business_model_precedent', '')
             
-            # Construire le contexte comme dans Origin.txt
-            context_info = f"""Dans ces données où vous allez récupérer les informations générales de l'entreprise {financial_tables_text} utiliser les données financières pour enrichir les arguments aussi sachez que le nom du projet correspond au nom de l'entreprise. Voici les autres informations à considérer c'est les informations du business model et ça doit être tenu compte lors de la génération: {business_model}"""
-            
             # Ajouter un contexte limité pour éviter les doublons
             limited_context = combined_content[-500:] if combined_content else ""  # Seulement les 500 derniers caractères
             
-            full_content = limited_context + " " + query + " " + context_info
-            
+            # Tableaux financiers et business model en tête du prompt (préfixe commun à toutes
+            # les sections), requête de la section à la fin
             content = generate_section(
                 system_message=system_message,
-                user_query=full_content,
-                additional_context="",
-                section_name=section_name
+                user_query=query + " Sachez que le nom du projet correspond au nom de l'entreprise.",
+                additional_context=limited_context,
+                section_name=section_name,
+                financial_context=financial_tables_text,
+                business_model=business_model,
+                template_context=get_template_context_text(template_nom)
             )
         
         # Nettoyer le contenu généré
@@ -460,134 +526,36 @@ def generate_all_financial_tables() -> Dict[str, Any]:
 def get_financial_tables_from_session() -> Dict[str, Any]:
     """Récupère les tableaux financiers depuis le session state (logique Origin.txt)"""
     
-    # Récupérer les données exportées de toutes les sections (comme dans Origin.txt)
-    export_data = {
-        'investissements': st.session_state.get('export_data_investissements', {}),
-        'salaires': st.session_state.get('export_data_salaires_charges_sociales', {}),
-        'amortissements': st.session_state.get('export_data_detail_amortissements', {}),
-        'compte': st.session_state.get('export_data_compte_resultats_previsionnel', {}),
-        'soldes': st.session_state.get('export_data_soldes_intermediaires_de_gestion', {}),
-        'capacite': st.session_state.get('export_data_capacite_autofinancement', {}),
-        'seuil': st.session_state.get('export_data_seuil_rentabilite_economique', {}),
-        'bfr': st.session_state.get('export_data_besoin_fonds_roulement', {}),
-        'plan_financement': st.session_state.get('export_data_plan_financement_trois_ans', {}),
-        'budget_part1': st.session_state.get('export_data_budget_previsionnel_tresorerie_part1', {}),
-        'budget_part2': st.session_state.get('export_data_budget_previsionnel_tresorerie_part2', {})
-    }
-    
-    # Formater le texte final (comme dans Origin.txt)
-    final_text = ""
-    section_titles = {
-        'investissements': "Investissements et financements",
-        'salaires': "Salaires et Charges Sociales", 
-        'amortissements': "Détail des Amortissements",
-        'compte': "Compte de résultats prévisionnel",
-        'soldes': "Soldes intermédiaires de gestion",
-        'capacite': "Capacité d'autofinancement",
-        'seuil': "Seuil de rentabilité économique",
-        'bfr': "Besoin en fonds de roulement",
-        'plan_financement': "Plan de financement à trois ans",
-        'budget_part1': "Budget prévisionnel de trésorerie",
-        'budget_part2': "Budget prévisionnel de trésorerie (suite)"
-    }
-    
-    for key, title in section_titles.items():
-        if export_data[key]:
-            final_text += format_table_data_cyclique(export_data[key], title)
+    export_data = exports_financiers_session()
     
     return {
         "raw_data": export_data,
-        "formatted_text": final_text,
-        "tables_list": list(section_titles.keys())
+        "formatted_text": serialiser_tableaux_financiers(export_data),
+        "tables_list": list(export_data.keys())
     }
 
 def format_financial_tables_for_business_plan_cyclique(tableaux_data: Dict[str, Any]) -> str:
-    """Formate tous les tableaux financiers en texte pour inclusion dans le business plan (style cyclique)"""
+    """Formate les tableaux financiers 5 ans en blocs compacts pour le business plan (style cyclique)"""
     
     if not tableaux_data:
         return "⚠️ Aucune donnée financière disponible"
     
-    formatted_text = "\n\n### TABLEAUX FINANCIERS DÉTAILLÉS\n\n"
-    
     # Tableaux principaux à inclure (priorité cyclique Origin.txt)
     tables_config = {
-        "compte_resultats_5ans": {
-            "title": "Compte de Résultats Prévisionnel (5 ans)",
-            "description": "Évolution prévisionnelle des revenus et charges sur 5 années"
-        },
-        "plan_financement_5ans": {
-            "title": "Plan de Financement (5 ans)", 
-            "description": "Équilibre emplois/ressources sur 5 années"
-        },
-        "soldes_intermediaires_5ans": {
-            "title": "Soldes Intermédiaires de Gestion",
-            "description": "Indicateurs de performance financière"
-        },
-        "capacite_autofinancement_5ans": {
-            "title": "Capacité d'Autofinancement",
-            "description": "Ressources internes générées par l'activité"
-        },
-        "seuil_rentabilite_5ans": {
-            "title": "Analyse du Seuil de Rentabilité",
-            "description": "Point mort et analyse de rentabilité"
-        },
-        "bfr_5ans": {
-            "title": "Besoin en Fonds de Roulement",
-            "description": "Calcul et évolution du BFR"
-        }
+        "compte_resultats_5ans": "Compte de résultat",
+        "plan_financement_5ans": "Plan de financement",
+        "soldes_intermediaires_5ans": "Soldes intermédiaires de gestion",
+        "capacite_autofinancement_5ans": "Capacité d'autofinancement",
+        "seuil_rentabilite_5ans": "Seuil de rentabilité",
+        "bfr_5ans": "Besoin en fonds de roulement"
     }
     
-    for table_key, config in tables_config.items():
-        if table_key in tableaux_data:
-            table_data = tableaux_data[table_key]
-            
-            formatted_text += f"\n#### {config['title']}\n\n"
-            formatted_text += f"*{config['description']}*\n\n"
-            
-            # Formater le tableau selon son type
-            if isinstance(table_data, dict) and "table_data" in table_data:
-                formatted_text += format_table_to_markdown(table_data["table_data"])
-            elif isinstance(table_data, dict) and "data" in table_data:
-                formatted_text += format_table_to_markdown(table_data["data"])
-            else:
-                formatted_text += "Données non disponibles pour ce tableau\n\n"
-            
-            formatted_text += "---\n\n"
-    
-    return formatted_text
-
-def format_table_data_cyclique(data: Dict[str, Any], title: str) -> str:
-    """Formate les données de tableau en texte (style Origin.txt)"""
-    if not data:
-        return ""
-    
-    text = f"\n\n### {title}\n\n"
-    
-    # Si c'est une structure de table avec table_data
-    if isinstance(data, dict) and "table_data" in data:
-        table_data = data["table_data"]
-        if isinstance(table_data, list) and table_data:
-            # Convertir en DataFrame pour le formatage
-            try:
-                df = pd.DataFrame(table_data)
-                text += df.to_markdown(index=False)
-                text += "\n\n"
-            except:
-                # Fallback simple
-                for row in table_data:
-                    if isinstance(row, dict):
-                        for key, value in row.items():
-                            text += f"  {key}: {value}\n"
-                    text += "\n"
-    
-    # Si c'est un dictionnaire simple
-    elif isinstance(data, dict):
-        for key, value in data.items():
-            if key != "table_data":  # Éviter la redondance
-                text += f"  **{key}**: {value}\n"
-        text += "\n"
-    
-    return text
+    blocs = [
+        serialiser_tableau(tableaux_data[table_key], title) or f"## {title}\nnon disponible\n"
+        for table_key, title in tables_config.items()
+        if table_key in tableaux_data
+    ]
+    return "Montants en USD.\n" + "\n".join(blocs)
 
 
 # Fonction manquante pour compatibilité avec le système existant
@@ -706,19 +674,35 @@ def create_export_files_cyclique(results: Dict[str, str], business_data: Dict[st
     
     with col1:
         st.markdown("### 📄 Format Word")
-        if st.button("📄 Générer Word", key="btn_word"):
-            try:
-                word_buffer = generate_word_document_cyclique(results, business_data, template_nom)
-                st.download_button(
-                    label="⬇️ Télécharger Business Plan.docx",
-                    data=word_buffer,
-                    file_name=f"business_plan_{template_nom.lower().replace(' ', '_')}.docx",
-                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    key="download_word"
-                )
-                st.success("✅ Document Word généré")
-            except Exception as e:
-                st.error(f"❌ Erreur génération Word : {str(e)}")
+        export_en_cours = travail_actif('export_word')
+        if export_en_cours:
+            st.info("⏳ Document Word en cours de génération en arrière-plan")
+        if st.button("📄 Générer Word", key="btn_word", disabled=export_en_cours):
+            if st.session_state.get('generation_arriere_plan', True):
+                # Le document est déposé comme artefact de la session à la fin du travail
+                resultat = soumettre_travail('export_word', results=dict(results),
+                                             business_data=business_data, template_nom=template_nom)
+                if resultat['success']:
+                    st.success("✅ Génération du document Word lancée en arrière-plan")
+                else:
+                    st.error(f"❌ {resultat['error']}")
+            else:
+                try:
+                    # Document généré : artefact de la session, déversé sur disque tant qu'il n'est pas téléchargé
+                    deposer_artefact('document_word', generate_word_document_cyclique(results, business_data, template_nom))
+                    st.success("✅ Document Word généré")
+                except Exception as e:
+                    st.error(f"❌ Erreur génération Word : {str(e)}")
+        
+        document_word = recuperer_artefact('document_word')
+        if document_word is not None:
+            st.download_button(
+                label="⬇️ Télécharger Business Plan.docx",
+                data=document_word,
+                file_name=f"business_plan_{template_nom.lower().replace(' ', '_')}.docx",
+                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                key="download_word"
+            )
     
     with col2:
         st.markdown("### 📑 Format Markdown")
@@ -5,6 +5,7 @@ Page des investissements et financements détaillés
 import streamlit as st
 import pandas as pd
 from typing import Dict, Any, List
+from utils.financial_utils import calculer_echeancier_financements, calculer_plans_amortissement
 
 def page_investissements_et_financements():
     """Page détaillée des investissements et financements"""
@@ -178,6 +179,14 @@ def afficher_tableau_financements(data: Dict[str, Any]):
         ]
     }
     
+    # Mensualités des prêts : premier remboursement après différé éventuel
+    echeancier = calculer_echeancier_financements(financements)
+    prets = echeancier["prets"]
+    mensualites = {
+        nom: echeancier["mensualite"][j, min(int(prets["differes_mois"][j]), int(prets["durees_mois"][j]) - 1)]
+        for j, nom in enumerate(prets["noms"])
+    }
+    
     tableau_fin = []
     total_financements = 0
     
@@ -209,12 +218,7 @@ def afficher_tableau_financements(data: Dict[str, Any]):
             
             if montant > 0:
                 # Calcul de la mensualité pour les emprunts
-                mensualite = ""
-                if taux > 0 and duree > 0:
-                    taux_mensuel = taux / 100 / 12
-                    if taux_mensuel > 0:
-                        mensualite = montant * (taux_mensuel * (1 + taux_mensuel)**duree) / ((1 + taux_mensuel)**duree - 1)
-                        mensualite = f"{mensualite:,.2f}"
+                mensualite = f"{mensualites[element]:,.2f}" if element in mensualites else ""
                 
                 tableau_fin.append({
                     "Source de financement": f"  • {nom}",
@@ -356,23 +360,20 @@ def get_duree_amortissement(element: str) -> str:
     }
     return durees.get(element, "Variable")
 
-def calculer_plan_amortissement(montant: float, duree_annees: int) -> List[Dict]:
-    """Calcule un plan d'amortissement linéaire"""
+def calculer_plan_amortissement(montant: float, duree_annees: int, methode: str = "lineaire",
+                                mois_mise_en_service: int = 1) -> List[Dict]:
+    """Calcule un plan d'amortissement (linéaire par défaut)"""
     if montant <= 0 or duree_annees <= 0:
         return []
     
-    amortissement_annuel = montant / duree_annees
-    plan = []
+    plans = calculer_plans_amortissement([montant], [duree_annees], [methode], [mois_mise_en_service])
     
-    for annee in range(1, duree_annees + 1):
-        valeur_debut = montant - (amortissement_annuel * (annee - 1))
-        valeur_fin = montant - (amortissement_annuel * annee)
-        
-        plan.append({
+    return [
+        {
             "Année": annee,
-            "Valeur début": round(valeur_debut, 2),
-            "Amortissement": round(amortissement_annuel, 2),
-            "Valeur fin": round(valeur_fin, 2)
-        })
-    
-    return plan
\ No newline at end of file
+            "Valeur début": round(float(plans["valeur_debut"][0, annee - 1]), 2),
+            "Amortissement": round(float(plans["dotations"][0, annee - 1]), 2),
+            "Valeur fin": round(float(plans["valeur_fin"][0, annee - 1]), 2)
+        }
+        for annee in range(1, plans["n_annees"] + 1)
+    ]
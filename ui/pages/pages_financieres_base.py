@@ -5,6 +5,13 @@ Pages financières de base - Version simplifiée pour préserver le workflow
 import streamlit as st
 import pandas as pd
 from datetime import date
+from services.financial import (
+    extraire_hypotheses_pages, lignes_devises_pages, projeter_scenarios, simuler_monte_carlo, analyser_sensibilite, resoudre_objectif,
+    DEVISES, POSTES_DEVISE, TAUX_CHANGE_DEFAUT, reporter_en_devise,
+    INDICES, lire_parametres_indexation, matrice_taux_indexation, indices_cumules, indexer_charges_annuelles
+)
+from utils.financial_utils import TYPES_PRET, calculer_echeancier_financements, totaliser_par_annee
+from ui.components import choisir_mode_saisie, editeur_tableau
 
 def page_informations_generales():
     """Page des informations générales - Version simplifiée"""
@@ -156,73 +163,6 @@ def page_besoins_demarrage():
     # Sauvegarde des données
     st.session_state.data["besoins_demarrage"] = besoins
 
-def calculer_pret_interet_fixe(montant, taux_annuel, duree_mois):
-    """
-    Calcule les détails d'un prêt avec intérêts fixes par mois.
-    
-    Args:
-        montant (float): Montant du prêt.
-        taux_annuel (float): Taux annuel en pourcentage.
-        duree_mois (int): Durée du prêt en mois.
-    
-    Returns:
-        dict: Détails du prêt.
-    """
-    if montant <= 0 or taux_annuel < 0:
-        return {
-            "mensualite": 0.0,
-            "principal_mensuel": 0.0,
-            "interet_mensuel": 0.0,
-            "total_a_rembourser": 0.0,
-            "interets_totaux": 0.0,
-            "interets_annee1": 0.0,
-            "interets_annee2": 0.0,
-            "interets_annee3": 0.0
-        }
-    
-    if duree_mois <= 0:
-        return {
-            "mensualite": 0.0,
-            "principal_mensuel": 0.0,
-            "interet_mensuel": 0.0,
-            "total_a_rembourser": 0.0,
-            "interets_totaux": 0.0,
-            "interets_annee1": 0.0,
-            "interets_annee2": 0.0,
-            "interets_annee3": 0.0
-        }
-    
-    taux_mensuel = taux_annuel / 100 / 12
-    
-    if taux_mensuel == 0:
-        mensualite = montant / duree_mois
-        interet_mensuel = 0.0
-    else:
-        mensualite = (taux_mensuel * montant) / (1 - (1 + taux_mensuel) ** (-duree_mois))
-        interet_mensuel = montant * taux_mensuel
-    
-    principal_mensuel = montant / duree_mois
-    
-    total_a_rembourser = mensualite * duree_mois
-    
-    interets_totaux = interet_mensuel * duree_mois
-    
-    # Intérêts par année, limités à 12 mois maximum
-    interets_annee1 = interet_mensuel * min(duree_mois, 12)
-    interets_annee2 = interet_mensuel * min(max(duree_mois - 12, 0), 12)
-    interets_annee3 = interet_mensuel * min(max(duree_mois - 24, 0), 12)
-    
-    return {
-        "mensualite": mensualite,
-        "principal_mensuel": principal_mensuel,
-        "interet_mensuel": interet_mensuel,
-        "total_a_rembourser": total_a_rembourser,
-        "interets_totaux": interets_totaux,
-        "interets_annee1": interets_annee1,
-        "interets_annee2": interets_annee2,
-        "interets_annee3": interets_annee3
-    }
-
 def page_financement():
     """Page de financement - Version complète selon l'original"""
     st.title("🏦 Financement")
@@ -258,16 +198,11 @@ def page_financement():
     st.write("---")
     st.subheader("🏦 Emprunts bancaires")
     
-    total_emprunts = 0.0
-    total_interets_annee1 = 0.0
-    total_interets_annee2 = 0.0
-    total_interets_annee3 = 0.0
-    
     for i in range(1, 4):  # Prêt 1, 2, 3
         pret_name = f"Prêt {i}"
         
         st.markdown(f"**{pret_name}**")
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4, col5 = st.columns(5)
         
         # Initialiser la structure du prêt si elle n'existe pas
         if pret_name not in fin:
@@ -299,39 +234,65 @@ def page_financement():
                 key=f"duree_pret_{i}"
             )
         
-        # Calculs du prêt
-        if fin[pret_name]["montant"] > 0:
-            pret_info = calculer_pret_interet_fixe(
-                fin[pret_name]["montant"],
-                fin[pret_name]["taux"],
-                fin[pret_name]["duree"]
+        with col4:
+            types = list(TYPES_PRET)
+            fin[pret_name]["type"] = st.selectbox(
+                f"Remboursement du {pret_name}",
+                types,
+                index=types.index(fin[pret_name].get("type", "annuite")),
+                format_func=TYPES_PRET.get,
+                key=f"type_pret_{i}"
+            )
+        
+        with col5:
+            fin[pret_name]["differe"] = st.number_input(
+                f"Différé du {pret_name} (mois)",
+                value=fin[pret_name].get("differe", 0),
+                min_value=0,
+                max_value=60,
+                help="Mois pendant lesquels seuls les intérêts sont payés",
+                key=f"differe_pret_{i}"
             )
+    
+    # Échéanciers de tous les prêts calculés en une passe, sur des années entières
+    duree_max = max([fin[f"Prêt {i}"]["duree"] for i in range(1, 4)] + [60])
+    echeancier = calculer_echeancier_financements(
+        {f"Prêt {i}": fin[f"Prêt {i}"] for i in range(1, 4)},
+        n_mois=-(-duree_max // 12) * 12
+    )
+    prets = echeancier["prets"]
+    interets_annuels = totaliser_par_annee(echeancier["interets"])
+    principal_annuel = totaliser_par_annee(echeancier["principal"])
+    
+    total_emprunts = float(prets["montants"].sum())
+    
+    for j, pret_name in enumerate(prets["noms"]):
+        mensualite_apres_differe = echeancier["mensualite"][j, min(int(prets["differes_mois"][j]), int(prets["durees_mois"][j]) - 1)]
+        interets_totaux = echeancier["interets"][j].sum()
+        
+        # Affichage des détails du prêt
+        with st.expander(f"Détails du {pret_name}"):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"Première mensualité : {echeancier['mensualite'][j, 0]:.2f} $")
+                st.write(f"Mensualité après différé : {mensualite_apres_differe:.2f} $")
+                st.write(f"Intérêts du premier mois : {echeancier['interets'][j, 0]:.2f} $")
             
-            total_emprunts += fin[pret_name]["montant"]
-            total_interets_annee1 += pret_info["interets_annee1"]
-            total_interets_annee2 += pret_info["interets_annee2"]
-            total_interets_annee3 += pret_info["interets_annee3"]
+            with col2:
+                st.write(f"Total à rembourser : {prets['montants'][j] + interets_totaux:.2f} $")
+                st.write(f"Intérêts totaux : {interets_totaux:.2f} $")
             
-            # Affichage des détails du prêt
-            with st.expander(f"Détails du {pret_name}"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(f"Mensualité : {pret_info['mensualite']:.2f} $")
-                    st.write(f"Principal mensuel : {pret_info['principal_mensuel']:.2f} $")
-                    st.write(f"Intérêt mensuel : {pret_info['interet_mensuel']:.2f} $")
-                
-                with col2:
-                    st.write(f"Total à rembourser : {pret_info['total_a_rembourser']:.2f} $")
-                    st.write(f"Intérêts totaux : {pret_info['interets_totaux']:.2f} $")
-                
-                st.write("**Intérêts par année :**")
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.write(f"Année 1 : {pret_info['interets_annee1']:.2f} $")
-                with col2:
-                    st.write(f"Année 2 : {pret_info['interets_annee2']:.2f} $")
-                with col3:
-                    st.write(f"Année 3 : {pret_info['interets_annee3']:.2f} $")
+            st.write("**Remboursements par année :**")
+            df_pret = pd.DataFrame({
+                "Année": [f"Année {a}" for a in range(1, interets_annuels.shape[1] + 1)],
+                "Capital remboursé ($)": principal_annuel[j],
+                "Intérêts ($)": interets_annuels[j],
+                "Capital restant dû ($)": echeancier["capital_restant"][j, 11::12]
+            })
+            st.dataframe(df_pret.style.format({c: "{:,.2f}" for c in df_pret.columns[1:]}), width='stretch', hide_index=True)
+    
+    # Intérêts cumulés de tous les prêts, sur 5 ans
+    total_interets_annees = interets_annuels.sum(axis=0) if interets_annuels.size else [0.0] * 5
     
     # Section 3: Subventions
     st.write("---")
@@ -386,9 +347,8 @@ def page_financement():
     fin["total_subventions"] = total_subventions
     fin["total_autres"] = total_autres
     fin["total_financement"] = total_financement
-    fin["total_interets_annee1"] = total_interets_annee1
-    fin["total_interets_annee2"] = total_interets_annee2
-    fin["total_interets_annee3"] = total_interets_annee3
+    for a in range(1, 6):
+        fin[f"total_interets_annee{a}"] = float(total_interets_annees[a - 1]) if a <= len(total_interets_annees) else 0.0
     
     # Affichage des totaux
     col1, col2, col3, col4 = st.columns(4)
@@ -422,6 +382,8 @@ def page_charges_fixes():
     st.title("📋 Charges Fixes sur 5 Années")
     st.markdown("### Système d'autofill intelligent - Modifiez année 1 pour auto-remplir années 2 à 5")
     
+    saisie_tableau = choisir_mode_saisie()
+    
     if "data" not in st.session_state:
         st.session_state.data = {}
     
@@ -498,220 +460,286 @@ def page_charges_fixes():
         year5_key = f"charge_{charge}_annee5"
         st.session_state[f"updated_{year5_key}"] = True
     
-    # Interface pour les charges fixes prédéfinies
-    st.subheader("💼 Charges Fixes Prédéfinies")
-    st.info("💡 **Autofill intelligent** : Modifiez l'année 1 pour auto-remplir les années suivantes")
-    
-    # Affichage en format tableau avec 5 colonnes
-    for charge in charges_fixes_predefinies:
-        st.markdown(f"**{charge}**")
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        # S'assurer que la charge existe dans toutes les années
-        for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
-            if charge not in charges_fixes_dict[annee]:
-                charges_fixes_dict[annee][charge] = 0.0
-        
-        with col1:
-            year1_key = f"charge_{charge}_annee1"
-            if year1_key not in st.session_state:
-                st.session_state[year1_key] = charges_fixes_dict["annee1"].get(charge, 0.0)
-            montant1 = st.number_input(
-                f"Année 1 ($)",
-                min_value=0.0,
-                key=year1_key,
-                on_change=update_year1,
-                args=(charge,),
-                value=st.session_state[year1_key]
-            )
-            charges_fixes_dict["annee1"][charge] = montant1
-        
-        with col2:
-            year2_key = f"charge_{charge}_annee2"
-            if year2_key not in st.session_state:
-                st.session_state[year2_key] = charges_fixes_dict["annee2"].get(charge, 0.0)
-            montant2 = st.number_input(
-                f"Année 2 ($)",
-                min_value=0.0,
-                key=year2_key,
-                on_change=update_year2,
-                args=(charge,),
-                value=st.session_state[year2_key]
-            )
-            charges_fixes_dict["annee2"][charge] = montant2
-        
-        with col3:
-            year3_key = f"charge_{charge}_annee3"
-            if year3_key not in st.session_state:
-                st.session_state[year3_key] = charges_fixes_dict["annee3"].get(charge, 0.0)
-            montant3 = st.number_input(
-                f"Année 3 ($)",
-                min_value=0.0,
-                key=year3_key,
-                on_change=update_year3,
-                args=(charge,),
-                value=st.session_state[year3_key]
-            )
-            charges_fixes_dict["annee3"][charge] = montant3
-        
-        with col4:
-            year4_key = f"charge_{charge}_annee4"
-            if year4_key not in st.session_state:
-                st.session_state[year4_key] = charges_fixes_dict["annee4"].get(charge, 0.0)
-            montant4 = st.number_input(
-                f"Année 4 ($)",
-                min_value=0.0,
-                key=year4_key,
-                on_change=update_year4,
-                args=(charge,),
-                value=st.session_state[year4_key]
-            )
-            charges_fixes_dict["annee4"][charge] = montant4
-        
-        with col5:
-            year5_key = f"charge_{charge}_annee5"
-            if year5_key not in st.session_state:
-                st.session_state[year5_key] = charges_fixes_dict["annee5"].get(charge, 0.0)
-            montant5 = st.number_input(
-                f"Année 5 ($)",
-                min_value=0.0,
-                key=year5_key,
-                on_change=update_year5,
-                args=(charge,),
-                value=st.session_state[year5_key]
-            )
-            charges_fixes_dict["annee5"][charge] = montant5
-    
-    # Section charges fixes personnalisées
-    st.subheader("➕ Charges Fixes Personnalisées")
-    st.info("Ajoutez vos propres charges fixes non listées ci-dessus")
-    
-    # Initialiser les charges personnalisées si nécessaire
-    if "charges_personnalisees" not in data:
-        data["charges_personnalisees"] = []
-    
-    # Interface pour ajouter une nouvelle charge personnalisée
-    with st.expander("🆕 Ajouter une nouvelle charge fixe"):
-        col_nom, col_add = st.columns([3, 1])
-        with col_nom:
-            nouvelle_charge = st.text_input("Nom de la nouvelle charge fixe")
-        with col_add:
-            st.write("")  # Espacement
-            if st.button("Ajouter"):
-                if nouvelle_charge and nouvelle_charge not in data["charges_personnalisees"]:
-                    data["charges_personnalisees"].append(nouvelle_charge)
-                    # Initialiser les valeurs pour toutes les années
-                    for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
-                        charges_fixes_dict[annee][nouvelle_charge] = 0.0
-                    st.success(f"Charge '{nouvelle_charge}' ajoutée !")
-                    st.rerun()
-                elif nouvelle_charge in data["charges_personnalisees"]:
-                    st.warning("Cette charge existe déjà")
-    
-    # Afficher les charges personnalisées existantes
-    if data["charges_personnalisees"]:
-        st.markdown("**Charges personnalisées :**")
-        for i, charge in enumerate(data["charges_personnalisees"]):
-            col_charge, col_delete = st.columns([10, 1])
+    def saisir_charges_fixes_en_tableau():
+        """Saisie de toutes les charges (prédéfinies et personnalisées) dans un seul tableau"""
+        annees = ["annee1", "annee2", "annee3", "annee4", "annee5"]
+        colonnes_annees = [f"Année {i} ($)" for i in range(1, 6)]
+        personnalisees = data.setdefault("charges_personnalisees", [])
+        noms = charges_fixes_predefinies + personnalisees
+        
+        tableau = pd.DataFrame({"Charge": noms})
+        for annee, colonne in zip(annees, colonnes_annees):
+            tableau[colonne] = [float(charges_fixes_dict[annee].get(nom, 0.0)) for nom in noms]
+        
+        st.info("💡 Ajoutez une ligne pour une charge personnalisée ; supprimer une charge prédéfinie la remet à 0.")
+        validation = editeur_tableau(
+            "charges_fixes", tableau,
+            colonnes_montants=colonnes_annees, colonnes_texte=["Charge"], colonne_libelle="Charge",
+            lignes_dynamiques=True,
+            column_config={
+                "Charge": st.column_config.TextColumn("Charge", required=True),
+                **{colonne: st.column_config.NumberColumn(colonne, min_value=0.0, format="%.2f", default=0.0)
+                   for colonne in colonnes_annees}
+            }
+        )
+        if not validation['valide']:
+            return
+        
+        saisi = validation['donnees_nettoyees'].set_index("Charge")
+        nouvelles_personnalisees = [nom for nom in saisi.index if nom not in charges_fixes_predefinies]
+        for nom in set(personnalisees) - set(nouvelles_personnalisees):
+            for annee in annees:
+                charges_fixes_dict[annee].pop(nom, None)
+        data["charges_personnalisees"] = nouvelles_personnalisees
+        
+        for i, (annee, colonne) in enumerate(zip(annees, colonnes_annees), 1):
+            for nom in charges_fixes_predefinies + nouvelles_personnalisees:
+                montant = float(saisi[colonne].get(nom, 0.0))
+                charges_fixes_dict[annee][nom] = montant
+                # Champs du mode "champ par champ", pour retrouver les mêmes valeurs
+                prefixe = "charge" if nom in charges_fixes_predefinies else "charge_perso"
+                st.session_state[f"{prefixe}_{nom}_annee{i}"] = montant
+    
+    def afficher_total_saisi():
+        """Totaux saisis, avant indexation"""
+        st.markdown("**Total saisi (avant indexation)**")
+        for i, col in enumerate(st.columns(5), 1):
+            with col:
+                st.metric(f"Année {i}", f"{sum(charges_fixes_dict[f'annee{i}'].values()):,.0f} $")
+    
+    @st.fragment
+    def grille_charges_fixes():
+        """Grilles des charges prédéfinies et personnalisées (fragment : seules les grilles sont réexécutées)"""
+        if saisie_tableau:
+            saisir_charges_fixes_en_tableau()
+            afficher_total_saisi()
+            bouton_appliquer_grille("charges_fixes")
+            return
+        
+        # Interface pour les charges fixes prédéfinies
+        st.subheader("💼 Charges Fixes Prédéfinies")
+        st.info("💡 **Autofill intelligent** : Modifiez l'année 1 pour auto-remplir les années suivantes")
+        
+        # Affichage en format tableau avec 5 colonnes
+        for charge in charges_fixes_predefinies:
+            st.markdown(f"**{charge}**")
+            col1, col2, col3, col4, col5 = st.columns(5)
             
-            with col_charge:
-                st.markdown(f"**{charge}**")
-                col1, col2, col3, col4, col5 = st.columns(5)
-                
-                # S'assurer que la charge existe dans toutes les années
-                for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
-                    if charge not in charges_fixes_dict[annee]:
-                        charges_fixes_dict[annee][charge] = 0.0
-                
-                with col1:
-                    year1_key = f"charge_perso_{charge}_annee1"
-                    if year1_key not in st.session_state:
-                        st.session_state[year1_key] = charges_fixes_dict["annee1"].get(charge, 0.0)
-                    montant1 = st.number_input(
-                        f"Année 1 ($)",
-                        min_value=0.0,
-                        key=year1_key,
-                        on_change=update_year1,
-                        args=(charge,),
-                        value=st.session_state[year1_key]
-                    )
-                    charges_fixes_dict["annee1"][charge] = montant1
-                
-                with col2:
-                    year2_key = f"charge_perso_{charge}_annee2"
-                    if year2_key not in st.session_state:
-                        st.session_state[year2_key] = charges_fixes_dict["annee2"].get(charge, 0.0)
-                    montant2 = st.number_input(
-                        f"Année 2 ($)",
-                        min_value=0.0,
-                        key=year2_key,
-                        on_change=update_year2,
-                        args=(charge,),
-                        value=st.session_state[year2_key]
-                    )
-                    charges_fixes_dict["annee2"][charge] = montant2
-                
-                with col3:
-                    year3_key = f"charge_perso_{charge}_annee3"
-                    if year3_key not in st.session_state:
-                        st.session_state[year3_key] = charges_fixes_dict["annee3"].get(charge, 0.0)
-                    montant3 = st.number_input(
-                        f"Année 3 ($)",
-                        min_value=0.0,
-                        key=year3_key,
-                        on_change=update_year3,
-                        args=(charge,),
-                        value=st.session_state[year3_key]
-                    )
-                    charges_fixes_dict["annee3"][charge] = montant3
-                
-                with col4:
-                    year4_key = f"charge_perso_{charge}_annee4"
-                    if year4_key not in st.session_state:
-                        st.session_state[year4_key] = charges_fixes_dict["annee4"].get(charge, 0.0)
-                    montant4 = st.number_input(
-                        f"Année 4 ($)",
-                        min_value=0.0,
-                        key=year4_key,
-                        on_change=update_year4,
-                        args=(charge,),
-                        value=st.session_state[year4_key]
-                    )
-                    charges_fixes_dict["annee4"][charge] = montant4
-                
-                with col5:
-                    year5_key = f"charge_perso_{charge}_annee5"
-                    if year5_key not in st.session_state:
-                        st.session_state[year5_key] = charges_fixes_dict["annee5"].get(charge, 0.0)
-                    montant5 = st.number_input(
-                        f"Année 5 ($)",
-                        min_value=0.0,
-                        key=year5_key,
-                        on_change=update_year5,
-                        args=(charge,),
-                        value=st.session_state[year5_key]
-                    )
-                    charges_fixes_dict["annee5"][charge] = montant5
+            # S'assurer que la charge existe dans toutes les années
+            for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
+                if charge not in charges_fixes_dict[annee]:
+                    charges_fixes_dict[annee][charge] = 0.0
+            
+            with col1:
+                year1_key = f"charge_{charge}_annee1"
+                if year1_key not in st.session_state:
+                    st.session_state[year1_key] = charges_fixes_dict["annee1"].get(charge, 0.0)
+                montant1 = st.number_input(
+                    f"Année 1 ($)",
+                    min_value=0.0,
+                    key=year1_key,
+                    on_change=update_year1,
+                    args=(charge,),
+                    value=st.session_state[year1_key]
+                )
+                charges_fixes_dict["annee1"][charge] = montant1
+            
+            with col2:
+                year2_key = f"charge_{charge}_annee2"
+                if year2_key not in st.session_state:
+                    st.session_state[year2_key] = charges_fixes_dict["annee2"].get(charge, 0.0)
+                montant2 = st.number_input(
+                    f"Année 2 ($)",
+                    min_value=0.0,
+                    key=year2_key,
+                    on_change=update_year2,
+                    args=(charge,),
+                    value=st.session_state[year2_key]
+                )
+                charges_fixes_dict["annee2"][charge] = montant2
             
-            with col_delete:
+            with col3:
+                year3_key = f"charge_{charge}_annee3"
+                if year3_key not in st.session_state:
+                    st.session_state[year3_key] = charges_fixes_dict["annee3"].get(charge, 0.0)
+                montant3 = st.number_input(
+                    f"Année 3 ($)",
+                    min_value=0.0,
+                    key=year3_key,
+                    on_change=update_year3,
+                    args=(charge,),
+                    value=st.session_state[year3_key]
+                )
+                charges_fixes_dict["annee3"][charge] = montant3
+            
+            with col4:
+                year4_key = f"charge_{charge}_annee4"
+                if year4_key not in st.session_state:
+                    st.session_state[year4_key] = charges_fixes_dict["annee4"].get(charge, 0.0)
+                montant4 = st.number_input(
+                    f"Année 4 ($)",
+                    min_value=0.0,
+                    key=year4_key,
+                    on_change=update_year4,
+                    args=(charge,),
+                    value=st.session_state[year4_key]
+                )
+                charges_fixes_dict["annee4"][charge] = montant4
+            
+            with col5:
+                year5_key = f"charge_{charge}_annee5"
+                if year5_key not in st.session_state:
+                    st.session_state[year5_key] = charges_fixes_dict["annee5"].get(charge, 0.0)
+                montant5 = st.number_input(
+                    f"Année 5 ($)",
+                    min_value=0.0,
+                    key=year5_key,
+                    on_change=update_year5,
+                    args=(charge,),
+                    value=st.session_state[year5_key]
+                )
+                charges_fixes_dict["annee5"][charge] = montant5
+        
+        # Section charges fixes personnalisées
+        st.subheader("➕ Charges Fixes Personnalisées")
+        st.info("Ajoutez vos propres charges fixes non listées ci-dessus")
+        
+        # Initialiser les charges personnalisées si nécessaire
+        if "charges_personnalisees" not in data:
+            data["charges_personnalisees"] = []
+        
+        # Interface pour ajouter une nouvelle charge personnalisée
+        with st.expander("🆕 Ajouter une nouvelle charge fixe"):
+            col_nom, col_add = st.columns([3, 1])
+            with col_nom:
+                nouvelle_charge = st.text_input("Nom de la nouvelle charge fixe")
+            with col_add:
                 st.write("")  # Espacement
-                if st.button("🗑️", key=f"delete_charge_{i}", help="Supprimer cette charge"):
-                    # Supprimer la charge des listes et des données
-                    data["charges_personnalisees"].remove(charge)
+                if st.button("Ajouter"):
+                    if nouvelle_charge and nouvelle_charge not in data["charges_personnalisees"]:
+                        data["charges_personnalisees"].append(nouvelle_charge)
+                        # Initialiser les valeurs pour toutes les années
+                        for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
+                            charges_fixes_dict[annee][nouvelle_charge] = 0.0
+                        st.success(f"Charge '{nouvelle_charge}' ajoutée !")
+                        st.rerun()
+                    elif nouvelle_charge in data["charges_personnalisees"]:
+                        st.warning("Cette charge existe déjà")
+        
+        # Afficher les charges personnalisées existantes
+        if data["charges_personnalisees"]:
+            st.markdown("**Charges personnalisées :**")
+            for i, charge in enumerate(data["charges_personnalisees"]):
+                col_charge, col_delete = st.columns([10, 1])
+                
+                with col_charge:
+                    st.markdown(f"**{charge}**")
+                    col1, col2, col3, col4, col5 = st.columns(5)
+                    
+                    # S'assurer que la charge existe dans toutes les années
                     for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
-                        if charge in charges_fixes_dict[annee]:
-                            del charges_fixes_dict[annee][charge]
-                    st.success(f"Charge '{charge}' supprimée !")
-                    st.rerun()
+                        if charge not in charges_fixes_dict[annee]:
+                            charges_fixes_dict[annee][charge] = 0.0
+                    
+                    with col1:
+                        year1_key = f"charge_perso_{charge}_annee1"
+                        if year1_key not in st.session_state:
+                            st.session_state[year1_key] = charges_fixes_dict["annee1"].get(charge, 0.0)
+                        montant1 = st.number_input(
+                            f"Année 1 ($)",
+                            min_value=0.0,
+                            key=year1_key,
+                            on_change=update_year1,
+                            args=(charge,),
+                            value=st.session_state[year1_key]
+                        )
+                        charges_fixes_dict["annee1"][charge] = montant1
+                    
+                    with col2:
+                        year2_key = f"charge_perso_{charge}_annee2"
+                        if year2_key not in st.session_state:
+                            st.session_state[year2_key] = charges_fixes_dict["annee2"].get(charge, 0.0)
+                        montant2 = st.number_input(
+                            f"Année 2 ($)",
+                            min_value=0.0,
+                            key=year2_key,
+                            on_change=update_year2,
+                            args=(charge,),
+                            value=st.session_state[year2_key]
+                        )
+                        charges_fixes_dict["annee2"][charge] = montant2
+                    
+                    with col3:
+                        year3_key = f"charge_perso_{charge}_annee3"
+                        if year3_key not in st.session_state:
+                            st.session_state[year3_key] = charges_fixes_dict["annee3"].get(charge, 0.0)
+                        montant3 = st.number_input(
+                            f"Année 3 ($)",
+                            min_value=0.0,
+                            key=year3_key,
+                            on_change=update_year3,
+                            args=(charge,),
+                            value=st.session_state[year3_key]
+                        )
+                        charges_fixes_dict["annee3"][charge] = montant3
+                    
+                    with col4:
+                        year4_key = f"charge_perso_{charge}_annee4"
+                        if year4_key not in st.session_state:
+                            st.session_state[year4_key] = charges_fixes_dict["annee4"].get(charge, 0.0)
+                        montant4 = st.number_input(
+                            f"Année 4 ($)",
+                            min_value=0.0,
+                            key=year4_key,
+                            on_change=update_year4,
+                            args=(charge,),
+                            value=st.session_state[year4_key]
+                        )
+                        charges_fixes_dict["annee4"][charge] = montant4
+                    
+                    with col5:
+                        year5_key = f"charge_perso_{charge}_annee5"
+                        if year5_key not in st.session_state:
+                            st.session_state[year5_key] = charges_fixes_dict["annee5"].get(charge, 0.0)
+                        montant5 = st.number_input(
+                            f"Année 5 ($)",
+                            min_value=0.0,
+                            key=year5_key,
+                            on_change=update_year5,
+                            args=(charge,),
+                            value=st.session_state[year5_key]
+                        )
+                        charges_fixes_dict["annee5"][charge] = montant5
+                
+                with col_delete:
+                    st.write("")  # Espacement
+                    if st.button("🗑️", key=f"btn_delete_charge_{i}", help="Supprimer cette charge"):
+                        # Supprimer la charge des listes et des données
+                        data["charges_personnalisees"].remove(charge)
+                        for annee in ["annee1", "annee2", "annee3", "annee4", "annee5"]:
+                            if charge in charges_fixes_dict[annee]:
+                                del charges_fixes_dict[annee][charge]
+                        st.success(f"Charge '{charge}' supprimée !")
+                        st.rerun()
+        
+        afficher_total_saisi()
+        bouton_appliquer_grille("charges_fixes")
+    
+    grille_charges_fixes()
+    
+    afficher_parametres_indexation(data)
     
-    # Calculs et résumé
+    # Calculs et résumé : montants recopiés d'une année à l'autre indexés, montants saisis retenus tels quels
     st.subheader("📊 Résumé des Charges Fixes")
+    st.caption("Totaux après indexation (inflation générale ou révision des loyers selon la charge) des montants "
+               "recopiés de l'année précédente ; un montant modifié pour une année est retenu tel quel.")
     
     col1, col2, col3, col4, col5 = st.columns(5)
+    totaux_indexes = indexer_charges_annuelles(charges_fixes_dict, data.get("indexation"))['totaux']
     totaux_annuels = {}
     
     for i, (annee, col) in enumerate(zip(["annee1", "annee2", "annee3", "annee4", "annee5"], [col1, col2, col3, col4, col5]), 1):
-        total = sum(charges_fixes_dict[annee].values())
+        total = float(totaux_indexes[i - 1])
         totaux_annuels[annee] = total
         
         with col:
@@ -740,11 +768,65 @@ def page_charges_fixes():
     for i, annee in enumerate(["annee1", "annee2", "annee3", "annee4", "annee5"], 1):
         data[f"total_charges_fixes_annee{i}"] = totaux_annuels[annee]
 
+def bouton_appliquer_grille(cle: str):
+    """
+    Valide une grille de saisie affichée dans un fragment (`st.fragment`)
+
+    Modifier une cellule ne réexécute que le fragment de la grille et ses
+    totaux ; les totaux lus par le moteur financier ne sont mis à jour qu'à
+    l'exécution complète de la page, déclenchée par ce bouton.
+
+    Args:
+        cle (str): Identifiant unique de la grille
+    """
+    st.caption("Les totaux ci-dessus sont recalculés à chaque saisie ; appliquez-les pour mettre à jour les tableaux financiers.")
+    if st.button("✅ Appliquer aux calculs financiers", key=f"btn_appliquer_{cle}"):
+        st.rerun()
+
+def afficher_parametres_indexation(data):
+    """Taux annuels des indices (inflation, loyers, salaires) et hypothèses de croissance"""
+    parametres = lire_parametres_indexation(data.get("indexation"))
+    taux = matrice_taux_indexation(parametres) * 100
+    
+    with st.expander("📈 Indexation des charges et des salaires", expanded=False):
+        st.markdown("Taux annuels (%) appliqués à partir de l'année 2 aux charges recopiées de l'année précédente et aux salaires de l'année 1.")
+        grille = pd.DataFrame(
+            taux[:, 1:], index=list(INDICES.values()), columns=[f"Année {a}" for a in range(2, 6)]
+        )
+        grille = st.data_editor(grille, width='stretch', key="indexation_taux")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            taux_charges_sociales = st.number_input(
+                "Charges sociales (% de la masse salariale)", min_value=0.0, max_value=100.0,
+                value=parametres['taux_charges_sociales'], step=1.0, key="indexation_charges_sociales"
+            )
+        with col2:
+            croissance_ca = st.number_input(
+                "Croissance du CA par défaut (%/an)", min_value=0.0, max_value=100.0,
+                value=parametres['croissance_ca_defaut'], step=1.0, key="indexation_croissance_ca"
+            )
+        with col3:
+            plafond_ca = st.number_input(
+                "Plafond de croissance du CA extrapolé (%/an)", min_value=0.0, max_value=100.0,
+                value=parametres['plafond_croissance_ca'], step=1.0, key="indexation_plafond_ca"
+            )
+    
+    data["indexation"] = {
+        **data.get("indexation", {}),
+        "taux": {indice: grille.iloc[i].astype(float).fillna(0.0).tolist() for i, indice in enumerate(INDICES)},
+        "taux_charges_sociales": taux_charges_sociales,
+        "croissance_ca_defaut": croissance_ca,
+        "plafond_croissance_ca": plafond_ca
+    }
+
 def page_chiffre_affaires():
     """Page de chiffre d'affaires - Version complète avec autofill mensuel"""
     st.title("📈 Chiffre d'Affaires Prévisionnel")
     st.markdown("### Saisie mensuelle avec autofill intelligent sur 12 mois")
     
+    saisie_tableau = choisir_mode_saisie()
+    
     if "data" not in st.session_state:
         st.session_state.data = {}
     
@@ -798,97 +880,140 @@ def page_chiffre_affaires():
         """Marque un champ comme modifié manuellement"""
         st.session_state[f"updated_{key}"] = True
 
+    def saisir_ca_mensuel_en_tableau(nom_vente):
+        """Saisie des 12 mois (jours travaillés, CA moyen/jour) dans un seul tableau"""
+        colonnes = ["Jours travaillés", "CA moyen/jour ($)"]
+        tableau = pd.DataFrame({
+            "Mois": mois,
+            colonnes[0]: [float(chiffre_affaires_dict.get(f"{nom_vente}_{m}_jours", 0)) for m in mois],
+            colonnes[1]: [float(chiffre_affaires_dict.get(f"{nom_vente}_{m}_ca_moyen", 0.0)) for m in mois]
+        })
+        validation = editeur_tableau(
+            f"ca_{nom_vente}", tableau, colonnes_montants=colonnes, colonne_libelle="Mois",
+            column_config={
+                "Mois": st.column_config.TextColumn("Mois", disabled=True),
+                colonnes[0]: st.column_config.NumberColumn(colonnes[0], min_value=0, max_value=31, step=1, format="%d"),
+                colonnes[1]: st.column_config.NumberColumn(colonnes[1], min_value=0.0, format="%.2f")
+            }
+        )
+        saisi = validation['donnees_nettoyees'] if validation['valide'] else tableau
+        
+        data_ca = []
+        for mois_nom, jours, ca_moyen in zip(mois, saisi[colonnes[0]], saisi[colonnes[1]]):
+            key_jours = f"{nom_vente}_{mois_nom}_jours"
+            key_ca_moyen = f"{nom_vente}_{mois_nom}_ca_moyen"
+            jours, ca_moyen = int(round(jours)), float(ca_moyen)
+            if validation['valide']:
+                chiffre_affaires_dict[key_jours] = jours
+                chiffre_affaires_dict[key_ca_moyen] = ca_moyen
+                # Champs du mode "champ par champ", pour retrouver les mêmes valeurs
+                st.session_state[key_jours] = jours
+                st.session_state[key_ca_moyen] = ca_moyen
+            ca_mensuel = chiffre_affaires_dict.get(key_jours, 0) * chiffre_affaires_dict.get(key_ca_moyen, 0.0)
+            chiffre_affaires_dict[f"{nom_vente}_{mois_nom}_ca"] = ca_mensuel
+            data_ca.append({
+                "mois": mois_nom,
+                "jours_travailles": chiffre_affaires_dict.get(key_jours, 0),
+                "ca_moyen_jour": chiffre_affaires_dict.get(key_ca_moyen, 0.0),
+                "ca_mensuel": ca_mensuel
+            })
+        return data_ca
+    
+    @st.fragment
     def calcul_chiffre_affaires(nom_vente):
-        """Calcule le chiffre d'affaires pour un type de vente donné"""
+        """Calcule le chiffre d'affaires pour un type de vente donné (fragment : seule la grille est réexécutée)"""
         data_ca = []
         
         st.subheader(f"📊 {nom_vente} - Répartition mensuelle Année 1")
-        st.info("💡 Saisissez les données du Mois 1, les autres mois se rempliront automatiquement. Modifiez individuellement si nécessaire.")
-        
-        # En-têtes du tableau
-        col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
-        with col1:
-            st.write("**Mois**")
-        with col2:
-            st.write("**Jours travaillés**")
-        with col3:
-            st.write("**CA moyen/jour ($)**")
-        with col4:
-            st.write("**CA mensuel ($)**")
-        
-        st.write("---")
-        
-        for mois_nom in mois:
-            col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
-            
-            key_jours = f"{nom_vente}_{mois_nom}_jours"
-            key_ca_moyen = f"{nom_vente}_{mois_nom}_ca_moyen"
-            key_ca = f"{nom_vente}_{mois_nom}_ca"
+        if saisie_tableau:
+            data_ca = saisir_ca_mensuel_en_tableau(nom_vente)
+        else:
+            st.info("💡 Saisissez les données du Mois 1, les autres mois se rempliront automatiquement. Modifiez individuellement si nécessaire.")
             
+            # En-têtes du tableau
+            col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
             with col1:
-                st.write(f"**{mois_nom}**")
-            
+                st.write("**Mois**")
             with col2:
-                if mois_nom == "Mois 1":
-                    # Mois 1 : déclenche l'autofill
-                    montant_jours = st.number_input(
-                        f"Jours {mois_nom}",
-                        min_value=0,
-                        key=key_jours,
-                        value=chiffre_affaires_dict.get(key_jours, 0),
-                        on_change=update_jours_travailles,
-                        args=(nom_vente,),
-                        label_visibility="collapsed"
-                    )
-                else:
-                    # Mois 2-12 : peut être modifié individuellement
-                    montant_jours = st.number_input(
-                        f"Jours {mois_nom}",
-                        min_value=0,
-                        key=key_jours,
-                        value=chiffre_affaires_dict.get(key_jours, 0),
-                        on_change=lambda key=key_jours: mark_updated(key),
-                        label_visibility="collapsed"
-                    )
-                chiffre_affaires_dict[key_jours] = montant_jours
-            
+                st.write("**Jours travaillés**")
             with col3:
-                if mois_nom == "Mois 1":
-                    # Mois 1 : déclenche l'autofill
-                    montant_ca_moyen = st.number_input(
-                        f"CA moyen {mois_nom}",
-                        min_value=0.0,
-                        key=key_ca_moyen,
-                        value=chiffre_affaires_dict.get(key_ca_moyen, 0.0),
-                        on_change=update_ca_moyen_jour,
-                        args=(nom_vente,),
-                        label_visibility="collapsed"
-                    )
-                else:
-                    # Mois 2-12 : peut être modifié individuellement
-                    montant_ca_moyen = st.number_input(
-                        f"CA moyen {mois_nom}",
-                        min_value=0.0,
-                        key=key_ca_moyen,
-                        value=chiffre_affaires_dict.get(key_ca_moyen, 0.0),
-                        on_change=lambda key=key_ca_moyen: mark_updated(key),
-                        label_visibility="collapsed"
-                    )
-                chiffre_affaires_dict[key_ca_moyen] = montant_ca_moyen
-            
-            # Calcul automatique du CA mensuel
-            ca_mensuel = montant_jours * montant_ca_moyen
-            chiffre_affaires_dict[key_ca] = ca_mensuel
-            
+                st.write("**CA moyen/jour ($)**")
             with col4:
-                st.metric("CA Mensuel (USD)", f"{ca_mensuel:,.2f}")
+                st.write("**CA mensuel ($)**")
             
-            data_ca.append({
-                "mois": mois_nom,
-                "jours_travailles": montant_jours,
-                "ca_moyen_jour": montant_ca_moyen,
-                "ca_mensuel": ca_mensuel
-            })
+            st.write("---")
+            
+            for mois_nom in mois:
+                col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
+                
+                key_jours = f"{nom_vente}_{mois_nom}_jours"
+                key_ca_moyen = f"{nom_vente}_{mois_nom}_ca_moyen"
+                key_ca = f"{nom_vente}_{mois_nom}_ca"
+                
+                with col1:
+                    st.write(f"**{mois_nom}**")
+                
+                with col2:
+                    if mois_nom == "Mois 1":
+                        # Mois 1 : déclenche l'autofill
+                        montant_jours = st.number_input(
+                            f"Jours {mois_nom}",
+                            min_value=0,
+                            key=key_jours,
+                            value=chiffre_affaires_dict.get(key_jours, 0),
+                            on_change=update_jours_travailles,
+                            args=(nom_vente,),
+                            label_visibility="collapsed"
+                        )
+                    else:
+                        # Mois 2-12 : peut être modifié individuellement
+                        montant_jours = st.number_input(
+                            f"Jours {mois_nom}",
+                            min_value=0,
+                            key=key_jours,
+                            value=chiffre_affaires_dict.get(key_jours, 0),
+                            on_change=lambda key=key_jours: mark_updated(key),
+                            label_visibility="collapsed"
+                        )
+                    chiffre_affaires_dict[key_jours] = montant_jours
+                
+                with col3:
+                    if mois_nom == "Mois 1":
+                        # Mois 1 : déclenche l'autofill
+                        montant_ca_moyen = st.number_input(
+                            f"CA moyen {mois_nom}",
+                            min_value=0.0,
+                            key=key_ca_moyen,
+                            value=chiffre_affaires_dict.get(key_ca_moyen, 0.0),
+                            on_change=update_ca_moyen_jour,
+                            args=(nom_vente,),
+                            label_visibility="collapsed"
+                        )
+                    else:
+                        # Mois 2-12 : peut être modifié individuellement
+                        montant_ca_moyen = st.number_input(
+                            f"CA moyen {mois_nom}",
+                            min_value=0.0,
+                            key=key_ca_moyen,
+                            value=chiffre_affaires_dict.get(key_ca_moyen, 0.0),
+                            on_change=lambda key=key_ca_moyen: mark_updated(key),
+                            label_visibility="collapsed"
+                        )
+                    chiffre_affaires_dict[key_ca_moyen] = montant_ca_moyen
+                
+                # Calcul automatique du CA mensuel
+                ca_mensuel = montant_jours * montant_ca_moyen
+                chiffre_affaires_dict[key_ca] = ca_mensuel
+                
+                with col4:
+                    st.metric("CA Mensuel (USD)", f"{ca_mensuel:,.2f}")
+                
+                data_ca.append({
+                    "mois": mois_nom,
+                    "jours_travailles": montant_jours,
+                    "ca_moyen_jour": montant_ca_moyen,
+                    "ca_mensuel": ca_mensuel
+                })
         
         # Calcul du total année 1
         total_ca_annee1 = sum(item["ca_mensuel"] for item in data_ca)
@@ -968,18 +1093,24 @@ def page_chiffre_affaires():
         with col4:
             st.metric(f"CA Année 5 ({nom_vente})", f"{total_ca_annee5:,.2f} $")
         
-        return total_ca_annee1, total_ca_annee2, total_ca_annee3, total_ca_annee4, total_ca_annee5
+        bouton_appliquer_grille(f"ca_{nom_vente}")
+    
+    def totaux_grille(nom_vente):
+        """Totaux annuels d'une grille, tels qu'enregistrés par son fragment"""
+        return [chiffre_affaires_dict.get(f"total_ca_{nom_vente}_annee{i}", 0) for i in range(1, 6)]
     
     # Interface selon le type de vente sélectionné
     totaux_marchandises = [0, 0, 0, 0, 0]
     totaux_services = [0, 0, 0, 0, 0]
     
     if type_vente in ["Marchandises", "Mixte"]:
-        totaux_marchandises = calcul_chiffre_affaires("Marchandises")
+        calcul_chiffre_affaires("Marchandises")
+        totaux_marchandises = totaux_grille("Marchandises")
         st.write("---")
     
     if type_vente in ["Services", "Mixte"]:
-        totaux_services = calcul_chiffre_affaires("Services")
+        calcul_chiffre_affaires("Services")
+        totaux_services = totaux_grille("Services")
         st.write("---")
     
     # Calcul des totaux généraux
@@ -1175,6 +1306,178 @@ def page_tresorerie():
     for i, result in enumerate(resultats_tresorerie, 1):
         data[f"tresorerie_annee{i}"] = result["tresorerie_cumulative"]
         data[f"resultat_net_annee{i}"] = result["resultat_net"]
+    
+    afficher_devises(data)
+    afficher_simulation_risque(data)
+    afficher_objectif_emprunt(data)
+
+def afficher_devises(data):
+    """Devise de règlement de chaque poste et budget mensuel reporté en USD ou en CDF"""
+    st.subheader("💱 Devises USD/CDF")
+    
+    if "devises" not in data:
+        data["devises"] = {}
+    devises = data["devises"]
+    postes = devises.setdefault("postes", {})
+    
+    with st.expander("Devise des postes et taux de change", expanded=False):
+        st.markdown("Les montants restent saisis en USD au taux initial ; une ligne réglée en CDF "
+                    "voit sa valeur en USD évoluer avec le taux de change. Chaque ligne suit la "
+                    "devise de son poste, sauf devise propre choisie ci-dessous.")
+        
+        colonnes = st.columns(len(POSTES_DEVISE))
+        for colonne, (poste, libelle) in zip(colonnes, POSTES_DEVISE.items()):
+            with colonne:
+                actuelle = postes.get(poste, "USD")
+                actuelle = actuelle if isinstance(actuelle, str) else ("CDF" if actuelle >= 0.5 else "USD")
+                postes[poste] = st.selectbox(libelle, list(DEVISES), index=list(DEVISES).index(actuelle), key=f"devise_{poste}")
+
+        # Devise propre à une ligne (loyer en CDF, assurance en USD...), à défaut celle du poste
+        st.markdown("**Devise par ligne**")
+        choix_lignes = ["Devise du poste"] + list(DEVISES)
+        devises_lignes = devises.setdefault("lignes", {})
+        for poste, (noms, _) in lignes_devises_pages(data).items():
+            if not len(noms):
+                continue
+            lignes_poste = devises_lignes.setdefault(poste, {})
+            st.caption(POSTES_DEVISE[poste])
+            colonnes = st.columns(min(len(noms), 4))
+            for i, nom in enumerate(noms):
+                with colonnes[i % len(colonnes)]:
+                    actuelle = lignes_poste.get(nom, "Devise du poste")
+                    actuelle = actuelle if isinstance(actuelle, str) else ("CDF" if actuelle >= 0.5 else "USD")
+                    choix = st.selectbox(nom, choix_lignes, index=choix_lignes.index(actuelle),
+                                         key=f"devise_ligne_{poste}_{nom}")
+                    if choix in DEVISES:
+                        lignes_poste[nom] = choix
+                    else:
+                        lignes_poste.pop(nom, None)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            devises["taux_change"] = st.number_input(
+                "Taux initial (CDF pour 1 USD)", min_value=1.0,
+                value=float(devises.get("taux_change", TAUX_CHANGE_DEFAUT)), step=50.0, key="devise_taux_change"
+            )
+        with col2:
+            devises["depreciation_annuelle"] = st.number_input(
+                "Dépréciation annuelle du CDF (%)", min_value=-50.0, max_value=200.0,
+                value=float(devises.get("depreciation_annuelle", 0.0)), step=1.0, key="devise_depreciation"
+            )
+        with col3:
+            devises["devise_rapport"] = st.radio(
+                "Devise du rapport", list(DEVISES), horizontal=True,
+                index=list(DEVISES).index(devises.get("devise_rapport", "USD")), key="devise_rapport"
+            )
+        
+        # Projection calculée une fois en USD, puis reportée par simple multiplication
+        projection = reporter_en_devise(projeter_scenarios(extraire_hypotheses_pages(data)), devises["devise_rapport"])
+        budget = pd.DataFrame({
+            "Taux CDF/USD": projection["taux_change"][0],
+            "Encaissements": projection["encaissements"][0],
+            "Décaissements": projection["decaissements"][0],
+            "Solde": projection["solde_mensuel"][0],
+            "Trésorerie": projection["tresorerie"][0]
+        }, index=[f"Mois {m}" for m in range(1, 61)])
+        
+        st.markdown(f"**Budget de trésorerie sur 60 mois ({devises['devise_rapport']})**")
+        st.dataframe(budget.style.format("{:,.0f}"), width='stretch', height=300)
+
+def afficher_objectif_emprunt(data):
+    """Recherche du montant d'emprunt qui maintient la trésorerie au-dessus d'un seuil"""
+    st.subheader("🎯 Emprunt nécessaire")
+    
+    with st.expander("Quel montant emprunter pour garder une trésorerie positive ?", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            seuil = st.number_input("Trésorerie minimale souhaitée ($)", value=0.0, step=1000.0, key="objectif_emprunt_seuil")
+            horizon = st.slider("Horizon (mois)", 1, 60, 12, key="objectif_emprunt_horizon")
+        with col2:
+            taux = st.number_input("Taux d'intérêt annuel (%)", min_value=0.0, max_value=100.0, value=10.0, step=0.5, key="objectif_emprunt_taux")
+            duree = st.number_input("Durée (mois)", min_value=1, max_value=360, value=36, step=1, key="objectif_emprunt_duree")
+        with col3:
+            type_pret = st.selectbox("Type de prêt", list(TYPES_PRET), format_func=TYPES_PRET.get, key="objectif_emprunt_type")
+            differe = st.number_input("Différé (mois)", min_value=0, max_value=60, value=0, step=1, key="objectif_emprunt_differe")
+        
+        if not st.button("Calculer le montant", key="btn_objectif_emprunt"):
+            return
+        
+        hypotheses = extraire_hypotheses_pages(data)
+        hypotheses['emprunt_supplementaire'] = {
+            'taux': taux, 'duree_mois': int(duree), 'type': type_pret, 'differe_mois': int(differe)
+        }
+        resultat = resoudre_objectif(hypotheses, 'montant_emprunt', 'tresorerie_minimale', cible=seuil, mois=horizon)
+        
+        if not resultat.get('success'):
+            st.error(f"Aucun montant d'emprunt ne permet d'atteindre cet objectif : {resultat.get('error')}")
+            return
+        
+        if resultat['valeur'] <= 0:
+            st.success(f"✅ Aucun emprunt supplémentaire n'est nécessaire sur les {horizon} premiers mois.")
+        else:
+            st.metric("Emprunt supplémentaire nécessaire", f"{resultat['valeur']:,.0f} $")
+        st.caption(f"Trésorerie minimale obtenue : {resultat['indicateur_atteint']:,.0f} $ — "
+                   f"{resultat['evaluations']} scénarios évalués en {resultat['duree_calcul_ms']:.0f} ms.")
+
+def afficher_simulation_risque(data):
+    """Simulation de Monte Carlo du risque de trésorerie sur 60 mois"""
+    st.subheader("🎲 Simulation de Risque (Monte Carlo)")
+    
+    with st.expander("Probabilité de rupture de trésorerie", expanded=False):
+        st.markdown("Des milliers de scénarios font varier la croissance du CA, le taux de charges variables, "
+                    "les délais de paiement et le taux de change USD/CDF.")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            n_scenarios = st.select_slider("Nombre de scénarios", options=[1000, 5000, 10000, 20000], value=10000, key="mc_n_scenarios")
+            graine = st.number_input("Graine aléatoire", min_value=0, value=42, step=1, key="mc_graine")
+        with col2:
+            vol_ca = st.slider("Volatilité annuelle du CA (%)", 0, 50, 15, key="mc_vol_ca")
+            vol_cv = st.slider("Volatilité du taux de charges variables (points)", 0, 20, 5, key="mc_vol_cv")
+            vol_change = st.slider("Volatilité annuelle du taux USD/CDF (%)", 0, 50, 20, key="mc_vol_change")
+        
+        if st.button("Lancer la simulation", key="btn_mc_lancer"):
+            hypotheses = extraire_hypotheses_pages(data)
+            st.session_state["simulation_monte_carlo"] = simuler_monte_carlo(
+                hypotheses,
+                n_scenarios=n_scenarios,
+                graine=int(graine),
+                volatilites={
+                    'croissance_ca': vol_ca / 100,
+                    'taux_charges_variables': vol_cv / 100,
+                    'change': vol_change / 100
+                }
+            )
+        
+        resultat = st.session_state.get("simulation_monte_carlo")
+        if not resultat:
+            return
+        if not resultat.get('success'):
+            st.error(f"Erreur lors de la simulation : {resultat.get('error')}")
+            return
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Probabilité de trésorerie négative", f"{resultat['probabilite_tresorerie_negative']:.1%}")
+        with col2:
+            st.metric("Trésorerie minimale (P5)", f"{resultat['tresorerie_minimale_percentiles']['P5']:,.0f} $")
+        with col3:
+            mois_creux = resultat['mois_pire_creux']
+            st.metric("Mois du pire creux (le plus fréquent)", f"Mois {mois_creux}" if mois_creux else "Aucun")
+        
+        st.markdown("**Résultat net par année (P5 / P50 / P95)**")
+        df_resultats = pd.DataFrame(
+            resultat['resultat_net_percentiles'],
+            index=[f"Année {i}" for i in range(1, 6)]
+        )
+        st.dataframe(df_resultats.style.format("{:,.0f} $"), width='stretch')
+        
+        st.markdown("**Trésorerie mensuelle (P5 / P50 / P95)**")
+        df_tresorerie = pd.DataFrame(resultat['tresorerie_percentiles'])
+        df_tresorerie.index = df_tresorerie.index + 1
+        st.line_chart(df_tresorerie)
+        
+        st.caption(f"{resultat['n_scenarios']:,} scénarios calculés en {resultat['duree_calcul_ms']:.0f} ms (graine {resultat['graine']}).")
 
 def page_charges_variables():
     """Page des charges variables - Version simplifiée"""
@@ -1386,6 +1689,8 @@ def page_salaires():
     st.title("👥 Salaires")
     st.info("⚠️ Version simplifiée - Données sur 3 ans.")
     
+    saisie_tableau = choisir_mode_saisie()
+    
     if "data" not in st.session_state:
         st.session_state.data = {}
     
@@ -1394,46 +1699,89 @@ def page_salaires():
     
     salaires = st.session_state.data["salaires"]
     
-    st.subheader("Salaires mensuels bruts")
-    
     postes = ["Dirigeant", "Employé 1", "Employé 2"]
     
-    total_mensuel = 0
-    for poste in postes:
-        if poste not in salaires:
-            salaires[poste] = {}
+    def saisir_salaires_en_tableau():
+        """Saisie des salaires de tous les postes dans un seul tableau"""
+        colonne = "Salaire brut ($/mois)"
+        tableau = pd.DataFrame({
+            "Poste": postes,
+            colonne: [float(salaires[poste].get("salaire_brut", 0.0)) for poste in postes]
+        })
+        validation = editeur_tableau(
+            "salaires", tableau, colonnes_montants=[colonne], colonne_libelle="Poste",
+            column_config={
+                "Poste": st.column_config.TextColumn("Poste", disabled=True),
+                colonne: st.column_config.NumberColumn(colonne, min_value=0.0, format="%.2f")
+            }
+        )
+        if validation['valide']:
+            for poste, montant in zip(postes, validation['donnees_nettoyees'][colonne]):
+                salaires[poste]["salaire_brut"] = float(montant)
+                # Champ du mode "champ par champ", pour retrouver la même valeur
+                st.session_state[f"salaire_{poste}"] = float(montant)
+    
+    @st.fragment
+    def grille_salaires():
+        """Grille des salaires et récapitulatif (fragment : seule la grille est réexécutée)"""
+        st.subheader("Salaires mensuels bruts")
+        
+        total_mensuel = 0
+        if saisie_tableau:
+            for poste in postes:
+                salaires.setdefault(poste, {})
+            saisir_salaires_en_tableau()
+            for poste in postes:
+                salaire_brut = salaires[poste].get("salaire_brut", 0.0)
+                salaires[poste]["charges_sociales"] = salaire_brut * 0.45
+                total_mensuel += salaire_brut
+        else:
+            for poste in postes:
+                if poste not in salaires:
+                    salaires[poste] = {}
+            
+                col1, col2 = st.columns(2)
+                with col1:
+                    salaire_brut = st.number_input(f"Salaire {poste} ($/mois)", 
+                                                 value=salaires[poste].get("salaire_brut", 0.0), 
+                                                 min_value=0.0,
+                                                 key=f"salaire_{poste}")
+                    salaires[poste]["salaire_brut"] = salaire_brut
+                    total_mensuel += salaire_brut
+            
+                with col2:
+                    # Calcul automatique des charges sociales (approximation 45%)
+                    charges_sociales = salaire_brut * 0.45
+                    st.metric(f"Charges sociales {poste}", f"{charges_sociales:,.0f} $")
+                    salaires[poste]["charges_sociales"] = charges_sociales
         
-        col1, col2 = st.columns(2)
-        with col1:
-            salaire_brut = st.number_input(f"Salaire {poste} ($/mois)", 
-                                         value=salaires[poste].get("salaire_brut", 0.0), 
-                                         min_value=0.0,
-                                         key=f"salaire_{poste}")
-            salaires[poste]["salaire_brut"] = salaire_brut
-            total_mensuel += salaire_brut
+        # Totaux
+        total_charges_sociales = sum([poste.get("charges_sociales", 0) for poste in salaires.values()])
+        cout_total_mensuel = total_mensuel + total_charges_sociales
+        cout_total_annuel = cout_total_mensuel * 12
         
+        st.subheader("Récapitulatif")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Salaires bruts/mois", f"{total_mensuel:,.0f} $")
         with col2:
-            # Calcul automatique des charges sociales (approximation 45%)
-            charges_sociales = salaire_brut * 0.45
-            st.metric(f"Charges sociales {poste}", f"{charges_sociales:,.0f} $")
-            salaires[poste]["charges_sociales"] = charges_sociales
+            st.metric("Charges sociales/mois", f"{total_charges_sociales:,.0f} $")
+        with col3:
+            st.metric("Coût total annuel", f"{cout_total_annuel:,.0f} $")
+        
+        bouton_appliquer_grille("salaires")
     
-    # Totaux
-    total_charges_sociales = sum([poste.get("charges_sociales", 0) for poste in salaires.values()])
-    cout_total_mensuel = total_mensuel + total_charges_sociales
-    cout_total_annuel = cout_total_mensuel * 12
+    grille_salaires()
     
-    st.subheader("Récapitulatif")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Salaires bruts/mois", f"{total_mensuel:,.0f} $")
-    with col2:
-        st.metric("Charges sociales/mois", f"{total_charges_sociales:,.0f} $")
-    with col3:
-        st.metric("Coût total annuel", f"{cout_total_annuel:,.0f} $")
+    total_mensuel = sum(salaires[poste].get("salaire_brut", 0.0) for poste in postes)
+    total_charges_sociales = sum([poste.get("charges_sociales", 0) for poste in salaires.values()])
+    cout_total_annuel = (total_mensuel + total_charges_sociales) * 12
     
-    # Sauvegarder pour les autres calculs
-    st.session_state.data["total_salaires_annee1"] = cout_total_annuel
+    # Sauvegarder pour les autres calculs (années suivantes selon l'indexation des salaires)
+    taux = matrice_taux_indexation(st.session_state.data.get("indexation"))
+    indice_salaires = indices_cumules(taux[list(INDICES).index("salaires")])
+    for i, indice in enumerate(indice_salaires, 1):
+        st.session_state.data[f"total_salaires_annee{i}"] = cout_total_annuel * float(indice)
 
 def page_rentabilite():
     """Page de rentabilité - Calculs automatiques"""
@@ -1491,9 +1839,75 @@ def page_rentabilite():
                 st.success("✅ Projet rentable dès la première année")
             else:
                 st.warning(f"⚠️ Il manque {seuil - ca_1:,.0f} $ de CA pour être rentable")
+        
+        afficher_objectif_rentabilite(data)
+        afficher_analyse_sensibilite(data)
     else:
         st.warning("Veuillez renseigner le chiffre d'affaires et les charges pour voir l'analyse de rentabilité")
 
+def afficher_objectif_rentabilite(data):
+    """Recherche du CA mensuel nécessaire pour être à l'équilibre à un mois donné"""
+    st.subheader("🎯 CA nécessaire à l'équilibre")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        mois = st.slider("Être à l'équilibre au mois", 1, 60, 12, key="objectif_rentabilite_mois")
+    with col2:
+        cible = st.number_input("Résultat mensuel visé ($)", value=0.0, step=500.0, key="objectif_rentabilite_cible")
+    
+    hypotheses = extraire_hypotheses_pages(data)
+    resultat = resoudre_objectif(hypotheses, 'ca_mensuel', 'resultat_mois', cible=cible, mois=mois)
+    if not resultat.get('success'):
+        st.error(f"Impossible de calculer le CA nécessaire : {resultat.get('error')}")
+        return
+    
+    ca_actuel = hypotheses['ca_annees'][0] / 12
+    st.metric("CA mensuel moyen nécessaire (année 1)", f"{resultat['valeur']:,.0f} $",
+              delta=f"{resultat['valeur'] - ca_actuel:,.0f} $ par rapport au prévisionnel", delta_color="inverse")
+    st.caption(f"Les années suivantes évoluent dans la même proportion. "
+               f"Calculé en {resultat['duree_calcul_ms']:.0f} ms.")
+
+def afficher_analyse_sensibilite(data):
+    """Diagramme en tornade : impact de ±x % sur chaque hypothèse clé"""
+    import plotly.graph_objects as go
+    
+    st.subheader("🌪️ Analyse de sensibilité")
+    variation = st.slider("Variation appliquée à chaque hypothèse (±%)", 1, 50, 10, key="sensibilite_variation")
+    
+    analyse = analyser_sensibilite(extraire_hypotheses_pages(data), variation=variation / 100)
+    if not analyse.get('success'):
+        st.error(f"Erreur lors de l'analyse de sensibilité : {analyse.get('error')}")
+        return
+    
+    titres = {
+        "seuil_rentabilite_annee1": "Seuil de rentabilité (Année 1)",
+        "resultat_net_annee5": "Résultat net (Année 5)",
+        "tresorerie_minimale": "Trésorerie minimale (60 mois)"
+    }
+    onglets = st.tabs(list(titres.values()))
+    
+    for onglet, (indicateur, titre) in zip(onglets, titres.items()):
+        donnees = analyse['indicateurs'][indicateur]
+        # Plus grande amplitude en haut du diagramme
+        lignes = list(reversed(donnees['lignes']))
+        libelles = [ligne['libelle'] for ligne in lignes]
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            y=libelles, x=[ligne['ecart_bas'] for ligne in lignes], base=donnees['base'],
+            orientation='h', name=f"-{variation}%", marker_color='#EF553B'
+        ))
+        fig.add_trace(go.Bar(
+            y=libelles, x=[ligne['ecart_haut'] for ligne in lignes], base=donnees['base'],
+            orientation='h', name=f"+{variation}%", marker_color='#00CC96'
+        ))
+        fig.add_vline(x=donnees['base'], line_dash="dash", line_color="grey")
+        fig.update_layout(barmode='overlay', title=f"{titre} — base : {donnees['base']:,.0f} $",
+                          xaxis_title="$", height=400)
+        
+        with onglet:
+            st.plotly_chart(fig, width='stretch')
+
 def page_generation_business_plan():
     """Page de génération du business plan - Version améliorée"""
     st.title("📄 Génération Business Plan")
@@ -0,0 +1,106 @@
+"""
+Page d'analyse de portefeuille : évaluation d'une cohorte de candidats
+"""
+
+import json
+import streamlit as st
+from services.financial import (
+    INDICATEURS_PORTEFEUILLE,
+    creer_instantane,
+    charger_instantanes,
+    analyser_portefeuille
+)
+
+COLONNES_AFFICHEES = {
+    'Rang': "Rang",
+    'Candidat': "Candidat",
+    'Programme': "Programme",
+    'annee_equilibre': "Année d'équilibre",
+    'tresorerie_minimale': "Trésorerie min. ($)",
+    'mois_tresorerie_minimale': "Mois du minimum",
+    'dscr_minimal': "DSCR min.",
+    'resultat_net_cumule': "Résultat net 5 ans ($)",
+    'ca_annee1': "CA année 1 ($)"
+}
+
+def page_portefeuille():
+    """Page d'analyse financière d'une cohorte de dossiers"""
+    st.title("📁 Analyse de Portefeuille")
+    st.markdown("Évaluez une cohorte complète de candidats à partir de leurs dossiers sauvegardés.")
+
+    # Sauvegarde du dossier courant
+    nom_fichier = (st.session_state.get('nom_entreprise') or "dossier").lower().replace(' ', '_')
+    st.download_button(
+        label="💾 Sauvegarder le dossier courant",
+        data=json.dumps(creer_instantane(st.session_state), indent=2, ensure_ascii=False, default=str),
+        file_name=f"instantane_{nom_fichier}.json",
+        mime="application/json",
+        key="download_portefeuille"
+    )
+
+    fichiers = st.file_uploader(
+        "Dossiers des candidats (JSON)", type=["json"], accept_multiple_files=True, key="portefeuille_fichiers"
+    )
+    if not fichiers:
+        st.info("Téléversez un ou plusieurs instantanés de dossiers pour lancer l'analyse.")
+        return
+
+    try:
+        instantanes = charger_instantanes(fichiers)
+    except Exception as e:
+        st.error(f"Erreur lors de la lecture des dossiers : {str(e)}")
+        return
+
+    programmes = sorted({i.get('template', '') for i in instantanes if i.get('template')})
+    col1, col2 = st.columns(2)
+    with col1:
+        critere = st.selectbox(
+            "Classer par", list(INDICATEURS_PORTEFEUILLE),
+            format_func=lambda cle: INDICATEURS_PORTEFEUILLE[cle][0], key="portefeuille_critere"
+        )
+    with col2:
+        filtre = st.multiselect("Programmes", programmes, default=programmes, key="portefeuille_programmes")
+    if programmes:
+        instantanes = [i for i in instantanes if i.get('template') in filtre]
+    if not instantanes:
+        st.warning("Aucun dossier ne correspond aux programmes sélectionnés.")
+        return
+
+    analyse = analyser_portefeuille(instantanes, critere=critere)
+    if not analyse.get('success'):
+        st.error(f"Erreur lors de l'analyse du portefeuille : {analyse.get('error')}")
+        return
+
+    classement = analyse['classement']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Dossiers analysés", analyse['n_dossiers'])
+    with col2:
+        st.metric("Trésorerie négative", int(classement['tresorerie_negative'].sum()))
+    with col3:
+        st.metric("DSCR insuffisant", int(classement['dscr_insuffisant'].sum()))
+    with col4:
+        st.metric("Valeurs atypiques", int(classement['atypique'].sum()))
+
+    onglet_classement, onglet_atypiques = st.tabs(["🏆 Classement", "⚠️ Valeurs atypiques"])
+
+    with onglet_classement:
+        st.dataframe(
+            classement[list(COLONNES_AFFICHEES)].rename(columns=COLONNES_AFFICHEES),
+            width='stretch', hide_index=True
+        )
+
+    with onglet_atypiques:
+        st.markdown("Dossiers dont un indicateur s'écarte fortement de la cohorte (score z modifié > 3,5), "
+                    "ou dont la trésorerie devient négative ou la couverture de la dette est inférieure à 1,2.")
+        alertes = classement[classement['atypique'] | classement['tresorerie_negative'] | classement['dscr_insuffisant']]
+        if alertes.empty:
+            st.success("✅ Aucun dossier atypique ou en alerte.")
+        else:
+            colonnes_scores = [c for c in alertes.columns if c.startswith('score_')]
+            st.dataframe(
+                alertes[['Candidat', 'Programme', 'tresorerie_negative', 'dscr_insuffisant', 'atypique'] + colonnes_scores],
+                width='stretch', hide_index=True
+            )
+
+    st.caption(f"{analyse['n_dossiers']:,} dossiers évalués en {analyse['duree_calcul_ms']:.0f} ms.")
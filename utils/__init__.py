@@ -3,6 +3,10 @@ Module d'initialisation des utilitaires
 """
 
 from .financial_utils import (
+    calculer_echeanciers_prets,
+    calculer_echeancier_financements,
+    normaliser_prets,
+    totaliser_par_annee,
     calculer_pret_interet_fixe,
     calculer_impot_societes,
     calculer_bfr,
@@ -23,6 +27,7 @@ from .validation_utils import (
     valider_donnees_entreprise,
     valider_investissement,
     consolider_erreurs,
+    valider_tableau,
     serialiser_donnees,
     deserialiser_donnees,
     generer_identifiant_unique,
@@ -47,6 +52,10 @@ from .formatting_utils import (
 
 __all__ = [
     # Financial utils
+    'calculer_echeanciers_prets',
+    'calculer_echeancier_financements',
+    'normaliser_prets',
+    'totaliser_par_annee',
     'calculer_pret_interet_fixe',
     'calculer_impot_societes',
     'calculer_bfr',
@@ -66,6 +75,7 @@ __all__ = [
     'valider_donnees_entreprise',
     'valider_investissement',
     'consolider_erreurs',
+    'valider_tableau',
     'serialiser_donnees',
     'deserialiser_donnees',
     'generer_identifiant_unique',
@@ -5,12 +5,176 @@ Fonctions utilitaires pour les calculs financiers
 import pandas as pd
 import numpy as np
 from datetime import datetime, date
+from .profilage_execution import tracer
 
 def calculer_taux_mensuel(taux_annuel):
     """Convertit un taux annuel en taux mensuel"""
     return taux_annuel / 12 / 100
 
-def calculer_pret_interet_fixe(montant, taux_annuel, duree_mois):
+TYPES_PRET = {
+    "annuite": "Annuités constantes",
+    "amortissement_constant": "Amortissement constant"
+}
+
+@tracer('calcul')
+def calculer_echeanciers_prets(montants, taux_annuels, durees_mois, types=None, differes_mois=None, n_mois=None):
+    """
+    Calcule les échéanciers mensuels complets de plusieurs prêts en une passe
+    
+    Les taux peuvent porter des axes supplémentaires en tête (par exemple un axe
+    de scénarios) : toutes les sorties ont alors la forme (..., L, M).
+    
+    Args:
+        montants (array): Capital emprunté de chaque prêt (L,)
+        taux_annuels (array): Taux annuels en pourcentage (L,) ou (..., L)
+        durees_mois (array): Durées totales en mois, différé compris (L,)
+        types (array, optional): "annuite" (défaut) ou "amortissement_constant" (L,)
+        differes_mois (array, optional): Mois de différé pendant lesquels seuls les intérêts sont payés (L,)
+        n_mois (int, optional): Horizon de l'échéancier (défaut : durée la plus longue)
+    
+    Returns:
+        dict: Tableaux mensuels principal, interets, mensualite et capital_restant (après échéance)
+    """
+    montants = np.asarray(montants, dtype=float)
+    durees = np.asarray(durees_mois, dtype=float)
+    nb_prets = montants.shape[-1] if montants.ndim else 1
+    if n_mois is None:
+        n_mois = int(durees.max()) if durees.size else 0
+    
+    taux = np.asarray(taux_annuels, dtype=float)[..., None] / 100 / 12
+    differes = np.zeros(nb_prets) if differes_mois is None else np.asarray(differes_mois, dtype=float)
+    types = np.full(nb_prets, "annuite") if types is None else np.asarray(types)
+    
+    capital = montants[:, None]
+    duree = durees[:, None]
+    differe = np.minimum(differes[:, None], np.maximum(duree - 1, 0))
+    duree_amortissement = np.maximum(duree - differe, 1)
+    amortissement_constant = (types == "amortissement_constant")[:, None]
+    
+    k = np.arange(n_mois)[None, :]
+    periode = np.maximum(k - differe, 0)
+    en_differe = k < differe
+    actif = k < duree
+    
+    # Annuités constantes : capital restant dû avant l'échéance (formule fermée)
+    avec_taux = taux > 0
+    taux_sur = np.where(avec_taux, taux, 1.0)
+    facteur = (1 + taux_sur) ** periode
+    annuite = np.where(
+        avec_taux,
+        capital * taux_sur / (1 - (1 + taux_sur) ** (-duree_amortissement)),
+        capital / duree_amortissement
+    )
+    restant_annuite = np.where(avec_taux, capital * facteur - annuite * (facteur - 1) / taux_sur, capital - annuite * periode)
+    
+    # Amortissement constant : part de capital identique à chaque échéance
+    part_constante = capital / duree_amortissement
+    restant_constant = capital - part_constante * periode
+    
+    restant_avant = np.maximum(np.where(amortissement_constant, restant_constant, restant_annuite), 0.0)
+    interets = np.where(actif, restant_avant * taux, 0.0)
+    principal = np.where(
+        actif & ~en_differe,
+        np.where(amortissement_constant, part_constante, annuite - restant_avant * taux),
+        0.0
+    )
+    principal = np.minimum(principal, restant_avant)
+    capital_restant = np.where(actif, restant_avant - principal, 0.0)
+    
+    return {
+        "principal": principal,
+        "interets": interets,
+        "mensualite": principal + interets,
+        "capital_restant": capital_restant,
+        "n_mois": n_mois
+    }
+
+def totaliser_par_annee(flux_mensuels, nb_annees=None):
+    """
+    Agrège des flux mensuels (..., M) en totaux annuels (..., A)
+    
+    Args:
+        flux_mensuels (array): Flux mensuels, le dernier axe étant le mois
+        nb_annees (int, optional): Nombre d'années (défaut : M / 12 arrondi au supérieur)
+    
+    Returns:
+        np.ndarray: Totaux annuels
+    """
+    flux = np.asarray(flux_mensuels, dtype=float)
+    n_mois = flux.shape[-1]
+    if nb_annees is None:
+        nb_annees = -(-n_mois // 12)
+    largeur = nb_annees * 12
+    if n_mois < largeur:
+        flux = np.concatenate([flux, np.zeros(flux.shape[:-1] + (largeur - n_mois,))], axis=-1)
+    return flux[..., :largeur].reshape(flux.shape[:-1] + (nb_annees, 12)).sum(axis=-1)
+
+def normaliser_prets(financements):
+    """
+    Rassemble les prêts d'un dictionnaire de financements sous forme de tableaux
+    
+    Accepte les prêts de la page financement ("Prêt 1" à "Prêt 3", durée en mois),
+    une liste explicite `prets` et l'emprunt global `emprunts_bancaires`
+    (durée `duree_emprunt` en années).
+    
+    Args:
+        financements (dict): Données de financement
+    
+    Returns:
+        dict: Tableaux montants, taux_annuels, durees_mois, types, differes_mois et noms
+    """
+    prets = []
+    
+    for i in range(1, 4):
+        pret = financements.get(f"Prêt {i}")
+        if isinstance(pret, dict):
+            prets.append({**pret, "nom": f"Prêt {i}", "duree_mois": pret.get("duree", 0)})
+    
+    for i, pret in enumerate(financements.get("prets", []), 1):
+        prets.append({"nom": pret.get("nom", f"Emprunt {i}"), **pret})
+    
+    emprunts_bancaires = float(financements.get("emprunts_bancaires", 0))
+    if emprunts_bancaires > 0:
+        prets.append({
+            "nom": "Emprunt bancaire",
+            "montant": emprunts_bancaires,
+            "taux": financements.get("taux_emprunt", 0),
+            "duree_mois": int(financements.get("duree_emprunt", 5)) * 12,
+            "type": financements.get("type_emprunt", "annuite"),
+            "differe_mois": financements.get("differe_emprunt", 0)
+        })
+    
+    prets = [p for p in prets if float(p.get("montant", 0)) > 0 and int(p.get("duree_mois", 0)) > 0]
+    
+    return {
+        "montants": np.array([float(p["montant"]) for p in prets]),
+        "taux_annuels": np.array([float(p.get("taux", 0)) for p in prets]),
+        "durees_mois": np.array([int(p["duree_mois"]) for p in prets], dtype=int),
+        "types": np.array([p.get("type", "annuite") for p in prets], dtype=object),
+        "differes_mois": np.array([int(p.get("differe_mois", p.get("differe", 0))) for p in prets], dtype=int),
+        "noms": [p["nom"] for p in prets]
+    }
+
+@tracer('calcul')
+def calculer_echeancier_financements(financements, n_mois=60):
+    """
+    Échéancier mensuel de tous les prêts d'un dictionnaire de financements
+    
+    Args:
+        financements (dict): Données de financement (voir `normaliser_prets`)
+        n_mois (int): Horizon en mois
+    
+    Returns:
+        dict: Prêts normalisés et échéanciers (L, n_mois)
+    """
+    prets = normaliser_prets(financements)
+    echeancier = calculer_echeanciers_prets(
+        prets["montants"], prets["taux_annuels"], prets["durees_mois"],
+        prets["types"], prets["differes_mois"], n_mois
+    )
+    return {"prets": prets, **echeancier}
+
+def calculer_pret_interet_fixe(montant, taux_annuel, duree_mois, type_pret="annuite", differe_mois=0):
     """
     Calcule la mensualité et les détails d'un prêt à intérêt fixe
     
@@ -18,27 +182,28 @@ def calculer_pret_interet_fixe(montant, taux_annuel, duree_mois):
         montant (float): Montant du prêt
         taux_annuel (float): Taux d'intérêt annuel en pourcentage
         duree_mois (int): Durée en mois
+        type_pret (str): "annuite" ou "amortissement_constant"
+        differe_mois (int): Mois de différé (intérêts seuls)
     
     Returns:
-        dict: Détails du prêt (mensualité, total intérêts, etc.)
+        dict: Détails du prêt (mensualité, total intérêts, intérêts par année, etc.)
     """
-    if montant <= 0 or taux_annuel <= 0 or duree_mois <= 0:
-        return {"mensualite": 0, "total_interets": 0, "total_a_payer": montant}
+    if montant <= 0 or taux_annuel < 0 or duree_mois <= 0:
+        return {
+            "mensualite": 0, "total_interets": 0, "total_a_payer": max(montant, 0),
+            "taux_mensuel": 0, "interets_par_annee": []
+        }
     
-    taux_mensuel = calculer_taux_mensuel(taux_annuel)
-    
-    if taux_mensuel == 0:
-        mensualite = montant / duree_mois
-        total_interets = 0
-    else:
-        mensualite = montant * (taux_mensuel * (1 + taux_mensuel)**duree_mois) / ((1 + taux_mensuel)**duree_mois - 1)
-        total_interets = mensualite * duree_mois - montant
+    echeancier = calculer_echeanciers_prets([montant], [taux_annuel], [duree_mois], [type_pret], [differe_mois])
+    total_interets = float(echeancier["interets"].sum())
+    premiere_echeance = int(min(differe_mois, duree_mois - 1))
     
     return {
-        "mensualite": round(mensualite, 2),
+        "mensualite": round(float(echeancier["mensualite"][0, premiere_echeance]), 2),
         "total_interets": round(total_interets, 2),
         "total_a_payer": round(montant + total_interets, 2),
-        "taux_mensuel": round(taux_mensuel * 100, 4)
+        "taux_mensuel": round(calculer_taux_mensuel(taux_annuel) * 100, 4),
+        "interets_par_annee": [round(float(v), 2) for v in totaliser_par_annee(echeancier["interets"])[0]]
     }
 
 def calculer_impot_societes(resultat, taux=30):
@@ -152,6 +317,142 @@ def calculer_amortissement_lineaire(valeur_acquisition, duree_ans):
         "duree": duree_ans
     }
 
+METHODES_AMORTISSEMENT = {
+    "lineaire": "Linéaire",
+    "degressif": "Dégressif"
+}
+
+# Immobilisations amortissables des besoins de démarrage et durées par défaut (années)
+IMMOBILISATIONS_AMORTISSABLES = {
+    "Immobilisations incorporelles": {
+        "Frais d'établissement": 3,
+        "Logiciels, formations": 3,
+        "Dépôt de marque": 5,
+        "Droits d'entrée": 5,
+        "Achat fonds de commerce ou parts": 5,
+        "Droit au bail": 5
+    },
+    "Immobilisations corporelles": {
+        "Véhicule": 5,
+        "Matériel professionnel": 5,
+        "Matériel autre": 5,
+        "Matériel de bureau": 3,
+        "Enseigne et éléments de communication": 5
+    }
+}
+
+DUREES_AMORTISSEMENT_DEFAUT = {
+    element: duree
+    for elements in IMMOBILISATIONS_AMORTISSABLES.values()
+    for element, duree in elements.items()
+}
+
+def coefficient_degressif(duree_ans):
+    """
+    Coefficient fiscal de l'amortissement dégressif selon la durée
+    
+    Args:
+        duree_ans (array): Durées d'amortissement en années
+    
+    Returns:
+        np.ndarray: 1.25 (3-4 ans), 1.75 (5-6 ans) ou 2.25 (plus de 6 ans)
+    """
+    duree = np.asarray(duree_ans, dtype=float)
+    return np.where(duree > 6, 2.25, np.where(duree >= 5, 1.75, 1.25))
+
+@tracer('calcul')
+def calculer_plans_amortissement(montants, durees_ans, methodes=None, mois_mise_en_service=None, n_annees=None):
+    """
+    Calcule les plans d'amortissement de tous les actifs sous forme de matrice (actif × année)
+    
+    Args:
+        montants (array): Valeurs d'acquisition (A,)
+        durees_ans (array): Durées d'amortissement en années (A,)
+        methodes (array, optional): "lineaire" (défaut) ou "degressif" (A,)
+        mois_mise_en_service (array, optional): Mois de mise en service dans l'année 1 (1-12),
+            pour un calcul prorata temporis ; 1 (année pleine) par défaut (A,)
+        n_annees (int, optional): Horizon (défaut : jusqu'à la fin du plan le plus long)
+    
+    Returns:
+        dict: Matrices dotations, valeur_debut, valeur_fin (A, n_annees) et totaux par année et par actif
+    """
+    montants = np.asarray(montants, dtype=float)
+    durees = np.maximum(np.asarray(durees_ans, dtype=float), 1)
+    nb_actifs = montants.size
+    methodes = np.full(nb_actifs, "lineaire") if methodes is None else np.asarray(methodes)
+    mois = np.ones(nb_actifs) if mois_mise_en_service is None else np.clip(np.asarray(mois_mise_en_service, dtype=float), 1, 12)
+    
+    # Part de la première année effectivement amortie (prorata temporis)
+    prorata = (13 - mois) / 12
+    if n_annees is None:
+        n_annees = int(np.ceil((durees + 1 - prorata).max())) if nb_actifs else 0
+    
+    annees = np.arange(n_annees)[None, :]
+    montant = montants[:, None]
+    duree = durees[:, None]
+    premiere = prorata[:, None]
+    
+    # Linéaire : cumul amorti en fin d'année = annuité × temps écoulé, plafonné à la valeur d'origine
+    annuite = montant / duree
+    cumul_lineaire = np.minimum(annuite * (annees + premiere), montant)
+    
+    # Dégressif : taux constant sur la valeur résiduelle, bascule en linéaire sur la durée
+    # restante dès que l'annuité linéaire devient supérieure
+    taux = coefficient_degressif(durees)[:, None] / duree
+    cumul_degressif = np.zeros((nb_actifs, n_annees))
+    valeur_residuelle = montant[:, 0].copy()
+    for a in range(n_annees):
+        duree_restante = np.maximum(durees - (a - 1 + prorata) * (a > 0), 1e-9)
+        temps = prorata if a == 0 else 1.0
+        dotation = np.maximum(valeur_residuelle * taux[:, 0], valeur_residuelle / duree_restante) * temps
+        dotation = np.minimum(dotation, valeur_residuelle)
+        valeur_residuelle = valeur_residuelle - dotation
+        cumul_degressif[:, a] = montant[:, 0] - valeur_residuelle
+    
+    cumul = np.where((methodes == "degressif")[:, None], cumul_degressif, cumul_lineaire)
+    valeur_fin = montant - cumul
+    valeur_debut = np.concatenate([montant, valeur_fin[:, :-1]], axis=1)
+    dotations = valeur_debut - valeur_fin
+    
+    return {
+        "dotations": dotations,
+        "valeur_debut": valeur_debut,
+        "valeur_fin": valeur_fin,
+        "cumul": cumul,
+        "total_par_annee": dotations.sum(axis=0),
+        "total_par_actif": dotations.sum(axis=1),
+        "n_annees": n_annees
+    }
+
+def preparer_actifs_amortissables(besoins, parametres=None):
+    """
+    Rassemble les immobilisations des besoins de démarrage et leurs paramètres
+    
+    Args:
+        besoins (dict): Besoins de démarrage (montant par élément)
+        parametres (dict, optional): Paramètres par élément (duree, methode, mois_mise_en_service)
+    
+    Returns:
+        dict: Listes noms, categories, montants, durees, methodes et mois_mise_en_service
+    """
+    parametres = parametres or {}
+    actifs = {"noms": [], "categories": [], "montants": [], "durees": [], "methodes": [], "mois_mise_en_service": []}
+    
+    for categorie, elements in IMMOBILISATIONS_AMORTISSABLES.items():
+        for element, duree_defaut in elements.items():
+            montant = float(besoins.get(element, 0.0) or 0.0)
+            if montant <= 0:
+                continue
+            param = parametres.get(element, {})
+            actifs["noms"].append(element)
+            actifs["categories"].append(categorie)
+            actifs["montants"].append(montant)
+            actifs["durees"].append(int(param.get("duree", duree_defaut)))
+            actifs["methodes"].append(param.get("methode", "lineaire"))
+            actifs["mois_mise_en_service"].append(int(param.get("mois_mise_en_service", 1)))
+    
+    return actifs
+
 def calculer_ratios_financiers(ca, resultat_net, total_actif, capitaux_propres, dettes):
     """
     Calcule les principaux ratios financiers
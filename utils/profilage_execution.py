@@ -0,0 +1,224 @@
+"""
+Profilage des exécutions de l'application (reruns Streamlit)
+
+Chaque exécution profilée produit une trace : une liste d'intervalles
+(« spans ») horodatés, imbriqués, avec durée et allocations. Sont mesurés :
+
+- l'exécution complète (`tracer_execution`, autour de `main`) ;
+- chaque page appelée par la navigation (`mesurer(nom, 'page')`) ;
+- chaque fonction décorée par `@tracer` : les `calculer_*` du moteur
+  financier et `generate_section`.
+
+Le profilage est actif pour une session en mode debug (`debug_ai`,
+`MIXBPM_DEBUG`) ou pour toutes les sessions avec `MIXBPM_PROFIL=1`. Inactif,
+un appel décoré ne coûte qu'une lecture de variable de contexte.
+
+Les allocations sont le solde de blocs mémoire alloués pendant l'intervalle
+(`sys.getallocatedblocks`, pour tout le processus) ; si `tracemalloc` est
+actif (`MIXBPM_PROFIL_MEMOIRE=1`), la mémoire allouée et le pic sont ajoutés.
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import streamlit as st
+
+# Nombre d'exécutions conservées par session
+MAX_EXECUTIONS = 20
+
+_CLE_EXECUTIONS = '_profil_executions'
+
+_trace_courante: ContextVar[Optional[Dict[str, Any]]] = ContextVar('trace_execution', default=None)
+
+if os.getenv('MIXBPM_PROFIL_MEMOIRE') and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def profilage_actif() -> bool:
+    """True si les exécutions de la session courante sont profilées"""
+    return bool(st.session_state.get('debug_ai') or os.getenv('MIXBPM_DEBUG') or os.getenv('MIXBPM_PROFIL'))
+
+
+@contextmanager
+def mesurer(nom: str, categorie: str = 'fonction') -> Iterator[None]:
+    """
+    Mesure un intervalle de l'exécution en cours (sans effet hors exécution profilée)
+
+    Args:
+        nom (str): Libellé de l'intervalle
+        categorie (str): 'page', 'calcul', 'generation'...
+    """
+    trace = _trace_courante.get()
+    if trace is None:
+        yield
+        return
+
+    span = {'nom': nom, 'categorie': categorie, 'profondeur': trace['_profondeur'], 'erreur': None}
+    trace['_profondeur'] += 1
+    memoire = tracemalloc.is_tracing()
+    if memoire:
+        avant, _ = tracemalloc.get_traced_memory()
+    blocs = sys.getallocatedblocks()
+    debut = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        # Les contrôles de Streamlit (st.rerun, st.stop) passent aussi par ici
+        span['erreur'] = type(e).__name__
+        raise
+    finally:
+        fin = time.perf_counter()
+        span['debut_ms'] = (debut - trace['_origine']) * 1000
+        span['duree_ms'] = (fin - debut) * 1000
+        span['blocs'] = sys.getallocatedblocks() - blocs
+        if memoire:
+            apres, pic = tracemalloc.get_traced_memory()
+            span['alloue_ko'] = (apres - avant) / 1024
+            span['pic_ko'] = pic / 1024
+        trace['_profondeur'] -= 1
+        trace['spans'].append(span)
+
+
+def tracer(categorie: str = 'fonction', argument: Optional[str] = None) -> Callable:
+    """
+    Décorateur : chaque appel est un intervalle de l'exécution profilée
+
+    Args:
+        categorie (str): Catégorie des intervalles
+        argument (str, optional): Paramètre dont la valeur complète le libellé
+                                  (ex. `section_name` pour `generate_section`)
+
+    Returns:
+        callable: Décorateur
+    """
+    def decorateur(fonction: Callable) -> Callable:
+        signature = inspect.signature(fonction) if argument else None
+
+        @wraps(fonction)
+        def fonction_tracee(*args, **kwargs):
+            if _trace_courante.get() is None:
+                return fonction(*args, **kwargs)
+            nom = fonction.__name__
+            if signature is not None:
+                try:
+                    nom = f"{nom}[{signature.bind_partial(*args, **kwargs).arguments.get(argument, '')}]"
+                except TypeError:
+                    pass
+            with mesurer(nom, categorie):
+                return fonction(*args, **kwargs)
+
+        return fonction_tracee
+    return decorateur
+
+
+@contextmanager
+def tracer_execution(nom: str = 'execution') -> Iterator[None]:
+    """
+    Trace une exécution complète de l'application et la conserve dans la session
+
+    Args:
+        nom (str): Libellé de l'intervalle racine
+    """
+    if not profilage_actif() or _trace_courante.get() is not None:
+        yield
+        return
+
+    trace = {'horodatage': datetime.now(), 'spans': [], '_origine': time.perf_counter(), '_profondeur': 0}
+    jeton = _trace_courante.set(trace)
+    try:
+        with mesurer(nom, 'execution'):
+            yield
+    finally:
+        _trace_courante.reset(jeton)
+        executions = st.session_state.setdefault(_CLE_EXECUTIONS, deque(maxlen=MAX_EXECUTIONS))
+        executions.append({
+            'horodatage': trace['horodatage'],
+            'duree_ms': trace['spans'][-1]['duree_ms'],
+            'spans': sorted(trace['spans'], key=lambda span: span['debut_ms'])
+        })
+
+
+def executions_profilees() -> List[Dict[str, Any]]:
+    """
+    Returns:
+        list: Exécutions conservées de la session, de la plus ancienne à la plus récente :
+              horodatage, duree_ms et spans (nom, categorie, profondeur, debut_ms,
+              duree_ms, blocs, erreur, et alloue_ko / pic_ko avec tracemalloc)
+    """
+    return list(st.session_state.get(_CLE_EXECUTIONS, []))
+
+
+def agreger_spans(executions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Agrège les intervalles par libellé
+
+    Args:
+        executions (list): Exécutions (voir `executions_profilees`)
+
+    Returns:
+        list: nom, categorie, appels, total_ms, moyenne_ms, max_ms, blocs, triés par total décroissant
+    """
+    agregats: Dict[str, Dict[str, Any]] = {}
+    for execution in executions:
+        for span in execution['spans']:
+            agregat = agregats.setdefault(span['nom'], {
+                'nom': span['nom'], 'categorie': span['categorie'], 'appels': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'blocs': 0
+            })
+            agregat['appels'] += 1
+            agregat['total_ms'] += span['duree_ms']
+            agregat['max_ms'] = max(agregat['max_ms'], span['duree_ms'])
+            agregat['blocs'] += span['blocs']
+    for agregat in agregats.values():
+        agregat['moyenne_ms'] = agregat['total_ms'] / agregat['appels']
+    return sorted(agregats.values(), key=lambda agregat: agregat['total_ms'], reverse=True)
+
+
+def exporter_json(executions: List[Dict[str, Any]]) -> str:
+    """
+    Args:
+        executions (list): Exécutions (voir `executions_profilees`)
+
+    Returns:
+        str: Exécutions au format JSON
+    """
+    return json.dumps(
+        [{**execution, 'horodatage': execution['horodatage'].isoformat()} for execution in executions],
+        indent=2, ensure_ascii=False
+    )
+
+
+def exporter_trace_chrome(executions: List[Dict[str, Any]]) -> str:
+    """
+    Exporte les exécutions au format Trace Event (chrome://tracing, Perfetto)
+
+    Args:
+        executions (list): Exécutions (voir `executions_profilees`)
+
+    Returns:
+        str: Document JSON {"traceEvents": [...]}, horodatages en microsecondes
+    """
+    evenements = []
+    for execution in executions:
+        origine = execution['horodatage'].timestamp() * 1e6
+        for span in execution['spans']:
+            evenements.append({
+                'name': span['nom'],
+                'cat': span['categorie'],
+                'ph': 'X',
+                'ts': origine + span['debut_ms'] * 1000,
+                'dur': span['duree_ms'] * 1000,
+                'pid': 1,
+                'tid': 1,
+                'args': {k: v for k, v in span.items() if k in ('blocs', 'alloue_ko', 'pic_ko', 'erreur') and v is not None}
+            })
+    return json.dumps({'traceEvents': evenements, 'displayTimeUnit': 'ms'})
@@ -8,21 +8,27 @@ from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 # Modèles et leurs coûts (USD par 1000 tokens) - Mis à jour 2025
+# `cached_input` : tokens d'entrée servis par le cache de préfixes du fournisseur ;
+# modèles sans cache de préfixes : prix d'entrée plein
 TOKEN_COSTS = {
     # Modèles GPT-4 famille (les plus performants)
-    "gpt-4o": {"input": 0.005, "output": 0.015},        # Le plus performant et récent
+    "gpt-4o": {"input": 0.005, "cached_input": 0.00125, "output": 0.015},  # Le plus performant et récent
     "gpt-4-turbo": {"input": 0.01, "output": 0.03},     # Excellent rapport qualité/prix
     "gpt-4": {"input": 0.03, "output": 0.06},           # Stable et fiable
-    "gpt-4o-mini": {"input": 0.000150, "output": 0.000600},  # Très économique
+    "gpt-4o-mini": {"input": 0.000150, "cached_input": 0.000075, "output": 0.000600},  # Très économique
     
     # Modèles O1 (pour raisonnement complexe)
-    "o1-preview": {"input": 0.015, "output": 0.060},    # Raisonnement avancé
-    "o1-mini": {"input": 0.003, "output": 0.012},       # Version allégée d'o1
+    "o1-preview": {"input": 0.015, "cached_input": 0.0075, "output": 0.060},  # Raisonnement avancé
+    "o1-mini": {"input": 0.003, "cached_input": 0.0015, "output": 0.012},     # Version allégée d'o1
     
     # Modèles legacy (pour compatibilité)
     "gpt-3.5-turbo": {"input": 0.001, "output": 0.002} # Ancien modèle
 }
 
+# Plafonds des historiques conservés dans la session
+MAX_HISTORIQUE_REQUETES = 200
+MAX_JOURS_USAGE = 31
+
 def get_encoding_for_model(model_name: str = "gpt-4"):
     """Récupère l'encodage approprié pour un modèle OpenAI"""
     try:
@@ -74,32 +80,42 @@ def init_token_counter():
             'total_input_tokens': 0,
             'total_output_tokens': 0,
             'total_cost_usd': 0.0,
+            'total_cached_tokens': 0,
+            'cache_savings_usd': 0.0,
             'requests_count': 0,
             'session_start': datetime.now().isoformat(),
             'daily_usage': {},
             'request_history': []
         }
 
-def calculate_cost(input_tokens: int, output_tokens: int, model_name: str = "gpt-4") -> float:
-    """Calcule le coût approximatif d'une requête"""
+def calculate_cost(input_tokens: int, output_tokens: int, model_name: str = "gpt-4", cached_tokens: int = 0) -> float:
+    """Calcule le coût approximatif d'une requête (tokens d'entrée en cache au prix `cached_input` du modèle)"""
     model_pricing = TOKEN_COSTS.get(model_name, TOKEN_COSTS["gpt-4"])
+    cached_price = model_pricing.get("cached_input", model_pricing["input"])
     
-    input_cost = input_tokens * (model_pricing["input"] / 1000)
+    input_cost = (
+        (input_tokens - cached_tokens) * (model_pricing["input"] / 1000)
+        + cached_tokens * (cached_price / 1000)
+    )
     output_cost = output_tokens * (model_pricing["output"] / 1000)
     
     return input_cost + output_cost
 
-def update_token_usage(input_tokens: int, output_tokens: int, model_name: str = "gpt-4"):
+def update_token_usage(input_tokens: int, output_tokens: int, model_name: str = "gpt-4", cached_tokens: int = 0):
     """Met à jour les statistiques d'usage des tokens"""
     init_token_counter()
     
-    request_cost = calculate_cost(input_tokens, output_tokens, model_name)
+    request_cost = calculate_cost(input_tokens, output_tokens, model_name, cached_tokens)
+    cache_savings = calculate_cost(input_tokens, output_tokens, model_name) - request_cost
     
     # Mise à jour des totaux
     st.session_state['token_usage']['total_input_tokens'] += input_tokens
     st.session_state['token_usage']['total_output_tokens'] += output_tokens
     st.session_state['token_usage']['total_cost_usd'] += request_cost
     st.session_state['token_usage']['requests_count'] += 1
+    usage = st.session_state['token_usage']
+    usage['total_cached_tokens'] = usage.get('total_cached_tokens', 0) + cached_tokens
+    usage['cache_savings_usd'] = usage.get('cache_savings_usd', 0.0) + cache_savings
     
     # Usage journalier
     today = datetime.now().strftime('%Y-%m-%d')
@@ -119,6 +135,42 @@ def update_token_usage(input_tokens: int, output_tokens: int, model_name: str =
     daily['output_tokens'] += output_tokens
     daily['cost_usd'] += request_cost
     daily['requests'] += 1
+    daily['cached_tokens'] = daily.get('cached_tokens', 0) + cached_tokens
+    
+    plafonner_historique_tokens()
+
+def fusionner_usage_tokens(usage: Dict[str, Any]):
+    """Ajoute au compteur de la session l'usage relevé ailleurs (travail en arrière-plan)"""
+    init_token_counter()
+    total = st.session_state['token_usage']
+
+    for cle in ('total_input_tokens', 'total_output_tokens', 'total_cost_usd',
+                'total_cached_tokens', 'cache_savings_usd', 'requests_count'):
+        total[cle] = total.get(cle, 0) + usage.get(cle, 0)
+
+    journalier = total.setdefault('daily_usage', {})
+    for jour, compteurs in usage.get('daily_usage', {}).items():
+        cumul = journalier.setdefault(jour, {'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0, 'requests': 0})
+        for cle, valeur in compteurs.items():
+            cumul[cle] = cumul.get(cle, 0) + valeur
+
+    total.setdefault('request_history', []).extend(usage.get('request_history', []))
+    plafonner_historique_tokens()
+
+def plafonner_historique_tokens():
+    """Ne conserve que les dernières requêtes et les derniers jours d'usage de la session"""
+    usage = st.session_state.get('token_usage')
+    if not usage:
+        return
+    
+    historique = usage.get('request_history')
+    if historique and len(historique) > MAX_HISTORIQUE_REQUETES:
+        del historique[:-MAX_HISTORIQUE_REQUETES]
+    
+    journalier = usage.get('daily_usage')
+    if journalier and len(journalier) > MAX_JOURS_USAGE:
+        for jour in sorted(journalier)[:-MAX_JOURS_USAGE]:  # Dates ISO : ordre chronologique
+            del journalier[jour]
 
 def check_token_limits(estimated_tokens: int) -> Tuple[bool, str]:
     """Vérifie si la requête respecte les limites"""
@@ -191,6 +243,8 @@ def obtenir_statistiques_tokens() -> Dict[str, Any]:
         'input_tokens': usage['total_input_tokens'],
         'output_tokens': usage['total_output_tokens'],
         'total_cost': usage['total_cost_usd'],
+        'cached_tokens': usage.get('total_cached_tokens', 0),
+        'cache_savings': usage.get('cache_savings_usd', 0.0),
         'requests_count': usage['requests_count'],
         'session_start': usage['session_start'],
         'session_duration': duration_str,
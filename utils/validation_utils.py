@@ -5,7 +5,10 @@ Fonctions utilitaires pour la validation et la gestion des données
 import re
 import json
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
 
 def valider_email(email: str) -> bool:
     """
@@ -220,6 +223,113 @@ def consolider_erreurs(validations: List[Dict[str, Any]]) -> Dict[str, Any]:
         'nb_avertissements': len(tous_avertissements)
     }
 
+def _convertir_colonne_nombres(serie: pd.Series) -> pd.Series:
+    """
+    Convertit une colonne selon les règles de `valider_montant` / `valider_pourcentage`
+
+    Les textes (collés depuis un tableur ou importés d'un CSV) sont débarrassés
+    de tout caractère autre que chiffres, points et virgules, la virgule valant
+    point décimal ; les nombres sont repris tels quels.
+
+    Args:
+        serie (pd.Series): Colonne à convertir
+
+    Returns:
+        pd.Series: Valeurs numériques (NaN si la cellule n'est pas convertible)
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return serie.astype(float)
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+
+    est_texte = serie.map(type).eq(str)
+    textes = serie.where(est_texte).astype('string')
+    textes = textes.str.replace(r'[^\d.,]', '', regex=True).str.replace(',', '.', regex=False)
+    depuis_texte = pd.to_numeric(textes, errors='coerce')
+    depuis_nombre = pd.to_numeric(serie.where(~est_texte), errors='coerce')
+    return depuis_texte.where(est_texte, depuis_nombre).astype(float)
+
+def valider_tableau(
+    tableau: pd.DataFrame,
+    colonnes_montants: Sequence[str] = (),
+    colonnes_pourcentages: Sequence[str] = (),
+    colonnes_texte: Sequence[str] = (),
+    colonne_libelle: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Valide un tableau saisi en masse, colonne par colonne en opérations vectorisées
+
+    Applique à chaque cellule les règles de `valider_montant` (nombre positif ou
+    nul), de `valider_pourcentage` (entre 0 et 100) et de `nettoyer_texte`
+    (libellé obligatoire), sans boucle sur les lignes.
+
+    Args:
+        tableau (pd.DataFrame): Tableau saisi (édité, collé ou importé)
+        colonnes_montants (list): Colonnes de montants
+        colonnes_pourcentages (list): Colonnes de pourcentages
+        colonnes_texte (list): Colonnes de libellés obligatoires
+        colonne_libelle (str, optional): Colonne nommant les lignes dans les messages (doit être unique)
+
+    Returns:
+        dict: Résultats de validation, avec le tableau nettoyé (`donnees_nettoyees`)
+              et le masque des cellules invalides (`cellules_invalides`)
+    """
+    nettoye = tableau.reset_index(drop=True).copy()
+    invalides = pd.DataFrame(False, index=nettoye.index, columns=nettoye.columns)
+    erreurs = []
+    avertissements = []
+
+    regles = [(colonne, 'montant') for colonne in colonnes_montants]
+    regles += [(colonne, 'pourcentage') for colonne in colonnes_pourcentages]
+
+    for colonne, regle in regles:
+        valeurs = _convertir_colonne_nombres(nettoye[colonne])
+        if regle == 'montant':
+            valide = valeurs.notna() & (valeurs >= 0)
+            nettoye[colonne] = valeurs.clip(lower=0).fillna(0.0)
+        else:
+            valide = valeurs.between(0, 100)
+            nettoye[colonne] = valeurs.clip(0, 100).fillna(0.0)
+        invalides[colonne] = ~valide
+
+    for colonne in colonnes_texte:
+        textes = nettoye[colonne].astype('string').str.replace(r'\s+', ' ', regex=True).str.strip()
+        invalides[colonne] = textes.isna() | (textes == '')
+        nettoye[colonne] = textes.fillna('').astype(object)
+
+    # Libellés des lignes pour les messages
+    if colonne_libelle and colonne_libelle in nettoye.columns:
+        libelles = nettoye[colonne_libelle].astype(str)
+        doublons = libelles[libelles.duplicated() & (libelles != '')].unique()
+        erreurs += [f"Le libellé « {libelle} » apparaît plusieurs fois" for libelle in doublons]
+    else:
+        libelles = pd.Series([f"Ligne {i + 1}" for i in range(len(nettoye))], index=nettoye.index)
+
+    descriptions = {'montant': "montant invalide", 'pourcentage': "pourcentage invalide (0 à 100)"}
+    for ligne, position in np.argwhere(invalides.to_numpy()):
+        colonne = invalides.columns[position]
+        regle = dict(regles).get(colonne)
+        libelle = libelles.iloc[ligne] or f"Ligne {ligne + 1}"
+        valeur = tableau.iloc[ligne][colonne]
+        if regle is None:
+            erreurs.append(f"{libelle} : « {colonne} » est obligatoire")
+        elif (valeur == '') if isinstance(valeur, str) else pd.isna(valeur):
+            erreurs.append(f"{libelle}, {colonne} : cellule vide")
+        else:
+            erreurs.append(f"{libelle}, {colonne} : {descriptions[regle]} ({valeur!r})")
+
+    colonnes_nombres = [colonne for colonne, _ in regles]
+    if colonnes_nombres and len(nettoye) and not nettoye[colonnes_nombres].to_numpy().any():
+        avertissements.append("Toutes les valeurs du tableau sont nulles")
+
+    return {
+        'valide': len(erreurs) == 0,
+        'erreurs': erreurs,
+        'avertissements': avertissements,
+        'donnees_nettoyees': nettoye,
+        'cellules_invalides': invalides
+    }
+
 def serialiser_donnees(donnees: Any) -> str:
     """
     Sérialise des données en JSON en gérant les types spéciaux